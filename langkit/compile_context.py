@@ -14,7 +14,9 @@ from __future__ import annotations
 from collections import defaultdict
 from contextlib import contextmanager
 from functools import reduce
+import hashlib
 import importlib
+import json
 import os
 from os import path
 from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, cast
@@ -1366,6 +1368,28 @@ class CompileCtx:
         for prop in self.all_properties(include_inherited=False):
             prop._uses_envs = bool(prop._uses_envs)
 
+    def compute_calls_user_externals_attr(self):
+        """
+        Pass to compute the `calls_user_externals` attribute for every
+        property.
+
+        This will determine the memoized properties whose results cannot be
+        kept when analysis units change.
+        """
+        _, backwards = self.properties_callgraphs()
+
+        queue = sorted(self.all_properties(lambda p: p.calls_user_externals,
+                                           include_inherited=False),
+                       key=lambda p: p.qualname)
+
+        # Propagate the attribute in the backwards call graph
+        while queue:
+            prop = queue.pop(0)
+            for caller in backwards[prop]:
+                if not caller.calls_user_externals:
+                    caller.calls_user_externals = True
+                    queue.append(caller)
+
     def warn_on_undocumented(self, node):
         """
         Emit a warning if ``node`` is not documented.
@@ -1808,6 +1832,28 @@ class CompileCtx:
         assert self._entity_types is not None
         return self._entity_types
 
+    @property  # type: ignore
+    @memoized
+    def parse_cache_build_id(self):
+        """
+        Return an identifier for the way the generated library turns source
+        files into parse trees: lexer, parsers and node types. Parse cache
+        entries created by a library with a different identifier must not be
+        reused.
+
+        :rtype: str
+        """
+        m = hashlib.sha1()
+        m.update(json.dumps(self.lexer.signature).encode('utf-8'))
+        for parser in self.generated_parsers:
+            m.update(parser.body.encode('utf-8'))
+        for cls in self.astnode_types:
+            m.update(cls.hierarchical_name.encode('utf-8'))
+            for f in cls.get_parse_fields(include_inherited=False):
+                m.update('{}:{}:{}'.format(f.name.lower, f.abstract, f.null)
+                         .encode('utf-8'))
+        return m.hexdigest()
+
     @property
     def enum_types(self):
         from langkit.compiled_types import CompiledTypeRepo
@@ -1907,6 +1953,8 @@ class CompileCtx:
                        CompileCtx.compute_uses_entity_info_attr),
             GlobalPass('compute uses envs attribute',
                        CompileCtx.compute_uses_envs_attr),
+            GlobalPass('compute calls user externals attribute',
+                       CompileCtx.compute_calls_user_externals_attr),
             EnvSpecPass('check env specs', EnvSpec.check_spec),
             GlobalPass('warn on unused private properties',
                        CompileCtx.warn_unused_private_properties),
@@ -81,6 +81,12 @@ def template_extensions(ctx):
         'unit_provider_get_unit_from_name_type':
             CAPIType(capi,
                      'unit_provider_get_unit_from_name_callback').name,
+        'serialization_callback_type':
+            CAPIType(capi, 'serialization_callback').name,
+        'event_handler_destroy_type':
+            CAPIType(capi, 'event_handler_destroy_callback').name,
+        'event_handler_phase_timing_type':
+            CAPIType(capi, 'event_handler_phase_timing_callback').name,
         'token_kind':            CAPIType(capi, 'token_kind').name,
         'token_type':            CAPIType(capi, 'token').name,
         'sloc_type':             CAPIType(capi, 'source_location').name,
@@ -89,6 +95,7 @@ def template_extensions(ctx):
         'text_type':             CAPIType(capi, 'text').name,
         'big_integer_type':      CAPIType(capi, 'big_integer').name,
         'diagnostic_type':       CAPIType(capi, 'diagnostic').name,
+        'memory_usage_type':     CAPIType(capi, 'memory_usage').name,
         'exception_type':        CAPIType(capi, 'exception').name,
         'exception_kind_type':   CAPIType(capi, 'exception_kind').name
     }
@@ -521,6 +528,29 @@ class AbstractNodeData:
         assert self.struct
         return self.struct.kwless_raw_name + self.api_name
 
+    @property
+    def has_bulk_accessor(self):
+        """
+        Return whether we generate a bulk accessor for this field, i.e. an
+        accessor that evaluates it on an array of nodes in a single call.
+
+        This is available only for properties that take no argument.
+
+        :rtype: bool
+        """
+        return self.is_property and not self.arguments
+
+    @property
+    def bulk_accessor_basename(self):
+        """
+        Return the base name for the bulk accessor we generate for this field.
+        See ``has_bulk_accessor``.
+
+        :rtype: names.Name
+        """
+        assert self.has_bulk_accessor
+        return self.accessor_basename + names.Name('Bulk')
+
     @property
     def natural_arguments(self):
         """
@@ -174,6 +174,13 @@ base_langkit_docs = {
         Diagnostic for an analysis unit: cannot open the source file, parsing
         error, ...
     """,
+    'langkit.memory_usage_type': """
+        Estimated memory usage, in bytes, for an analysis unit or an analysis
+        context, broken down by category: AST nodes, token and trivia tables,
+        source buffer, symbols, memoized property results, lexical environment
+        maps and lexical environment lookup caches. The last field is the sum
+        of all categories.
+    """,
     'langkit.exception_kind_type': """
         Enumerated type describing all possible exceptions that need to be
         handled in the C bindings.
@@ -303,6 +310,179 @@ base_langkit_docs = {
         Debug helper. Set whether ``Property_Error`` exceptions raised in
         ``Populate_Lexical_Env`` should be discarded. They are by default.
     """,
+    'langkit.context_memoization_invalidation_stats': """
+        % if lang == 'python':
+        Return a ``(invalidated, surviving)`` couple, where ``invalidated`` is
+        % else:
+        Return in ``Invalidated``
+        % endif
+        the number of memoized property results that were discarded because a
+        unit they depend on was reparsed or had its lexical environments
+        updated, and
+        % if lang == 'python':
+        ``surviving``
+        % else:
+        in ``Surviving``
+        % endif
+        the number of memoized results that were kept during these
+        invalidations. Both counters are cumulative since the creation of the
+        context.
+    """,
+    'langkit.memoized_properties_count': """
+        Return the number of memoized properties in this library.
+    """,
+    'langkit.memoized_property_name': """
+        Return the qualified name of the memoized property at ``Index``
+        % if lang == 'ada':
+        (from 1
+        % else:
+        (from 0
+        % endif
+        to the number of memoized properties, excluded).
+    """,
+    'langkit.context_memoization_stats': """
+        % if lang == 'python':
+        Return a dict that maps the qualified name of each memoized property
+        to its memoization statistics in this context: number of calls that
+        reused a memoized result (``hits``) or that had to evaluate the
+        property (``misses``), number of memoized results currently stored
+        (``entries``) and their estimated memory footprint in bytes
+        (``bytes``), and number of results discarded to honor the memoization
+        memory limit (``evictions``).
+        % else:
+        Return memoization statistics for the memoized property at ``Index``
+        in ``Context``: number of calls that reused a memoized result or that
+        had to evaluate the property, number of memoized results currently
+        stored and their estimated memory footprint in bytes, and number of
+        results discarded to honor the memoization memory limit.
+        % endif
+    """,
+    'langkit.context_set_memoization_memory_limit': """
+        Bound the memory that memoized property results can use in this
+        context to ``Limit`` bytes (estimated). If ``Limit`` is zero, which is
+        the default, memoization memory is unbounded.
+
+        Whenever this limit is exceeded, memoized results are discarded (they
+        are computed again when needed) according to ``Policy``.
+        % if lang == 'python':
+        It can be ``'lru'`` or ``'clock'``.
+        % elif lang == 'c':
+        It can be ``0`` (LRU) or ``1`` (Clock).
+        % else:
+        See ``Memoization_Eviction_Policy``.
+        % endif
+        % if lang != 'ada':
+
+        LRU discards the least recently used results first. Clock approximates
+        LRU at a lower cost: it goes over results from the oldest to the
+        newest and discards the first one that was not used since it last went
+        over it.
+        % endif
+    """,
+    'langkit.context_set_unit_memory_limit': """
+        Bound the memory that analysis units can use in this context to
+        ``Limit`` bytes (estimated). This covers the trees, tokens and source
+        buffers of units, as well as memoized property results. If ``Limit``
+        is zero, which is the default, this memory is unbounded.
+
+        Whenever this limit is exceeded, the least recently used units are
+        evicted: their trees, tokens, source buffers and lexical environments
+        are released, as well as the memoized results that depend on them. The
+        units themselves remain valid: they are parsed again from their source
+        files the next time they are used. References to the nodes of evicted
+        units become stale, just like after a reparse. As parsing them again
+        would invalidate the results that running properties rely on, using
+        evicted units while properties are evaluated (for instance fetching
+        them from a unit provider) is an error.
+
+        Units parsed from buffers, units that populated lexical environments
+        of other units (or the root environment), and units whose lexical
+        environments contain nodes from other units or are used in env
+        rebindings are never evicted. No unit is evicted while properties are
+        evaluated, while lexical environments are populated or during tree
+        rewriting sessions.
+        % if lang == 'python':
+        The limit is not enforced either inside ``no_reparse`` blocks.
+        % endif
+    """,
+    'langkit.context_set_parse_cache_directory': """
+        Enable the on-disk parse cache for this context, storing its entries in
+        ``Directory`` (created if needed), or disable it if ``Directory`` is
+        % if lang == 'python':
+        None or
+        % elif lang == 'c':
+        NULL or
+        % endif
+        an empty string. The parse cache is disabled by default.
+
+        When the parse cache is enabled, the tokens and the tree of units
+        parsed from source files without errors are saved in the cache, so
+        that parsing the same file contents again (with the same grammar rule,
+        charset, tab stop and trivia settings, and the same build of this
+        library) just reloads them instead of lexing and parsing. Cache
+        entries are only meant to be read on the host that wrote them.
+    """,
+    'langkit.context_set_compact_source_buffers': """
+        Set whether units parsed in this context afterwards can store their
+        source buffer in a compact representation: when the source text
+        contains only Latin-1 characters, it then takes one byte per character
+        instead of four. This is disabled by default.
+
+        This is transparent for users, except that the APIs which return
+        references to the source buffer (the text of units, nodes and tokens in
+        the C and Python APIs) switch the corresponding unit back to the
+        regular representation. Wrapping tokens does not: in the C API, the
+        text of tokens that belong to units which use the compact
+        representation is empty, so it must be fetched with the token range
+        text function instead.
+    """,
+    'langkit.context_memory_usage': """
+        % if lang == 'python':
+        Return the estimated memory usage, in bytes, of all analysis units in
+        this context plus its symbol table and root lexical environment, as a
+        ``MemoryUsage`` instance.
+        % else:
+        Return the estimated memory usage, in bytes, of all analysis units in
+        ``Context`` plus its symbol table and root lexical environment.
+        % endif
+
+        This only reads counters and the size of existing tables, so it is
+        cheap enough to be called periodically, for instance to monitor a
+        long-running process.
+    """,
+    'langkit.context_set_event_handler': """
+        % if lang == 'c':
+        Set the event handler for this context: ``phase_timing_func`` is
+        called with ``data`` each time an analysis phase completes, and
+        ``destroy_func`` (if not null) is called with ``data`` when the
+        context releases the event handler, i.e. when another event handler
+        is set or when the context is destroyed. Pass a null
+        ``phase_timing_func`` to remove the current event handler.
+        % elif lang == 'python':
+        Set the event handler for this context (an ``EventHandler``
+        instance), or remove the current one if ``handler`` is None.
+        % else:
+        Set the event handler for this context, or remove the current one if
+        ``Handler`` is null. The context takes ownership of ``Handler``: it
+        calls its ``Release`` primitive and deallocates it when it is replaced
+        or when the context is destroyed.
+        % endif
+
+        The event handler receives timings for lexing, parsing and lexical
+        environment population for each analysis unit, as well as for each
+        top-level property call.
+    """,
+    'langkit.analysis_phase': """
+        Phase of the analysis of a unit for which the event handler of an
+        analysis context receives timings.
+    """,
+    'langkit.memoization_eviction_policy': """
+        Policy to discard memoized property results when the memoization
+        memory limit is exceeded. LRU discards the least recently used results
+        first. Clock approximates LRU at a lower cost: it goes over results
+        from the oldest to the newest and discards the first one that was not
+        used since it last went over it.
+    """,
     'langkit.context_set_logic_resolution_timeout': """
         If ``Timeout`` is greater than zero, set a timeout for the resolution
         of logic equations. The unit is the number of steps in ANY/ALL
@@ -310,6 +490,16 @@ base_langkit_docs = {
         the timeout is ``100 000`` steps.
     """,
 
+    'langkit.context_has_unit': """
+        Return whether ``Context`` contains a unit corresponding to
+        ``Unit_Filename``.
+    """,
+    'langkit.context_reparse_version': """
+        Return a number that changes each time a unit in ``Context`` is
+        reparsed or evicted, i.e. each time nodes in ``Context`` may be
+        deallocated.
+    """,
+
     'langkit.get_unit_from_file': """
         Create a new analysis unit for ``Filename`` or return the existing one
         if any. If ``Reparse`` is true and the analysis unit already exists,
@@ -408,9 +598,72 @@ base_langkit_docs = {
         Return the number of trivias in this unit. This is 0 for units that
         were parsed with trivia analysis disabled.
     """,
+    'langkit.unit_memory_usage': """
+        % if lang == 'python':
+        Return the estimated memory usage, in bytes, of this unit, as a
+        ``MemoryUsage`` instance.
+        % else:
+        Return the estimated memory usage, in bytes, of this unit.
+        % endif
+        All units in a context share its symbol table: the symbols category
+        holds the share of this unit, proportional to its number of tokens.
+    """,
+    'langkit.unit_is_evicted': """
+        Return whether this unit is currently evicted to honor the unit memory
+        limit of its context. Accessing its tree or its tokens parses it
+        again.
+    """,
     'langkit.unit_text': """
         Return the source buffer associated to this unit.
     """,
+    'langkit.unit_source_buffer': """
+        % if lang == 'python':
+            Return a read-only memory view on the source buffer of this unit,
+            as UTF-32 code points (native endianness). The view designates a
+            copy of the buffer, made once per version of this unit, so it
+            (and slices of it) remain valid after the unit is reparsed, and
+            keep the source text at the time it was requested.
+        % else:
+            Return the whole source buffer of this unit. The result designates
+            the buffer that the unit owns: it must not be freed and is valid
+            only until the unit is reparsed or destroyed.
+        % endif
+    """,
+    'langkit.unit_export_tokens': """
+        % if lang == 'python':
+            Return a ``TokenTable`` instance that describes all the tokens and
+            trivia in this unit, in logical order, as packed columns. This
+            requires a single call to the C API, whatever the number of tokens.
+        % else:
+            Fill arrays with information about the tokens and trivia in this
+            unit, in logical order: one element per token/trivia for each
+            array. Arrays can be null, in which case the corresponding
+            information is not exported.
+
+            ``Capacity`` is the number of elements that the arrays can hold:
+            elements beyond it are not exported. Return the total number of
+            tokens and trivia in this unit, so that callers can check whether
+            the arrays were big enough.
+
+            Offsets are 0-based indexes in the source buffer of this unit. Like
+            source location ranges, end offsets are exclusive.
+        % endif
+    """,
+    'langkit.unit_node_at_preorder_index': """
+        % if lang == 'ada':
+            Return the node in this unit whose preorder index is ``Index`` (see
+            ``Preorder_Index``), or null if there is no such node.
+        % elif lang == 'c':
+            Store in ``*result_p`` the node in this unit whose preorder index
+            is ``index`` (see ``${capi.get_name('node_preorder_index')}``) and
+            return 1. Return 0 if there is no such node.
+        % else:
+            Return the node in this unit whose preorder index is ``index`` (see
+            ``preorder_index``), or None if there is no such node.
+        % endif
+
+        This is a constant time operation.
+    """,
     'langkit.unit_lookup_token': """
         Look for a token in this unit that contains the given source location.
         If this falls before the first token, return the first token. If this
@@ -418,6 +671,119 @@ base_langkit_docs = {
         falls after the last token, return the last token. If there is no token
         in this unit, return no token.
     """,
+    'langkit.unit_serialize': """
+        Serialize the parse tree of this unit in the given format, streaming the
+        result to
+        % if lang == 'python':
+            ``output``, a binary file-like object, or return it as a bytes
+            string if ``output`` is None.
+
+            ``format`` is either ``"json"`` or ``"binary"``.
+        % else:
+            ``callback``, which receives ``data`` and the successive chunks of
+            the output. Return 1 on success, 0 on error.
+
+            ``format`` is 0 for JSON and 1 for the binary format.
+        % endif
+
+        In the JSON format, each node is an object with a ``"kind"`` (name of
+        its kind) and a ``"sloc_range"`` entries. Token nodes also have a
+        ``"text"`` entry, list nodes have an ``"items"`` entry (array of
+        children) and other nodes have a ``"fields"`` entry (object that maps
+        field names to children).
+
+        The binary format is a compact and self-describing encoding of the
+        parse tree (node kinds, field layout, token indexes, source location
+        ranges and a table for the text of token nodes). The generated
+        ``${ctx.python_api_settings.module_name}_tree_reader`` Python module
+        can decode it without loading this library.
+    """,
+    'langkit.node_bulk_accessor': """
+        Evaluate this property on each of the ``count`` nodes in the ``nodes``
+        array, in order. Store each result in the corresponding element of
+        ``values`` and set the corresponding element of ``errors`` to 1 if the
+        evaluation failed for this node, to 0 otherwise.
+
+        Return 1 if the evaluation succeeded for all nodes, 0 otherwise. As
+        errors are reported per node, this does not set the exception that
+        ``${capi.get_name('get_last_exception')}`` returns.
+    """,
+    'langkit.serialization_callback_type': """
+        Callback type for functions that receive serialized parse trees. The
+        first argument is the ``data`` pointer given to the serialization
+        function, then come the address and the size of a chunk of output.
+    """,
+    'langkit.unit_line_count': """
+        Return the number of lines in the source buffer for this unit.
+    """,
+    'langkit.unit_offset_to_sloc': """
+        % if lang == 'c':
+            Store in ``*sloc`` the source location of the character at
+            ``offset`` (0-based index in the source buffer for this unit) and
+            return 1. Return 0 if ``offset`` is out of bounds.
+        % else:
+            Return the source location of the character at ``offset`` (0-based
+            index in the source buffer for this unit), or None if ``offset`` is
+            out of bounds.
+        % endif
+        The size of the source buffer designates the end of the source buffer.
+
+        This uses the table of lines starts that is computed when lexing the
+        unit, so the line lookup runs in logarithmic time.
+    """,
+    'langkit.unit_sloc_to_offset': """
+        Return the 0-based index in the source buffer for this unit of the
+        character at ``sloc``, or
+        % if lang == 'c':
+            -1
+        % else:
+            None
+        % endif
+        if there is no such character. Note that the end of a line is a valid
+        location.
+    """,
+    'langkit.unit_line_tokens': """
+        % if lang == 'c':
+            Store in ``*first`` and ``*last`` the first and the last tokens in
+            this unit (trivia included) whose source location range overlaps
+            with ``line`` and return 1. Return 0 if there is no such token.
+        % else:
+            Return the list of tokens in this unit (trivia included) whose
+            source location range overlaps with ``line``.
+        % endif
+    """,
+    'langkit.unit_lookup_node': """
+        % if lang == 'c':
+            Store in ``*result_p`` the bottom-most node in this unit whose sloc
+            range contains ``*sloc``, or the null node if there is none.
+        % else:
+            Return the bottom-most node in this unit whose sloc range contains
+            ``Sloc``, or ${null} if there is none.
+        % endif
+        All the nodes that contain this source location are this node and its
+        parents.
+
+        The first call computes an index of the unit's tree, so that this call
+        and node lookups in this unit run in logarithmic time. Reparsing the
+        unit discards this index.
+    """,
+    'langkit.unit_covering_nodes': """
+        % if lang == 'c':
+            Store in ``*result_p`` a new array that contains all the nodes in
+            this unit whose sloc range contains ``*sloc``, from the bottom-most
+            one (see ``${capi.get_name('unit_lookup_node')}``) up to the root
+            node. The array is empty if there is no such node. The caller must
+            dec-ref it when done with it.
+        % elif lang == 'python':
+            Return the list of all nodes in this unit whose sloc range contains
+            ``sloc``, from the bottom-most one (see ``lookup_node``) up to the
+            root node. Return an empty list if there is none.
+        % else:
+            Return all the nodes in this unit whose sloc range contains
+            ``Sloc``, from the bottom-most one (see ``Lookup_Node``) up to the
+            root node. Return an empty array if there is none.
+        % endif
+    """,
     'langkit.unit_dump_lexical_env': """
         Debug helper: output the lexical envs for the given analysis unit.
     """,
@@ -482,6 +848,12 @@ base_langkit_docs = {
 
         Note that this returns the empty string for synthetic nodes.
     """,
+    'langkit.node_text_slice': """
+        Like ``node_text``, but instead of returning an allocated copy of the
+        text, return the slice of the source buffer that it designates. The
+        result must not be freed and is valid only until the unit that owns
+        this node is reparsed or destroyed.
+    """,
     'langkit.node_sloc_range': """
         Return the spanning source location range for this node.
 
@@ -498,6 +870,35 @@ base_langkit_docs = {
         Return the Nth child for in this node's fields and store it into
         *CHILD_P.  Return zero on failure (when N is too big).
     """,
+    'langkit.node_preorder_index': """
+        Return the index of this node in the preorder traversal of its
+        analysis unit's tree, which the parser computes for all nodes.
+        % if lang == 'ada':
+            Indexes are 1-based. Return 0 for synthetic nodes, which are not
+            part of this tree.
+        % elif lang == 'c':
+            Indexes are 0-based. Return -1 for synthetic nodes, which are not
+            part of this tree.
+        % else:
+            Indexes are 0-based. Return None for synthetic nodes, which are not
+            part of this tree.
+        % endif
+
+        Preorder indexes identify nodes in a unit as long as it is not
+        reparsed, and node B is in the subtree of node A iff B's preorder index
+        is between A's preorder index and A's last preorder index.
+    """,
+    'langkit.node_preorder_last': """
+        Return the preorder index of the last node in this node's subtree (see
+        the preorder index of nodes).
+        % if lang == 'ada':
+            Return 0 for synthetic nodes.
+        % elif lang == 'c':
+            Return -1 for synthetic nodes.
+        % else:
+            Return None for synthetic nodes.
+        % endif
+    """,
     'langkit.node_is_null': """
         Return whether this node is a null node reference.
     """,
@@ -558,6 +959,42 @@ base_langkit_docs = {
     # Unit providers
     #
 
+    'langkit.event_handler_type': """
+        Interface to receive notifications about the analysis of units in an
+        analysis context, for instance to monitor where analysis time goes.
+        % if lang == 'python':
+        See ``AnalysisContext.set_event_handler``.
+        % else:
+        See ``Set_Event_Handler``.
+        % endif
+    """,
+    'langkit.event_handler_phase_timing': """
+        Called each time an analysis phase completes. ``Filename`` is the
+        name of the analysis unit that was analyzed, ``Phase`` says what was
+        done and ``Elapsed`` is how long it took. For property evaluation,
+        this is called only for top-level property calls (not for calls made
+        during the evaluation of other properties, nor during lexical
+        environment population), ``Name`` is the qualified name of the
+        property and ``Filename`` designates the unit that owns the node on
+        which it was called. ``Name`` is empty for other phases.
+
+        This must not raise exceptions.
+    """,
+    'langkit.event_handler_destroy_type': """
+        Callback type for functions that are called when destroying an event
+        handler. The argument is the ``data`` pointer given when setting the
+        event handler.
+    """,
+    'langkit.event_handler_phase_timing_type': """
+        Callback type for functions that are called each time an analysis
+        phase completes. Arguments are the ``data`` pointer given when setting
+        the event handler, the name of the analysis unit, the phase, the
+        qualified name of the property for property evaluation (empty string
+        for other phases) and the elapsed time in seconds.
+
+        The phase can be ``0`` (lexing), ``1`` (parsing), ``2`` (lexical
+        environment population) or ``3`` (property evaluation).
+    """,
     'langkit.unit_provider_type': """
         Interface to fetch analysis units from a name and a unit kind.
 
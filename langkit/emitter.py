@@ -512,6 +512,10 @@ class Emitter:
             Unit('pkg_lexer_impl', 'Lexer_Implementation'),
             Unit('pkg_lexer_state_machine', 'Lexer_State_Machine',
                  has_body=True, cached_body=self.dfa_code is None),
+            # Unit for parse tree serializers
+            Unit('pkg_serialization', 'Serialization'),
+            # Unit for the on-disk parse cache
+            Unit('pkg_parse_cache', 'Parse_Cache'),
             # Unit for debug helpers
             Unit('pkg_debug', 'Debug'),
         ]:
@@ -535,6 +539,16 @@ class Emitter:
                 ctx.render_template('main_parse_ada'),
                 self.post_process_ada
             )
+            for kind, template in [
+                (ADA_SPEC, 'main_parse_timing_spec_ada'),
+                (ADA_BODY, 'main_parse_timing_body_ada'),
+            ]:
+                write_ada_file(
+                    path.join(self.lib_root, 'src'),
+                    kind, [names.Name('Parse_Timing')],
+                    ctx.render_template(template),
+                    self.post_process_ada
+                )
 
         imain_project_file = os.path.join(self.lib_root, 'src', 'mains.gpr')
         write_source_file(
@@ -654,6 +668,15 @@ class Emitter:
             'python_api/py2to3_py'
         )
 
+        # Emit the standalone reader for serialized trees. It must not belong
+        # to the package so that it can be used without loading the library.
+        render_python_template(
+            os.path.join(self.python_path, '{}_tree_reader.py'.format(
+                ctx.python_api_settings.module_name
+            )),
+            'python_api/tree_reader_py'
+        )
+
         # Emit stub files for Mypy (type hints)
         render_python_template(
             os.path.join(package_dir, '__init__.pyi'),
@@ -3337,6 +3337,17 @@ class PropertyDef(AbstractNodeData):
         :type: bool
         """
 
+        self.calls_user_externals = self.user_external
+        """
+        Whether the evaluation of this property can involve calling external
+        properties that come from the DSL. As we do not know what their
+        implementation does, the memoized results of such properties must be
+        invalidated whenever any analysis unit changes. Computed during the
+        "compute calls user externals attribute" pass.
+
+        :type: bool
+        """
+
         self._uses_entity_info = uses_entity_info
         self._uses_envs = uses_envs
 
@@ -4193,6 +4204,19 @@ class PropertyDef(AbstractNodeData):
                 self.struct.name +
                 self.name).camel_with_underscores
 
+    @property
+    def memoization_key_length(self):
+        """
+        Return the number of items in the memoization keys for this property:
+        one for Self, one per argument and one for the entity info, if used.
+
+        :rtype: int
+        """
+        result = 1 + len(self.arguments)
+        if self.uses_entity_info:
+            result += 1
+        return result
+
     @property
     def reason_for_no_memoization(self):
         """
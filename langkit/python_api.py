@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
+from typing import Optional, TYPE_CHECKING, cast
 
 from langkit.c_api import CAPISettings
 import langkit.compiled_types as ct
@@ -29,7 +29,8 @@ class PythonAPISettings(AbstractAPISettings):
     def wrap_value(self,
                    value: str,
                    type: CompiledType,
-                   from_field_access: bool = False) -> str:
+                   from_field_access: bool = False,
+                   context: Optional[str] = None) -> str:
         """
         Given an expression for a low-level value and the associated type,
         return an other expression that yields the corresponding high-level
@@ -40,6 +41,9 @@ class PythonAPISettings(AbstractAPISettings):
         :param from_field_access: True if "value" is a record field or array
             item access (False by default). This is a special case because of
             the way ctypes works.
+        :param context: If provided, expression for the analysis context
+            wrapper that owns "value". For arrays, this allows to return
+            ``ArrayView`` instances in ``lazy_arrays`` blocks.
         """
         value_suffix = '' if from_field_access else '.value'
         return dispatch_on_type(type, [
@@ -57,9 +61,10 @@ class PythonAPISettings(AbstractAPISettings):
             (T.Int, lambda _: '{{}}{}'.format(value_suffix)),
             (T.Character, lambda _: '_py2to3.unicode_character({{}}{})'
                                     .format(value_suffix)),
-            (ct.ArrayType, lambda _: '{}.wrap({{}}, {})'.format(
+            (ct.ArrayType, lambda _: '{}.wrap({{}}, {}{})'.format(
                 self.array_wrapper(cast(ArrayType, type)),
-                from_field_access
+                from_field_access,
+                '' if context is None else ', {}'.format(context)
             )),
             (ct.StructType, lambda _: '{}._wrap({{}})'.format(
                 self.type_public_name(type))),
@@ -187,3 +192,19 @@ class PythonAPISettings(AbstractAPISettings):
             (ct.StructType, lambda _: type.api_name.camel),
             (T.BigInt, lambda _: 'int'),
         ])
+
+    def property_type_hint(self, type: CompiledType) -> str:
+        """
+        Return the type hint for values that properties of the given type
+        return. This differs from ``CompiledType.mypy_type_hint`` only for
+        arrays, which can be returned as ``ArrayView`` instances.
+
+        :param type: Return type for the property.
+        """
+        if (
+            isinstance(type, ArrayType)
+            and not type.element_type.is_character_type
+        ):
+            element_hint = type.element_type.mypy_type_hint
+            return 'Union[List[{0}], ArrayView[{0}]]'.format(element_hint)
+        return type.mypy_type_hint
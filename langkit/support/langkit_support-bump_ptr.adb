@@ -58,6 +58,16 @@ package body Langkit_Support.Bump_Ptr is
       return new Bump_Ptr_Pool_Type;
    end Create;
 
+   ---------------------
+   -- Allocated_Bytes --
+   ---------------------
+
+   function Allocated_Bytes (Pool : Bump_Ptr_Pool) return Long_Long_Integer
+   is
+   begin
+      return (if Pool = No_Pool then 0 else Pool.Allocated);
+   end Allocated_Bytes;
+
    ----------
    -- Free --
    ----------
@@ -105,6 +115,7 @@ package body Langkit_Support.Bump_Ptr is
             --  it can keep being used next time.
 
             Append (Pool.Pages, Mem);
+            Pool.Allocated := Pool.Allocated + Long_Long_Integer (S);
             return Mem;
          end;
       end if;
@@ -115,6 +126,7 @@ package body Langkit_Support.Bump_Ptr is
       if Page_Size - Pool.Current_Offset < S then
          Pool.Current_Page := System.Memory.Alloc (Page_Size);
          Append (Pool.Pages, Pool.Current_Page);
+         Pool.Allocated := Pool.Allocated + Long_Long_Integer (Page_Size);
          Pool.Current_Offset := 0;
       end if;
 
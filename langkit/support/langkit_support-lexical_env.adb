@@ -43,11 +43,6 @@ package body Langkit_Support.Lexical_Env is
    --  Whether lookup cache is enabled for the given lexical environment.
    --  Note that for now, this is only a global setting (not per env).
 
-   function Is_Lookup_Cache_Valid (Env : Lexical_Env) return Boolean
-      with Pre => Env.Kind = Primary;
-   --  Return whether Env's lookup cache is valid. This will check every
-   --  Lookup_Cache_Valid flag up Env's parent chain.
-
    function Wrap
      (Env   : Lexical_Env_Access;
       Owner : Unit_T := No_Unit) return Lexical_Env
@@ -94,11 +89,34 @@ package body Langkit_Support.Lexical_Env is
       Rebindings    : Env_Rebindings := null;
       Metadata      : Node_Metadata := Empty_Metadata;
       Categories    : Ref_Categories;
-      Local_Results : in out Lookup_Result_Vector);
+      Local_Results : in out Lookup_Result_Vector;
+      Deps          : in out Lookup_Dependencies);
+
+   procedure Add_Lookup_Unit
+     (Units : in out Lookup_Unit_Vectors.Vector; Unit : Unit_T);
+   --  Append Unit to Units, unless it is No_Unit or Units already contains it
+
+   procedure Add_Lookup_Env
+     (Deps : in out Lookup_Dependencies; Env : Lexical_Env)
+      with Pre => Env.Kind = Primary;
+   --  Record in Deps that the lookup traversed Env, in its current version
+
+   procedure Merge_Dependencies
+     (Deps : in out Lookup_Dependencies; Other : Lookup_Dependencies);
+   --  Record in Deps everything that Other records
+
+   function Is_Up_To_Date (Deps : Lookup_Dependencies) return Boolean;
+   --  Return whether none of the things that Deps records has changed
+
+   procedure Destroy (Deps : in out Lookup_Dependencies);
+   --  Free resources allocated for Deps
 
    procedure Reset_Lookup_Cache (Self : Lexical_Env);
    --  Reset Self's lexical environment lookup cache
 
+   procedure Register_Lookup_Dependencies (Deps : in out Lookup_Dependencies);
+   --  Call Register_Lookup_Dependency on all units in Deps, then destroy it
+
    function Is_Foreign (Self : Lexical_Env; Node : Node_Type) return Boolean
    is (Self.Env.Node = No_Node
        or else Node_Unit (Self.Env.Node) /= Node_Unit (Node))
@@ -121,21 +139,121 @@ package body Langkit_Support.Lexical_Env is
       return To_Text (Ret);
    end Text_Image;
 
-   ---------------------------
-   -- Is_Lookup_Cache_Valid --
-   ---------------------------
+   ---------------------
+   -- Add_Lookup_Unit --
+   ---------------------
 
-   function Is_Lookup_Cache_Valid (Env : Lexical_Env) return Boolean is
-      P : Lexical_Env;
+   procedure Add_Lookup_Unit
+     (Units : in out Lookup_Unit_Vectors.Vector; Unit : Unit_T) is
    begin
-      if Env.Env.Lookup_Cache_Valid then
-         P := Parent (Env);
-         return (P in Null_Lexical_Env | Empty_Env
-                 or else Is_Lookup_Cache_Valid (P));
-      else
+      if Unit = No_Unit then
+         return;
+      end if;
+
+      --  Lookups tend to traverse several environments from the same unit in
+      --  a row, so start looking for duplicates from the end.
+      for I in reverse Units.First_Index .. Units.Last_Index loop
+         if Units.Get (I) = Unit then
+            return;
+         end if;
+      end loop;
+      Units.Append (Unit);
+   end Add_Lookup_Unit;
+
+   --------------------
+   -- Add_Lookup_Env --
+   --------------------
+
+   procedure Add_Lookup_Env
+     (Deps : in out Lookup_Dependencies; Env : Lexical_Env) is
+   begin
+      for I in reverse Deps.Envs.First_Index .. Deps.Envs.Last_Index loop
+         if Deps.Envs.Get (I).Env = Env then
+            return;
+         end if;
+      end loop;
+      Deps.Envs.Append ((Env, Env.Env.Content_Version));
+      Add_Lookup_Unit (Deps.Units, Env.Owner);
+   end Add_Lookup_Env;
+
+   ------------------------
+   -- Merge_Dependencies --
+   ------------------------
+
+   procedure Merge_Dependencies
+     (Deps : in out Lookup_Dependencies; Other : Lookup_Dependencies) is
+   begin
+      for U of Other.Units loop
+         Add_Lookup_Unit (Deps.Units, U);
+      end loop;
+      for E of Other.Envs loop
+         if not (for some Dep_E of Deps.Envs => Dep_E.Env = E.Env) then
+            Deps.Envs.Append (E);
+         end if;
+      end loop;
+      if Other.Context_Version /= -1 then
+         Deps.Context_Unit := Other.Context_Unit;
+         Deps.Context_Version := Other.Context_Version;
+      end if;
+      Deps.Cacheable := Deps.Cacheable and then Other.Cacheable;
+   end Merge_Dependencies;
+
+   -------------------
+   -- Is_Up_To_Date --
+   -------------------
+
+   function Is_Up_To_Date (Deps : Lookup_Dependencies) return Boolean is
+   begin
+      if Deps.Context_Version /= -1
+         and then Get_Context_Version (Deps.Context_Unit)
+                  /= Deps.Context_Version
+      then
          return False;
       end if;
-   end Is_Lookup_Cache_Valid;
+
+      for E of Deps.Envs loop
+
+         --  Check first that the environment was not destroyed (i.e. that
+         --  its unit was not reparsed), as only then we can inspect it.
+         --  Primary environments that have no owner (the root scope) live as
+         --  long as their analysis context.
+
+         if E.Env.Owner /= No_Unit
+            and then Get_Unit_Version (E.Env.Owner) > E.Env.Version
+         then
+            return False;
+         end if;
+
+         if E.Env.Env.Content_Version /= E.Version then
+            return False;
+         end if;
+      end loop;
+
+      return True;
+   end Is_Up_To_Date;
+
+   -------------
+   -- Destroy --
+   -------------
+
+   procedure Destroy (Deps : in out Lookup_Dependencies) is
+   begin
+      Deps.Units.Destroy;
+      Deps.Envs.Destroy;
+   end Destroy;
+
+   ----------------------------------
+   -- Register_Lookup_Dependencies --
+   ----------------------------------
+
+   procedure Register_Lookup_Dependencies (Deps : in out Lookup_Dependencies)
+   is
+   begin
+      for U of Deps.Units loop
+         Register_Lookup_Dependency (U);
+      end loop;
+      Destroy (Deps);
+   end Register_Lookup_Dependencies;
 
    ------------------------
    -- Reset_Lookup_Cache --
@@ -145,10 +263,10 @@ package body Langkit_Support.Lexical_Env is
    begin
       for C of Self.Env.Lookup_Cache loop
          C.Elements.Destroy;
+         Destroy (C.Dependencies);
       end loop;
 
       Self.Env.Lookup_Cache.Clear;
-      Self.Env.Lookup_Cache_Valid := True;
    end Reset_Lookup_Cache;
 
    -----------------------
@@ -443,8 +561,8 @@ package body Langkit_Support.Lexical_Env is
             Referenced_Envs          => <>,
             Map                      => new Internal_Envs.Map,
             Rebindings_Pool          => null,
-            Lookup_Cache_Valid       => True,
             Lookup_Cache             => Lookup_Cache_Maps.Empty_Map,
+            Content_Version          => 0,
             Rebindings_Assoc_Ref_Env => -1),
          Owner => Owner);
    end Create_Lexical_Env;
@@ -475,7 +593,7 @@ package body Langkit_Support.Lexical_Env is
 
       --  Invalidate the cache, and make sure we have an entry in the internal
       --  map for the given key.
-      Self.Env.Lookup_Cache_Valid := False;
+      Reset_Caches (Self);
       Map.Insert (Key, Empty_Internal_Map_Element, C, Dummy);
 
       declare
@@ -520,7 +638,7 @@ package body Langkit_Support.Lexical_Env is
          end loop;
       end if;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      Reset_Caches (Self);
    end Remove;
 
    ---------------
@@ -559,7 +677,7 @@ package body Langkit_Support.Lexical_Env is
            Self.Env.Referenced_Envs.Last_Index;
       end if;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      Reset_Caches (Self);
    end Reference;
 
    ---------------
@@ -584,7 +702,7 @@ package body Langkit_Support.Lexical_Env is
          Self.Env.Rebindings_Assoc_Ref_Env :=
            Self.Env.Referenced_Envs.Last_Index;
       end if;
-      Self.Env.Lookup_Cache_Valid := False;
+      Reset_Caches (Self);
    end Reference;
 
    ---------
@@ -598,10 +716,12 @@ package body Langkit_Support.Lexical_Env is
       Rebindings    : Env_Rebindings := null;
       Metadata      : Node_Metadata := Empty_Metadata;
       Categories    : Ref_Categories;
-      Local_Results : in out Lookup_Result_Vector)
+      Local_Results : in out Lookup_Result_Vector;
+      Deps          : in out Lookup_Dependencies)
    is
       Outer_Results :  Lookup_Result_Vector :=
         Lookup_Result_Item_Vectors.Empty_Vector;
+      Outer_Deps    : Lookup_Dependencies := No_Lookup_Dependencies;
       Need_Cache  : Boolean := False;
 
       Current_Rebindings : Env_Rebindings;
@@ -763,6 +883,11 @@ package body Langkit_Support.Lexical_Env is
                else Node.Resolver.all (E));
          begin
             Resolved_Entity.Info.From_Rebound := From_Rebound;
+            Add_Lookup_Unit (Deps.Units, Node_Unit (Node.Node));
+            if Node.Resolver /= null and then Resolved_Entity.Node /= No_Node
+            then
+               Add_Lookup_Unit (Deps.Units, Node_Unit (Resolved_Entity.Node));
+            end if;
             Local_Results.Append
               (Lookup_Result_Item'
                  (E                    => Resolved_Entity,
@@ -787,11 +912,18 @@ package body Langkit_Support.Lexical_Env is
 
          if (Lookup_Kind /= Recursive and then Self.Kind /= Transitive)
            or else Self.Being_Visited
-           or else Self.State = Inactive
          then
             return;
          end if;
 
+         --  Inactive referenced environments are being recomputed: the result
+         --  of this lookup is incomplete, so it must not be cached.
+
+         if Self.State = Inactive then
+            Deps.Cacheable := False;
+            return;
+         end if;
+
          if Self.Categories /= All_Cats
             and then Categories /= All_Cats
             and then not (for some C
@@ -805,8 +937,22 @@ package body Langkit_Support.Lexical_Env is
 
          --  Get the env for the referenced env getter. Pass the metadata and
          --  current_rebindings, if relevant.
-         Env := Get_Env
-           (Self.Getter, Entity_Info'(Metadata, Current_Rebindings, False));
+         declare
+            Info : constant Entity_Info :=
+              (Metadata, Current_Rebindings, False);
+         begin
+            Env := Get_Env (Self.Getter, Info);
+
+            --  Get_Env caches the result of dynamic resolvers only when there
+            --  is no entity info. Otherwise, the resolver may yield another
+            --  environment as soon as any unit changes, so this lookup is
+            --  valid only until then.
+
+            if Self.Getter.Dynamic and then Info /= No_Entity_Info then
+               Deps.Context_Unit := Node_Unit (Self.Getter.Node);
+               Deps.Context_Version := Get_Context_Version (Deps.Context_Unit);
+            end if;
+         end;
 
          --  TODO: Do not create a temp vector here, rather keep track of prior
          --  size, and only modify appended elements if the getter is dynamic.
@@ -825,7 +971,8 @@ package body Langkit_Support.Lexical_Env is
                Rebindings  => Shed_Rebindings (Env, Current_Rebindings),
                Metadata    => Metadata,
                Categories  => Categories,
-               Local_Results => Refd_Results);
+               Local_Results => Refd_Results,
+               Deps        => Deps);
 
             if Self.Getter.Dynamic then
                for Res of Refd_Results loop
@@ -841,6 +988,10 @@ package body Langkit_Support.Lexical_Env is
             end if;
 
             Refd_Results.Destroy;
+         exception
+            when others =>
+               Refd_Results.Destroy;
+               raise;
          end;
 
          Self.Being_Visited := False;
@@ -883,7 +1034,7 @@ package body Langkit_Support.Lexical_Env is
          when Orphaned =>
             Get_Internal
               (Self.Env.Orphaned_Env, Key, Flat, Rebindings, Metadata,
-               Categories, Local_Results);
+               Categories, Local_Results, Deps);
             return;
 
          when Grouped =>
@@ -895,7 +1046,7 @@ package body Langkit_Support.Lexical_Env is
             begin
                for E of Self.Env.Grouped_Envs.all loop
                   Get_Internal (E, Key, Lookup_Kind, Rebindings, MD,
-                                Categories, Local_Results);
+                                Categories, Local_Results, Deps);
                end loop;
             end;
             Traces.Decrease_Indent (Rec);
@@ -906,7 +1057,7 @@ package body Langkit_Support.Lexical_Env is
             Get_Internal
               (Self.Env.Rebound_Env, Key, Lookup_Kind,
                Combine (Self.Env.Rebindings, Rebindings),
-               Metadata, Categories, Local_Results);
+               Metadata, Categories, Local_Results, Deps);
             return;
 
          when Primary => null; --  Handled below to avoid extra nesting levels
@@ -916,46 +1067,76 @@ package body Langkit_Support.Lexical_Env is
 
       if Has_Lookup_Cache (Self) and then Lookup_Kind = Recursive then
 
-         if not Is_Lookup_Cache_Valid (Self) then
-            Reset_Lookup_Cache (Self);
-         end if;
-
          declare
             Val : constant Lookup_Cache_Entry :=
-              (Computing, Empty_Lookup_Result_Vector);
+              (Computing, Empty_Lookup_Result_Vector, No_Lookup_Dependencies);
          begin
             Self.Env.Lookup_Cache.Insert
               (Res_Key, Val, Cached_Res_Cursor, Inserted);
-         end;
 
-         if Inserted then
-            Need_Cache := True;
-            Outer_Results := Local_Results;
-            Local_Results := Lookup_Result_Item_Vectors.Empty_Vector;
-         else
+            if not Inserted then
+               Res_Val := Element (Cached_Res_Cursor);
 
-            Res_Val := Element (Cached_Res_Cursor);
+               if Has_Trace then
+                  Traces.Trace
+                    (Rec, "Found a cache entry: "
+                          & Lookup_Cache_Entry_State'Image (Res_Val.State));
+               end if;
 
-            if Has_Trace then
-               Traces.Trace
-                 (Rec, "Found a cache entry: "
-                       & Lookup_Cache_Entry_State'Image (Res_Val.State));
+               case Res_Val.State is
+                  when Computing =>
+                     return;
+
+                  when Computed =>
+                     if Is_Up_To_Date (Res_Val.Dependencies) then
+                        Local_Results.Concat (Res_Val.Elements);
+                        Merge_Dependencies (Deps, Res_Val.Dependencies);
+                        return;
+                     end if;
+
+                     --  Some environments that this entry traversed have
+                     --  changed since it was computed: compute it again.
+
+                     if Has_Trace then
+                        Traces.Trace (Rec, "Cache entry is stale");
+                     end if;
+                     Res_Val.Elements.Destroy;
+                     Destroy (Res_Val.Dependencies);
+                     Self.Env.Lookup_Cache.Replace_Element
+                       (Cached_Res_Cursor, Val);
+
+                  when None =>
+                     Self.Env.Lookup_Cache.Replace_Element
+                       (Cached_Res_Cursor, Val);
+               end case;
             end if;
+         end;
 
-            case Res_Val.State is
-               when Computing =>
-                  return;
-               when Computed =>
-                  Local_Results.Concat (Res_Val.Elements);
-                  return;
-               when None =>
-                  Need_Cache := True;
-                  Outer_Results := Local_Results;
-                  Local_Results := Lookup_Result_Item_Vectors.Empty_Vector;
-            end case;
-         end if;
+         --  Compute the lookup result in a separate vector, and record its
+         --  dependencies separately, so that we can cache both. If the lookup
+         --  uses rebindings, it depends on the environments they involve.
+
+         Need_Cache := True;
+         Outer_Results := Local_Results;
+         Local_Results := Lookup_Result_Item_Vectors.Empty_Vector;
+         Outer_Deps := Deps;
+         Deps := No_Lookup_Dependencies;
+
+         declare
+            R : Env_Rebindings := Rebindings;
+         begin
+            while R /= null loop
+               Add_Lookup_Env (Deps, R.Old_Env);
+               Add_Lookup_Env (Deps, R.New_Env);
+               R := R.Parent;
+            end loop;
+         end;
       end if;
 
+      --  Whatever the outcome of the lookup, it depends on Self's content
+
+      Add_Lookup_Env (Deps, Self);
+
       --  If there is an environment corresponding to Self in env rebindings,
       --  we'll get it here. We'll also shed it from the set of current
       --  rebindings.
@@ -965,6 +1146,9 @@ package body Langkit_Support.Lexical_Env is
       --  Phase 1: Get nodes in own env if there are any
 
       Env := Extract_Rebinding (Current_Rebindings, Self, Found_Rebinding);
+      if Env /= Self then
+         Add_Lookup_Env (Deps, Env);
+      end if;
       if not Get_Nodes (Env, Found_Rebinding) and then Env /= Self then
          --  Getting the nodes in Self (env before extract rebinding) should
          --  still have the proper env rebindings, so we do Get_Nodes in the
@@ -1012,7 +1196,7 @@ package body Langkit_Support.Lexical_Env is
                Get_Internal
                  (Parent_Env, Key, Lookup_Kind,
                   Parent_Rebindings,
-                  Metadata, Categories, Local_Results);
+                  Metadata, Categories, Local_Results, Deps);
                if Has_Trace then
                   Traces.Decrease_Indent (Rec);
                end if;
@@ -1052,11 +1236,42 @@ package body Langkit_Support.Lexical_Env is
         and then Lookup_Kind = Recursive
         and then Need_Cache
       then
-         Self.Env.Lookup_Cache.Include (Res_Key, (Computed, Local_Results));
          Outer_Results.Concat (Local_Results);
+         Merge_Dependencies (Outer_Deps, Deps);
+
+         if Deps.Cacheable then
+            --  The cache entry now owns Local_Results and Deps
+            Self.Env.Lookup_Cache.Include
+              (Res_Key, (Computed, Local_Results, Deps));
+         else
+            Self.Env.Lookup_Cache.Include (Res_Key, No_Lookup_Cache_Entry);
+            Local_Results.Destroy;
+            Destroy (Deps);
+         end if;
+
          Local_Results := Outer_Results;
+         Deps := Outer_Deps;
+         Need_Cache := False;
       end if;
 
+   exception
+      when others =>
+         --  Do not leave a Computing entry in the cache: later lookups would
+         --  wrongly consider that they are infinite recursions.
+
+         if Need_Cache then
+            Self.Env.Lookup_Cache.Include (Res_Key, No_Lookup_Cache_Entry);
+
+            --  Local_Results and Deps are the vectors we allocated to compute
+            --  the cache entry: free them and give the caller back its own
+            --  vectors, which it is responsible for.
+
+            Local_Results.Destroy;
+            Destroy (Deps);
+            Local_Results := Outer_Results;
+            Deps := Outer_Deps;
+         end if;
+         raise;
    end Get_Internal;
 
    function Get
@@ -1100,9 +1315,12 @@ package body Langkit_Support.Lexical_Env is
 
       declare
          Results : Lookup_Result_Vector;
+         Deps    : Lookup_Dependencies := No_Lookup_Dependencies;
       begin
          Get_Internal
-           (Self, Key, Lookup_Kind, null, Empty_Metadata, Categories, Results);
+           (Self, Key, Lookup_Kind, null, Empty_Metadata, Categories, Results,
+            Deps);
+         Register_Lookup_Dependencies (Deps);
 
          for El of Results loop
             if From = No_Node
@@ -1127,6 +1345,11 @@ package body Langkit_Support.Lexical_Env is
 
          Results.Destroy;
          return FV;
+      exception
+         when others =>
+            Results.Destroy;
+            Destroy (Deps);
+            raise;
       end;
    end Get;
 
@@ -1151,10 +1374,13 @@ package body Langkit_Support.Lexical_Env is
       end if;
 
       declare
-         V : Lookup_Result_Vector;
+         V     : Lookup_Result_Vector;
+         Deps  : Lookup_Dependencies := No_Lookup_Dependencies;
       begin
          Get_Internal
-           (Self, Key, Lookup_Kind, null, Empty_Metadata, Categories, V);
+           (Self, Key, Lookup_Kind, null, Empty_Metadata, Categories, V,
+            Deps);
+         Register_Lookup_Dependencies (Deps);
 
          for El of V loop
             if From = No_Node
@@ -1183,6 +1409,11 @@ package body Langkit_Support.Lexical_Env is
                Traces.Trace (Me, "===== Out Env Get_First =====");
             end if;
          end return;
+      exception
+         when others =>
+            V.Destroy;
+            Destroy (Deps);
+            raise;
       end;
    end Get_First;
 
@@ -2107,7 +2338,10 @@ package body Langkit_Support.Lexical_Env is
          return;
       end if;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      --  There is no need to invalidate lookup caches here: lookups that skip
+      --  inactive referenced environments are not cached, and existing cache
+      --  entries remain valid as long as the referenced environments resolve
+      --  to the same environments (see Recompute_Referenced_Envs).
 
       for I in Self.Env.Referenced_Envs.First_Index
             .. Self.Env.Referenced_Envs.Last_Index
@@ -2132,8 +2366,19 @@ package body Langkit_Support.Lexical_Env is
             .. Self.Env.Referenced_Envs.Last_Index
       loop
          R := Self.Env.Referenced_Envs.Get_Access (I);
-         Resolve (R.Getter, No_Entity_Info);
-         R.State := Active;
+         declare
+            Old_Env : constant Lexical_Env := R.Getter.Env;
+         begin
+            Resolve (R.Getter, No_Entity_Info);
+            R.State := Active;
+
+            --  If this reference now designates another environment, lookups
+            --  that traversed Self may now yield different results.
+
+            if R.Getter.Env /= Old_Env then
+               Reset_Caches (Self);
+            end if;
+         end;
       end loop;
    end Recompute_Referenced_Envs;
 
@@ -2143,9 +2388,55 @@ package body Langkit_Support.Lexical_Env is
 
    procedure Reset_Caches (Self : Lexical_Env) is
    begin
-      Self.Env.Lookup_Cache_Valid := False;
+      Self.Env.Content_Version := Self.Env.Content_Version + 1;
    end Reset_Caches;
 
+   ----------------------
+   -- Add_Memory_Usage --
+   ----------------------
+
+   procedure Add_Memory_Usage
+     (Self                          : Lexical_Env;
+      Map_Bytes, Lookup_Cache_Bytes : in out Long_Long_Integer)
+   is
+      Pointer_Bytes : constant Long_Long_Integer :=
+        System.Address'Size / System.Storage_Unit;
+
+      Map_Node_Bytes : constant Long_Long_Integer :=
+        Internal_Map_Node'Size / System.Storage_Unit;
+
+      Env : Lexical_Env_Type renames Self.Env.all;
+   begin
+      --  Hashed containers allocate one bucket per unit of capacity and one
+      --  node (element plus next pointer) per entry. Ordered maps allocate one
+      --  node (element plus three links) per entry.
+
+      if Env.Map /= null and then Env.Map /= Empty_Env_Map'Access then
+         Map_Bytes := Map_Bytes
+           + Long_Long_Integer (Env.Map.Capacity) * Pointer_Bytes;
+         for Element of Env.Map.all loop
+            Map_Bytes := Map_Bytes
+              + Internal_Map_Element'Size / System.Storage_Unit
+              + 2 * Pointer_Bytes
+              + Element.Native_Nodes.Memory_Usage
+              + Long_Long_Integer (Element.Foreign_Nodes.Length)
+                * (Map_Node_Bytes + 4 * Pointer_Bytes);
+         end loop;
+      end if;
+
+      Lookup_Cache_Bytes := Lookup_Cache_Bytes
+        + Long_Long_Integer (Env.Lookup_Cache.Capacity) * Pointer_Bytes;
+      for E of Env.Lookup_Cache loop
+         Lookup_Cache_Bytes := Lookup_Cache_Bytes
+           + (Lookup_Cache_Key'Size + Lookup_Cache_Entry'Size)
+             / System.Storage_Unit
+           + Pointer_Bytes
+           + E.Elements.Memory_Usage
+           + E.Dependencies.Units.Memory_Usage
+           + E.Dependencies.Envs.Memory_Usage;
+      end loop;
+   end Add_Memory_Usage;
+
    --------------
    -- Is_Stale --
    --------------
@@ -73,4 +73,26 @@ package body Langkit_Support.Slocs is
                     else Inside));
    end Compare;
 
+   ------------------
+   -- Column_After --
+   ------------------
+
+   function Column_After
+     (C        : Character_Type;
+      Column   : Column_Number;
+      Tab_Stop : Positive) return Column_Number is
+   begin
+      if C = Chars.HT then
+         declare
+            Zero_Based : constant Natural := Natural (Column - 1);
+            Aligned    : constant Natural :=
+               (Zero_Based + Tab_Stop) / Tab_Stop * Tab_Stop;
+         begin
+            return Column_Number (Aligned + 1);
+         end;
+      else
+         return Column + 1;
+      end if;
+   end Column_After;
+
 end Langkit_Support.Slocs;
@@ -31,6 +31,16 @@ package body Langkit_Support.Symbols is
    procedure Deallocate is new Ada.Unchecked_Deallocation
      (Symbol_Table_Record, Symbol_Table);
 
+   Pointer_Bytes : constant Long_Long_Integer :=
+     Address'Size / Storage_Unit;
+
+   function Symbol_Bytes (Length : Natural) return Long_Long_Integer is
+     (Long_Long_Integer (Length) * Wide_Wide_Character'Size / Storage_Unit
+      + 2 * Integer'Size / Storage_Unit + 2 * Pointer_Bytes);
+   --  Return an estimate of the memory used to internalize a symbol of the
+   --  given length: its text, the bounds of the text array and the hashed set
+   --  node (element and next pointer).
+
    -----------
    -- Image --
    -----------
@@ -110,9 +120,22 @@ package body Langkit_Support.Symbols is
 
       T_Acc := new Text_Type'(T);
       ST.Symbols.Insert (T_Acc);
+      ST.Text_Bytes := ST.Text_Bytes + Symbol_Bytes (T'Length);
       return T_Acc;
    end Find;
 
+   ------------------
+   -- Memory_Usage --
+   ------------------
+
+   function Memory_Usage (ST : Symbol_Table) return Long_Long_Integer is
+   begin
+      --  Count one bucket per unit of capacity in the hashed set
+
+      return ST.Text_Bytes
+             + Long_Long_Integer (ST.Symbols.Capacity) * Pointer_Bytes;
+   end Memory_Usage;
+
    -------------
    -- Destroy --
    -------------
@@ -21,6 +21,7 @@
 -- <http://www.gnu.org/licenses/>.                                          --
 ------------------------------------------------------------------------------
 
+with Ada.Characters.Handling;
 with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
 with Interfaces; use Interfaces;
 with System;
@@ -29,6 +30,12 @@ with GNATCOLL.Iconv;
 
 package body Langkit_Support.Text is
 
+   type Fast_Charset_Kind is (None, ASCII_Kind, Latin_1_Kind, UTF_8_Kind);
+   --  Charsets that Fast_Decode supports (None for all other charsets)
+
+   function Fast_Charset (Charset : String) return Fast_Charset_Kind;
+   --  Return the kind of charset that the Charset name designates
+
    ------------------
    -- Text_Charset --
    ------------------
@@ -169,16 +176,46 @@ package body Langkit_Support.Text is
    ------------
 
    function Decode (S : String; Charset : String) return Text_Type is
-      Result : constant String := GNATCOLL.Iconv.Iconv
-        (Input     => S,
-         To_Code   => Text_Charset,
-         From_Code => Charset);
-      pragma Assert (Result'Length mod 4 = 0);
-
-      Text_Result : constant Text_Type (1 .. Result'Length / 4)
-         with Import, Address => Result'Address;
    begin
-      return Text_Result;
+      --  Try the fast decoder first, if it supports Charset. If it fails,
+      --  fall back to iconv so that invalid inputs are reported the usual
+      --  way.
+
+      if Has_Fast_Decoder (Charset) then
+         declare
+            --  Decode in a heap-allocated buffer: S can be arbitrarily big,
+            --  so the primary stack may not be able to hold it.
+
+            Buffer  : Text_Access := new Text_Type (1 .. S'Length);
+            Last    : Natural;
+            Success : Boolean;
+         begin
+            Fast_Decode (S, Charset, Buffer.all, Last, Success);
+            if Success then
+               return Result : constant Text_Type := Buffer (1 .. Last) do
+                  Free (Buffer);
+               end return;
+            end if;
+            Free (Buffer);
+         exception
+            when others =>
+               Free (Buffer);
+               raise;
+         end;
+      end if;
+
+      declare
+         Result : constant String := GNATCOLL.Iconv.Iconv
+           (Input     => S,
+            To_Code   => Text_Charset,
+            From_Code => Charset);
+         pragma Assert (Result'Length mod 4 = 0);
+
+         Text_Result : constant Text_Type (1 .. Result'Length / 4)
+            with Import, Address => Result'Address;
+      begin
+         return Text_Result;
+      end;
    end Decode;
 
    -------------
@@ -201,4 +238,148 @@ package body Langkit_Support.Text is
       return Decode (S, "UTF-8");
    end From_UTF8;
 
+   ------------------
+   -- From_Latin_1 --
+   ------------------
+
+   function From_Latin_1 (S : String) return Text_Type is
+   begin
+      return Result : Text_Type (S'Range) do
+         for I in S'Range loop
+            Result (I) := Character_Type'Val (Character'Pos (S (I)));
+         end loop;
+      end return;
+   end From_Latin_1;
+
+   ------------------
+   -- Fast_Charset --
+   ------------------
+
+   function Fast_Charset (Charset : String) return Fast_Charset_Kind is
+      Name : constant String := Ada.Characters.Handling.To_Lower (Charset);
+   begin
+      if Name in "ascii" | "us-ascii" | "ansi_x3.4-1968" then
+         return ASCII_Kind;
+      elsif Name in "iso-8859-1" | "iso8859-1" | "iso_8859-1" | "latin1"
+                  | "latin-1" | "l1"
+      then
+         return Latin_1_Kind;
+      elsif Name in "utf-8" | "utf8" then
+         return UTF_8_Kind;
+      else
+         return None;
+      end if;
+   end Fast_Charset;
+
+   ----------------------
+   -- Has_Fast_Decoder --
+   ----------------------
+
+   function Has_Fast_Decoder (Charset : String) return Boolean is
+   begin
+      return Fast_Charset (Charset) /= None;
+   end Has_Fast_Decoder;
+
+   -----------------
+   -- Fast_Decode --
+   -----------------
+
+   procedure Fast_Decode
+     (Buffer  : String;
+      Charset : String;
+      Result  : out Text_Type;
+      Last    : out Natural;
+      Success : out Boolean)
+   is
+      Kind : constant Fast_Charset_Kind := Fast_Charset (Charset);
+
+      I : Positive := Buffer'First;
+      --  Index in Buffer of the next byte to decode
+
+      J : Natural := Result'First - 1;
+      --  Index in Result of the last decoded character
+
+      B : Unsigned_32;
+   begin
+      Last := J;
+      Success := False;
+
+      while I <= Buffer'Last loop
+         B := Character'Pos (Buffer (I));
+
+         if B < 16#80# or else Kind = Latin_1_Kind then
+
+            --  Each ASCII/Latin-1 byte encodes the code point that has the
+            --  same value. This is the most common case, so handle it first.
+
+            J := J + 1;
+            Result (J) := Wide_Wide_Character'Val (B);
+            I := I + 1;
+
+         elsif Kind = ASCII_Kind then
+            return;
+
+         else
+            --  We have the first byte of a UTF-8 multibyte sequence: use it
+            --  to determine the length of the sequence, and reject the bytes
+            --  that cannot start a sequence, as well as the ones that start
+            --  only overlong forms (16#C0# and 16#C1#) or code points above
+            --  U+10FFFF (16#F5# and above).
+
+            declare
+               Length : Positive;
+               Min    : Unsigned_32;
+               C      : Unsigned_32;
+            begin
+               if B in 16#C2# .. 16#DF# then
+                  Length := 2;
+                  Min := 16#80#;
+                  C := B and 16#1F#;
+               elsif B in 16#E0# .. 16#EF# then
+                  Length := 3;
+                  Min := 16#800#;
+                  C := B and 16#0F#;
+               elsif B in 16#F0# .. 16#F4# then
+                  Length := 4;
+                  Min := 16#1_0000#;
+                  C := B and 16#07#;
+               else
+                  return;
+               end if;
+
+               --  Reject truncated sequences
+
+               if Buffer'Last - I < Length - 1 then
+                  return;
+               end if;
+
+               for K in I + 1 .. I + Length - 1 loop
+                  B := Character'Pos (Buffer (K));
+                  if (B and 16#C0#) /= 16#80# then
+                     return;
+                  end if;
+                  C := Shift_Left (C, 6) or (B and 16#3F#);
+               end loop;
+
+               --  Reject overlong forms, surrogates and code points above
+               --  U+10FFFF.
+
+               if C < Min
+                  or else C in 16#D800# .. 16#DFFF#
+                  or else C > 16#10_FFFF#
+               then
+                  return;
+               end if;
+
+               J := J + 1;
+               Result (J) := Wide_Wide_Character'Val (C);
+               I := I + Length;
+            end;
+         end if;
+      end loop;
+
+      Last := J;
+      Success := True;
+   end Fast_Decode;
+
 end Langkit_Support.Text;
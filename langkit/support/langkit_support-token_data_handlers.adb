@@ -21,6 +21,8 @@
 -- <http://www.gnu.org/licenses/>.                                          --
 ------------------------------------------------------------------------------
 
+with System;
+
 package body Langkit_Support.Token_Data_Handlers is
 
    function Internal_Get_Trivias
@@ -108,17 +110,21 @@ package body Langkit_Support.Token_Data_Handlers is
 
    function Has_Source_Buffer (TDH : Token_Data_Handler) return Boolean is
    begin
-      return TDH.Source_Buffer /= null;
+      return TDH.Source_Buffer /= null or else TDH.Compact_Buffer /= null;
    end Has_Source_Buffer;
 
    ----------------
    -- Initialize --
    ----------------
 
-   procedure Initialize (TDH : out Token_Data_Handler; Symbols : Symbol_Table)
-   is
+   procedure Initialize
+     (TDH           : out Token_Data_Handler;
+      Symbols       : Symbol_Table;
+      Allow_Compact : Boolean := False) is
    begin
       TDH := (Source_Buffer     => null,
+              Compact_Buffer    => null,
+              Allow_Compact     => Allow_Compact,
               Source_First      => <>,
               Source_Last       => <>,
               Filename          => <>,
@@ -126,7 +132,9 @@ package body Langkit_Support.Token_Data_Handlers is
               Tokens            => <>,
               Symbols           => Symbols,
               Tokens_To_Trivias => <>,
-              Trivias           => <>);
+              Trivias           => <>,
+              Lines_Starts      => <>,
+              Tab_Stop          => 1);
    end Initialize;
 
    -----------
@@ -137,16 +145,72 @@ package body Langkit_Support.Token_Data_Handlers is
      (TDH           : in out Token_Data_Handler;
       Source_Buffer : Text_Access;
       Source_First  : Positive;
-      Source_Last   : Natural) is
+      Source_Last   : Natural;
+      Tab_Stop      : Positive)
+   is
+      function Is_Latin_1 return Boolean;
+      --  Return whether the source text contains only Latin-1 characters
+
+      ----------------
+      -- Is_Latin_1 --
+      ----------------
+
+      function Is_Latin_1 return Boolean is
+      begin
+         for C of Source_Buffer (Source_First .. Source_Last) loop
+            if Character_Type'Pos (C) > Character'Pos (Character'Last) then
+               return False;
+            end if;
+         end loop;
+         return True;
+      end Is_Latin_1;
+
    begin
       Free (TDH.Source_Buffer);
+      Free (TDH.Compact_Buffer);
       TDH.Source_Buffer := Source_Buffer;
       TDH.Source_First := Source_First;
       TDH.Source_Last := Source_Last;
+      TDH.Tab_Stop := Tab_Stop;
+
+      --  Switch to the compact representation if allowed and possible. Note
+      --  that the compact buffer contains only the source text, whereas the
+      --  decoded buffer may be bigger.
+
+      if TDH.Allow_Compact
+         and then Source_Buffer /= null
+         and then Is_Latin_1
+      then
+         TDH.Compact_Buffer := new String (Source_First .. Source_Last);
+         for I in Source_First .. Source_Last loop
+            TDH.Compact_Buffer (I) :=
+               Character'Val (Character_Type'Pos (Source_Buffer (I)));
+         end loop;
+         Free (TDH.Source_Buffer);
+      end if;
 
       Clear (TDH.Tokens);
       Clear (TDH.Trivias);
       Clear (TDH.Tokens_To_Trivias);
+
+      --  Compute the lines starts table. Note that the source buffer may be
+      --  null for empty sources.
+
+      Clear (TDH.Lines_Starts);
+      Append (TDH.Lines_Starts, Source_First);
+      if TDH.Compact_Buffer /= null then
+         for I in Source_First .. Source_Last loop
+            if TDH.Compact_Buffer (I) = ASCII.LF then
+               Append (TDH.Lines_Starts, I + 1);
+            end if;
+         end loop;
+      elsif TDH.Source_Buffer /= null then
+         for I in Source_First .. Source_Last loop
+            if TDH.Source_Buffer (I) = Chars.LF then
+               Append (TDH.Lines_Starts, I + 1);
+            end if;
+         end loop;
+      end if;
    end Reset;
 
    ----------
@@ -156,9 +220,11 @@ package body Langkit_Support.Token_Data_Handlers is
    procedure Free (TDH : in out Token_Data_Handler) is
    begin
       Free (TDH.Source_Buffer);
+      Free (TDH.Compact_Buffer);
       Destroy (TDH.Tokens);
       Destroy (TDH.Trivias);
       Destroy (TDH.Tokens_To_Trivias);
+      Destroy (TDH.Lines_Starts);
       TDH.Symbols := No_Symbol_Table;
    end Free;
 
@@ -170,6 +236,8 @@ package body Langkit_Support.Token_Data_Handlers is
    begin
       Destination := Source;
       Source := (Source_Buffer     => null,
+                 Compact_Buffer    => null,
+                 Allow_Compact     => False,
                  Source_First      => <>,
                  Source_Last       => <>,
                  Filename          => <>,
@@ -177,9 +245,94 @@ package body Langkit_Support.Token_Data_Handlers is
                  Tokens            => <>,
                  Symbols           => No_Symbol_Table,
                  Tokens_To_Trivias => <>,
-                 Trivias           => <>);
+                 Trivias           => <>,
+                 Lines_Starts      => <>,
+                 Tab_Stop          => 1);
    end Move;
 
+   ----------------
+   -- Is_Compact --
+   ----------------
+
+   function Is_Compact (TDH : Token_Data_Handler) return Boolean is
+   begin
+      return TDH.Compact_Buffer /= null;
+   end Is_Compact;
+
+   -------------
+   -- Promote --
+   -------------
+
+   procedure Promote (TDH : in out Token_Data_Handler) is
+   begin
+      if TDH.Compact_Buffer /= null then
+         TDH.Source_Buffer := new Text_Type'
+           (From_Latin_1 (TDH.Compact_Buffer.all));
+         Free (TDH.Compact_Buffer);
+      end if;
+   end Promote;
+
+   -----------------
+   -- Source_Char --
+   -----------------
+
+   function Source_Char
+     (TDH : Token_Data_Handler; Index : Positive) return Character_Type is
+   begin
+      if TDH.Compact_Buffer /= null then
+         return Character_Type'Val
+           (Character'Pos (TDH.Compact_Buffer (Index)));
+      else
+         return TDH.Source_Buffer (Index);
+      end if;
+   end Source_Char;
+
+   -----------------
+   -- Source_Text --
+   -----------------
+
+   function Source_Text
+     (TDH   : Token_Data_Handler;
+      First : Positive;
+      Last  : Natural) return Text_Type is
+   begin
+      if TDH.Compact_Buffer /= null then
+         return From_Latin_1 (TDH.Compact_Buffer (First .. Last));
+      else
+         return TDH.Source_Buffer (First .. Last);
+      end if;
+   end Source_Text;
+
+   --------------------------------
+   -- Source_Buffer_Memory_Usage --
+   --------------------------------
+
+   function Source_Buffer_Memory_Usage
+     (TDH : Token_Data_Handler) return Long_Long_Integer is
+   begin
+      if TDH.Compact_Buffer /= null then
+         return Long_Long_Integer (TDH.Compact_Buffer'Length)
+                * Character'Size / System.Storage_Unit;
+      elsif TDH.Source_Buffer = null then
+         return 0;
+      end if;
+      return Long_Long_Integer (TDH.Source_Buffer'Length)
+             * Wide_Wide_Character'Size / System.Storage_Unit;
+   end Source_Buffer_Memory_Usage;
+
+   -------------------------
+   -- Tokens_Memory_Usage --
+   -------------------------
+
+   function Tokens_Memory_Usage
+     (TDH : Token_Data_Handler) return Long_Long_Integer is
+   begin
+      return TDH.Tokens.Memory_Usage
+             + TDH.Trivias.Memory_Usage
+             + TDH.Tokens_To_Trivias.Memory_Usage
+             + TDH.Lines_Starts.Memory_Usage;
+   end Tokens_Memory_Usage;
+
    --------------------------
    -- Internal_Get_Trivias --
    --------------------------
@@ -598,6 +751,161 @@ package body Langkit_Support.Token_Data_Handlers is
       end;
    end Lookup_Token;
 
+   ----------------
+   -- Line_Count --
+   ----------------
+
+   function Line_Count (TDH : Token_Data_Handler) return Natural is
+   begin
+      return TDH.Lines_Starts.Length;
+   end Line_Count;
+
+   --------------------
+   -- Offset_To_Sloc --
+   --------------------
+
+   function Offset_To_Sloc
+     (TDH : Token_Data_Handler; Offset : Positive) return Source_Location
+   is
+      function Compare
+        (Offset      : Positive;
+         Dummy_Index : Positive;
+         Line_Start  : Integer) return Relative_Position
+      is (if Offset < Line_Start then Before
+          elsif Offset = Line_Start then Inside
+          else After);
+
+      function Line_Floor is new Floor
+        (Key_Type        => Positive,
+         Element_Type    => Integer,
+         Element_Vectors => Integer_Vectors);
+
+      Line : Natural;
+   begin
+      if TDH.Lines_Starts.Is_Empty
+         or else Offset not in TDH.Source_First .. TDH.Source_Last + 1
+      then
+         return No_Source_Location;
+      end if;
+
+      Line := Line_Floor (Offset, TDH.Lines_Starts);
+      return Result : Source_Location := (Line_Number (Line), 1) do
+         for I in TDH.Lines_Starts.Get (Line) .. Offset - 1 loop
+            Result.Column := Column_After
+              (Source_Char (TDH, I), Result.Column, TDH.Tab_Stop);
+         end loop;
+      end return;
+   end Offset_To_Sloc;
+
+   --------------------
+   -- Sloc_To_Offset --
+   --------------------
+
+   function Sloc_To_Offset
+     (TDH : Token_Data_Handler; Sloc : Source_Location) return Natural
+   is
+      Line_Last : Natural;
+      Column    : Column_Number := 1;
+   begin
+      if Sloc.Line = 0
+         or else Sloc.Column = 0
+         or else Natural (Sloc.Line) > TDH.Lines_Starts.Length
+      then
+         return 0;
+      end if;
+
+      --  Line_Last is the index of the last character in this line, excluding
+      --  the line terminator.
+
+      Line_Last :=
+        (if Natural (Sloc.Line) = TDH.Lines_Starts.Length
+         then TDH.Source_Last
+         else TDH.Lines_Starts.Get (Natural (Sloc.Line) + 1) - 2);
+
+      for I in TDH.Lines_Starts.Get (Natural (Sloc.Line)) .. Line_Last + 1 loop
+         if Column = Sloc.Column then
+            return I;
+         elsif Column > Sloc.Column or else I > Line_Last then
+            --  Sloc is inside a tabulation or past the end of the line
+            return 0;
+         end if;
+         Column := Column_After (Source_Char (TDH, I), Column, TDH.Tab_Stop);
+      end loop;
+      return 0;
+   end Sloc_To_Offset;
+
+   ---------------------
+   -- Get_Line_Tokens --
+   ---------------------
+
+   procedure Get_Line_Tokens
+     (TDH         : Token_Data_Handler;
+      Line        : Line_Number;
+      First, Last : out Token_Or_Trivia_Index)
+   is
+      Line_Start : constant Source_Location := (Line, 1);
+      Next_Start : constant Source_Location := (Line + 1, 1);
+
+      function Ends_Before_Line (T : Token_Or_Trivia_Index) return Boolean;
+      --  Return whether T does not overlap Line and is before it
+
+      function Starts_After_Line (T : Token_Or_Trivia_Index) return Boolean;
+      --  Return whether T does not overlap Line and is after it
+
+      ----------------------
+      -- Ends_Before_Line --
+      ----------------------
+
+      function Ends_Before_Line (T : Token_Or_Trivia_Index) return Boolean is
+         R : constant Source_Location_Range := Data (T, TDH).Sloc_Range;
+      begin
+         --  Empty tokens overlap Line if they start on it
+
+         return (if Start_Sloc (R) = End_Sloc (R)
+                 then Start_Sloc (R) < Line_Start
+                 else End_Sloc (R) <= Line_Start);
+      end Ends_Before_Line;
+
+      -----------------------
+      -- Starts_After_Line --
+      -----------------------
+
+      function Starts_After_Line (T : Token_Or_Trivia_Index) return Boolean is
+      begin
+         return Start_Sloc (Data (T, TDH).Sloc_Range) >= Next_Start;
+      end Starts_After_Line;
+
+   begin
+      First := No_Token_Or_Trivia_Index;
+      Last := No_Token_Or_Trivia_Index;
+      if Line = 0 then
+         return;
+      end if;
+
+      --  Lookup_Token returns the token that contains the first column of
+      --  Line, or the one right before it: skip tokens until we find one that
+      --  overlaps Line.
+
+      First := Lookup_Token (TDH, Line_Start);
+      while First /= No_Token_Or_Trivia_Index
+            and then Ends_Before_Line (First)
+      loop
+         First := Next (First, TDH);
+      end loop;
+      if First = No_Token_Or_Trivia_Index or else Starts_After_Line (First)
+      then
+         First := No_Token_Or_Trivia_Index;
+         return;
+      end if;
+
+      --  Likewise for the last token, from the first column of the next line
+
+      Last := Lookup_Token (TDH, Next_Start);
+      while Starts_After_Line (Last) loop
+         Last := Previous (Last, TDH);
+      end loop;
+   end Get_Line_Tokens;
+
    ----------
    -- Data --
    ----------
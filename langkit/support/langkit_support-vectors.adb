@@ -292,6 +292,21 @@ package body Langkit_Support.Vectors is
 
    function Length (Self : Vector) return Natural is (Self.Size);
 
+   --------------
+   -- Capacity --
+   --------------
+
+   function Capacity (Self : Vector) return Natural is (Self.Capacity);
+
+   ------------------
+   -- Memory_Usage --
+   ------------------
+
+   function Memory_Usage (Self : Vector) return Long_Long_Integer is
+     (if Self.E = null
+      then 0
+      else Long_Long_Integer (Self.Capacity) * Long_Long_Integer (El_Size));
+
    -----------
    -- Slice --
    -----------
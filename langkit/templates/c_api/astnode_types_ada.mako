@@ -18,6 +18,14 @@
       Value_P : access ${field.public_type.c_type(capi).name}) return int
 </%def>
 
+<%def name="bulk_accessor_profile(field)">
+   function ${capi.get_name(field.bulk_accessor_basename)}
+     (Nodes  : System.Address;
+      Count  : size_t;
+      Values : System.Address;
+      Errors : System.Address) return int
+</%def>
+
 <%def name="accessor_decl(field)">
    <% accessor_name = capi.get_name(field.accessor_basename) %>
 
@@ -26,6 +34,14 @@
            Convention    => C,
            External_name => "${accessor_name}";
    ${ada_doc(field, 3, lang='c')}
+
+   % if field.has_bulk_accessor:
+   ${bulk_accessor_profile(field)}
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(field.bulk_accessor_basename)}";
+   ${ada_c_doc('langkit.node_bulk_accessor', 3)}
+   % endif
 </%def>
 
 
@@ -173,3 +189,51 @@
    end ${accessor_name};
 
 </%def>
+
+<%def name="bulk_accessor_body(field)">
+
+   <%
+      accessor_name = capi.get_name(field.accessor_basename)
+      entity_type = root_entity.c_type(capi).name
+   %>
+
+   ${bulk_accessor_profile(field)}
+   is
+      type Node_Array is array (size_t range <>) of ${entity_type};
+      type Value_Array is array (size_t range <>)
+         of aliased ${field.public_type.c_type(capi).name};
+      type Error_Array is array (size_t range <>) of ${bool_type};
+
+      --  The following unchecked conversion makes it possible to pass
+      --  elements of the input array to the regular accessor, which expects
+      --  an access to a single entity. The pointed value is only read, and
+      --  through values of the same access type.
+
+      pragma Warnings (Off, "possible aliasing problem for type");
+      function Convert is new Ada.Unchecked_Conversion
+        (System.Address, ${entity_type}_Ptr);
+      pragma Warnings (On, "possible aliasing problem for type");
+
+      N : Node_Array (1 .. Count) with Import, Address => Nodes;
+      V : Value_Array (1 .. Count) with Import, Address => Values;
+      E : Error_Array (1 .. Count) with Import, Address => Errors;
+
+      Result : int := 1;
+   begin
+      for I in N'Range loop
+         if ${accessor_name} (Convert (N (I)'Address), V (I)'Access) = 0 then
+            E (I) := 1;
+            Result := 0;
+         else
+            E (I) := 0;
+         end if;
+      end loop;
+
+      --  Errors are reported per node through E: do not leave the exception
+      --  from the last failing node as the last exception.
+
+      Clear_Last_Exception;
+      return Result;
+   end ${capi.get_name(field.bulk_accessor_basename)};
+
+</%def>
@@ -22,4 +22,14 @@ extern int ${accessor_name}(
     ${field.c_type_or_error(capi).name} *value_p
 );
 
+% if field.has_bulk_accessor:
+${c_doc('langkit.node_bulk_accessor')}
+extern int ${capi.get_name(field.bulk_accessor_basename)}(
+    const ${entity_type} *nodes,
+    size_t count,
+    ${field.c_type_or_error(capi).name} *values,
+    ${bool_type} *errors
+);
+% endif
+
 </%def>
@@ -105,6 +105,10 @@ typedef struct {
     int token_index, trivia_index;
 
     ${token_kind} kind;
+
+    /* Text for this token. This is empty if the unit that owns this token uses
+       the compact representation for its source buffer: use
+       ${capi.get_name('token_range_text')} to get it in that case.  */
     ${text_type} text;
     ${sloc_range_type} sloc_range;
 } ${token_type};
@@ -116,6 +120,18 @@ typedef struct {
     ${text_type} message;
 } ${diagnostic_type};
 
+${c_doc('langkit.memory_usage_type')}
+typedef struct {
+    long long ast_nodes;
+    long long tokens;
+    long long source_buffer;
+    long long symbols;
+    long long memoization;
+    long long lexical_envs;
+    long long lookup_caches;
+    long long total;
+} ${memory_usage_type};
+
 % for enum_type in ctx.enum_types:
    typedef enum {
       ${', '.join(v.c_name(capi) for v in enum_type.values)}
@@ -183,6 +199,21 @@ typedef void *${unit_provider_type};
 ${c_doc('langkit.unit_provider_destroy_type')}
 typedef void (*${unit_provider_destroy_type})(void *data);
 
+${c_doc('langkit.serialization_callback_type')}
+typedef void (*${serialization_callback_type})(void *data,
+                                               const char *buffer,
+                                               size_t length);
+
+${c_doc('langkit.event_handler_destroy_type')}
+typedef void (*${event_handler_destroy_type})(void *data);
+
+${c_doc('langkit.event_handler_phase_timing_type')}
+typedef void (*${event_handler_phase_timing_type})(void *data,
+                                                   const char *filename,
+                                                   int phase,
+                                                   const char *name,
+                                                   double elapsed);
+
 ${c_doc('langkit.unit_provider_get_unit_filename_type')}
 typedef char *(*${unit_provider_get_unit_filename_type})(
    void *data,
@@ -253,6 +284,82 @@ ${capi.get_name("context_discard_errors_in_populate_lexical_env")}(
         ${analysis_context_type} context,
         int discard);
 
+${c_doc('langkit.context_memoization_invalidation_stats')}
+extern void
+${capi.get_name("context_memoization_invalidation_stats")}(
+        ${analysis_context_type} context,
+        long long *invalidated,
+        long long *surviving);
+
+${c_doc('langkit.memoized_properties_count')}
+extern int
+${capi.get_name("memoized_properties_count")}(void);
+
+${c_doc('langkit.memoized_property_name')}
+extern char *
+${capi.get_name("memoized_property_name")}(int index);
+
+${c_doc('langkit.context_memoization_stats')}
+extern void
+${capi.get_name("context_memoization_stats")}(
+        ${analysis_context_type} context,
+        int index,
+        long long *hits,
+        long long *misses,
+        long long *entries,
+        long long *bytes,
+        long long *evictions);
+
+${c_doc('langkit.context_set_memoization_memory_limit')}
+extern void
+${capi.get_name("context_set_memoization_memory_limit")}(
+        ${analysis_context_type} context,
+        long long limit,
+        int policy);
+
+${c_doc('langkit.context_set_unit_memory_limit')}
+extern void
+${capi.get_name("context_set_unit_memory_limit")}(
+        ${analysis_context_type} context,
+        long long limit);
+
+${c_doc('langkit.context_set_parse_cache_directory')}
+extern void
+${capi.get_name("context_set_parse_cache_directory")}(
+        ${analysis_context_type} context,
+        const char *directory);
+
+${c_doc('langkit.context_set_compact_source_buffers')}
+extern void
+${capi.get_name("context_set_compact_source_buffers")}(
+        ${analysis_context_type} context,
+        int enabled);
+
+${c_doc('langkit.context_memory_usage')}
+extern void
+${capi.get_name("context_memory_usage")}(
+        ${analysis_context_type} context,
+        ${memory_usage_type} *result);
+
+${c_doc('langkit.context_set_event_handler')}
+extern void
+${capi.get_name("context_set_event_handler")}(
+        ${analysis_context_type} context,
+        void *data,
+        ${event_handler_destroy_type} destroy_func,
+        ${event_handler_phase_timing_type} phase_timing_func);
+
+${c_doc('langkit.context_has_unit')}
+extern int
+${capi.get_name("context_has_unit")}(
+        ${analysis_context_type} context,
+        const char *unit_filename);
+
+${c_doc('langkit.context_reparse_version')}
+extern int
+${capi.get_name("context_reparse_version")}(
+        ${analysis_context_type} context);
+
 ${c_doc('langkit.get_unit_from_file')}
 extern ${analysis_unit_type}
 ${capi.get_name("get_analysis_unit_from_file")}(
@@ -306,6 +413,81 @@ ${c_doc('langkit.unit_trivia_count')}
 extern int
 ${capi.get_name('unit_trivia_count')}(${analysis_unit_type} unit);
 
+${c_doc('langkit.unit_memory_usage')}
+extern void
+${capi.get_name('unit_memory_usage')}(${analysis_unit_type} unit,
+                                      ${memory_usage_type} *result);
+
+${c_doc('langkit.unit_is_evicted')}
+extern int
+${capi.get_name('unit_is_evicted')}(${analysis_unit_type} unit);
+
+${c_doc('langkit.unit_source_buffer')}
+extern void
+${capi.get_name('unit_source_buffer')}(${analysis_unit_type} unit,
+                                       ${text_type} *text);
+
+${c_doc('langkit.unit_export_tokens')}
+extern int
+${capi.get_name('unit_export_tokens')}(${analysis_unit_type} unit,
+                                       int capacity,
+                                       int *kinds,
+                                       uint32_t *start_offsets,
+                                       uint32_t *end_offsets,
+                                       uint32_t *start_lines,
+                                       uint16_t *start_columns,
+                                       uint32_t *end_lines,
+                                       uint16_t *end_columns,
+                                       ${bool_type} *is_trivia);
+
+${c_doc('langkit.unit_node_at_preorder_index')}
+extern int
+${capi.get_name('unit_node_at_preorder_index')}(${analysis_unit_type} unit,
+                                                unsigned index,
+                                                ${entity_type} *result_p);
+
+${c_doc('langkit.unit_lookup_node')}
+extern void
+${capi.get_name('unit_lookup_node')}(${analysis_unit_type} unit,
+                                     const ${sloc_type} *sloc,
+                                     ${entity_type} *result_p);
+
+${c_doc('langkit.unit_covering_nodes')}
+extern void
+${capi.get_name('unit_covering_nodes')}(
+        ${analysis_unit_type} unit,
+        const ${sloc_type} *sloc,
+        ${T.entity.array.c_type(capi).name} *result_p);
+
+${c_doc('langkit.unit_serialize')}
+extern int
+${capi.get_name('unit_serialize')}(${analysis_unit_type} unit,
+                                   int format,
+                                   ${serialization_callback_type} callback,
+                                   void *data);
+
+${c_doc('langkit.unit_line_count')}
+extern int
+${capi.get_name('unit_line_count')}(${analysis_unit_type} unit);
+
+${c_doc('langkit.unit_offset_to_sloc')}
+extern int
+${capi.get_name('unit_offset_to_sloc')}(${analysis_unit_type} unit,
+                                        unsigned offset,
+                                        ${sloc_type} *sloc);
+
+${c_doc('langkit.unit_sloc_to_offset')}
+extern int
+${capi.get_name('unit_sloc_to_offset')}(${analysis_unit_type} unit,
+                                        const ${sloc_type} *sloc);
+
+${c_doc('langkit.unit_line_tokens')}
+extern int
+${capi.get_name('unit_line_tokens')}(${analysis_unit_type} unit,
+                                     unsigned line,
+                                     ${token_type} *first,
+                                     ${token_type} *last);
+
 ${c_doc('langkit.unit_dump_lexical_env')}
 extern void
 ${capi.get_name('unit_dump_lexical_env')}(${analysis_unit_type} unit);
@@ -385,6 +567,11 @@ extern void
 ${capi.get_name("node_text")}(${entity_type} *node,
                               ${text_type} *text);
 
+${c_doc('langkit.node_text_slice')}
+extern void
+${capi.get_name("node_text_slice")}(${entity_type} *node,
+                                    ${text_type} *text);
+
 ${c_doc('langkit.node_sloc_range')}
 extern void
 ${capi.get_name("node_sloc_range")}(${entity_type} *node,
@@ -406,6 +593,14 @@ ${capi.get_name("node_child")}(${entity_type} *node,
                                unsigned n,
                                ${entity_type}* child_p);
 
+${c_doc('langkit.node_preorder_index')}
+extern int
+${capi.get_name("node_preorder_index")}(${entity_type} *node);
+
+${c_doc('langkit.node_preorder_last')}
+extern int
+${capi.get_name("node_preorder_last")}(${entity_type} *node);
+
 ${c_doc('langkit.text_to_locale_string')}
 extern char *
 ${capi.get_name("text_to_locale_string")}(${text_type} *text);
@@ -8,6 +8,7 @@
 <% entity_type = root_entity.c_type(capi).name %>
 
 with Ada.Finalization;
+with Ada.Streams; use Ada.Streams;
 pragma Warnings (Off, "is an internal GNAT unit");
 with Ada.Strings.Wide_Wide_Unbounded.Aux;
 use Ada.Strings.Wide_Wide_Unbounded.Aux;
@@ -23,6 +24,7 @@ with Langkit_Support.Text;        use Langkit_Support.Text;
 
 with ${ada_lib_name}.Private_Converters;
 use ${ada_lib_name}.Private_Converters;
+with ${ada_lib_name}.Serialization;
 
 ${exts.with_clauses(with_clauses)}
 
@@ -44,6 +46,40 @@ package body ${ada_lib_name}.Implementation.C is
 
    type C_Unit_Provider_Access is access all C_Unit_Provider;
 
+   type C_Event_Handler is limited new Event_Handler_Interface with record
+      Data              : System.Address;
+      Destroy_Func      : ${event_handler_destroy_type};
+      Phase_Timing_Func : ${event_handler_phase_timing_type};
+   end record;
+   --  Event handler that forwards events to C callbacks
+
+   overriding procedure Phase_Timing
+     (Self     : in out C_Event_Handler;
+      Filename : String;
+      Phase    : Analysis_Phase;
+      Name     : String;
+      Elapsed  : Duration);
+   overriding procedure Release (Self : in out C_Event_Handler);
+
+   type Callback_Stream is new Root_Stream_Type with record
+      Callback : ${serialization_callback_type};
+      Data     : System.Address;
+      Buffer   : Stream_Element_Array (1 .. 2 ** 16);
+      Last     : Stream_Element_Offset := 0;
+   end record;
+   --  Output stream that buffers data and sends it to a C serialization
+   --  callback.
+
+   overriding procedure Read
+     (Stream : in out Callback_Stream;
+      Item   : out Stream_Element_Array;
+      Last   : out Stream_Element_Offset);
+   overriding procedure Write
+     (Stream : in out Callback_Stream; Item : Stream_Element_Array);
+
+   procedure Flush (Stream : in out Callback_Stream);
+   --  Send all buffered data to the callback
+
    overriding procedure Finalize (Provider : in out C_Unit_Provider);
    overriding procedure Inc_Ref (Provider : in out C_Unit_Provider);
    overriding function Dec_Ref
@@ -167,6 +203,172 @@ package body ${ada_lib_name}.Implementation.C is
          Set_Last_Exception (Exc);
    end;
 
+   procedure ${capi.get_name("context_memoization_invalidation_stats")}
+     (Context                : ${analysis_context_type};
+      Invalidated, Surviving : access Long_Long_Integer) is
+   begin
+      Clear_Last_Exception;
+      Memoization_Invalidation_Stats
+        (Context, Invalidated.all, Surviving.all);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   function ${capi.get_name("memoized_properties_count")} return int is
+   begin
+      Clear_Last_Exception;
+      return int (Memoized_Properties_Count);
+   end;
+
+   function ${capi.get_name("memoized_property_name")}
+     (Index : int) return chars_ptr is
+   begin
+      Clear_Last_Exception;
+      if Index < 0 then
+         raise Precondition_Failure with "invalid memoized property index";
+      end if;
+      return New_String (Memoized_Property_Name (Positive (Index + 1)));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return Null_Ptr;
+   end;
+
+   procedure ${capi.get_name("context_memoization_stats")}
+     (Context                                 : ${analysis_context_type};
+      Index                                   : int;
+      Hits, Misses, Entries, Bytes, Evictions : access Long_Long_Integer) is
+   begin
+      Clear_Last_Exception;
+      if Index < 0 then
+         raise Precondition_Failure with "invalid memoized property index";
+      end if;
+
+      declare
+         Stats : constant Memoized_Property_Stats :=
+            Memoization_Stats (Context, Positive (Index + 1));
+      begin
+         Hits.all := Stats.Hits;
+         Misses.all := Stats.Misses;
+         Entries.all := Stats.Entries;
+         Bytes.all := Stats.Bytes;
+         Evictions.all := Stats.Evictions;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_set_memoization_memory_limit")}
+     (Context : ${analysis_context_type};
+      Limit   : Long_Long_Integer;
+      Policy  : int) is
+   begin
+      Clear_Last_Exception;
+      if Policy not in
+         Memoization_Eviction_Policy'Pos (Memoization_Eviction_Policy'First)
+         .. Memoization_Eviction_Policy'Pos (Memoization_Eviction_Policy'Last)
+      then
+         raise Constraint_Error with "invalid eviction policy";
+      end if;
+
+      Set_Memoization_Memory_Limit
+        (Context, Limit, Memoization_Eviction_Policy'Val (Policy));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_set_unit_memory_limit")}
+     (Context : ${analysis_context_type};
+      Limit   : Long_Long_Integer) is
+   begin
+      Clear_Last_Exception;
+      Set_Unit_Memory_Limit (Context, Limit);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_set_parse_cache_directory")}
+     (Context   : ${analysis_context_type};
+      Directory : chars_ptr) is
+   begin
+      Clear_Last_Exception;
+      Set_Parse_Cache_Directory (Context, Value_Or_Empty (Directory));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_set_compact_source_buffers")}
+     (Context : ${analysis_context_type};
+      Enabled : int) is
+   begin
+      Clear_Last_Exception;
+      Set_Compact_Source_Buffers (Context, Enabled /= 0);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_memory_usage")}
+     (Context : ${analysis_context_type};
+      Result  : access ${memory_usage_type}) is
+   begin
+      Clear_Last_Exception;
+      Result.all := Wrap (Memory_Usage (Context));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_set_event_handler")}
+     (Context           : ${analysis_context_type};
+      Data              : System.Address;
+      Destroy_Func      : ${event_handler_destroy_type};
+      Phase_Timing_Func : ${event_handler_phase_timing_type}) is
+   begin
+      Clear_Last_Exception;
+      Set_Event_Handler
+        (Context,
+         (if Phase_Timing_Func = null
+          then null
+          else new C_Event_Handler'
+                 (Data              => Data,
+                  Destroy_Func      => Destroy_Func,
+                  Phase_Timing_Func => Phase_Timing_Func)));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   function ${capi.get_name("context_has_unit")}
+     (Context       : ${analysis_context_type};
+      Unit_Filename : chars_ptr) return int is
+   begin
+      Clear_Last_Exception;
+
+      return (if Has_Unit (Context, Value (Unit_Filename)) then 1 else 0);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
+   function ${capi.get_name("context_reparse_version")}
+     (Context : ${analysis_context_type}) return int is
+   begin
+      Clear_Last_Exception;
+
+      return int (Context.Reparse_Cache_Version);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
    function ${capi.get_name("get_analysis_unit_from_file")}
      (Context           : ${analysis_context_type};
       Filename, Charset : chars_ptr;
@@ -249,6 +451,7 @@ package body ${ada_lib_name}.Implementation.C is
    begin
       Clear_Last_Exception;
 
+      Ensure_Loaded (Unit);
       Result_P.all := (Unit.AST_Root, ${T.entity_info.nullexpr});
    exception
       when Exc : others =>
@@ -311,6 +514,155 @@ package body ${ada_lib_name}.Implementation.C is
          return -1;
    end;
 
+   procedure ${capi.get_name('unit_memory_usage')}
+     (Unit   : ${analysis_unit_type};
+      Result : access ${memory_usage_type}) is
+   begin
+      Clear_Last_Exception;
+      Result.all := Wrap (Memory_Usage (Unit));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   function ${capi.get_name('unit_is_evicted')}
+     (Unit : ${analysis_unit_type}) return int is
+   begin
+      Clear_Last_Exception;
+      return (if Is_Evicted (Unit) then 1 else 0);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
+   procedure ${capi.get_name('unit_source_buffer')}
+     (Unit : ${analysis_unit_type};
+      Text : access ${text_type}) is
+   begin
+      Clear_Last_Exception;
+
+      Ensure_Loaded (Unit);
+      Promote (Unit.TDH);
+      Text.all := Wrap
+        (Text_Cst_Access (Unit.TDH.Source_Buffer),
+         Unit.TDH.Source_First,
+         Unit.TDH.Source_Last);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   function ${capi.get_name('unit_export_tokens')}
+     (Unit          : ${analysis_unit_type};
+      Capacity      : int;
+      Kinds         : System.Address;
+      Start_Offsets : System.Address;
+      End_Offsets   : System.Address;
+      Start_Lines   : System.Address;
+      Start_Columns : System.Address;
+      End_Lines     : System.Address;
+      End_Columns   : System.Address;
+      Is_Trivia     : System.Address) return int
+   is
+      type Int_Array is array (Positive range <>) of int;
+      type Uint32_Array is array (Positive range <>) of Unsigned_32;
+      type Uint16_Array is array (Positive range <>) of Unsigned_16;
+      type Bool_Array is array (Positive range <>) of ${bool_type};
+   begin
+      Clear_Last_Exception;
+      Ensure_Loaded (Unit);
+
+      declare
+         TDH   : Token_Data_Handler renames Unit.TDH;
+         Count : constant Natural :=
+           Natural (TDH.Tokens.Length) + Natural (TDH.Trivias.Length);
+         Last  : constant Natural := Natural'Min (Count, Natural (Capacity));
+
+         --  Overlay user arrays. Note that null addresses are fine as long as
+         --  the corresponding arrays are not accessed.
+
+         K  : Int_Array (1 .. Last) with Import, Address => Kinds;
+         SO : Uint32_Array (1 .. Last) with Import, Address => Start_Offsets;
+         EO : Uint32_Array (1 .. Last) with Import, Address => End_Offsets;
+         SL : Uint32_Array (1 .. Last) with Import, Address => Start_Lines;
+         SC : Uint16_Array (1 .. Last) with Import, Address => Start_Columns;
+         EL : Uint32_Array (1 .. Last) with Import, Address => End_Lines;
+         EC : Uint16_Array (1 .. Last) with Import, Address => End_Columns;
+         T  : Bool_Array (1 .. Last) with Import, Address => Is_Trivia;
+
+         Cur : Token_Or_Trivia_Index := First_Token_Or_Trivia (TDH);
+      begin
+         for I in 1 .. Last loop
+            exit when Cur = No_Token_Or_Trivia_Index;
+
+            declare
+               D : constant Stored_Token_Data := Data (Cur, TDH);
+               R : Source_Location_Range renames D.Sloc_Range;
+            begin
+               if Kinds /= System.Null_Address then
+                  K (I) := Token_Kind'Enum_Rep (To_Token_Kind (D.Kind));
+               end if;
+               if Start_Offsets /= System.Null_Address then
+                  SO (I) := Unsigned_32 (D.Source_First - TDH.Source_First);
+               end if;
+               if End_Offsets /= System.Null_Address then
+                  EO (I) := Unsigned_32 (D.Source_Last - TDH.Source_First + 1);
+               end if;
+               if Start_Lines /= System.Null_Address then
+                  SL (I) := Unsigned_32 (R.Start_Line);
+               end if;
+               if Start_Columns /= System.Null_Address then
+                  SC (I) := Unsigned_16 (R.Start_Column);
+               end if;
+               if End_Lines /= System.Null_Address then
+                  EL (I) := Unsigned_32 (R.End_Line);
+               end if;
+               if End_Columns /= System.Null_Address then
+                  EC (I) := Unsigned_16 (R.End_Column);
+               end if;
+               if Is_Trivia /= System.Null_Address then
+                  T (I) := (if Cur.Trivia = No_Token_Index then 0 else 1);
+               end if;
+            end;
+
+            Cur := Next (Cur, TDH);
+         end loop;
+
+         return int (Count);
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return -1;
+   end;
+
+   function ${capi.get_name('unit_node_at_preorder_index')}
+     (Unit     : ${analysis_unit_type};
+      Index    : unsigned;
+      Result_P : ${entity_type}_Ptr) return int is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         Result : ${T.root_node.name};
+      begin
+         if Index >= unsigned (Natural'Last) then
+            return 0;
+         end if;
+         Result := Node_At_Preorder_Index (Unit, Natural (Index) + 1);
+         if Result = null then
+            return 0;
+         end if;
+         Result_P.all := (Result, ${T.entity_info.nullexpr});
+         return 1;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
    procedure ${capi.get_name('unit_lookup_token')}
      (Unit   : ${analysis_unit_type};
       Sloc   : access ${sloc_type};
@@ -329,6 +681,209 @@ package body ${ada_lib_name}.Implementation.C is
          Set_Last_Exception (Exc);
    end;
 
+   function ${capi.get_name('unit_line_count')}
+     (Unit : ${analysis_unit_type}) return int is
+   begin
+      Clear_Last_Exception;
+      Ensure_Loaded (Unit);
+      return int (Line_Count (Unit.TDH));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
+   function ${capi.get_name('unit_offset_to_sloc')}
+     (Unit   : ${analysis_unit_type};
+      Offset : unsigned;
+      Sloc   : access ${sloc_type}) return int is
+   begin
+      Clear_Last_Exception;
+      Ensure_Loaded (Unit);
+
+      declare
+         TDH : Token_Data_Handler renames Unit.TDH;
+         S   : Source_Location;
+      begin
+         if Offset > unsigned (TDH.Source_Last - TDH.Source_First + 1) then
+            return 0;
+         end if;
+         S := Offset_To_Sloc (TDH, TDH.Source_First + Natural (Offset));
+         if S = No_Source_Location then
+            return 0;
+         end if;
+         Sloc.all := Wrap (S);
+         return 1;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
+   function ${capi.get_name('unit_sloc_to_offset')}
+     (Unit : ${analysis_unit_type};
+      Sloc : access ${sloc_type}) return int is
+   begin
+      Clear_Last_Exception;
+      Ensure_Loaded (Unit);
+
+      declare
+         TDH    : Token_Data_Handler renames Unit.TDH;
+         Offset : constant Natural := Sloc_To_Offset (TDH, Unwrap (Sloc.all));
+      begin
+         return (if Offset = 0
+                 then -1
+                 else int (Offset - TDH.Source_First));
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return -1;
+   end;
+
+   function ${capi.get_name('unit_line_tokens')}
+     (Unit        : ${analysis_unit_type};
+      Line        : unsigned;
+      First, Last : access ${token_type}) return int is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         F, L : Token_Reference;
+      begin
+         Get_Line_Tokens (Unit, Line_Number (Line), F, L);
+         if F = No_Token then
+            return 0;
+         end if;
+         First.all := Wrap (F);
+         Last.all := Wrap (L);
+         return 1;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
+   procedure ${capi.get_name('unit_lookup_node')}
+     (Unit   : ${analysis_unit_type};
+      Sloc   : access ${sloc_type};
+      Result : ${entity_type}_Ptr) is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         S : constant Source_Location := Unwrap (Sloc.all);
+      begin
+         Result.all := (Lookup_Node (Unit, S), ${T.entity_info.nullexpr});
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name('unit_covering_nodes')}
+     (Unit   : ${analysis_unit_type};
+      Sloc   : access ${sloc_type};
+      Result : access ${root_entity.array.name}) is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         S    : constant Source_Location := Unwrap (Sloc.all);
+         Node : constant ${T.root_node.name} := Lookup_Node (Unit, S);
+      begin
+         Result.all :=
+           (if Node = null
+            then ${root_entity.array.constructor_name} (0)
+            else Parents (Node, ${T.entity_info.nullexpr}));
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   ----------
+   -- Read --
+   ----------
+
+   overriding procedure Read
+     (Stream : in out Callback_Stream;
+      Item   : out Stream_Element_Array;
+      Last   : out Stream_Element_Offset)
+   is
+      pragma Unreferenced (Stream, Item, Last);
+   begin
+      raise Program_Error with "cannot read from serialization streams";
+   end Read;
+
+   -----------
+   -- Write --
+   -----------
+
+   overriding procedure Write
+     (Stream : in out Callback_Stream; Item : Stream_Element_Array) is
+   begin
+      if Item'Length > Stream.Buffer'Last - Stream.Last then
+         Flush (Stream);
+      end if;
+
+      --  Send big chunks directly to the callback
+
+      if Item'Length > Stream.Buffer'Length then
+         Stream.Callback (Stream.Data, Item'Address, Item'Length);
+      else
+         Stream.Buffer (Stream.Last + 1 .. Stream.Last + Item'Length) := Item;
+         Stream.Last := Stream.Last + Item'Length;
+      end if;
+   end Write;
+
+   -----------
+   -- Flush --
+   -----------
+
+   procedure Flush (Stream : in out Callback_Stream) is
+   begin
+      if Stream.Last > 0 then
+         Stream.Callback
+           (Stream.Data, Stream.Buffer'Address, size_t (Stream.Last));
+         Stream.Last := 0;
+      end if;
+   end Flush;
+
+   function ${capi.get_name('unit_serialize')}
+     (Unit     : ${analysis_unit_type};
+      Format   : int;
+      Callback : ${serialization_callback_type};
+      Data     : System.Address) return int
+   is
+      use ${ada_lib_name}.Serialization;
+   begin
+      Clear_Last_Exception;
+
+      if Format not in Serialization_Format'Pos (Serialization_Format'First)
+                     .. Serialization_Format'Pos (Serialization_Format'Last)
+      then
+         raise Constraint_Error with "invalid serialization format";
+      end if;
+
+      declare
+         Stream : aliased Callback_Stream;
+      begin
+         Stream.Callback := Callback;
+         Stream.Data := Data;
+         Serialize
+           (Unit, Serialization_Format'Val (Format), Stream'Access);
+         Flush (Stream);
+      end;
+      return 1;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
    procedure ${capi.get_name('unit_dump_lexical_env')}
      (Unit : ${analysis_unit_type}) is
    begin
@@ -546,6 +1101,52 @@ package body ${ada_lib_name}.Implementation.C is
          Set_Last_Exception (Exc);
    end;
 
+   procedure ${capi.get_name('node_text_slice')}
+     (Node : ${entity_type}_Ptr;
+      Text : access ${text_type}) is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         N : constant ${T.root_node.name} := Node.Node;
+      begin
+         if N = null then
+            raise Property_Error with "cannot get the text of a null node";
+
+         elsif Is_Synthetic (N) or else Is_Ghost (N) then
+            --  No text is associated to synthetic and ghost nodes
+
+            Text.all := (Chars        => System.Null_Address,
+                         Length       => 0,
+                         Is_Allocated => 0);
+
+         else
+            --  Return the source buffer slice that spans between the first
+            --  and the last tokens of N. This requires the UTF-32 source
+            --  buffer.
+
+            Promote (N.Unit.TDH);
+            declare
+               Start_D : constant Token_Data_Type :=
+                  Data (Token (N, N.Token_Start_Index));
+               End_D   : constant Token_Data_Type :=
+                  Data (Token (N, N.Token_End_Index));
+
+               Source_Buffer, Ignored_Buffer : Text_Cst_Access;
+               First, Ignored_First          : Positive;
+               Last, Ignored_Last            : Natural;
+            begin
+               Extract_Token_Text (Start_D, Source_Buffer, First, Ignored_Last);
+               Extract_Token_Text (End_D, Ignored_Buffer, Ignored_First, Last);
+               Text.all := Wrap (Source_Buffer, First, Last);
+            end;
+         end if;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
    procedure ${capi.get_name('node_sloc_range')}
      (Node         : ${entity_type}_Ptr;
       Sloc_Range_P : access ${sloc_range_type}) is
@@ -614,6 +1215,28 @@ package body ${ada_lib_name}.Implementation.C is
          return 0;
    end;
 
+   function ${capi.get_name('node_preorder_index')}
+     (Node : ${entity_type}_Ptr) return int is
+   begin
+      Clear_Last_Exception;
+      return int (Preorder_Index (Node.Node)) - 1;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return -1;
+   end;
+
+   function ${capi.get_name('node_preorder_last')}
+     (Node : ${entity_type}_Ptr) return int is
+   begin
+      Clear_Last_Exception;
+      return int (Preorder_Last (Node.Node)) - 1;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return -1;
+   end;
+
    function ${capi.get_name("text_to_locale_string")}
      (Text : ${text_type}) return System.Address is
    begin
@@ -811,6 +1434,11 @@ package body ${ada_lib_name}.Implementation.C is
    is
    begin
       Clear_Last_Exception;
+
+      --  The result designates the UTF-32 source buffer: make sure it exists.
+      --  If Last belongs to another unit, this returns 0 anyway.
+
+      Promote (Get_Token_TDH (Unwrap (First)).all);
       declare
          FD : constant Token_Data_Type := Data (Unwrap (First));
          LD : constant Token_Data_Type := Data (Unwrap (Last));
@@ -1022,6 +1650,38 @@ package body ${ada_lib_name}.Implementation.C is
          Set_Last_Exception (Exc);
    end;
 
+   ------------------
+   -- Phase_Timing --
+   ------------------
+
+   overriding procedure Phase_Timing
+     (Self     : in out C_Event_Handler;
+      Filename : String;
+      Phase    : Analysis_Phase;
+      Name     : String;
+      Elapsed  : Duration)
+   is
+      C_Filename : chars_ptr := New_String (Filename);
+      C_Name     : chars_ptr := New_String (Name);
+   begin
+      Self.Phase_Timing_Func
+        (Self.Data, C_Filename, Analysis_Phase'Pos (Phase), C_Name,
+         double (Elapsed));
+      Free (C_Filename);
+      Free (C_Name);
+   end Phase_Timing;
+
+   -------------
+   -- Release --
+   -------------
+
+   overriding procedure Release (Self : in out C_Event_Handler) is
+   begin
+      if Self.Destroy_Func /= null then
+         Self.Destroy_Func (Self.Data);
+      end if;
+   end Release;
+
    --------------
    -- Finalize --
    --------------
@@ -1140,11 +1800,21 @@ package body ${ada_lib_name}.Implementation.C is
          Last          : Natural;
       begin
          Extract_Token_Text (D, Source_Buffer, First, Last);
+
+         --  Do not switch units that use the compact representation for
+         --  their source buffer back to the UTF-32 one just to wrap tokens:
+         --  leave the text empty instead (see token_range_text).
+
          return (Token_Data   => Convert (Get_Token_TDH (Token)),
                  Token_Index  => int (Index.Token),
                  Trivia_Index => int (Index.Trivia),
                  Kind         => K'Enum_Rep,
-                 Text         => Wrap (Source_Buffer, First, Last),
+                 Text         =>
+                   (if Source_Buffer = null
+                    then (Chars        => System.Null_Address,
+                          Length       => 0,
+                          Is_Allocated => 0)
+                    else Wrap (Source_Buffer, First, Last)),
                  Sloc_Range   => Wrap (Sloc_Range (D)));
       end;
    end Wrap;
@@ -1190,6 +1860,9 @@ package body ${ada_lib_name}.Implementation.C is
    % for astnode in ctx.astnode_types:
        % for field in astnode.fields_with_accessors():
            ${astnode_types.accessor_body(field)}
+           % if field.has_bulk_accessor:
+              ${astnode_types.bulk_accessor_body(field)}
+           % endif
        % endfor
    % endfor
 
@@ -97,6 +97,13 @@ private package ${ada_lib_name}.Implementation.C is
      with Convention => C;
    ${ada_c_doc('langkit.diagnostic_type', 3)}
 
+   type ${memory_usage_type} is record
+      AST_Nodes, Tokens, Source_Buffer, Symbols, Memoization, Lexical_Envs,
+      Lookup_Caches, Total : Long_Long_Integer;
+   end record
+     with Convention => C;
+   ${ada_c_doc('langkit.memory_usage_type', 3)}
+
    type ${exception_kind_type} is (
       ${', '.join(str(e.kind_name) for e in ctx.sorted_exception_types)}
    ) with Convention => C;
@@ -184,6 +191,27 @@ private package ${ada_lib_name}.Implementation.C is
       with Convention => C;
    ${ada_c_doc('langkit.unit_provider_get_unit_from_name_type', 3)}
 
+   type ${serialization_callback_type} is access procedure
+     (Data   : System.Address;
+      Buffer : System.Address;
+      Length : size_t)
+      with Convention => C;
+   ${ada_c_doc('langkit.serialization_callback_type', 3)}
+
+   type ${event_handler_destroy_type} is access procedure
+     (Data : System.Address)
+      with Convention => C;
+   ${ada_c_doc('langkit.event_handler_destroy_type', 3)}
+
+   type ${event_handler_phase_timing_type} is access procedure
+     (Data     : System.Address;
+      Filename : chars_ptr;
+      Phase    : int;
+      Name     : chars_ptr;
+      Elapsed  : double)
+      with Convention => C;
+   ${ada_c_doc('langkit.event_handler_phase_timing_type', 3)}
+
    -------------------------
    -- Analysis primitives --
    -------------------------
@@ -230,6 +258,107 @@ private package ${ada_lib_name}.Implementation.C is
               'context_discard_errors_in_populate_lexical_env')}";
    ${ada_c_doc('langkit.context_discard_errors_in_populate_lexical_env', 3)}
 
+   procedure ${capi.get_name("context_memoization_invalidation_stats")}
+     (Context                : ${analysis_context_type};
+      Invalidated, Surviving : access Long_Long_Integer)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_memoization_invalidation_stats')}";
+   ${ada_c_doc('langkit.context_memoization_invalidation_stats', 3)}
+
+   function ${capi.get_name("memoized_properties_count")} return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('memoized_properties_count')}";
+   ${ada_c_doc('langkit.memoized_properties_count', 3)}
+
+   function ${capi.get_name("memoized_property_name")}
+     (Index : int) return chars_ptr
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('memoized_property_name')}";
+   ${ada_c_doc('langkit.memoized_property_name', 3)}
+
+   procedure ${capi.get_name("context_memoization_stats")}
+     (Context                                 : ${analysis_context_type};
+      Index                                   : int;
+      Hits, Misses, Entries, Bytes, Evictions : access Long_Long_Integer)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_memoization_stats')}";
+   ${ada_c_doc('langkit.context_memoization_stats', 3)}
+
+   procedure ${capi.get_name("context_set_memoization_memory_limit")}
+     (Context : ${analysis_context_type};
+      Limit   : Long_Long_Integer;
+      Policy  : int)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_set_memoization_memory_limit')}";
+   ${ada_c_doc('langkit.context_set_memoization_memory_limit', 3)}
+
+   procedure ${capi.get_name("context_set_unit_memory_limit")}
+     (Context : ${analysis_context_type};
+      Limit   : Long_Long_Integer)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_set_unit_memory_limit')}";
+   ${ada_c_doc('langkit.context_set_unit_memory_limit', 3)}
+
+   procedure ${capi.get_name("context_set_parse_cache_directory")}
+     (Context   : ${analysis_context_type};
+      Directory : chars_ptr)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_set_parse_cache_directory')}";
+   ${ada_c_doc('langkit.context_set_parse_cache_directory', 3)}
+
+   procedure ${capi.get_name("context_set_compact_source_buffers")}
+     (Context : ${analysis_context_type};
+      Enabled : int)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name(
+              'context_set_compact_source_buffers')}";
+   ${ada_c_doc('langkit.context_set_compact_source_buffers', 3)}
+
+   procedure ${capi.get_name("context_memory_usage")}
+     (Context : ${analysis_context_type};
+      Result  : access ${memory_usage_type})
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_memory_usage')}";
+   ${ada_c_doc('langkit.context_memory_usage', 3)}
+
+   procedure ${capi.get_name("context_set_event_handler")}
+     (Context           : ${analysis_context_type};
+      Data              : System.Address;
+      Destroy_Func      : ${event_handler_destroy_type};
+      Phase_Timing_Func : ${event_handler_phase_timing_type})
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_set_event_handler')}";
+   ${ada_c_doc('langkit.context_set_event_handler', 3)}
+
+   function ${capi.get_name('context_has_unit')}
+     (Context       : ${analysis_context_type};
+      Unit_Filename : chars_ptr) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_has_unit')}";
+   ${ada_c_doc('langkit.context_has_unit', 3)}
+
+   function ${capi.get_name('context_reparse_version')}
+     (Context : ${analysis_context_type}) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_reparse_version')}";
+   ${ada_c_doc('langkit.context_reparse_version', 3)}
+
    function ${capi.get_name('get_analysis_unit_from_file')}
      (Context           : ${analysis_context_type};
       Filename, Charset : chars_ptr;
@@ -307,6 +436,55 @@ private package ${ada_lib_name}.Implementation.C is
            External_Name => "${capi.get_name('unit_trivia_count')}";
    ${ada_c_doc('langkit.unit_trivia_count', 3)}
 
+   procedure ${capi.get_name('unit_memory_usage')}
+     (Unit   : ${analysis_unit_type};
+      Result : access ${memory_usage_type})
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_memory_usage')}";
+   ${ada_c_doc('langkit.unit_memory_usage', 3)}
+
+   function ${capi.get_name('unit_is_evicted')}
+     (Unit : ${analysis_unit_type}) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_is_evicted')}";
+   ${ada_c_doc('langkit.unit_is_evicted', 3)}
+
+   procedure ${capi.get_name('unit_source_buffer')}
+     (Unit : ${analysis_unit_type};
+      Text : access ${text_type})
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_source_buffer')}";
+   ${ada_c_doc('langkit.unit_source_buffer', 3)}
+
+   function ${capi.get_name('unit_export_tokens')}
+     (Unit          : ${analysis_unit_type};
+      Capacity      : int;
+      Kinds         : System.Address;
+      Start_Offsets : System.Address;
+      End_Offsets   : System.Address;
+      Start_Lines   : System.Address;
+      Start_Columns : System.Address;
+      End_Lines     : System.Address;
+      End_Columns   : System.Address;
+      Is_Trivia     : System.Address) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_export_tokens')}";
+   ${ada_c_doc('langkit.unit_export_tokens', 3)}
+
+   function ${capi.get_name('unit_node_at_preorder_index')}
+     (Unit     : ${analysis_unit_type};
+      Index    : unsigned;
+      Result_P : ${entity_type}_Ptr) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name =>
+              "${capi.get_name('unit_node_at_preorder_index')}";
+   ${ada_c_doc('langkit.unit_node_at_preorder_index', 3)}
+
    procedure ${capi.get_name('unit_lookup_token')}
      (Unit   : ${analysis_unit_type};
       Sloc   : access ${sloc_type};
@@ -316,6 +494,67 @@ private package ${ada_lib_name}.Implementation.C is
            External_Name => "${capi.get_name('unit_lookup_token')}";
    ${ada_c_doc('langkit.unit_lookup_token', 3)}
 
+   function ${capi.get_name('unit_line_count')}
+     (Unit : ${analysis_unit_type}) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_line_count')}";
+   ${ada_c_doc('langkit.unit_line_count', 3)}
+
+   function ${capi.get_name('unit_offset_to_sloc')}
+     (Unit   : ${analysis_unit_type};
+      Offset : unsigned;
+      Sloc   : access ${sloc_type}) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_offset_to_sloc')}";
+   ${ada_c_doc('langkit.unit_offset_to_sloc', 3)}
+
+   function ${capi.get_name('unit_sloc_to_offset')}
+     (Unit : ${analysis_unit_type};
+      Sloc : access ${sloc_type}) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_sloc_to_offset')}";
+   ${ada_c_doc('langkit.unit_sloc_to_offset', 3)}
+
+   function ${capi.get_name('unit_line_tokens')}
+     (Unit        : ${analysis_unit_type};
+      Line        : unsigned;
+      First, Last : access ${token_type}) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_line_tokens')}";
+   ${ada_c_doc('langkit.unit_line_tokens', 3)}
+
+   procedure ${capi.get_name('unit_lookup_node')}
+     (Unit   : ${analysis_unit_type};
+      Sloc   : access ${sloc_type};
+      Result : ${entity_type}_Ptr)
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_lookup_node')}";
+   ${ada_c_doc('langkit.unit_lookup_node', 3)}
+
+   procedure ${capi.get_name('unit_covering_nodes')}
+     (Unit   : ${analysis_unit_type};
+      Sloc   : access ${sloc_type};
+      Result : access ${root_entity.array.name})
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_covering_nodes')}";
+   ${ada_c_doc('langkit.unit_covering_nodes', 3)}
+
+   function ${capi.get_name('unit_serialize')}
+     (Unit     : ${analysis_unit_type};
+      Format   : int;
+      Callback : ${serialization_callback_type};
+      Data     : System.Address) return int
+      with Export        => True,
+           Convention    => C,
+           External_Name => "${capi.get_name('unit_serialize')}";
+   ${ada_c_doc('langkit.unit_serialize', 3)}
+
    procedure ${capi.get_name('unit_dump_lexical_env')}
      (Unit : ${analysis_unit_type})
       with Export        => True,
@@ -432,6 +671,13 @@ private package ${ada_lib_name}.Implementation.C is
            External_Name      => "${capi.get_name('node_text')}";
    ${ada_c_doc('langkit.node_text', 3)}
 
+   procedure ${capi.get_name('node_text_slice')}
+     (Node : ${entity_type}_Ptr;
+      Text : access ${text_type})
+      with Export, Convention => C,
+           External_Name      => "${capi.get_name('node_text_slice')}";
+   ${ada_c_doc('langkit.node_text_slice', 3)}
+
    procedure ${capi.get_name('node_sloc_range')}
      (Node         : ${entity_type}_Ptr;
       Sloc_Range_P : access ${sloc_range_type})
@@ -465,6 +711,20 @@ private package ${ada_lib_name}.Implementation.C is
            External_name => "${capi.get_name('node_child')}";
    ${ada_c_doc('langkit.node_child', 3)}
 
+   function ${capi.get_name('node_preorder_index')}
+     (Node : ${entity_type}_Ptr) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('node_preorder_index')}";
+   ${ada_c_doc('langkit.node_preorder_index', 3)}
+
+   function ${capi.get_name('node_preorder_last')}
+     (Node : ${entity_type}_Ptr) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('node_preorder_last')}";
+   ${ada_c_doc('langkit.node_preorder_last', 3)}
+
    function ${capi.get_name('text_to_locale_string')}
      (Text : ${text_type}) return System.Address
       with Export        => True,
@@ -623,6 +883,10 @@ private package ${ada_lib_name}.Implementation.C is
        Column_Number (S.Start_S.Column),
        Column_Number (S.End_S.Column)));
 
+   function Wrap (S : Memory_Usage_Stats) return ${memory_usage_type} is
+     ((S.AST_Nodes, S.Tokens, S.Source_Buffer, S.Symbols, S.Memoization,
+       S.Lexical_Envs, S.Lookup_Caches, S.Total));
+
    function Wrap (S : Unbounded_Wide_Wide_String) return ${text_type};
 
    function Wrap_Alloc (S : Text_Type) return ${text_type};
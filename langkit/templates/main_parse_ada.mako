@@ -19,6 +19,8 @@ with ${ada_lib_name}.Common;    use ${ada_lib_name}.Common;
 with ${ada_lib_name}.Unparsing; use ${ada_lib_name}.Unparsing;
 % endif
 
+with Parse_Timing; use Parse_Timing;
+
 procedure Parse is
 
    package String_Vectors is new Ada.Containers.Vectors
@@ -42,7 +44,9 @@ procedure Parse is
         (Parser, "-E", "--print-envs", "Print lexical environments computed");
 
       package Measure_Time is new Parse_Flag
-        (Parser, "-t", "--time", "Time the execution of parsing");
+        (Parser, "-t", "--time",
+         "Time the execution of parsing, and print timings for each analysis"
+         & " phase");
 
       package Check is new Parse_Flag
         (Parser, "-C", "--check",
@@ -73,6 +77,12 @@ procedure Parse is
          Long => "--hide-slocs",
          Help => "When printing the tree, hide source locations");
 
+      package Do_Print_Memoization_Stats is new Parse_Flag
+        (Parser,
+         Long => "--memoization-stats",
+         Help => "Print statistics for memoized properties once all inputs"
+                 & " are processed");
+
       package Lookups is new Parse_Option_List
         (Parser, "-L", "--lookups",
          Arg_Type   => Unbounded_String,
@@ -111,11 +121,28 @@ procedure Parse is
    procedure Process_File (Filename : String; Ctx : Analysis_Context);
    procedure Print_Token_Stream (Unit : Analysis_Unit);
    procedure Parse_Input (Content : String);
+   procedure Print_Memoization_Stats (Ctx : Analysis_Context);
+
+   function Create_Parse_Context return Analysis_Context;
+
+   --------------------------
+   -- Create_Parse_Context --
+   --------------------------
 
    function Create_Parse_Context return Analysis_Context is
-     (Create_Context (Charset     => To_String (Args.Charset.Get),
-                      With_Trivia => Args.Do_Print_Trivia.Get
-                                     or else Args.Do_Print_Tokens.Get));
+      Result : constant Analysis_Context := Create_Context
+        (Charset     => To_String (Args.Charset.Get),
+         With_Trivia => Args.Do_Print_Trivia.Get
+                        or else Args.Do_Print_Tokens.Get);
+   begin
+      --  When asked to measure time, also print timings for each analysis
+      --  phase.
+
+      if Args.Measure_Time.Get then
+         Set_Event_Handler (Result, new Timing_Printer);
+      end if;
+      return Result;
+   end Create_Parse_Context;
 
    -------------
    -- Convert --
@@ -236,8 +263,38 @@ procedure Parse is
          --  process it anyway.
          Process_Node (Root (Unit));
       end if;
+
+      if Args.Do_Print_Memoization_Stats.Get then
+         Print_Memoization_Stats (Ctx);
+      end if;
    end Parse_Input;
 
+   -----------------------------
+   -- Print_Memoization_Stats --
+   -----------------------------
+
+   procedure Print_Memoization_Stats (Ctx : Analysis_Context) is
+   begin
+      Put_Line ("Memoization statistics:");
+      for I in 1 .. Memoized_Properties_Count loop
+         declare
+            S : constant Memoized_Property_Stats := Memoization_Stats (Ctx, I);
+         begin
+            --  Skip properties that were never called, to keep the output
+            --  short for big languages.
+            if S.Hits + S.Misses > 0 then
+               Put_Line
+                 ("  " & Memoized_Property_Name (I) & ":"
+                  & " hits" & Long_Long_Integer'Image (S.Hits)
+                  & ", misses" & Long_Long_Integer'Image (S.Misses)
+                  & ", entries" & Long_Long_Integer'Image (S.Entries)
+                  & ", bytes" & Long_Long_Integer'Image (S.Bytes)
+                  & ", evictions" & Long_Long_Integer'Image (S.Evictions));
+            end if;
+         end;
+      end loop;
+   end Print_Memoization_Stats;
+
    ------------------
    -- Process_File --
    ------------------
@@ -350,6 +407,10 @@ begin
             end;
          end loop;
          Close (F);
+
+         if Args.Do_Print_Memoization_Stats.Get then
+            Print_Memoization_Stats (Ctx);
+         end if;
       end;
 
    elsif Args.File_Names.Get'Length /= 0 then
@@ -359,6 +420,10 @@ begin
          for File_Name of Args.File_Names.Get loop
             Process_File (To_String (File_Name), Ctx);
          end loop;
+
+         if Args.Do_Print_Memoization_Stats.Get then
+            Print_Memoization_Stats (Ctx);
+         end if;
       end;
 
    else
@@ -0,0 +1,30 @@
+## vim: filetype=makoada
+
+with Ada.Characters.Handling; use Ada.Characters.Handling;
+with Ada.Characters.Latin_1;  use Ada.Characters.Latin_1;
+with Ada.Strings;             use Ada.Strings;
+with Ada.Strings.Fixed;       use Ada.Strings.Fixed;
+with Ada.Text_IO;             use Ada.Text_IO;
+
+package body Parse_Timing is
+
+   ------------------
+   -- Phase_Timing --
+   ------------------
+
+   overriding procedure Phase_Timing
+     (Self     : in out Timing_Printer;
+      Filename : String;
+      Phase    : Analysis_Phase;
+      Name     : String;
+      Elapsed  : Duration)
+   is
+      pragma Unreferenced (Self);
+   begin
+      Put_Line ("time" & HT & Filename
+                & HT & To_Lower (Analysis_Phase'Image (Phase))
+                & HT & Name
+                & HT & Trim (Duration'Image (Elapsed), Left));
+   end Phase_Timing;
+
+end Parse_Timing;
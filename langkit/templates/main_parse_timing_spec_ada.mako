@@ -0,0 +1,28 @@
+## vim: filetype=makoada
+
+with ${ada_lib_name}.Common; use ${ada_lib_name}.Common;
+
+--  Event handler for the "parse" main, used to print phase timings when the
+--  --time option is passed.
+
+package Parse_Timing is
+
+   type Timing_Printer is new Event_Handler_Interface with null record;
+   --  Event handler that prints one line per timing it receives, in the
+   --  following tab-separated format::
+   --
+   --     time  FILENAME  PHASE  PROPERTY-NAME  SECONDS
+   --
+   --  PHASE is the lower-cased name of the analysis phase and PROPERTY-NAME
+   --  is empty for phases other than property evaluation.
+
+   overriding procedure Phase_Timing
+     (Self     : in out Timing_Printer;
+      Filename : String;
+      Phase    : Analysis_Phase;
+      Name     : String;
+      Elapsed  : Duration);
+
+   overriding procedure Release (Self : in out Timing_Printer) is null;
+
+end Parse_Timing;
@@ -11,6 +11,12 @@
    # We want discrimanted types below to be constrained, so we want
    # discriminant default values.
    default_key = key_types[0].memoization_kind
+
+   # Most memoized properties have few arguments: store the items of their
+   # keys inline, so that creating keys does not need heap allocations. Do
+   # not make inline keys bigger than needed, though.
+   inline_key_length = min(4, max(p.memoization_key_length
+                                  for p in memoized_props))
 %>
 
 type Mmz_Property is
@@ -31,10 +37,38 @@ end record;
 
 type Mmz_Key_Array is array (Positive range <>) of Mmz_Key_Item;
 type Mmz_Key_Array_Access is access all Mmz_Key_Array;
-type Mmz_Key is record
+
+Mmz_Inline_Key_Length : constant := ${inline_key_length};
+--  Maximum number of items for keys that store them inline
+
+type Mmz_Key (Inline : Boolean := True) is record
    Property : Mmz_Property;
-   Items    : Mmz_Key_Array_Access;
+
+   Hash : Hash_Type := 0;
+   --  Hash for this key. It is computed once when the key is created (see
+   --  Find_Memoized_Value), so that map operations do not recompute it.
+
+   case Inline is
+      when True =>
+         Length       : Natural range 0 .. Mmz_Inline_Key_Length := 0;
+         Inline_Items : Mmz_Key_Array (1 .. Mmz_Inline_Key_Length);
+         --  Items for this key are Inline_Items (1 .. Length)
+
+      when False =>
+         Items : Mmz_Key_Array_Access;
+   end case;
 end record;
+--  Key for a memoized property call. Keys that have at most
+--  Mmz_Inline_Key_Length items store them inline to avoid heap allocations.
+--  Keys own a share of the ref-counted values they contain.
+
+function Make_Key (Property : Mmz_Property; Length : Natural) return Mmz_Key;
+--  Return a key for Property with Length items, to be set with Set_Item
+
+procedure Set_Item
+  (Key : in out Mmz_Key; Index : Positive; Item : Mmz_Key_Item)
+  with Inline;
+--  Set the Index'th item of Key to Item
 
 type Mmz_Value (Kind : Mmz_Value_Kind := Mmz_Evaluating) is record
    case Kind is
@@ -48,15 +82,101 @@ type Mmz_Value (Kind : Mmz_Value_Kind := Mmz_Evaluating) is record
    end case;
 end record;
 
-function Hash (Key : Mmz_Key) return Hash_Type;
+function Hash (Key : Mmz_Key) return Hash_Type is (Key.Hash);
 function Equivalent (L, R : Mmz_Key) return Boolean;
 
+package Mmz_Dependency_Vectors is new Langkit_Support.Vectors (Internal_Unit);
+
+subtype Mmz_Dependency_Array is Mmz_Dependency_Vectors.Elements_Array;
+type Mmz_Dependency_Array_Access is access all Mmz_Dependency_Array;
+--  Set of analysis units that a memoized value depends on. A null item
+--  stands for the root scope (see Analysis_Context_Type.Root_Scope).
+
+procedure Free is new Ada.Unchecked_Deallocation
+  (Mmz_Dependency_Array, Mmz_Dependency_Array_Access);
+
+type Mmz_Entry is record
+   Value : Mmz_Value;
+
+   Dependencies : Mmz_Dependency_Array_Access;
+   --  Units on which the computation of Value depended: this entry must be
+   --  invalidated when one of them changes. Null while Value is being
+   --  evaluated.
+
+   Depends_On_All_Units : Boolean := False;
+   --  Whether this entry must be invalidated whenever any unit changes. This
+   --  is used when we cannot compute the set of units this entry depends on.
+
+   Size : Natural := 0;
+   --  Estimated memory footprint of this entry (key and value included), in
+   --  bytes. Zero while Value is being evaluated.
+
+   Eviction_Item : Natural := 0;
+   --  Index in Analysis_Context_Type.Mmz_Eviction.Items of the item that
+   --  tracks this entry, or 0 while Value is being evaluated.
+end record;
+
 package Memoization_Maps is new Ada.Containers.Hashed_Maps
-  (Mmz_Key, Mmz_Value, Hash, Equivalent_Keys => Equivalent);
+  (Mmz_Key, Mmz_Entry, Hash, Equivalent_Keys => Equivalent);
+
+type Mmz_Stats_Array is array (Mmz_Property) of Memoized_Property_Stats;
+--  Memoization statistics for all memoized properties
+
+type Mmz_Eviction_Item is record
+   Unit : Internal_Unit;
+   Cur  : Memoization_Maps.Cursor;
+   --  Memoization entry that this item tracks, in Unit.Memoization_Map
+
+   Newer, Older : Natural := 0;
+   --  Indexes of the neighbor items in the eviction list (0 if there is
+   --  none). For free items, Older is the index of the next free item.
+
+   Referenced : Boolean := False;
+   --  For the Clock eviction policy, whether the entry was used since the
+   --  clock hand last went over it.
+end record;
+
+package Mmz_Eviction_Item_Vectors is new Langkit_Support.Vectors
+  (Mmz_Eviction_Item);
+
+type Mmz_Eviction_List is record
+   Items : Mmz_Eviction_Item_Vectors.Vector;
+   --  Storage for items. Items that are not linked in the list are chained
+   --  from First_Free so that they can be reused.
+
+   Newest, Oldest : Natural := 0;
+   --  Ends of the list: indexes of the most and least recently used (or
+   --  added) entries, or 0 if the list is empty.
 
-procedure Destroy (Map : in out Memoization_Maps.Map);
---  Free all resources stored in a memoization map. This includes destroying
---  ref-count shares the map owns.
+   First_Free : Natural := 0;
+   --  Index of the first unused item, or 0 if there is none
+
+   Hand : Natural := 0;
+   --  For the Clock eviction policy, index of the next item to consider for
+   --  eviction (0 to start from Oldest).
+end record;
+--  List of all the evaluated memoization entries of a context, used to pick
+--  the entries to evict when memoization memory is bounded (see
+--  Set_Memoization_Memory_Limit).
+
+type Mmz_Frame is record
+   First_Dependency : Positive;
+   --  Index in Analysis_Context_Type.Mmz_Dependencies of the first unit that
+   --  belongs to this frame.
+
+   Depends_On_All_Units : Boolean;
+   --  See the eponym Mmz_Entry component
+end record;
+--  Dependencies recorded so far for a memoized property that is being
+--  evaluated.
+
+package Mmz_Frame_Vectors is new Langkit_Support.Vectors (Mmz_Frame);
+
+procedure Destroy_Memoization_Map (Unit : Internal_Unit);
+--  Free all resources stored in Unit's memoization map. This includes
+--  destroying ref-count shares the map owns. Like eviction, this also removes
+--  the destroyed entries from the context's eviction list and memoization
+--  statistics.
 
 type Memoization_Handle is record
    Key : Mmz_Key;
@@ -67,9 +187,13 @@ type Memoization_Handle is record
    --  to it.
 
    Cache_Version : Natural := 0;
-   --  Version of the unit memoization table at the time Key/Cur were created.
-   --  When using this record, if the version has changed, both Key and Cur are
-   --  invalid and must be recomputed.
+   --  Version of the context memoization caches at the time Key/Cur were
+   --  created. When using this record, if the version has changed, caches were
+   --  invalidated during the evaluation, so its result may be stale.
+
+   Frame : Natural := 0;
+   --  Index in Analysis_Context_Type.Mmz_Frames for the frame that records
+   --  dependencies for this evaluation, or 0 if there is no such frame.
 end record;
 --  Wrapper for memoization state, to be used in memoized properties.
 --  Please use high-level functions below instead of accessing fields
@@ -79,18 +203,41 @@ function Find_Memoized_Value
   (Unit       : Internal_Unit;
    Handle     : out Memoization_Handle;
    Value      : out Mmz_Value;
-   Create_Key : access function return Mmz_Key) return Boolean;
+   Create_Key : access function return Mmz_Key;
+   Uses_Envs  : Boolean := False;
+   Untracked  : Boolean := False) return Boolean;
 --  Initialize Handle and look for a memoization entry in Unit.Memoization_Map
 --  that corresponds to the key in Handle/Create_Key. If one is found, put it
---  in Value and return True. Create such an entry and return False otherwise.
+--  in Value and return True. Create such an entry, start recording its
+--  dependencies and return False otherwise. Uses_Envs must be true if the
+--  memoized property can do lexical environment lookups. Untracked must be
+--  true if we cannot know on which units the memoized property depends.
 
 procedure Add_Memoized_Value
   (Unit       : Internal_Unit;
    Handle     : in out Memoization_Handle;
    Value      : Mmz_Value);
---  Insert the Handle.Key/Value entry in UNit.Memoization_Map (replacing the
---  previous entry, if present). If the key in Handle is stale (i.e. caches
---  were reset since it was created), recompute it using Create_Key.
+--  Insert the Handle.Key/Value entry in Unit.Memoization_Map (replacing the
+--  previous entry, if present), along with the dependencies recorded since the
+--  call to Find_Memoized_Value. If caches were invalidated since then, discard
+--  the entry instead.
+
+procedure Add_Memoization_Dependency
+  (Context : Internal_Context; Unit : Internal_Unit);
+--  If a memoized property is being evaluated in Context, record that its
+--  result depends on Unit (null for the root scope).
+
+procedure Invalidate_Memoization
+  (Context : Internal_Context; Units : Mmz_Dependency_Array);
+--  Remove from all memoization maps in Context the entries that depend on at
+--  least one unit in Units and update Context's memoization invalidation
+--  counters.
+
+procedure Evict_Memoized_Values
+  (Context : Internal_Context; Reserved : Long_Long_Integer := 0);
+--  Evict memoization entries from Context, following its eviction policy,
+--  until the memory they use plus Reserved bytes fits in its memoization
+--  memory limit. Do nothing if there is no such limit.
 
 </%def>
 
@@ -103,7 +250,71 @@ procedure Add_Memoized_Value
 
 function Hash (Key : Mmz_Key_Item) return Hash_Type;
 function Equivalent (L, R : Mmz_Key_Item) return Boolean;
-procedure Destroy (Key : in out Mmz_Key_Array_Access);
+function Equivalent (L, R : Mmz_Key_Array) return Boolean;
+procedure Compute_Hash (Key : in out Mmz_Key);
+procedure Destroy (Items : Mmz_Key_Array);
+procedure Destroy (Key : in out Mmz_Key);
+procedure Destroy (Value : in out Mmz_Value);
+
+procedure Truncate_Dependencies (Context : Internal_Context; Length : Natural);
+--  Remove items from Context.Mmz_Dependencies so that it has at most Length
+--  items.
+
+procedure Add_All_Units_Dependency (Context : Internal_Context);
+--  Record in Context's current frame (if any) that the property being
+--  evaluated depends on all units.
+
+procedure Add_Memoization_Dependencies
+  (Context : Internal_Context; Item : Mmz_Entry);
+--  Record in Context's current frame (if any) that the property being
+--  evaluated depends on all units Item depends on.
+
+procedure Add_Rebindings_Dependencies
+  (Context : Internal_Context; Rebindings : Env_Rebindings);
+--  Record in Context's current frame (if any) that the property being
+--  evaluated depends on all units that own environments in Rebindings.
+
+procedure Add_Key_Dependencies (Context : Internal_Context; Key : Mmz_Key);
+--  Record in Context's current frame (if any) that the property being
+--  evaluated depends on all units that Key references.
+
+procedure Pop_Frame
+  (Context              : Internal_Context;
+   Frame                : Natural;
+   Dependencies         : out Mmz_Dependency_Array_Access;
+   Depends_On_All_Units : out Boolean);
+--  Remove from Context the given dependency frame (and all the ones on top of
+--  it, that exceptions may have left) and return the set of units it recorded.
+--  Also record these units in the parent frame, if any.
+
+function Entry_Size (Key : Mmz_Key; Item : Mmz_Entry) return Natural;
+--  Return an estimation of the memory footprint of the Key/Item memoization
+--  entry, in bytes.
+
+procedure Link_Entry
+  (Context : Internal_Context;
+   Unit    : Internal_Unit;
+   Cur     : Memoization_Maps.Cursor;
+   Index   : out Positive);
+--  Add to Context's eviction list an item for the memoization entry that Cur
+--  designates in Unit.Memoization_Map, as the most recently used entry.
+--  Return the index of this item in Index.
+
+procedure Unlink_Entry (Context : Internal_Context; Index : Positive);
+--  Remove the Index item from Context's eviction list and make it available
+--  for reuse.
+
+procedure Touch_Entry (Context : Internal_Context; Index : Positive);
+--  Record that the memoization entry the Index item tracks was just used
+
+procedure Forget_Entry
+  (Context : Internal_Context;
+   Unit    : Internal_Unit;
+   Key     : Mmz_Key;
+   Item    : Mmz_Entry);
+--  Update Context's eviction list and memoization statistics for the removal
+--  of the Key/Item entry from Unit's memoization map. This entry must not be
+--  in the Mmz_Evaluating state.
 
 ----------------
 -- Equivalent --
@@ -145,33 +356,80 @@ begin
    end case;
 end Hash;
 
-----------
--- Hash --
-----------
+--------------
+-- Make_Key --
+--------------
 
-function Hash (Key : Mmz_Key) return Hash_Type is
-   Result : Hash_Type := Mmz_Property'Pos (Key.Property);
+function Make_Key (Property : Mmz_Property; Length : Natural) return Mmz_Key
+is
 begin
-   for K of Key.Items.all loop
-      Result := Combine (Result, Hash (K));
-   end loop;
-   return Result;
-end Hash;
+   if Length <= Mmz_Inline_Key_Length then
+      return (Inline       => True,
+              Property     => Property,
+              Hash         => 0,
+              Length       => Length,
+              Inline_Items => <>);
+   else
+      return (Inline   => False,
+              Property => Property,
+              Hash     => 0,
+              Items    => new Mmz_Key_Array (1 .. Length));
+   end if;
+end Make_Key;
+
+--------------
+-- Set_Item --
+--------------
+
+procedure Set_Item
+  (Key : in out Mmz_Key; Index : Positive; Item : Mmz_Key_Item) is
+begin
+   if Key.Inline then
+      Key.Inline_Items (Index) := Item;
+   else
+      Key.Items (Index) := Item;
+   end if;
+end Set_Item;
+
+------------------
+-- Compute_Hash --
+------------------
+
+procedure Compute_Hash (Key : in out Mmz_Key) is
+
+   function Hash (Items : Mmz_Key_Array) return Hash_Type;
+
+   ----------
+   -- Hash --
+   ----------
+
+   function Hash (Items : Mmz_Key_Array) return Hash_Type is
+      Result : Hash_Type := Mmz_Property'Pos (Key.Property);
+   begin
+      for K of Items loop
+         Result := Combine (Result, Hash (K));
+      end loop;
+      return Result;
+   end Hash;
+
+begin
+   Key.Hash := (if Key.Inline
+                then Hash (Key.Inline_Items (1 .. Key.Length))
+                else Hash (Key.Items.all));
+end Compute_Hash;
 
 ----------------
 -- Equivalent --
 ----------------
 
-function Equivalent (L, R : Mmz_Key) return Boolean is
-   L_Items : Mmz_Key_Array renames L.Items.all;
-   R_Items : Mmz_Key_Array renames R.Items.all;
+function Equivalent (L, R : Mmz_Key_Array) return Boolean is
 begin
-   if L.Property /= R.Property or else L_Items'Length /= R_Items'Length then
+   if L'Length /= R'Length then
       return False;
    end if;
 
-   for I in L_Items'Range loop
-      if not Equivalent (L_Items (I), R_Items (I)) then
+   for I in 0 .. L'Length - 1 loop
+      if not Equivalent (L (L'First + I), R (R'First + I)) then
          return False;
       end if;
    end loop;
@@ -179,13 +437,37 @@ begin
    return True;
 end Equivalent;
 
--------------
--- Destroy --
--------------
+----------------
+-- Equivalent --
+----------------
 
-procedure Destroy (Map : in out Memoization_Maps.Map) is
+function Equivalent (L, R : Mmz_Key) return Boolean is
+begin
+   --  Keys for the same property all have the same number of items, and
+   --  thus are either all inline, or all stored in the heap.
+
+   if L.Hash /= R.Hash
+      or else L.Property /= R.Property
+      or else L.Inline /= R.Inline
+   then
+      return False;
+   elsif L.Inline then
+      return Equivalent (L.Inline_Items (1 .. L.Length),
+                         R.Inline_Items (1 .. R.Length));
+   else
+      return Equivalent (L.Items.all, R.Items.all);
+   end if;
+end Equivalent;
+
+-----------------------------
+-- Destroy_Memoization_Map --
+-----------------------------
+
+procedure Destroy_Memoization_Map (Unit : Internal_Unit) is
    use Memoization_Maps;
 
+   Map : Memoization_Maps.Map renames Unit.Memoization_Map;
+
    --  We need keys and values to be valid when clearing the memoization map,
    --  but on the other hand we need to free keys and values as well. To
    --  achieve both goals, we first copy key and values into arrays, then we
@@ -194,12 +476,12 @@ procedure Destroy (Map : in out Memoization_Maps.Map) is
 
    Length : constant Natural := Natural (Map.Length);
 
-   type Key_Array is array (1 .. Length) of Mmz_Key_Array_Access;
+   type Key_Array is array (1 .. Length) of Mmz_Key;
    type Key_Array_Access is access Key_Array;
    procedure Free is new Ada.Unchecked_Deallocation
      (Key_Array, Key_Array_Access);
 
-   type Value_Array is array (1 .. Length) of Mmz_Value;
+   type Value_Array is array (1 .. Length) of Mmz_Entry;
    type Value_Array_Access is access Value_Array;
    procedure Free is new Ada.Unchecked_Deallocation
      (Value_Array, Value_Array_Access);
@@ -209,60 +491,463 @@ procedure Destroy (Map : in out Memoization_Maps.Map) is
    I      : Positive := 1;
 begin
    for Cur in Map.Iterate loop
-      Keys (I) := Key (Cur).Items;
+      Keys (I) := Key (Cur);
       Values (I) := Element (Cur);
+
+      --  Entries still being evaluated are not in the eviction list yet
+
+      if Values (I).Value.Kind /= Mmz_Evaluating then
+         Forget_Entry (Unit.Context, Unit, Keys (I), Values (I));
+      end if;
       I := I + 1;
    end loop;
 
    Map.Clear;
 
-   for K_Array of Keys.all loop
-      Destroy (K_Array);
+   for K of Keys.all loop
+      Destroy (K);
+   end loop;
+
+   for V of Values.all loop
+      Destroy (V.Value);
+      Free (V.Dependencies);
    end loop;
 
+   Free (Keys);
+   Free (Values);
+end Destroy_Memoization_Map;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Value : in out Mmz_Value) is
+begin
    <% refcounted_value_types = [t for t in value_types if t.is_refcounted] %>
    % if refcounted_value_types:
-      for V of Values.all loop
-         case V.Kind is
-            % for t in refcounted_value_types:
+      case Value.Kind is
+         % for t in refcounted_value_types:
+            when ${t.memoization_kind} =>
+               Dec_Ref (Value.As_${t.name});
+         % endfor
+
+         when others => null;
+      end case;
+   % else:
+      null;
+   % endif
+end Destroy;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Items : Mmz_Key_Array) is
+   <% refcounted_key_types = [t for t in key_types
+                              if t.is_refcounted] %>
+   % if refcounted_key_types:
+      Item : Mmz_Key_Item;
+   % endif
+begin
+   % if refcounted_key_types:
+      for K of Items loop
+         Item := K;
+         case Item.Kind is
+            % for t in refcounted_key_types:
                when ${t.memoization_kind} =>
-                  Dec_Ref (V.As_${t.name});
+                  Dec_Ref (Item.As_${t.name});
             % endfor
 
             when others => null;
          end case;
       end loop;
+   % else:
+      null;
    % endif
-
-   Free (Keys);
-   Free (Values);
 end Destroy;
 
 -------------
 -- Destroy --
 -------------
 
-procedure Destroy (Key : in out Mmz_Key_Array_Access) is
+procedure Destroy (Key : in out Mmz_Key) is
    procedure Free is new Ada.Unchecked_Deallocation
      (Mmz_Key_Array, Mmz_Key_Array_Access);
 begin
-   <% refcounted_key_types = [t for t in key_types
-                              if t.is_refcounted] %>
+   if Key.Inline then
+      Destroy (Key.Inline_Items (1 .. Key.Length));
+      Key.Length := 0;
+   else
+      Destroy (Key.Items.all);
+      Free (Key.Items);
+   end if;
+end Destroy;
 
-   % if refcounted_key_types:
-      for K of Key.all loop
+---------------------------
+-- Truncate_Dependencies --
+---------------------------
+
+procedure Truncate_Dependencies (Context : Internal_Context; Length : Natural)
+is
+   Units : Mmz_Dependency_Vectors.Vector renames Context.Mmz_Dependencies;
+begin
+   while Units.Length > Length loop
+      Units.Pop;
+   end loop;
+end Truncate_Dependencies;
+
+--------------------------------
+-- Add_Memoization_Dependency --
+--------------------------------
+
+procedure Add_Memoization_Dependency
+  (Context : Internal_Context; Unit : Internal_Unit)
+is
+   Frames : Mmz_Frame_Vectors.Vector renames Context.Mmz_Frames;
+   Units  : Mmz_Dependency_Vectors.Vector renames Context.Mmz_Dependencies;
+begin
+   if Frames.Is_Empty then
+      return;
+   end if;
+
+   for I in reverse Frames.Get (Frames.Last_Index).First_Dependency
+                    .. Units.Last_Index
+   loop
+      if Units.Get (I) = Unit then
+         return;
+      end if;
+   end loop;
+   Units.Append (Unit);
+end Add_Memoization_Dependency;
+
+------------------------------
+-- Add_All_Units_Dependency --
+------------------------------
+
+procedure Add_All_Units_Dependency (Context : Internal_Context) is
+   Frames : Mmz_Frame_Vectors.Vector renames Context.Mmz_Frames;
+begin
+   if not Frames.Is_Empty then
+      Frames.Get_Access (Frames.Last_Index).Depends_On_All_Units := True;
+   end if;
+end Add_All_Units_Dependency;
+
+----------------------------------
+-- Add_Memoization_Dependencies --
+----------------------------------
+
+procedure Add_Memoization_Dependencies
+  (Context : Internal_Context; Item : Mmz_Entry) is
+begin
+   if Item.Depends_On_All_Units then
+      Add_All_Units_Dependency (Context);
+   end if;
+   if Item.Dependencies /= null then
+      for U of Item.Dependencies.all loop
+         Add_Memoization_Dependency (Context, U);
+      end loop;
+   end if;
+end Add_Memoization_Dependencies;
+
+---------------------------------
+-- Add_Rebindings_Dependencies --
+---------------------------------
+
+procedure Add_Rebindings_Dependencies
+  (Context : Internal_Context; Rebindings : Env_Rebindings)
+is
+   R : Env_Rebindings := Rebindings;
+begin
+   while R /= null loop
+      Add_Memoization_Dependency (Context, R.Old_Env.Owner);
+      Add_Memoization_Dependency (Context, R.New_Env.Owner);
+      R := R.Parent;
+   end loop;
+end Add_Rebindings_Dependencies;
+
+--------------------------
+-- Add_Key_Dependencies --
+--------------------------
+
+procedure Add_Key_Dependencies (Context : Internal_Context; Key : Mmz_Key) is
+
+   procedure Process (Items : Mmz_Key_Array);
+   --  Record dependencies for all units that Items references
+
+   -------------
+   -- Process --
+   -------------
+
+   procedure Process (Items : Mmz_Key_Array) is
+   begin
+      for K of Items loop
          case K.Kind is
-            % for t in refcounted_key_types:
+            % for t in key_types:
                when ${t.memoization_kind} =>
-                  Dec_Ref (K.As_${t.name});
+               <% value = 'K.As_{}'.format(t.name) %>
+               % if t.is_ast_node:
+                  if ${value} /= null then
+                     Add_Memoization_Dependency (Context, ${value}.Unit);
+                  end if;
+               % elif t.is_entity_type:
+                  if ${value}.Node /= null then
+                     Add_Memoization_Dependency (Context, ${value}.Node.Unit);
+                  end if;
+                  Add_Rebindings_Dependencies
+                    (Context, ${value}.Info.Rebindings);
+               % elif t == T.entity_info:
+                  Add_Rebindings_Dependencies (Context, ${value}.Rebindings);
+               % elif t.is_env_rebindings_type:
+                  Add_Rebindings_Dependencies (Context, ${value});
+               % elif t.is_analysis_unit_type:
+                  Add_Memoization_Dependency (Context, ${value});
+               % elif t.is_lexical_env_type:
+                  if ${value}.Kind = Primary then
+                     Add_Memoization_Dependency (Context, ${value}.Owner);
+                  else
+                     Add_All_Units_Dependency (Context);
+                  end if;
+               % elif (t.is_bool_type or t.is_int_type or t.is_long_type \
+                       or t.is_character_type or t.is_symbol_type \
+                       or t.is_enum_type or t.is_big_integer_type \
+                       or t.is_string_type):
+                  null;
+               % else:
+                  ## We do not know how to extract units from other types: be
+                  ## conservative.
+                  Add_All_Units_Dependency (Context);
+               % endif
             % endfor
-
-            when others => null;
          end case;
       end loop;
+   end Process;
+
+begin
+   if Key.Inline then
+      Process (Key.Inline_Items (1 .. Key.Length));
+   else
+      Process (Key.Items.all);
+   end if;
+end Add_Key_Dependencies;
+
+---------------
+-- Pop_Frame --
+---------------
+
+procedure Pop_Frame
+  (Context              : Internal_Context;
+   Frame                : Natural;
+   Dependencies         : out Mmz_Dependency_Array_Access;
+   Depends_On_All_Units : out Boolean)
+is
+   Frames : Mmz_Frame_Vectors.Vector renames Context.Mmz_Frames;
+   Units  : Mmz_Dependency_Vectors.Vector renames Context.Mmz_Dependencies;
+   F      : Mmz_Frame;
+begin
+   --  Frames are discarded only when no property is running, so our frame
+   --  should still be there. Be conservative if it is not.
+
+   if Frame not in 1 .. Frames.Last_Index then
+      Dependencies := null;
+      Depends_On_All_Units := True;
+      return;
+   end if;
+
+   --  Frames above ours were left by properties that raised an exception
+   --  other than Property_Error: their dependencies are ours too.
+
+   while Frames.Last_Index > Frame loop
+      F := Frames.Pop;
+      declare
+         Orphans : constant Mmz_Dependency_Array :=
+           (if F.First_Dependency > Units.Last_Index
+            then Mmz_Dependency_Vectors.Empty_Array
+            else Units.Slice (F.First_Dependency, Units.Last_Index));
+      begin
+         Truncate_Dependencies (Context, F.First_Dependency - 1);
+         if F.Depends_On_All_Units then
+            Add_All_Units_Dependency (Context);
+         end if;
+         for U of Orphans loop
+            Add_Memoization_Dependency (Context, U);
+         end loop;
+      end;
+   end loop;
+
+   F := Frames.Pop;
+   Dependencies := new Mmz_Dependency_Array'
+     (if F.First_Dependency > Units.Last_Index
+      then Mmz_Dependency_Vectors.Empty_Array
+      else Units.Slice (F.First_Dependency, Units.Last_Index));
+   Depends_On_All_Units := F.Depends_On_All_Units;
+   Truncate_Dependencies (Context, F.First_Dependency - 1);
+
+   --  Whatever the caller is, it depends on everything our property depends
+   --  on.
+
+   Add_Memoization_Dependencies
+     (Context, (Value                => (Kind => Mmz_Evaluating),
+                Dependencies         => Dependencies,
+                Depends_On_All_Units => Depends_On_All_Units,
+                others               => <>));
+end Pop_Frame;
+
+----------------
+-- Entry_Size --
+----------------
+
+function Entry_Size (Key : Mmz_Key; Item : Mmz_Entry) return Natural is
+   <% array_value_types = [t for t in value_types if t.is_array_type] %>
+   Result : Natural := (Mmz_Key'Size + Mmz_Entry'Size) / 8;
+begin
+   if not Key.Inline then
+      Result := Result + Key.Items'Length * Mmz_Key_Array'Component_Size / 8;
+   end if;
+   if Item.Dependencies /= null then
+      Result := Result
+        + Item.Dependencies'Length * Mmz_Dependency_Array'Component_Size / 8;
+   end if;
+
+   % if array_value_types:
+      case Item.Value.Kind is
+         % for t in array_value_types:
+            when ${t.memoization_kind} =>
+               if Item.Value.As_${t.name} /= null then
+                  Result := Result + Item.Value.As_${t.name}.all'Size / 8;
+               end if;
+         % endfor
+
+         when others => null;
+      end case;
    % endif
-   Free (Key);
-end Destroy;
+
+   return Result;
+end Entry_Size;
+
+----------------
+-- Link_Entry --
+----------------
+
+procedure Link_Entry
+  (Context : Internal_Context;
+   Unit    : Internal_Unit;
+   Cur     : Memoization_Maps.Cursor;
+   Index   : out Positive)
+is
+   L    : Mmz_Eviction_List renames Context.Mmz_Eviction;
+   Item : constant Mmz_Eviction_Item :=
+     (Unit       => Unit,
+      Cur        => Cur,
+      Newer      => 0,
+      Older      => L.Newest,
+      Referenced => False);
+begin
+   if L.First_Free /= 0 then
+      Index := L.First_Free;
+      L.First_Free := L.Items.Get (Index).Older;
+      L.Items.Set (Index, Item);
+   else
+      L.Items.Append (Item);
+      Index := L.Items.Last_Index;
+   end if;
+
+   if L.Newest = 0 then
+      L.Oldest := Index;
+   else
+      L.Items.Get_Access (L.Newest).Newer := Index;
+   end if;
+   L.Newest := Index;
+end Link_Entry;
+
+------------------
+-- Unlink_Entry --
+------------------
+
+procedure Unlink_Entry (Context : Internal_Context; Index : Positive) is
+   L    : Mmz_Eviction_List renames Context.Mmz_Eviction;
+   Item : constant Mmz_Eviction_Item := L.Items.Get (Index);
+begin
+   if Item.Newer = 0 then
+      L.Newest := Item.Older;
+   else
+      L.Items.Get_Access (Item.Newer).Older := Item.Older;
+   end if;
+
+   if Item.Older = 0 then
+      L.Oldest := Item.Newer;
+   else
+      L.Items.Get_Access (Item.Older).Newer := Item.Newer;
+   end if;
+
+   if L.Hand = Index then
+      L.Hand := Item.Newer;
+   end if;
+
+   L.Items.Set
+     (Index, (Unit       => null,
+              Cur        => Memoization_Maps.No_Element,
+              Newer      => 0,
+              Older      => L.First_Free,
+              Referenced => False));
+   L.First_Free := Index;
+end Unlink_Entry;
+
+-----------------
+-- Touch_Entry --
+-----------------
+
+procedure Touch_Entry (Context : Internal_Context; Index : Positive) is
+   L : Mmz_Eviction_List renames Context.Mmz_Eviction;
+begin
+   case Context.Mmz_Eviction_Policy is
+      when LRU =>
+         --  Move the item to the front of the list
+
+         if L.Newest /= Index then
+            declare
+               Item : Mmz_Eviction_Item := L.Items.Get (Index);
+            begin
+               --  As Item is not the newest one, it has a newer neighbor
+
+               L.Items.Get_Access (Item.Newer).Older := Item.Older;
+               if Item.Older = 0 then
+                  L.Oldest := Item.Newer;
+               else
+                  L.Items.Get_Access (Item.Older).Newer := Item.Newer;
+               end if;
+
+               Item.Newer := 0;
+               Item.Older := L.Newest;
+               L.Items.Get_Access (L.Newest).Newer := Index;
+               L.Newest := Index;
+               L.Items.Set (Index, Item);
+            end;
+         end if;
+
+      when Clock =>
+         L.Items.Get_Access (Index).Referenced := True;
+   end case;
+end Touch_Entry;
+
+------------------
+-- Forget_Entry --
+------------------
+
+procedure Forget_Entry
+  (Context : Internal_Context;
+   Unit    : Internal_Unit;
+   Key     : Mmz_Key;
+   Item    : Mmz_Entry)
+is
+   Stats : Memoized_Property_Stats renames Context.Mmz_Stats (Key.Property);
+   Size  : constant Long_Long_Integer := Long_Long_Integer (Item.Size);
+begin
+   Unlink_Entry (Context, Item.Eviction_Item);
+   Stats.Entries := Stats.Entries - 1;
+   Stats.Bytes := Stats.Bytes - Size;
+   Context.Mmz_Bytes := Context.Mmz_Bytes - Size;
+   Unit.Mmz_Bytes := Unit.Mmz_Bytes - Size;
+end Forget_Entry;
 
 -------------------------
 -- Find_Memoized_Value --
@@ -272,8 +957,11 @@ function Find_Memoized_Value
   (Unit       : Internal_Unit;
    Handle     : out Memoization_Handle;
    Value      : out Mmz_Value;
-   Create_Key : access function return Mmz_Key) return Boolean
+   Create_Key : access function return Mmz_Key;
+   Uses_Envs  : Boolean := False;
+   Untracked  : Boolean := False) return Boolean
 is
+   Context  : constant Internal_Context := Unit.Context;
    Inserted : Boolean;
 begin
    --  Make sure that we don't lookup stale caches
@@ -282,19 +970,70 @@ begin
    --  Initialize handle: create the key and create a cursor pointing to an
    --  existing entry.
    Handle.Key := Create_Key.all;
-   Handle.Cache_Version := Unit.Cache_Version;
+   Compute_Hash (Handle.Key);
+   Handle.Cache_Version := Context.Cache_Version;
+   Handle.Frame := 0;
    Value := (Kind => Mmz_Evaluating);
-   Unit.Memoization_Map.Insert (Handle.Key, Value, Handle.Cur, Inserted);
+   Unit.Memoization_Map.Insert
+     (Handle.Key, (Value, null, False, 0, 0), Handle.Cur, Inserted);
 
    --  No existing entry yet? The above just created one. Otherwise, destroy
-   --  our key and reuse the existing entry's.
+   --  our key and reuse the existing entry's. Whatever property is calling
+   --  us depends on everything this entry depends on.
    if not Inserted then
-      Destroy (Handle.Key.Items);
+      Destroy (Handle.Key);
       Handle.Key := Memoization_Maps.Key (Handle.Cur);
-      Value := Memoization_Maps.Element (Handle.Cur);
+      declare
+         Item : constant Mmz_Entry := Memoization_Maps.Element (Handle.Cur);
+      begin
+         Value := Item.Value;
+         Add_Memoization_Dependencies (Context, Item);
+
+         --  Entries still being evaluated denote infinite recursions, not
+         --  reuses of a memoized result.
+         if Item.Eviction_Item /= 0 then
+            declare
+               Stats : Memoized_Property_Stats renames
+                  Context.Mmz_Stats (Handle.Key.Property);
+            begin
+               Stats.Hits := Stats.Hits + 1;
+            end;
+            Touch_Entry (Context, Item.Eviction_Item);
+         end if;
+      end;
+      return True;
+   end if;
+
+   declare
+      Stats : Memoized_Property_Stats renames
+         Context.Mmz_Stats (Handle.Key.Property);
+   begin
+      Stats.Misses := Stats.Misses + 1;
+   end;
+
+   --  We are about to evaluate the property: start recording its
+   --  dependencies in a new frame. If this is the outermost property call,
+   --  first discard frames that exceptions may have left.
+   if Context.Current_Call_Depth <= 1 then
+      Context.Mmz_Frames.Clear;
+      Context.Mmz_Dependencies.Clear;
    end if;
+   Context.Mmz_Frames.Append
+     ((First_Dependency     => Context.Mmz_Dependencies.Last_Index + 1,
+       Depends_On_All_Units => False));
+   Handle.Frame := Context.Mmz_Frames.Last_Index;
 
-   return not Inserted;
+   --  Properties that do lexical env lookups potentially depend on the root
+   --  scope, to which any unit can add entries.
+   if Uses_Envs then
+      Add_Memoization_Dependency (Context, No_Analysis_Unit);
+   end if;
+   if Untracked then
+      Add_All_Units_Dependency (Context);
+   end if;
+   Add_Key_Dependencies (Context, Handle.Key);
+
+   return False;
 end Find_Memoized_Value;
 
 ------------------------
@@ -304,17 +1043,218 @@ end Find_Memoized_Value;
 procedure Add_Memoized_Value
   (Unit       : Internal_Unit;
    Handle     : in out Memoization_Handle;
-   Value      : Mmz_Value) is
+   Value      : Mmz_Value)
+is
+   Context              : constant Internal_Context := Unit.Context;
+   Dependencies         : Mmz_Dependency_Array_Access;
+   Depends_On_All_Units : Boolean;
 begin
-   --  If Handle was created using a memoization map that has been since then
-   --  reset, do nothing: the result can be partly stale due to the event that
-   --  triggered the memoization tables reset.
+   Pop_Frame (Context, Handle.Frame, Dependencies, Depends_On_All_Units);
 
-   if Handle.Cache_Version < Unit.Cache_Version then
+   --  If caches were invalidated while evaluating the property, do not
+   --  memoize its result: it can be partly stale due to the event that
+   --  triggered the invalidation. Remove the placeholder entry so that the
+   --  next call evaluates the property again.
+
+   if Handle.Cache_Version /= Context.Cache_Version then
+      Free (Dependencies);
+      declare
+         Key : Mmz_Key := Handle.Key;
+      begin
+         Unit.Memoization_Map.Delete (Handle.Cur);
+         Destroy (Key);
+      end;
       return;
    end if;
 
-   Unit.Memoization_Map.Replace_Element (Handle.Cur, Value);
+   declare
+      Stats : Memoized_Property_Stats renames
+         Context.Mmz_Stats (Handle.Key.Property);
+      Item  : Mmz_Entry :=
+        (Value, Dependencies, Depends_On_All_Units, others => <>);
+      Size  : Long_Long_Integer;
+   begin
+      Item.Size := Entry_Size (Handle.Key, Item);
+      Size := Long_Long_Integer (Item.Size);
+
+      --  Make room for the new entry before adding it to the eviction list,
+      --  so that it is never evicted itself: our caller is about to use it.
+      Evict_Memoized_Values (Context, Size);
+      Link_Entry (Context, Unit, Handle.Cur, Item.Eviction_Item);
+      Unit.Memoization_Map.Replace_Element (Handle.Cur, Item);
+
+      Stats.Entries := Stats.Entries + 1;
+      Stats.Bytes := Stats.Bytes + Size;
+      Context.Mmz_Bytes := Context.Mmz_Bytes + Size;
+      Unit.Mmz_Bytes := Unit.Mmz_Bytes + Size;
+   end;
 end Add_Memoized_Value;
 
+----------------------------
+-- Invalidate_Memoization --
+----------------------------
+
+procedure Invalidate_Memoization
+  (Context : Internal_Context; Units : Mmz_Dependency_Array)
+is
+   use Memoization_Maps;
+
+   package Cursor_Vectors is new Langkit_Support.Vectors (Cursor);
+
+   Idle : constant Boolean := Context.Current_Call_Depth = 0;
+   --  Whether no property is currently running. If this is the case, no
+   --  memoization entry is being evaluated, so entries still in the
+   --  Mmz_Evaluating state are leftovers from exceptions.
+
+   function Is_Invalidated (Item : Mmz_Entry) return Boolean;
+   --  Return whether Item must be removed
+
+   procedure Process (Unit : Internal_Unit);
+   --  Remove invalidated entries from Unit's memoization map
+
+   --------------------
+   -- Is_Invalidated --
+   --------------------
+
+   function Is_Invalidated (Item : Mmz_Entry) return Boolean is
+   begin
+      if Item.Value.Kind = Mmz_Evaluating then
+         return Idle;
+      elsif Item.Depends_On_All_Units then
+         return True;
+      end if;
+
+      for U of Item.Dependencies.all loop
+         for Invalidated_Unit of Units loop
+            if U = Invalidated_Unit then
+               return True;
+            end if;
+         end loop;
+      end loop;
+      return False;
+   end Is_Invalidated;
+
+   -------------
+   -- Process --
+   -------------
+
+   procedure Process (Unit : Internal_Unit) is
+      Map       : Memoization_Maps.Map renames Unit.Memoization_Map;
+      To_Remove : Cursor_Vectors.Vector;
+   begin
+      for Cur in Map.Iterate loop
+         if Is_Invalidated (Element (Cur)) then
+            To_Remove.Append (Cur);
+         end if;
+      end loop;
+
+      --  Deleting an entry may need to hash its key, so destroy keys and
+      --  values only once they are out of the map.
+
+      for Cur of To_Remove loop
+         declare
+            C    : Cursor := Cur;
+            K    : Mmz_Key := Key (C);
+            Item : Mmz_Entry := Element (C);
+         begin
+            if Item.Value.Kind /= Mmz_Evaluating then
+               Forget_Entry (Context, Unit, K, Item);
+            end if;
+            Map.Delete (C);
+            Destroy (K);
+            Destroy (Item.Value);
+            Free (Item.Dependencies);
+         end;
+      end loop;
+
+      Context.Mmz_Invalidated_Entries :=
+        Context.Mmz_Invalidated_Entries + Long_Long_Integer (To_Remove.Length);
+      Context.Mmz_Surviving_Entries :=
+        Context.Mmz_Surviving_Entries + Long_Long_Integer (Map.Length);
+      To_Remove.Destroy;
+   end Process;
+
+begin
+   --  Memoization handles for properties being evaluated must not store
+   --  their result, as it may be partly stale.
+   Invalidate_Caches (Context, Invalidate_Envs => False);
+
+   if Idle then
+      Context.Mmz_Frames.Clear;
+      Context.Mmz_Dependencies.Clear;
+   end if;
+
+   for Unit of Context.Units loop
+      Process (Unit);
+   end loop;
+end Invalidate_Memoization;
+
+---------------------------
+-- Evict_Memoized_Values --
+---------------------------
+
+procedure Evict_Memoized_Values
+  (Context : Internal_Context; Reserved : Long_Long_Integer := 0)
+is
+   L      : Mmz_Eviction_List renames Context.Mmz_Eviction;
+   Victim : Positive;
+begin
+   if Context.Mmz_Memory_Limit = 0 then
+      return;
+   end if;
+
+   while L.Oldest /= 0
+         and then Context.Mmz_Bytes + Reserved > Context.Mmz_Memory_Limit
+   loop
+      case Context.Mmz_Eviction_Policy is
+         when LRU =>
+            Victim := L.Oldest;
+
+         when Clock =>
+            --  Move the hand from older to newer entries, giving a second
+            --  chance to entries that were used since the last time the hand
+            --  went over them. As we clear their Referenced flag, this stops
+            --  after at most one turn.
+
+            loop
+               if L.Hand = 0 then
+                  L.Hand := L.Oldest;
+               end if;
+
+               declare
+                  Item : constant Mmz_Eviction_Item_Vectors.Element_Access :=
+                     L.Items.Get_Access (L.Hand);
+               begin
+                  exit when not Item.Referenced;
+                  Item.Referenced := False;
+                  L.Hand := Item.Newer;
+               end;
+            end loop;
+            Victim := L.Hand;
+      end case;
+
+      declare
+         use Memoization_Maps;
+
+         Item  : constant Mmz_Eviction_Item := L.Items.Get (Victim);
+         Cur   : Cursor := Item.Cur;
+         K     : Mmz_Key := Key (Cur);
+         E     : Mmz_Entry := Element (Cur);
+         Stats : Memoized_Property_Stats renames
+            Context.Mmz_Stats (K.Property);
+      begin
+         Forget_Entry (Context, Item.Unit, K, E);
+         Stats.Evictions := Stats.Evictions + 1;
+
+         --  Deleting the entry may need to hash its key, so destroy the key
+         --  only once it is out of the map.
+
+         Item.Unit.Memoization_Map.Delete (Cur);
+         Destroy (K);
+         Destroy (E.Value);
+         Free (E.Dependencies);
+      end;
+   end loop;
+end Evict_Memoized_Values;
+
 </%def>
@@ -252,6 +252,23 @@ package body ${ada_lib_name}.Parsers is
    ${parser.body}
    % endfor
 
+   -------------------
+   -- Allocate_Node --
+   -------------------
+
+   function Allocate_Node
+     (Pool : Bump_Ptr_Pool; Kind : ${T.node_kind}) return Parsed_Node is
+   begin
+      case Kind is
+      % for cls in ctx.astnode_types:
+         % if not cls.abstract:
+         when ${cls.ada_kind_name} =>
+            return Parsed_Node (${cls.parser_allocator} (Pool));
+         % endif
+      % endfor
+      end case;
+   end Allocate_Node;
+
    -----------
    -- Reset --
    -----------
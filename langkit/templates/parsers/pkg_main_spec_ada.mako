@@ -81,6 +81,11 @@ private package ${ada_lib_name}.Parsers is
    --  consider the case when the parser could not consume all the input tokens
    --  as an error.
 
+   function Allocate_Node
+     (Pool : Bump_Ptr_Pool; Kind : ${T.node_kind}) return Parsed_Node;
+   --  Allocate a node of the given Kind in Pool, as parsers do. Only its kind
+   --  is initialized. This is used to rebuild trees from the parse cache.
+
    procedure Reset (Parser : in out Parser_Type);
    --  Reset the parser so that it is ready to parse again
 
@@ -256,6 +256,109 @@ package body ${ada_lib_name}.Analysis is
         (Unwrap_Context (Context), Discard);
    end Discard_Errors_In_Populate_Lexical_Env;
 
+   ------------------------------------
+   -- Memoization_Invalidation_Stats --
+   ------------------------------------
+
+   procedure Memoization_Invalidation_Stats
+     (Context                : Analysis_Context'Class;
+      Invalidated, Surviving : out Long_Long_Integer) is
+   begin
+      Memoization_Invalidation_Stats
+        (Unwrap_Context (Context), Invalidated, Surviving);
+   end Memoization_Invalidation_Stats;
+
+   -------------------------------
+   -- Memoized_Properties_Count --
+   -------------------------------
+
+   function Memoized_Properties_Count return Natural is
+   begin
+      return Implementation.Memoized_Properties_Count;
+   end Memoized_Properties_Count;
+
+   ----------------------------
+   -- Memoized_Property_Name --
+   ----------------------------
+
+   function Memoized_Property_Name (Index : Positive) return String is
+   begin
+      return Implementation.Memoized_Property_Name (Index);
+   end Memoized_Property_Name;
+
+   -----------------------
+   -- Memoization_Stats --
+   -----------------------
+
+   function Memoization_Stats
+     (Context : Analysis_Context'Class;
+      Index   : Positive) return Memoized_Property_Stats is
+   begin
+      return Memoization_Stats (Unwrap_Context (Context), Index);
+   end Memoization_Stats;
+
+   ----------------------------------
+   -- Set_Memoization_Memory_Limit --
+   ----------------------------------
+
+   procedure Set_Memoization_Memory_Limit
+     (Context : Analysis_Context'Class;
+      Limit   : Long_Long_Integer;
+      Policy  : Memoization_Eviction_Policy := LRU) is
+   begin
+      Set_Memoization_Memory_Limit (Unwrap_Context (Context), Limit, Policy);
+   end Set_Memoization_Memory_Limit;
+
+   ---------------------------
+   -- Set_Unit_Memory_Limit --
+   ---------------------------
+
+   procedure Set_Unit_Memory_Limit
+     (Context : Analysis_Context'Class; Limit : Long_Long_Integer) is
+   begin
+      Set_Unit_Memory_Limit (Unwrap_Context (Context), Limit);
+   end Set_Unit_Memory_Limit;
+
+   -------------------------------
+   -- Set_Parse_Cache_Directory --
+   -------------------------------
+
+   procedure Set_Parse_Cache_Directory
+     (Context : Analysis_Context'Class; Directory : String) is
+   begin
+      Set_Parse_Cache_Directory (Unwrap_Context (Context), Directory);
+   end Set_Parse_Cache_Directory;
+
+   --------------------------------
+   -- Set_Compact_Source_Buffers --
+   --------------------------------
+
+   procedure Set_Compact_Source_Buffers
+     (Context : Analysis_Context'Class; Enabled : Boolean) is
+   begin
+      Set_Compact_Source_Buffers (Unwrap_Context (Context), Enabled);
+   end Set_Compact_Source_Buffers;
+
+   ------------------
+   -- Memory_Usage --
+   ------------------
+
+   function Memory_Usage
+     (Context : Analysis_Context'Class) return Memory_Usage_Stats is
+   begin
+      return Memory_Usage (Unwrap_Context (Context));
+   end Memory_Usage;
+
+   -----------------------
+   -- Set_Event_Handler --
+   -----------------------
+
+   procedure Set_Event_Handler
+     (Context : Analysis_Context'Class; Handler : Event_Handler_Access) is
+   begin
+      Set_Event_Handler (Unwrap_Context (Context), Handler);
+   end Set_Event_Handler;
+
    ----------------------------------
    -- Set_Logic_Resolution_Timeout --
    ----------------------------------
@@ -424,6 +527,25 @@ package body ${ada_lib_name}.Analysis is
       return Trivia_Count (Unwrap_Unit (Unit));
    end Trivia_Count;
 
+   ------------------
+   -- Memory_Usage --
+   ------------------
+
+   function Memory_Usage
+     (Unit : Analysis_Unit'Class) return Memory_Usage_Stats is
+   begin
+      return Memory_Usage (Unwrap_Unit (Unit));
+   end Memory_Usage;
+
+   ----------------
+   -- Is_Evicted --
+   ----------------
+
+   function Is_Evicted (Unit : Analysis_Unit'Class) return Boolean is
+   begin
+      return Is_Evicted (Unwrap_Unit (Unit));
+   end Is_Evicted;
+
    ----------
    -- Text --
    ----------
@@ -444,6 +566,44 @@ package body ${ada_lib_name}.Analysis is
       return Lookup_Token (Unwrap_Unit (Unit), Sloc);
    end Lookup_Token;
 
+   ----------------------------
+   -- Node_At_Preorder_Index --
+   ----------------------------
+
+   function Node_At_Preorder_Index
+     (Unit : Analysis_Unit'Class; Index : Positive)
+      return ${root_entity.api_name} is
+   begin
+      return Wrap_Node (Node_At_Preorder_Index (Unwrap_Unit (Unit), Index));
+   end Node_At_Preorder_Index;
+
+   -----------------
+   -- Lookup_Node --
+   -----------------
+
+   function Lookup_Node
+     (Unit : Analysis_Unit'Class; Sloc : Source_Location)
+      return ${root_entity.api_name} is
+   begin
+      return Wrap_Node (Lookup_Node (Unwrap_Unit (Unit), Sloc));
+   end Lookup_Node;
+
+   --------------------
+   -- Covering_Nodes --
+   --------------------
+
+   function Covering_Nodes
+     (Unit : Analysis_Unit'Class; Sloc : Source_Location)
+      return ${root_entity.array.api_name}
+   is
+      Node : constant ${root_entity.api_name} := Lookup_Node (Unit, Sloc);
+   begin
+      if Node.Is_Null then
+         return (1 .. 0 => <>);
+      end if;
+      return Node.Parents;
+   end Covering_Nodes;
+
    ----------------------
    -- Dump_Lexical_Env --
    ----------------------
@@ -723,6 +883,28 @@ package body ${ada_lib_name}.Analysis is
       return Last_Child_Index (Node.Internal.Node);
    end Last_Child_Index;
 
+   --------------------
+   -- Preorder_Index --
+   --------------------
+
+   function Preorder_Index
+     (Node : ${root_entity.api_name}'Class) return Natural is
+   begin
+      Check_Safety_Net (Node.Safety_Net);
+      return Preorder_Index (Node.Internal.Node);
+   end Preorder_Index;
+
+   -------------------
+   -- Preorder_Last --
+   -------------------
+
+   function Preorder_Last
+     (Node : ${root_entity.api_name}'Class) return Natural is
+   begin
+      Check_Safety_Net (Node.Safety_Net);
+      return Preorder_Last (Node.Internal.Node);
+   end Preorder_Last;
+
    ---------------
    -- Get_Child --
    ---------------
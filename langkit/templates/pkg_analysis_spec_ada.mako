@@ -229,6 +229,48 @@ package ${ada_lib_name}.Analysis is
      (Context : Analysis_Context'Class; Discard : Boolean);
    ${ada_doc('langkit.context_discard_errors_in_populate_lexical_env', 3)}
 
+   procedure Memoization_Invalidation_Stats
+     (Context                : Analysis_Context'Class;
+      Invalidated, Surviving : out Long_Long_Integer);
+   ${ada_doc('langkit.context_memoization_invalidation_stats', 3)}
+
+   function Memoized_Properties_Count return Natural;
+   ${ada_doc('langkit.memoized_properties_count', 3)}
+
+   function Memoized_Property_Name (Index : Positive) return String;
+   ${ada_doc('langkit.memoized_property_name', 3)}
+
+   function Memoization_Stats
+     (Context : Analysis_Context'Class;
+      Index   : Positive) return Memoized_Property_Stats;
+   ${ada_doc('langkit.context_memoization_stats', 3)}
+
+   procedure Set_Memoization_Memory_Limit
+     (Context : Analysis_Context'Class;
+      Limit   : Long_Long_Integer;
+      Policy  : Memoization_Eviction_Policy := LRU);
+   ${ada_doc('langkit.context_set_memoization_memory_limit', 3)}
+
+   procedure Set_Unit_Memory_Limit
+     (Context : Analysis_Context'Class; Limit : Long_Long_Integer);
+   ${ada_doc('langkit.context_set_unit_memory_limit', 3)}
+
+   procedure Set_Parse_Cache_Directory
+     (Context : Analysis_Context'Class; Directory : String);
+   ${ada_doc('langkit.context_set_parse_cache_directory', 3)}
+
+   procedure Set_Compact_Source_Buffers
+     (Context : Analysis_Context'Class; Enabled : Boolean);
+   ${ada_doc('langkit.context_set_compact_source_buffers', 3)}
+
+   function Memory_Usage
+     (Context : Analysis_Context'Class) return Memory_Usage_Stats;
+   ${ada_doc('langkit.context_memory_usage', 3)}
+
+   procedure Set_Event_Handler
+     (Context : Analysis_Context'Class; Handler : Event_Handler_Access);
+   ${ada_doc('langkit.context_set_event_handler', 3)}
+
    procedure Set_Logic_Resolution_Timeout
      (Context : Analysis_Context'Class; Timeout : Natural);
    ${ada_doc('langkit.context_set_logic_resolution_timeout', 3)}
@@ -300,6 +342,13 @@ package ${ada_lib_name}.Analysis is
    function Trivia_Count (Unit : Analysis_Unit'Class) return Natural;
    ${ada_doc('langkit.unit_trivia_count', 3)}
 
+   function Memory_Usage
+     (Unit : Analysis_Unit'Class) return Memory_Usage_Stats;
+   ${ada_doc('langkit.unit_memory_usage', 3)}
+
+   function Is_Evicted (Unit : Analysis_Unit'Class) return Boolean;
+   ${ada_doc('langkit.unit_is_evicted', 3)}
+
    function Text (Unit : Analysis_Unit'Class) return Text_Type;
    ${ada_doc('langkit.unit_text', 3)}
 
@@ -308,6 +357,20 @@ package ${ada_lib_name}.Analysis is
       return Token_Reference;
    ${ada_doc('langkit.unit_lookup_token', 3)}
 
+   pragma Warnings (Off, "defined after private extension");
+   function Node_At_Preorder_Index
+     (Unit : Analysis_Unit'Class; Index : Positive)
+      return ${root_entity.api_name};
+   ${ada_doc('langkit.unit_node_at_preorder_index', 3)}
+   pragma Warnings (On, "defined after private extension");
+
+   pragma Warnings (Off, "defined after private extension");
+   function Lookup_Node
+     (Unit : Analysis_Unit'Class; Sloc : Source_Location)
+      return ${root_entity.api_name};
+   ${ada_doc('langkit.unit_lookup_node', 3)}
+   pragma Warnings (On, "defined after private extension");
+
    procedure Dump_Lexical_Env (Unit : Analysis_Unit'Class);
    ${ada_doc('langkit.unit_dump_lexical_env', 3)}
 
@@ -361,6 +424,11 @@ package ${ada_lib_name}.Analysis is
       % endif
    % endfor
 
+   function Covering_Nodes
+     (Unit : Analysis_Unit'Class; Sloc : Source_Location)
+      return ${root_entity.array.api_name};
+   ${ada_doc('langkit.unit_covering_nodes', 3)}
+
    --------------------
    -- Token Iterator --
    --------------------
@@ -461,6 +529,14 @@ package ${ada_lib_name}.Analysis is
      (Node : ${root_entity.api_name}'Class) return Natural;
    --  Return the index of the last child Node has, or 0 if there is no child
 
+   function Preorder_Index
+     (Node : ${root_entity.api_name}'Class) return Natural;
+   ${ada_doc('langkit.node_preorder_index', 3)}
+
+   function Preorder_Last
+     (Node : ${root_entity.api_name}'Class) return Natural;
+   ${ada_doc('langkit.node_preorder_last', 3)}
+
    pragma Warnings (Off, "defined after private extension");
    procedure Get_Child
      (Node            : ${root_entity.api_name}'Class;
@@ -187,6 +187,79 @@ package ${ada_lib_name}.Common is
    --  Helper type to control the node traversal process. See the
    --  ``${ada_lib_name}.Analysis.Traverse`` function.
 
+   type Memoized_Property_Stats is record
+      Hits : Long_Long_Integer := 0;
+      --  Number of calls that reused a memoized result
+
+      Misses : Long_Long_Integer := 0;
+      --  Number of calls that had to evaluate the property
+
+      Entries : Long_Long_Integer := 0;
+      --  Number of memoized results currently stored
+
+      Bytes : Long_Long_Integer := 0;
+      --  Estimated memory used by these memoized results, in bytes
+
+      Evictions : Long_Long_Integer := 0;
+      --  Number of memoized results that were discarded to honor the
+      --  memoization memory limit.
+   end record;
+   --  Memoization statistics for a memoized property in an analysis context.
+   --  See the ``${ada_lib_name}.Analysis.Memoization_Stats`` function.
+
+   type Memoization_Eviction_Policy is (LRU, Clock);
+   ${ada_doc('langkit.memoization_eviction_policy', 3)}
+
+   type Memory_Usage_Stats is record
+      AST_Nodes : Long_Long_Integer := 0;
+      --  Memory pages allocated to store parse nodes
+
+      Tokens : Long_Long_Integer := 0;
+      --  Token and trivia tables, including the index of line starts
+
+      Source_Buffer : Long_Long_Integer := 0;
+      --  Decoded source text
+
+      Symbols : Long_Long_Integer := 0;
+      --  Internalized symbols. As analysis units share their context's symbol
+      --  table, this is the share of this table for an analysis unit,
+      --  proportional to its number of tokens.
+
+      Memoization : Long_Long_Integer := 0;
+      --  Memoized property results
+
+      Lexical_Envs : Long_Long_Integer := 0;
+      --  Symbol to node maps in lexical environments
+
+      Lookup_Caches : Long_Long_Integer := 0;
+      --  Caches for lexical environment lookups
+
+      Total : Long_Long_Integer := 0;
+      --  Sum of all the above
+   end record;
+   --  Estimated memory usage, in bytes, for an analysis unit or an analysis
+   --  context. See the ``${ada_lib_name}.Analysis.Memory_Usage`` functions.
+
+   type Analysis_Phase is
+     (Lexing, Parsing, Lexical_Env_Population, Property_Evaluation);
+   ${ada_doc('langkit.analysis_phase', 3)}
+
+   type Event_Handler_Interface is limited interface;
+   ${ada_doc('langkit.event_handler_type', 3)}
+
+   procedure Phase_Timing
+     (Self     : in out Event_Handler_Interface;
+      Filename : String;
+      Phase    : Analysis_Phase;
+      Name     : String;
+      Elapsed  : Duration) is abstract;
+   ${ada_doc('langkit.event_handler_phase_timing', 3)}
+
+   procedure Release (Self : in out Event_Handler_Interface) is abstract;
+   --  Actions to perform when the analysis context that owns Self releases it
+
+   type Event_Handler_Access is access all Event_Handler_Interface'Class;
+
    -----------------------
    -- Lexical utilities --
    -----------------------
@@ -434,7 +507,9 @@ private
       --  See documentation for the Index accessor
 
       Source_Buffer : Text_Cst_Access;
-      --  Text for the original source file
+      --  Text for the original source file. This is null if the source
+      --  buffer uses the compact representation (see
+      --  Token_Data_Handler.Compact_Buffer).
 
       Source_First : Positive;
       Source_Last  : Natural;
@@ -14,6 +14,7 @@ with Ada.Containers.Vectors;
 with Ada.Directories;
 with Ada.Exceptions;
 with Ada.Finalization;
+with Ada.Real_Time;                   use type Ada.Real_Time.Time;
 with Ada.Strings.Wide_Wide_Unbounded; use Ada.Strings.Wide_Wide_Unbounded;
 with Ada.Text_IO;                     use Ada.Text_IO;
 with Ada.Unchecked_Conversion;
@@ -42,6 +43,7 @@ pragma Warnings (On, "referenced");
 with ${ada_lib_name}.Private_Converters;
 use ${ada_lib_name}.Private_Converters;
 with ${ada_lib_name}.Introspection_Implementation;
+with ${ada_lib_name}.Parse_Cache;
 
 ${exts.with_clauses(with_clauses + [
    ((ctx.symbol_canonicalizer.unit_fqn, False, False)
@@ -143,6 +145,12 @@ package body ${ada_lib_name}.Implementation is
    function Snaps_At_Start (Self : ${T.root_node.name}) return Boolean;
    function Snaps_At_End (Self : ${T.root_node.name}) return Boolean;
 
+   procedure Check_Reload_Allowed (Unit : Internal_Unit);
+   --  Raise a Precondition_Failure if Unit is evicted and properties are being
+   --  evaluated. Parsing Unit again would then invalidate the lexical
+   --  environment lookup caches and memoized results that these properties
+   --  may rely on.
+
    --  Those maps are used to give unique ids to lexical envs while pretty
    --  printing them.
 
@@ -187,6 +195,48 @@ package body ${ada_lib_name}.Implementation is
       return Ret;
    end Construct_Entity_Array;
 
+   procedure Free is new Ada.Unchecked_Deallocation
+     (Event_Handler_Interface'Class, Event_Handler_Access);
+
+   function Timing_Start
+     (Context : Internal_Context) return Ada.Real_Time.Time
+   is (if Context.Event_Handler = null
+       then Ada.Real_Time.Time_First
+       else Ada.Real_Time.Clock);
+   --  Return the start time for an analysis phase to report to Context's
+   --  event handler. Avoid the cost of reading the clock if there is no event
+   --  handler.
+
+   procedure Report_Timing
+     (Context : Internal_Context;
+      Unit    : Internal_Unit;
+      Phase   : Analysis_Phase;
+      Start   : Ada.Real_Time.Time;
+      Name    : String := "");
+   --  If Context has an event handler, report to it the time elapsed since
+   --  Start for Phase on Unit.
+
+   -------------------
+   -- Report_Timing --
+   -------------------
+
+   procedure Report_Timing
+     (Context : Internal_Context;
+      Unit    : Internal_Unit;
+      Phase   : Analysis_Phase;
+      Start   : Ada.Real_Time.Time;
+      Name    : String := "") is
+   begin
+      if Context.Event_Handler /= null then
+         Context.Event_Handler.Phase_Timing
+           (Filename => Get_Filename (Unit),
+            Phase    => Phase,
+            Name     => Name,
+            Elapsed  => Ada.Real_Time.To_Duration
+                          (Ada.Real_Time.Clock - Start));
+      end if;
+   end Report_Timing;
+
    ----------------
    -- Enter_Call --
    ----------------
@@ -204,13 +254,25 @@ package body ${ada_lib_name}.Implementation is
       if Current > Max then
          raise Property_Error with "stack overflow";
       end if;
+
+      --  Time top-level property calls for the event handler. Calls made
+      --  during lexical environment population are part of that phase.
+
+      if Current = 1 and then not Context.In_Populate_Lexical_Env then
+         Context.Property_Start := Timing_Start (Context);
+      end if;
    end Enter_Call;
 
    ---------------
    -- Exit_Call --
    ---------------
 
-   procedure Exit_Call (Context : Internal_Context; Call_Depth : Natural) is
+   procedure Exit_Call
+     (Context    : Internal_Context;
+      Call_Depth : Natural;
+      Unit       : Internal_Unit;
+      Property   : String)
+   is
       Current : Natural renames Context.Current_Call_Depth;
    begin
       if Call_Depth /= Current then
@@ -218,6 +280,12 @@ package body ${ada_lib_name}.Implementation is
             "Langkit code generation bug for call depth handling detected";
       end if;
       Current := Current - 1;
+
+      if Current = 0 and then not Context.In_Populate_Lexical_Env then
+         Report_Timing
+           (Context, Unit, Property_Evaluation, Context.Property_Start,
+            Property);
+      end if;
    end Exit_Call;
 
    -----------
@@ -383,11 +451,25 @@ package body ${ada_lib_name}.Implementation is
       Context.In_Populate_Lexical_Env := False;
       Context.Cache_Version := 0;
       Context.Reparse_Cache_Version := 0;
+      Context.Mmz_Invalidated_Entries := 0;
+      Context.Mmz_Surviving_Entries := 0;
+      % if ctx.has_memoization:
+         Context.Mmz_Stats := (others => <>);
+         Context.Mmz_Bytes := 0;
+         Context.Mmz_Memory_Limit := 0;
+         Context.Mmz_Eviction_Policy := LRU;
+         Context.Mmz_Eviction := (others => <>);
+      % endif
 
       Context.Rewriting_Handle := No_Rewriting_Handle_Pointer;
       Context.Templates_Unit := No_Analysis_Unit;
 
       Context.Max_Call_Depth := Max_Call_Depth;
+      Context.Event_Handler := null;
+      Context.Unit_Memory_Limit := 0;
+      Context.Unit_Use_Clock := 0;
+      Context.Parse_Cache_Directory := Null_Unbounded_String;
+      Context.Compact_Source_Buffers := False;
 
       ${exts.include_extension(ctx.ext('analysis', 'context', 'create'))}
 
@@ -470,9 +552,11 @@ package body ${ada_lib_name}.Implementation is
          else Element (Cur));
       Unit.Charset := Actual_Charset;
 
-      --  (Re)parse it if needed
+      --  (Re)parse it if needed. Evicted units need to be parsed again even
+      --  if the caller did not request a reparse.
 
-      if Created or else Reparse then
+      Check_Reload_Allowed (Unit);
+      if Created or else Reparse or else Unit.Is_Evicted then
          declare
             Reparsed : Reparsed_Unit;
          begin
@@ -481,6 +565,11 @@ package body ${ada_lib_name}.Implementation is
          end;
       end if;
 
+      --  Unit is now the most recently used one: if it made units exceed
+      --  their memory limit, evict other units.
+
+      Ensure_Loaded (Unit);
+      Evict_Units (Context, Keep => Unit);
       return Unit;
    end Get_Unit;
 
@@ -680,6 +769,8 @@ package body ${ada_lib_name}.Implementation is
 
    procedure Destroy (Context : in out Internal_Context) is
    begin
+      Set_Event_Handler (Context, null);
+
       --  If we are asked to free this context, it means that no one else have
       --  references to its analysis units, so it's safe to destroy these.
       for Unit of Context.Units loop
@@ -690,6 +781,12 @@ package body ${ada_lib_name}.Implementation is
 
       Destroy (Context.Templates_Unit);
       AST_Envs.Destroy (Context.Root_Scope);
+      % if ctx.has_memoization:
+         Context.Mmz_Frames.Destroy;
+         Context.Mmz_Dependencies.Destroy;
+         Context.Mmz_Changed_Units.Destroy;
+         Context.Mmz_Eviction.Items.Destroy;
+      % endif
       Destroy (Context.Symbols);
       Destroy (Context.Parser);
       Dec_Ref (Context.Unit_Provider);
@@ -753,22 +850,14 @@ package body ${ada_lib_name}.Implementation is
       Saved_In_Populate_Lexical_Env : constant Boolean :=
          Unit.Context.In_Populate_Lexical_Env;
 
-      procedure Reset_Envs_Caches (Unit : Internal_Unit) is
-         procedure Internal (Node : ${T.root_node.name}) is
-         begin
-            if Node = null then
-               return;
-            end if;
-            Reset_Caches (Node.Self_Env);
-            for I in 1 .. Children_Count (Node) loop
-               Internal (Child (Node, I));
-            end loop;
-         end Internal;
-      begin
-         Internal (Unit.AST_Root);
-      end Reset_Envs_Caches;
+      Start : Ada.Real_Time.Time;
+      --  Start time for this PLE pass, to report to the event handler
 
    begin
+      --  Lexical environments are created from Unit's tree, so make sure it
+      --  is available.
+      Ensure_Loaded (Unit);
+
       --  TODO??? Handle env invalidation when reparsing a unit and when a
       --  previous call raised a Property_Error.
       if Unit.Is_Env_Populated then
@@ -782,6 +871,7 @@ package body ${ada_lib_name}.Implementation is
 
       GNATCOLL.Traces.Trace (Main_Trace, "Populating lexical envs for unit: "
                                          & Basename (Unit));
+      Start := Timing_Start (Context);
       GNATCOLL.Traces.Increase_Indent (Main_Trace);
 
       Context.In_Populate_Lexical_Env := True;
@@ -809,9 +899,26 @@ package body ${ada_lib_name}.Implementation is
       Context.In_Populate_Lexical_Env :=
          Saved_In_Populate_Lexical_Env;
 
+      % if ctx.has_memoization:
+         --  Invalidate memoized results that depend on lexical environments
+         --  from other units to which we just added entries.
+         if not Context.Mmz_Changed_Units.Is_Empty then
+            declare
+               Changed_Units : constant Mmz_Dependency_Array :=
+                  Context.Mmz_Changed_Units.To_Array;
+            begin
+               Context.Mmz_Changed_Units.Clear;
+               Invalidate_Memoization (Context, Changed_Units);
+            end;
+         end if;
+      % endif
+
       GNATCOLL.Traces.Decrease_Indent (Main_Trace);
+      Report_Timing (Context, Unit, Lexical_Env_Population, Start);
 
-      Reset_Envs_Caches (Unit);
+      --  There is no need to reset lookup caches here: each change to a
+      --  lexical environment increments its version, which invalidates only
+      --  the cache entries that depend on it.
 
       if Has_Errors and then not Context.Discard_Errors_In_Populate_Lexical_Env
       then
@@ -883,36 +990,125 @@ package body ${ada_lib_name}.Implementation is
    ----------
 
    function Root (Unit : Internal_Unit) return ${T.root_node.name} is
-     (Unit.AST_Root);
+   begin
+      Ensure_Loaded (Unit);
+      return Unit.AST_Root;
+   end Root;
 
    -----------------
    -- First_Token --
    -----------------
 
    function First_Token (Unit : Internal_Unit) return Token_Reference is
-     (Wrap_Token_Reference (Unit.TDH'Access,
-                            First_Token_Or_Trivia (Unit.TDH)));
+   begin
+      Ensure_Loaded (Unit);
+      return Wrap_Token_Reference
+        (Unit.TDH'Access, First_Token_Or_Trivia (Unit.TDH));
+   end First_Token;
 
    ----------------
    -- Last_Token --
    ----------------
 
    function Last_Token (Unit : Internal_Unit) return Token_Reference is
-     (Wrap_Token_Reference (Unit.TDH'Access, Last_Token_Or_Trivia (Unit.TDH)));
+   begin
+      Ensure_Loaded (Unit);
+      return Wrap_Token_Reference
+        (Unit.TDH'Access, Last_Token_Or_Trivia (Unit.TDH));
+   end Last_Token;
 
    -----------------
    -- Token_Count --
    -----------------
 
    function Token_Count (Unit : Internal_Unit) return Natural is
-     (Unit.TDH.Tokens.Length);
+   begin
+      Ensure_Loaded (Unit);
+      return Unit.TDH.Tokens.Length;
+   end Token_Count;
 
    ------------------
    -- Trivia_Count --
    ------------------
 
    function Trivia_Count (Unit : Internal_Unit) return Natural is
-     (Unit.TDH.Trivias.Length);
+   begin
+      Ensure_Loaded (Unit);
+      return Unit.TDH.Trivias.Length;
+   end Trivia_Count;
+
+   procedure Add_Memory_Usage
+     (Unit : Internal_Unit; Stats : in out Memory_Usage_Stats);
+   --  Add to Stats the memory that Unit uses, except for symbols and for the
+   --  Total component.
+
+   function Total (Stats : Memory_Usage_Stats) return Long_Long_Integer
+   is (Stats.AST_Nodes + Stats.Tokens + Stats.Source_Buffer + Stats.Symbols
+       + Stats.Memoization + Stats.Lexical_Envs + Stats.Lookup_Caches);
+   --  Return the sum of all categories in Stats
+
+   ----------------------
+   -- Add_Memory_Usage --
+   ----------------------
+
+   procedure Add_Memory_Usage
+     (Unit : Internal_Unit; Stats : in out Memory_Usage_Stats) is
+   begin
+      Stats.AST_Nodes := Stats.AST_Nodes
+        + Allocated_Bytes (Unit.AST_Mem_Pool);
+      Stats.Tokens := Stats.Tokens + Tokens_Memory_Usage (Unit.TDH);
+      Stats.Source_Buffer := Stats.Source_Buffer
+        + Source_Buffer_Memory_Usage (Unit.TDH);
+      % if ctx.has_memoization:
+         Stats.Memoization := Stats.Memoization + Unit.Mmz_Bytes;
+      % endif
+
+      --  Lexical environments that Unit owns are the ones that its nodes
+      --  create. Check the owner first so that we never dereference
+      --  environments from other units.
+
+      for Node of Unit.Nodes loop
+         declare
+            Env : constant Lexical_Env := Node.Self_Env;
+         begin
+            if Env.Kind = Primary
+               and then Env.Owner = Unit
+               and then AST_Envs.Env_Node (Env) = Node
+            then
+               AST_Envs.Add_Memory_Usage
+                 (Env, Stats.Lexical_Envs, Stats.Lookup_Caches);
+            end if;
+         end;
+      end loop;
+   end Add_Memory_Usage;
+
+   ------------------
+   -- Memory_Usage --
+   ------------------
+
+   function Memory_Usage (Unit : Internal_Unit) return Memory_Usage_Stats is
+      Result       : Memory_Usage_Stats;
+      Total_Tokens : Long_Long_Integer := 0;
+   begin
+      Add_Memory_Usage (Unit, Result);
+
+      --  All units share the context's symbol table: attribute it to units
+      --  in proportion to their number of tokens. Do not use Token_Count, as
+      --  it would reload evicted units.
+
+      for U of Unit.Context.Units loop
+         Total_Tokens :=
+           Total_Tokens + Long_Long_Integer (U.TDH.Tokens.Length);
+      end loop;
+      if Total_Tokens > 0 then
+         Result.Symbols :=
+           Memory_Usage (Unit.Context.Symbols)
+           * Long_Long_Integer (Unit.TDH.Tokens.Length) / Total_Tokens;
+      end if;
+
+      Result.Total := Total (Result);
+      return Result;
+   end Memory_Usage;
 
    ----------
    -- Text --
@@ -928,13 +1124,168 @@ package body ${ada_lib_name}.Implementation is
    ------------------
 
    function Lookup_Token
-     (Unit : Internal_Unit; Sloc : Source_Location) return Token_Reference
-   is
-      Result : constant Token_Or_Trivia_Index := Lookup_Token (Unit.TDH, Sloc);
+     (Unit : Internal_Unit; Sloc : Source_Location) return Token_Reference is
    begin
-      return Wrap_Token_Reference (Unit.TDH'Access, Result);
+      Ensure_Loaded (Unit);
+      return Wrap_Token_Reference
+        (Unit.TDH'Access, Lookup_Token (Unit.TDH, Sloc));
    end Lookup_Token;
 
+   ---------------------
+   -- Get_Line_Tokens --
+   ---------------------
+
+   procedure Get_Line_Tokens
+     (Unit        : Internal_Unit;
+      Line        : Line_Number;
+      First, Last : out Token_Reference)
+   is
+      F, L : Token_Or_Trivia_Index;
+   begin
+      Ensure_Loaded (Unit);
+      Get_Line_Tokens (Unit.TDH, Line, F, L);
+      First := Wrap_Token_Reference (Unit.TDH'Access, F);
+      Last := Wrap_Token_Reference (Unit.TDH'Access, L);
+   end Get_Line_Tokens;
+
+   ----------------------------
+   -- Node_At_Preorder_Index --
+   ----------------------------
+
+   function Node_At_Preorder_Index
+     (Unit : Internal_Unit; Index : Positive) return ${T.root_node.name} is
+   begin
+      Ensure_Loaded (Unit);
+      return (if Index <= Unit.Nodes.Last_Index
+              then Unit.Nodes.Get (Index)
+              else null);
+   end Node_At_Preorder_Index;
+
+   ------------------------------
+   -- Compute_Preorder_Indexes --
+   ------------------------------
+
+   procedure Compute_Preorder_Indexes (Unit : Internal_Unit) is
+
+      procedure Process (Node : ${T.root_node.name});
+      --  Assign preorder indexes to Node and all its children
+
+      -------------
+      -- Process --
+      -------------
+
+      procedure Process (Node : ${T.root_node.name}) is
+      begin
+         if Node = null then
+            return;
+         end if;
+
+         Unit.Nodes.Append (Node);
+         Node.Preorder_Index := Unit.Nodes.Last_Index;
+         for I in 1 .. Children_Count (Node) loop
+            Process (Child (Node, I));
+         end loop;
+         Node.Preorder_Last := Unit.Nodes.Last_Index;
+      end Process;
+
+   begin
+      Unit.Nodes.Clear;
+      Process (Unit.AST_Root);
+   end Compute_Preorder_Indexes;
+
+   ------------------------
+   -- Compute_Sloc_Index --
+   ------------------------
+
+   procedure Compute_Sloc_Index (Unit : Internal_Unit) is
+
+      procedure Append (Sloc : Source_Location; Node : ${T.root_node.name});
+      --  Record that Node is the bottom-most node starting at Sloc
+
+      procedure Process (Node : ${T.root_node.name});
+      --  Append entries for Node and all its children
+
+      ------------
+      -- Append --
+      ------------
+
+      procedure Append (Sloc : Source_Location; Node : ${T.root_node.name}) is
+      begin
+         Unit.Sloc_Index.Append ((Sloc, Node));
+      end Append;
+
+      -------------
+      -- Process --
+      -------------
+
+      procedure Process (Node : ${T.root_node.name}) is
+      begin
+         --  Node is the bottom-most node from its start up to the start of its
+         --  first child, and then from the end of each child up to the start
+         --  of the next one.
+
+         Append (Start_Sloc (Sloc_Range (Node)), Node);
+         for I in 1 .. Children_Count (Node) loop
+            declare
+               C : constant ${T.root_node.name} := Child (Node, I);
+            begin
+               if C /= null then
+                  Process (C);
+                  Append (End_Sloc (Sloc_Range (C)), Node);
+               end if;
+            end;
+         end loop;
+      end Process;
+
+   begin
+      Unit.Sloc_Index.Clear;
+      if Unit.AST_Root /= null then
+         Process (Unit.AST_Root);
+         Append (End_Sloc (Sloc_Range (Unit.AST_Root)), null);
+      end if;
+   end Compute_Sloc_Index;
+
+   -----------------
+   -- Lookup_Node --
+   -----------------
+
+   function Lookup_Node
+     (Unit : Internal_Unit; Sloc : Source_Location) return ${T.root_node.name}
+   is
+      First  : Positive := 1;
+      Last   : Natural;
+      Result : ${T.root_node.name} := null;
+   begin
+      if Sloc = No_Source_Location then
+         return null;
+      end if;
+
+      Ensure_Loaded (Unit);
+      if Unit.Sloc_Index.Is_Empty then
+         Compute_Sloc_Index (Unit);
+      end if;
+
+      --  Look for the last entry whose sloc is before or at Sloc: its node is
+      --  the bottom-most one that contains Sloc.
+
+      Last := Unit.Sloc_Index.Last_Index;
+      while First <= Last loop
+         declare
+            Middle : constant Positive := (First + Last) / 2;
+            E      : constant Sloc_Index_Entry := Unit.Sloc_Index.Get (Middle);
+         begin
+            if E.Sloc <= Sloc then
+               Result := E.Node;
+               First := Middle + 1;
+            else
+               Last := Middle - 1;
+            end if;
+         end;
+      end loop;
+
+      return Result;
+   end Lookup_Node;
+
    ----------------------
    -- Dump_Lexical_Env --
    ----------------------
@@ -1004,6 +1355,7 @@ package body ${ada_lib_name}.Implementation is
 
    procedure Print (Unit : Internal_Unit; Show_Slocs : Boolean) is
    begin
+      Ensure_Loaded (Unit);
       if Unit.AST_Root = null then
          Put_Line ("<empty analysis unit>");
       else
@@ -1052,10 +1404,12 @@ package body ${ada_lib_name}.Implementation is
 
       Unit.Exiled_Entries.Destroy;
       Unit.Foreign_Nodes.Destroy;
+      Unit.Nodes.Destroy;
+      Unit.Sloc_Index.Destroy;
       Analysis_Unit_Sets.Destroy (Unit.Referenced_Units);
 
       % if ctx.has_memoization:
-         Destroy (Unit.Memoization_Map);
+         Destroy_Memoization_Map (Unit);
       % endif
 
       Destroy_Rebindings (Unit.Rebindings'Access);
@@ -1249,6 +1603,25 @@ package body ${ada_lib_name}.Implementation is
             Mapping.Val.Unit.Exiled_Entries.Append
               ((Dest_Env, Mapping.Key, Mapping.Val));
 
+            % if ctx.has_memoization:
+               --  Lookups in Dest_Env may now return different results:
+               --  memoized entries that depend on its unit must be
+               --  invalidated.
+               declare
+                  Changed_Units : Mmz_Dependency_Vectors.Vector renames
+                     Self.Unit.Context.Mmz_Changed_Units;
+                  Changed_Unit  : constant Internal_Unit :=
+                    (if Dest_Env = Root_Scope
+                     then No_Analysis_Unit
+                     else Dest_Env.Env.Node.Unit);
+               begin
+                  if not (for some U of Changed_Units => U = Changed_Unit)
+                  then
+                     Changed_Units.Append (Changed_Unit);
+                  end if;
+               end;
+            % endif
+
             if Dest_Env /= Root_Scope then
                --  Add Val to the list of foreign nodes that Dest_Env's unit
                --  contains, so that when that unit is reparsed, we can call
@@ -1323,6 +1696,9 @@ package body ${ada_lib_name}.Implementation is
       Self.Self_Env := Self_Env;
       Self.Last_Attempted_Child := -1;
 
+      Self.Preorder_Index := 0;
+      Self.Preorder_Last := 0;
+
       ${astnode_types.init_user_fields(T.root_node, 'Self')}
    end Initialize;
 
@@ -1473,6 +1849,24 @@ package body ${ada_lib_name}.Implementation is
       end loop;
    end Set_Parents;
 
+   --------------------
+   -- Preorder_Index --
+   --------------------
+
+   function Preorder_Index (Node : ${T.root_node.name}) return Natural is
+   begin
+      return Node.Preorder_Index;
+   end Preorder_Index;
+
+   -------------------
+   -- Preorder_Last --
+   -------------------
+
+   function Preorder_Last (Node : ${T.root_node.name}) return Natural is
+   begin
+      return Node.Preorder_Last;
+   end Preorder_Last;
+
    -------------
    -- Destroy --
    -------------
@@ -1671,6 +2065,24 @@ package body ${ada_lib_name}.Implementation is
          return null;
       end if;
 
+      --  If Node belongs to its unit's tree and contains Sloc, the bottom-most
+      --  node in the whole unit that contains Sloc is also the one in Node's
+      --  subtree: use the unit's sloc index. Fall back to the tree descent if
+      --  the result is not in Node's subtree, i.e. if children sloc ranges
+      --  overlap.
+
+      if Node.Preorder_Index > 0
+         and then Compare (Sloc_Range (Node), Sloc) = Inside
+      then
+         Result := Lookup_Node (Node.Unit, Sloc);
+         if Result /= null
+            and then Result.Preorder_Index in
+                     Node.Preorder_Index .. Node.Preorder_Last
+         then
+            return Result;
+         end if;
+      end if;
+
       Lookup_Relative
         (${T.root_node.name} (Node), Sloc, Position, Result);
       return Result;
@@ -2272,6 +2684,18 @@ package body ${ada_lib_name}.Implementation is
    begin
       return Unit.Context.Reparse_Cache_Version;
    end Context_Version;
+
+   % if ctx.has_memoization:
+   --------------------------------
+   -- Register_Lookup_Dependency --
+   --------------------------------
+
+   procedure Register_Lookup_Dependency (Unit : Internal_Unit) is
+   begin
+      Add_Memoization_Dependency (Unit.Context, Unit);
+   end Register_Lookup_Dependency;
+   % endif
+
    ----------------------
    -- Short_Text_Image --
    ----------------------
@@ -3364,7 +3788,16 @@ package body ${ada_lib_name}.Implementation is
 
    function Kind_Name (Node : ${T.root_node.name}) return String is
    begin
-      return To_String (Kind_Names (Node.Kind));
+      return Kind_Name (Node.Kind);
+   end Kind_Name;
+
+   ---------------
+   -- Kind_Name --
+   ---------------
+
+   function Kind_Name (Kind : ${T.node_kind}) return String is
+   begin
+      return To_String (Kind_Names (Kind));
    end Kind_Name;
 
    --------------------
@@ -3472,11 +3905,18 @@ package body ${ada_lib_name}.Implementation is
          Exiled_Entries    => Exiled_Entry_Vectors.Empty_Vector,
          Foreign_Nodes     =>
             Foreign_Node_Entry_Vectors.Empty_Vector,
+         Nodes             => ${T.root_node.array.pkg_vector}.Empty_Vector,
+         Sloc_Index        => Sloc_Index_Vectors.Empty_Vector,
          Rebindings        => Env_Rebindings_Vectors.Empty_Vector,
          Cache_Version     => <>,
-         Unit_Version      => <>
+         Unit_Version      => <>,
+         From_File         => False,
+         Read_BOM          => False,
+         Is_Evicted        => False,
+         Last_Used         => 0
          % if ctx.has_memoization:
          , Memoization_Map => <>
+         , Mmz_Bytes       => 0
          % endif
       );
    begin
@@ -3681,20 +4121,367 @@ package body ${ada_lib_name}.Implementation is
    ------------------
 
    procedure Reset_Caches (Unit : Internal_Unit) is
-      Cache_Version : constant Natural := Unit.Cache_Version;
    begin
-      if Cache_Version < Unit.Context.Reparse_Cache_Version then
+      --  Memoization caches are invalidated eagerly, and only for entries
+      --  that depend on units that changed: see Invalidate_Memoization.
+      if Unit.Cache_Version < Unit.Context.Reparse_Cache_Version then
          Unit.Cache_Version := Unit.Context.Reparse_Cache_Version;
          Reset_Envs (Unit);
       end if;
+   end Reset_Caches;
+
+   ------------------------------------
+   -- Memoization_Invalidation_Stats --
+   ------------------------------------
+
+   procedure Memoization_Invalidation_Stats
+     (Context                : Internal_Context;
+      Invalidated, Surviving : out Long_Long_Integer) is
+   begin
+      Invalidated := Context.Mmz_Invalidated_Entries;
+      Surviving := Context.Mmz_Surviving_Entries;
+   end Memoization_Invalidation_Stats;
+
+   <% memoized_props = sorted(ctx.memoized_properties,
+                              key=lambda p: p.qualname) %>
+
+   -------------------------------
+   -- Memoized_Properties_Count --
+   -------------------------------
+
+   function Memoized_Properties_Count return Natural is
+   begin
+      return ${len(memoized_props)};
+   end Memoized_Properties_Count;
+
+   ----------------------------
+   -- Memoized_Property_Name --
+   ----------------------------
+
+   function Memoized_Property_Name (Index : Positive) return String is
+   begin
+      % if memoized_props:
+         if Index <= Memoized_Properties_Count then
+            case Mmz_Property'Val (Index - 1) is
+               % for p in memoized_props:
+                  when ${p.memoization_enum} =>
+                     return ${string_repr(p.qualname)};
+               % endfor
+            end case;
+         end if;
+      % endif
+      raise Precondition_Failure with "invalid memoized property index";
+   end Memoized_Property_Name;
+
+   -----------------------
+   -- Memoization_Stats --
+   -----------------------
+
+   function Memoization_Stats
+     (Context : Internal_Context;
+      Index   : Positive) return Memoized_Property_Stats
+   is
+      % if not ctx.has_memoization:
+         pragma Unreferenced (Context);
+      % endif
+   begin
+      if Index > Memoized_Properties_Count then
+         raise Precondition_Failure with "invalid memoized property index";
+      end if;
+
+      % if ctx.has_memoization:
+         return Context.Mmz_Stats (Mmz_Property'Val (Index - 1));
+      % else:
+         return (others => <>);
+      % endif
+   end Memoization_Stats;
+
+   ----------------------------------
+   -- Set_Memoization_Memory_Limit --
+   ----------------------------------
+
+   procedure Set_Memoization_Memory_Limit
+     (Context : Internal_Context;
+      Limit   : Long_Long_Integer;
+      Policy  : Memoization_Eviction_Policy)
+   is
+      % if not ctx.has_memoization:
+         pragma Unreferenced (Context, Policy);
+      % endif
+   begin
+      if Limit < 0 then
+         raise Precondition_Failure with "negative memoization memory limit";
+      end if;
+
+      % if ctx.has_memoization:
+         Context.Mmz_Memory_Limit := Limit;
+         if Context.Mmz_Eviction_Policy /= Policy then
+            Context.Mmz_Eviction_Policy := Policy;
+
+            --  Referenced flags are meaningful only for the Clock policy:
+            --  start from a clean state.
+            for I in 1 .. Context.Mmz_Eviction.Items.Last_Index loop
+               Context.Mmz_Eviction.Items.Get_Access (I).Referenced := False;
+            end loop;
+            Context.Mmz_Eviction.Hand := 0;
+         end if;
+
+         --  Apply the new limit right away, so that memory is released now
+         --  rather than on the next memoized property evaluation.
+         Evict_Memoized_Values (Context);
+      % endif
+   end Set_Memoization_Memory_Limit;
+
+   ------------------
+   -- Memory_Usage --
+   ------------------
+
+   function Memory_Usage
+     (Context : Internal_Context) return Memory_Usage_Stats
+   is
+      Result : Memory_Usage_Stats;
+   begin
+      for Unit of Context.Units loop
+         Add_Memory_Usage (Unit, Result);
+      end loop;
+      Result.Symbols := Memory_Usage (Context.Symbols);
+
+      --  The root environment belongs to no unit
+
+      AST_Envs.Add_Memory_Usage
+        (Context.Root_Scope, Result.Lexical_Envs, Result.Lookup_Caches);
+
+      Result.Total := Total (Result);
+      return Result;
+   end Memory_Usage;
+
+   -----------------------
+   -- Set_Event_Handler --
+   -----------------------
+
+   procedure Set_Event_Handler
+     (Context : Internal_Context; Handler : Event_Handler_Access) is
+   begin
+      if Context.Event_Handler /= null then
+         Context.Event_Handler.Release;
+         Free (Context.Event_Handler);
+      end if;
+      Context.Event_Handler := Handler;
+   end Set_Event_Handler;
+
+   ---------------------------
+   -- Set_Unit_Memory_Limit --
+   ---------------------------
+
+   procedure Set_Unit_Memory_Limit
+     (Context : Internal_Context; Limit : Long_Long_Integer) is
+   begin
+      if Limit < 0 then
+         raise Precondition_Failure with "negative unit memory limit";
+      end if;
+
+      Context.Unit_Memory_Limit := Limit;
+
+      --  Apply the new limit right away, so that memory is released now
+      --  rather than when the next unit is loaded.
+      Evict_Units (Context);
+   end Set_Unit_Memory_Limit;
+
+   ----------------
+   -- Is_Evicted --
+   ----------------
+
+   function Is_Evicted (Unit : Internal_Unit) return Boolean is
+   begin
+      return Unit.Is_Evicted;
+   end Is_Evicted;
+
+   -------------------------------
+   -- Set_Parse_Cache_Directory --
+   -------------------------------
+
+   procedure Set_Parse_Cache_Directory
+     (Context : Internal_Context; Directory : String) is
+   begin
+      Context.Parse_Cache_Directory := To_Unbounded_String (Directory);
+      if Directory'Length > 0 then
+         Parse_Cache.Delete_Stale_Temp_Files (Directory);
+      end if;
+   end Set_Parse_Cache_Directory;
+
+   --------------------------------
+   -- Set_Compact_Source_Buffers --
+   --------------------------------
+
+   procedure Set_Compact_Source_Buffers
+     (Context : Internal_Context; Enabled : Boolean) is
+   begin
+      Context.Compact_Source_Buffers := Enabled;
+   end Set_Compact_Source_Buffers;
+
+   --------------------------
+   -- Check_Reload_Allowed --
+   --------------------------
+
+   procedure Check_Reload_Allowed (Unit : Internal_Unit) is
+   begin
+      if Unit.Is_Evicted and then Unit.Context.Current_Call_Depth > 0 then
+         raise Precondition_Failure with
+           "cannot reload an evicted unit during a property evaluation";
+      end if;
+   end Check_Reload_Allowed;
+
+   -------------------
+   -- Ensure_Loaded --
+   -------------------
+
+   procedure Ensure_Loaded (Unit : Internal_Unit) is
+      Context : constant Internal_Context := Unit.Context;
+   begin
+      Context.Unit_Use_Clock := Context.Unit_Use_Clock + 1;
+      Unit.Last_Used := Context.Unit_Use_Clock;
+
+      if not Unit.Is_Evicted then
+         return;
+      end if;
+      Check_Reload_Allowed (Unit);
+
+      GNATCOLL.Traces.Trace
+        (Main_Trace, "Reloading evicted unit: " & Basename (Unit));
+      declare
+         Input    : constant Internal_Lexer_Input :=
+           (Kind     => File,
+            Charset  => Unit.Charset,
+            Read_BOM => Unit.Read_BOM,
+            Filename => Unit.Filename);
+         Reparsed : Reparsed_Unit;
+      begin
+         Do_Parsing (Unit, Input, Reparsed);
+         Update_After_Reparse (Unit, Reparsed);
+      end;
+      Evict_Units (Context, Keep => Unit);
+   end Ensure_Loaded;
+
+   function Unit_Memory (Unit : Internal_Unit) return Long_Long_Integer
+   is (Allocated_Bytes (Unit.AST_Mem_Pool)
+       + Tokens_Memory_Usage (Unit.TDH)
+       + Source_Buffer_Memory_Usage (Unit.TDH));
+   --  Return the memory used by Unit that eviction releases, except for
+   --  memoization (accounted at the context level).
+
+   function Is_Evictable (Unit : Internal_Unit) return Boolean
+   is (not Unit.Is_Evicted
+       and then Unit.From_File
+       and then Unit.AST_Root /= null
+       and then Unit.Exiled_Entries.Length = 0
+       and then Unit.Foreign_Nodes.Length = 0
+       and then Unit.Rebindings.Length = 0);
+   --  Return whether Unit can be evicted. Units parsed from buffers cannot be
+   --  parsed again transparently. Units with exiled entries (nodes in other
+   --  units' lexical environments or in the root scope), with foreign nodes or
+   --  with env rebindings are referenced from the lexical environments of
+   --  other units: evicting them would change the result of lookups in these
+   --  environments until they are loaded again.
+
+   procedure Evict_Unit (Unit : Internal_Unit);
+   --  Release the tree, the tokens, the source buffer and the lexical
+   --  environments of Unit, as well as the memoized results that depend on it,
+   --  and mark it as evicted.
+
+   ----------------
+   -- Evict_Unit --
+   ----------------
+
+   procedure Evict_Unit (Unit : Internal_Unit) is
+      Context : constant Internal_Context := Unit.Context;
+   begin
+      GNATCOLL.Traces.Trace (Main_Trace, "Evicting unit: " & Basename (Unit));
+
+      --  Just like for a reparse, caches in other units may reference Unit's
+      --  nodes or lexical environments, so invalidate them before destroying
+      --  these.
+
+      Invalidate_Caches (Context, Invalidate_Envs => True);
+      % if ctx.has_memoization:
+         Invalidate_Memoization (Context, (1 => Unit));
+      % endif
+
+      Destroy (Unit.AST_Root);
+      Unit.AST_Root := null;
+      Unit.Nodes.Destroy;
+      Unit.Sloc_Index.Destroy;
+      Destroy_Unit_Destroyables (Unit);
+      Free (Unit.AST_Mem_Pool);
+
+      Free (Unit.TDH);
+      Initialize (Unit.TDH, Context.Symbols);
+
+      --  Keep Unit.Is_Env_Populated unchanged so that reloading Unit also
+      --  populates its lexical environments again if needed (see
+      --  Update_After_Reparse). Increment the unit version number to make
+      --  references to Unit's nodes stale.
+
+      Unit.Unit_Version := Unit.Unit_Version + 1;
+      Unit.Is_Evicted := True;
+   end Evict_Unit;
+
+   -----------------
+   -- Evict_Units --
+   -----------------
+
+   procedure Evict_Units
+     (Context : Internal_Context; Keep : Internal_Unit := No_Analysis_Unit)
+   is
+      Used   : Long_Long_Integer := 0;
+      Victim : Internal_Unit;
+   begin
+      if Context.Unit_Memory_Limit = 0
+         or else Context.Current_Call_Depth > 0
+         or else Context.In_Populate_Lexical_Env
+         or else Has_Rewriting_Handle (Context)
+      then
+         return;
+      end if;
+
+      --  Memoized results are released along with the units they depend on,
+      --  so they count towards the limit.
 
-      if Cache_Version < Unit.Context.Cache_Version then
-         Unit.Cache_Version := Unit.Context.Cache_Version;
+      for U of Context.Units loop
+         Used := Used + Unit_Memory (U);
+      end loop;
+      % if ctx.has_memoization:
+         Used := Used + Context.Mmz_Bytes;
+      % endif
+
+      --  Evict units from the least recently used one until we are under the
+      --  limit. Units are evicted rarely compared to how often they are used,
+      --  so just look for the least recently used one each time rather than
+      --  maintaining a sorted list of units.
+
+      while Used > Context.Unit_Memory_Limit loop
+         Victim := No_Analysis_Unit;
+         for U of Context.Units loop
+            if U /= Keep
+               and then Is_Evictable (U)
+               and then (Victim = No_Analysis_Unit
+                         or else U.Last_Used < Victim.Last_Used)
+            then
+               Victim := U;
+            end if;
+         end loop;
+         exit when Victim = No_Analysis_Unit;
+
+         Used := Used - Unit_Memory (Victim);
          % if ctx.has_memoization:
-            Destroy (Unit.Memoization_Map);
+            Used := Used - Context.Mmz_Bytes;
          % endif
-      end if;
-   end Reset_Caches;
+         Evict_Unit (Victim);
+         Used := Used + Unit_Memory (Victim);
+         % if ctx.has_memoization:
+            Used := Used + Context.Mmz_Bytes;
+         % endif
+      end loop;
+   end Evict_Units;
 
    --------------------
    -- Reference_Unit --
@@ -3746,6 +4533,10 @@ package body ${ada_lib_name}.Implementation is
       --  from the unit to Result, and restore the "old" token data to Unit.
       --  This last step is what Rotate_TDH (see below) is above.
 
+      Cache_Entry : Unbounded_String;
+      --  If the parse cache is enabled and the source file is readable, name
+      --  of the parse cache entry for this parsing. Empty string otherwise.
+
       procedure Rotate_TDH;
       --  Move token data from Unit to Result and restore data in Saved_TDH to
       --  Unit.
@@ -3777,9 +4568,12 @@ package body ${ada_lib_name}.Implementation is
       GNATCOLL.Traces.Trace (Main_Trace, "Parsing unit " & Basename (Unit));
 
       Result.AST_Root := null;
+      Result.From_File := Input.Kind = File;
+      Result.Read_BOM := Input.Kind = File and then Input.Read_BOM;
 
       Move (Saved_TDH, Unit_TDH.all);
-      Initialize (Unit_TDH.all, Saved_TDH.Symbols);
+      Initialize (Unit_TDH.all, Saved_TDH.Symbols,
+                  Allow_Compact => Context.Compact_Source_Buffers);
 
       --  This is where lexing occurs, so this is where we get most "setup"
       --  issues: missing input file, bad charset, etc. If we have such an
@@ -3804,13 +4598,40 @@ package body ${ada_lib_name}.Implementation is
          end;
       end if;
 
+      --  If the parse cache is enabled, first try to rebuild tokens and the
+      --  tree from it: this is much faster than lexing and parsing.
+
+      if Input.Kind = File
+         and then Length (Context.Parse_Cache_Directory) > 0
+      then
+         declare
+            Start : constant Ada.Real_Time.Time := Timing_Start (Context);
+         begin
+            Cache_Entry :=
+               To_Unbounded_String (Parse_Cache.Entry_Name (Unit, Input));
+            if Length (Cache_Entry) > 0
+               and then Parse_Cache.Load
+                 (To_String (Cache_Entry), Unit, Input, Unit_TDH.all,
+                  Result.AST_Mem_Pool, Result.AST_Root)
+            then
+               Report_Timing
+                 (Context, Unit, Parsing, Start, Name => "parse cache");
+               Rotate_TDH;
+               return;
+            end if;
+         end;
+      end if;
+
       declare
          use Ada.Exceptions;
          Actual_Input : Internal_Lexer_Input := Input;
+         Start        : constant Ada.Real_Time.Time :=
+            Timing_Start (Context);
       begin
          Init_Parser
            (Actual_Input, Context.Tab_Stop, Context.With_Trivia, Unit,
             Unit_TDH, Unit.Context.Parser);
+         Report_Timing (Context, Unit, Lexing, Start);
       exception
          when Exc : Name_Error =>
             --  This happens when we cannot open the source file for lexing:
@@ -3846,9 +4667,22 @@ package body ${ada_lib_name}.Implementation is
       Result.AST_Mem_Pool := Create;
       Unit.Context.Parser.Mem_Pool := Result.AST_Mem_Pool;
 
-      Result.AST_Root := ${T.root_node.name}
-        (Parse (Unit.Context.Parser, Rule => Unit.Rule));
+      declare
+         Start : constant Ada.Real_Time.Time := Timing_Start (Context);
+      begin
+         Result.AST_Root := ${T.root_node.name}
+           (Parse (Unit.Context.Parser, Rule => Unit.Rule));
+         Report_Timing (Context, Unit, Parsing, Start);
+      end;
       Result.Diagnostics.Append (Unit.Context.Parser.Diagnostics);
+
+      --  Trees for sources with diagnostics may be incomplete: only save
+      --  error-free results in the parse cache.
+
+      if Length (Cache_Entry) > 0 and then Result.Diagnostics.Is_Empty then
+         Parse_Cache.Save
+           (To_String (Cache_Entry), Unit_TDH.all, Result.AST_Root);
+      end if;
       Rotate_TDH;
    end Do_Parsing;
 
@@ -3870,14 +4704,23 @@ package body ${ada_lib_name}.Implementation is
       Reparsed.Diagnostics.Clear;
 
       --  As (re-)loading a unit can change how any AST node property in the
-      --  whole analysis context behaves, we have to invalidate caches. This
-      --  is likely overkill, but kill all caches here as it's easy to do.
+      --  whole analysis context behaves, we have to invalidate caches.
       --
       --  As an optimization, invalidate referenced envs cache only if this is
       --  not the first time we parse Unit.
       Invalidate_Caches
         (Unit.Context, Invalidate_Envs => Unit.AST_Root /= null);
 
+      % if ctx.has_memoization:
+         --  Memoized results that depend on Unit (its old nodes, the content
+         --  of its lexical environments, ...) are now stale. Invalidate them
+         --  before the old nodes are destroyed, as the corresponding keys may
+         --  reference them. Entries that depend only on other units are kept.
+         --  Entries that depend on lexical environments to which Unit adds
+         --  entries are invalidated when they are added (see Add_To_Env).
+         Invalidate_Memoization (Unit.Context, (1 => Unit));
+      % endif
+
       --  Likewise for token data
       Free (Unit.TDH);
       Move (Unit.TDH, Reparsed.TDH);
@@ -3893,6 +4736,11 @@ package body ${ada_lib_name}.Implementation is
          Destroy (Unit.AST_Root);
       end if;
       Unit.AST_Root := Reparsed.AST_Root;
+      Compute_Preorder_Indexes (Unit);
+      Unit.Sloc_Index.Clear;
+      Unit.From_File := Reparsed.From_File;
+      Unit.Read_BOM := Reparsed.Read_BOM;
+      Unit.Is_Evicted := False;
 
       --  Likewise for memory pools
       Free (Unit.AST_Mem_Pool);
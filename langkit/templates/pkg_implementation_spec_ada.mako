@@ -10,6 +10,7 @@
 
 with Ada.Containers;        use Ada.Containers;
 with Ada.Containers.Hashed_Maps;
+with Ada.Real_Time;
 with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
 with Ada.Strings.Unbounded.Hash;
 with Ada.Unchecked_Conversion;
@@ -52,6 +53,9 @@ private package ${ada_lib_name}.Implementation is
    type Analysis_Context_Type;
    type Internal_Context is access all Analysis_Context_Type;
 
+   type Analysis_Unit_Type;
+   type Internal_Unit is access all Analysis_Unit_Type;
+
    Unexpected_Call_Depth : exception;
    --  Raised when the Call_Depth for two matching calls to Enter_Call and
    --  Exit_Call don't match, i.e. when there is a bug in the counting of
@@ -68,12 +72,18 @@ private package ${ada_lib_name}.Implementation is
    --
    --  Put in Call_Depth the incremented call depth.
 
-   procedure Exit_Call (Context : Internal_Context; Call_Depth : Natural);
+   procedure Exit_Call
+     (Context    : Internal_Context;
+      Call_Depth : Natural;
+      Unit       : Internal_Unit;
+      Property   : String);
    --  Decrement the call depth in Context. If Call_Depth does not match the
    --  current call depth, raise an Unexpected_Call_Depth.
-
-   type Analysis_Unit_Type;
-   type Internal_Unit is access all Analysis_Unit_Type;
+   --
+   --  Property is the qualified name of the property that returns, and Unit
+   --  is the analysis unit that owns the node on which it was called. They
+   --  are used to report timings for top-level property calls to Context's
+   --  event handler.
 
    type ${T.root_node.value_type_name};
    type ${T.root_node.name} is access all ${T.root_node.value_type_name};
@@ -180,6 +190,13 @@ private package ${ada_lib_name}.Implementation is
    function Context_Version (Unit : Internal_Unit) return Integer;
    --  Return the version of the analysis context associated with Unit
 
+   % if ctx.has_memoization:
+   procedure Register_Lookup_Dependency (Unit : Internal_Unit);
+   --  Record that the memoized property currently evaluated in Unit's context
+   --  (if any) depends on Unit, as one of its lexical env lookups traversed
+   --  Unit's environments.
+   % endif
+
    type Ref_Category is
      (${", ".join(sorted(str(cat) for cat in ctx.ref_cats))});
    type Ref_Categories is array (Ref_Category) of Boolean;
@@ -203,6 +220,9 @@ private package ${ada_lib_name}.Implementation is
       Combine                  => Combine,
       Node_Text_Image          => AST_Envs_Node_Text_Image,
       Register_Rebinding       => Register_Rebinding,
+      % if ctx.has_memoization:
+      Register_Lookup_Dependency => Register_Lookup_Dependency,
+      % endif
       Ref_Category             => Ref_Category,
       Ref_Categories           => Ref_Categories);
 
@@ -319,6 +339,9 @@ private package ${ada_lib_name}.Implementation is
    function Kind_Name (Node : ${T.root_node.name}) return String;
    --  Return the concrete kind for Node
 
+   function Kind_Name (Kind : ${T.node_kind}) return String;
+   --  Return the name of the given concrete node kind
+
    -------------------------------
    -- Tree traversal operations --
    -------------------------------
@@ -584,6 +607,14 @@ private package ${ada_lib_name}.Implementation is
       --  0-based index for the last child we tried to parse for this node. -1
       --  if parsing for all children was successful.
 
+      Preorder_Index : Natural;
+      Preorder_Last  : Natural;
+      --  1-based index of this node in the preorder traversal of its analysis
+      --  unit, and index of the last node in its subtree: a node belongs to
+      --  this subtree iff its own preorder index is in Preorder_Index ..
+      --  Preorder_Last. Both are 0 for nodes that are not part of the tree of
+      --  their analysis unit (synthetic nodes). See Compute_Preorder_Indexes.
+
       <%def name="node_fields(cls, or_null=True)">
          <%
             is_generic_list = cls is ctx.generic_list_type
@@ -716,6 +747,12 @@ private package ${ada_lib_name}.Implementation is
    --  Set Node.Parent to Parent, and initialize recursively the parent of all
    --  child nodes.
 
+   function Preorder_Index (Node : ${T.root_node.name}) return Natural;
+   --  Implementation for Analysis.Preorder_Index
+
+   function Preorder_Last (Node : ${T.root_node.name}) return Natural;
+   --  Implementation for Analysis.Preorder_Last
+
    procedure Destroy (Node : ${T.root_node.name});
    --  Free the resources allocated to this node and all its children
 
@@ -809,6 +846,18 @@ private package ${ada_lib_name}.Implementation is
    package Foreign_Node_Entry_Vectors is new Langkit_Support.Vectors
      (Foreign_Node_Entry);
 
+   type Sloc_Index_Entry is record
+      Sloc : Source_Location;
+      --  Source location at which Node becomes the bottom-most node
+
+      Node : ${T.root_node.name};
+      --  Bottom-most node that contains all source locations from Sloc (and
+      --  up to the next entry's Sloc), or null past the end of the tree.
+   end record;
+
+   package Sloc_Index_Vectors is new Langkit_Support.Vectors
+     (Sloc_Index_Entry);
+
    procedure Register_Destroyable
      (Unit : Internal_Unit; Node : ${T.root_node.name});
    --  Register Node to be destroyed when Unit is deallocated/reparsed
@@ -984,6 +1033,42 @@ private package ${ada_lib_name}.Implementation is
       --  Version number used to invalidate referenced envs caches. It is
       --  incremented only when a unit is reparsed in the context.
 
+      % if ctx.has_memoization:
+      Mmz_Frames : Mmz_Frame_Vectors.Vector;
+      Mmz_Dependencies : Mmz_Dependency_Vectors.Vector;
+      --  Stack of dependency frames for the memoized properties currently
+      --  being evaluated, and the units they depend on (see Mmz_Frame).
+
+      Mmz_Changed_Units : Mmz_Dependency_Vectors.Vector;
+      --  Units whose lexical environments received entries from other units
+      --  during the current Populate_Lexical_Env pass. Memoization entries
+      --  that depend on them are invalidated at the end of the pass.
+
+      Mmz_Stats : Mmz_Stats_Array;
+      --  Memoization statistics for each memoized property
+
+      Mmz_Bytes : Long_Long_Integer := 0;
+      --  Estimated memory used by all memoization entries in this context, in
+      --  bytes.
+
+      Mmz_Memory_Limit : Long_Long_Integer := 0;
+      --  Maximum value for Mmz_Bytes, or 0 if memoization memory is unbounded.
+      --  See Set_Memoization_Memory_Limit.
+
+      Mmz_Eviction_Policy : Memoization_Eviction_Policy := LRU;
+      --  Policy to pick the memoization entries to evict so that Mmz_Bytes
+      --  does not exceed Mmz_Memory_Limit.
+
+      Mmz_Eviction : Mmz_Eviction_List;
+      --  All evaluated memoization entries in this context, in usage order
+      % endif
+
+      Mmz_Invalidated_Entries : Long_Long_Integer := 0;
+      Mmz_Surviving_Entries   : Long_Long_Integer := 0;
+      --  Total number of memoization entries that were invalidated (resp.
+      --  that survived) every time memoization caches were invalidated in this
+      --  context.
+
       Rewriting_Handle : Rewriting_Handle_Pointer :=
          No_Rewriting_Handle_Pointer;
       --  Rewriting handle for this context's current rewriting session.
@@ -1006,6 +1091,30 @@ private package ${ada_lib_name}.Implementation is
 
       Max_Call_Depth : Natural := 0;
       --  Maximum number of recursive calls allowed
+
+      Event_Handler : Event_Handler_Access;
+      --  Event handler to notify about analysis phase timings, or null. This
+      --  context owns it.
+
+      Property_Start : Ada.Real_Time.Time;
+      --  If Event_Handler is not null and a top-level property call is
+      --  running, time at which this call started.
+
+      Unit_Memory_Limit : Long_Long_Integer := 0;
+      --  Maximum memory that analysis units can use in this context, or 0 if
+      --  it is unbounded. See Set_Unit_Memory_Limit.
+
+      Unit_Use_Clock : Long_Long_Integer := 0;
+      --  Number of times analysis units were used in this context. Used to
+      --  timestamp units for the LRU eviction policy (see Last_Used).
+
+      Parse_Cache_Directory : Unbounded_String;
+      --  Directory for the on-disk parse cache, or empty string if the parse
+      --  cache is disabled. See Set_Parse_Cache_Directory.
+
+      Compact_Source_Buffers : Boolean := False;
+      --  Whether units parsed in this context can store their source buffer
+      --  in the compact representation. See Set_Compact_Source_Buffers.
    end record;
 
    type Analysis_Unit_Type is limited record
@@ -1072,6 +1181,16 @@ private package ${ada_lib_name}.Implementation is
       --  the list of AST nodes that were added to these environments and that
       --  come from other units.
 
+      Nodes : ${T.root_node.array.pkg_vector}.Vector;
+      --  All the nodes in this unit's tree, indexed by preorder index. See
+      --  Compute_Preorder_Indexes.
+
+      Sloc_Index : Sloc_Index_Vectors.Vector;
+      --  Sorted boundaries of bottom-most nodes, used to look for nodes from
+      --  source locations in logarithmic time. This is computed lazily (empty
+      --  when not computed yet) and cleared every time Unit.AST_Root changes.
+      --  See Lookup_Node.
+
       Rebindings : aliased Env_Rebindings_Vectors.Vector;
       --  List of rebindings for which Old_Env and/or New_Env belong to this
       --  unit. When this unit gets destroyed or reparsed, these rebindings
@@ -1080,10 +1199,28 @@ private package ${ada_lib_name}.Implementation is
       % if ctx.has_memoization:
          Memoization_Map : Memoization_Maps.Map;
          --  Mapping of arguments tuple to property result for memoization
+
+         Mmz_Bytes : Long_Long_Integer := 0;
+         --  Estimated number of bytes used by entries in Memoization_Map
       % endif
 
       Cache_Version : Natural := 0;
       --  See the eponym field in Analysis_Context_Type
+
+      From_File : Boolean := False;
+      Read_BOM  : Boolean := False;
+      --  Whether the last parsing of this unit read its source file (as
+      --  opposed to a buffer) and if so, whether it looked for a byte order
+      --  mark. Only units parsed from files can be evicted, as they can be
+      --  transparently parsed again later.
+
+      Is_Evicted : Boolean := False;
+      --  Whether this unit was evicted to honor the context's unit memory
+      --  limit: its tree, tokens and source buffer are released until it is
+      --  used again. See Ensure_Loaded.
+
+      Last_Used : Long_Long_Integer := 0;
+      --  Value of Context.Unit_Use_Clock when this unit was last used
    end record;
 
    procedure Free is new Ada.Unchecked_Deallocation
@@ -1097,6 +1234,8 @@ private package ${ada_lib_name}.Implementation is
       Diagnostics  : Diagnostics_Vectors.Vector;
       AST_Mem_Pool : Bump_Ptr_Pool;
       AST_Root     : ${T.root_node.name};
+      From_File    : Boolean := False;
+      Read_BOM     : Boolean := False;
    end record;
    --  Holder for fields affected by an analysis unit reparse. This makes it
    --  possible to separate the "reparsing" and the "replace" steps.
@@ -1265,6 +1404,9 @@ private package ${ada_lib_name}.Implementation is
    function Trivia_Count (Unit : Internal_Unit) return Natural;
    --  Implementation for Analysis.Trivia_Count
 
+   function Memory_Usage (Unit : Internal_Unit) return Memory_Usage_Stats;
+   --  Implementation for Analysis.Memory_Usage
+
    function Text (Unit : Internal_Unit) return Text_Type;
    --  Implementation for Analysis.Text
 
@@ -1272,6 +1414,31 @@ private package ${ada_lib_name}.Implementation is
      (Unit : Internal_Unit; Sloc : Source_Location) return Token_Reference;
    --  Implementation for Analysis.Lookup_Token
 
+   procedure Get_Line_Tokens
+     (Unit        : Internal_Unit;
+      Line        : Line_Number;
+      First, Last : out Token_Reference);
+   --  Set First and Last to the first and the last tokens/trivia in Unit that
+   --  overlap with the given Line. Set both to No_Token if there is none.
+
+   function Node_At_Preorder_Index
+     (Unit : Internal_Unit; Index : Positive) return ${T.root_node.name};
+   --  Implementation for Analysis.Node_At_Preorder_Index
+
+   procedure Compute_Preorder_Indexes (Unit : Internal_Unit);
+   --  Assign preorder indexes to all the nodes in Unit's tree and register
+   --  them in Unit.Nodes. This must be called every time Unit.AST_Root
+   --  changes.
+
+   procedure Compute_Sloc_Index (Unit : Internal_Unit);
+   --  Compute Unit.Sloc_Index from Unit.AST_Root
+
+   function Lookup_Node
+     (Unit : Internal_Unit; Sloc : Source_Location) return ${T.root_node.name};
+   --  Implementation for Analysis.Lookup_Node. Compute Unit.Sloc_Index if
+   --  needed and use it to return the bottom-most node in Unit that contains
+   --  Sloc, or null if there is none.
+
    procedure Dump_Lexical_Env (Unit : Internal_Unit);
    --  Implementation for Analysis.Dump_Lexical_Env
 
@@ -1289,12 +1456,73 @@ private package ${ada_lib_name}.Implementation is
 
    procedure Invalidate_Caches
      (Context : Internal_Context; Invalidate_Envs : Boolean);
-   --  Invalidate memoization caches. If Invalidate_Envs is true, also
-   --  invalidate referenced envs caches.
+   --  Increase Context's version number, so that the results of memoized
+   --  properties currently being evaluated are not stored. If Invalidate_Envs
+   --  is true, also invalidate referenced envs caches.
 
    procedure Reset_Caches (Unit : Internal_Unit);
-   --  Destroy Unit's memoization cache. This resets Unit's version number to
-   --  Unit.Context.Cache_Version.
+   --  Recompute Unit's referenced envs if they are stale. This resets Unit's
+   --  version number to Unit.Context.Reparse_Cache_Version.
+
+   procedure Memoization_Invalidation_Stats
+     (Context                : Internal_Context;
+      Invalidated, Surviving : out Long_Long_Integer);
+   --  Implementation for Analysis.Memoization_Invalidation_Stats
+
+   function Memoized_Properties_Count return Natural;
+   --  Implementation for Analysis.Memoized_Properties_Count
+
+   function Memoized_Property_Name (Index : Positive) return String;
+   --  Implementation for Analysis.Memoized_Property_Name
+
+   function Memoization_Stats
+     (Context : Internal_Context;
+      Index   : Positive) return Memoized_Property_Stats;
+   --  Implementation for Analysis.Memoization_Stats
+
+   procedure Set_Memoization_Memory_Limit
+     (Context : Internal_Context;
+      Limit   : Long_Long_Integer;
+      Policy  : Memoization_Eviction_Policy);
+   --  Implementation for Analysis.Set_Memoization_Memory_Limit
+
+   function Memory_Usage
+     (Context : Internal_Context) return Memory_Usage_Stats;
+   --  Implementation for Analysis.Memory_Usage
+
+   procedure Set_Event_Handler
+     (Context : Internal_Context; Handler : Event_Handler_Access);
+   --  Implementation for Analysis.Set_Event_Handler
+
+   procedure Set_Unit_Memory_Limit
+     (Context : Internal_Context; Limit : Long_Long_Integer);
+   --  Implementation for Analysis.Set_Unit_Memory_Limit
+
+   function Is_Evicted (Unit : Internal_Unit) return Boolean;
+   --  Implementation for Analysis.Is_Evicted
+
+   procedure Set_Parse_Cache_Directory
+     (Context : Internal_Context; Directory : String);
+   --  Implementation for Analysis.Set_Parse_Cache_Directory
+
+   procedure Set_Compact_Source_Buffers
+     (Context : Internal_Context; Enabled : Boolean);
+   --  Implementation for Analysis.Set_Compact_Source_Buffers
+
+   procedure Ensure_Loaded (Unit : Internal_Unit);
+   --  Record that Unit is being used, for the LRU unit eviction policy. If
+   --  Unit was evicted, parse it again from its source file first, or raise a
+   --  Precondition_Failure if properties are being evaluated. This must be
+   --  called before accessing Unit's tree, tokens or diagnostics on behalf of
+   --  users.
+
+   procedure Evict_Units
+     (Context : Internal_Context; Keep : Internal_Unit := No_Analysis_Unit);
+   --  Evict the least recently used units in Context (except Keep) until the
+   --  memory used by units fits in its unit memory limit. Do nothing if there
+   --  is no such limit or if the analysis is in progress (property evaluation,
+   --  lexical environment population, tree rewriting), as evicting units then
+   --  could destroy nodes that are in use.
 
    procedure Reference_Unit (From, Referenced : Internal_Unit);
    --  Set the Referenced unit as being referenced from the From unit. This is
@@ -73,8 +73,20 @@ package body ${ada_lib_name}.Lexer_Implementation is
 
    generic
       With_Trivia : Boolean;
+
+      type Char_Type is (<>);
+      type Input_Type is array (Positive range <>) of Char_Type;
+      type Input_Access is access all Input_Type;
+      with package State_Machine is new Generic_State_Machine
+        (Char_Type, Input_Type, Input_Access);
+      --  Representation for the input buffer (see
+      --  Token_Data_Handler.Compact_Buffer) and the corresponding lexer
+      --  automaton.
+
+      with function To_Text (Input : Input_Type) return Text_Type;
+      --  Return the text corresponding to Input
    procedure Process_All_Tokens
-     (Input       : Text_Access;
+     (Input       : Input_Access;
       Input_First : Positive;
       Input_Last  : Natural;
       Tab_Stop    : Positive;
@@ -92,13 +104,14 @@ package body ${ada_lib_name}.Lexer_Implementation is
    ------------------------
 
    procedure Process_All_Tokens
-     (Input       : Text_Access;
+     (Input       : Input_Access;
       Input_First : Positive;
       Input_Last  : Natural;
       Tab_Stop    : Positive;
       TDH         : in out Token_Data_Handler;
       Diagnostics : in out Diagnostics_Vectors.Vector)
    is
+      use State_Machine;
 
       Token    : Lexed_Token;
       Token_Id : Token_Kind := ${termination};
@@ -114,8 +127,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
       --  Source location after scanning the current token
 
       Last_Token_Last : Natural := Input'First - 1;
-      --  Index in TDH.Source_Buffer for the last character of the previous
-      --  token. Used to process chunks of ignored text.
+      --  Index in Input for the last character of the previous token. Used to
+      --  process chunks of ignored text.
 
       ## Variables specific to indentation tracking
       % if lexer.track_indent:
@@ -150,8 +163,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
       --  accordingly.
 
       function Source_First return Positive is (Token.Text_First);
-      --  Index in TDH.Source_Buffer for the first character corresponding to
-      --  the current token.
+      --  Index in Input for the first character corresponding to the current
+      --  token.
 
       function Source_Last return Natural is (Token.Text_Last);
       --  Likewise, for the last character
@@ -161,7 +174,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
       --  Create a sloc range value corresponding to Token
 
       function Sloc_After
-        (Base_Sloc : Source_Location; Text : Text_Type) return Source_Location;
+        (Base_Sloc : Source_Location; Text : Input_Type)
+         return Source_Location;
       --  Return Base_Sloc updated as if Text was appended
 
       ------------------
@@ -208,32 +222,24 @@ package body ${ada_lib_name}.Lexer_Implementation is
       ----------------
 
       function Sloc_After
-        (Base_Sloc : Source_Location; Text : Text_Type) return Source_Location
-      is
+        (Base_Sloc : Source_Location; Text : Input_Type)
+         return Source_Location is
       begin
          return Result : Source_Location := Base_Sloc do
             --  TODO: use the Unicode algorithm to account for grapheme
             --  clusters.
             for T of Text loop
-               case T is
-                  when Chars.LF =>
+               declare
+                  C : constant Character_Type :=
+                     Character_Type'Val (Char_Type'Pos (T));
+               begin
+                  if C = Chars.LF then
                      Result := (Result.Line + 1, 1);
-
-                  when Chars.HT =>
-                     --  Make horizontal tabulations move by stride of 8
-                     --  columns, as usually implemented in code editors.
-                     declare
-                        Zero_Based : constant Natural :=
-                           Natural (Result.Column - 1);
-                        Aligned    : constant Natural :=
-                           (Zero_Based + Tab_Stop) / Tab_Stop * Tab_Stop;
-                     begin
-                        Result.Column := Column_Number (Aligned + 1);
-                     end;
-
-                  when others =>
-                     Result.Column := Result.Column + 1;
-               end case;
+                  else
+                     Result.Column :=
+                        Column_After (C, Result.Column, Tab_Stop);
+                  end if;
+               end;
             end loop;
          end return;
       end Sloc_After;
@@ -261,8 +267,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
          --  Initialize the first sloc for the token to come. For this, process
          --  the text that was ignored since the last token.
          declare
-            Ignored_Text : Text_Type renames
-               TDH.Source_Buffer (Last_Token_Last + 1 .. Source_First - 1);
+            Ignored_Text : Input_Type renames
+               Input (Last_Token_Last + 1 .. Source_First - 1);
          begin
             Current_Sloc := Sloc_After (Current_Sloc, Ignored_Text);
             Last_Token_Last := Source_Last;
@@ -271,7 +277,7 @@ package body ${ada_lib_name}.Lexer_Implementation is
          --  Then update Next_Sloc according to Token's text
          if Token_Id /= ${termination} then
             declare
-               Text : Text_Type renames Input (Source_First .. Source_Last);
+               Text : Input_Type renames Input (Source_First .. Source_Last);
             begin
                Next_Sloc := Sloc_After (Current_Sloc, Text);
             end;
@@ -285,8 +291,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
             when ${' | '.join(with_symbol_actions)} =>
                if TDH.Symbols /= No_Symbol_Table then
                   declare
-                     Bounded_Text : Text_Type renames
-                        Input (Token.Text_First .. Token.Text_Last);
+                     Bounded_Text : constant Text_Type :=
+                        To_Text (Input (Token.Text_First .. Token.Text_Last));
 
                      Symbol_Res : constant Symbolization_Result :=
                         % if ctx.symbol_canonicalizer:
@@ -439,8 +445,26 @@ package body ${ada_lib_name}.Lexer_Implementation is
 
    end Process_All_Tokens;
 
-   procedure Process_All_Tokens_With_Trivia is new Process_All_Tokens (True);
-   procedure Process_All_Tokens_No_Trivia is new Process_All_Tokens (False);
+   function Identity (Input : Text_Type) return Text_Type is (Input);
+   --  To_Text formal for the lexing of UTF-32 source buffers
+
+   package Text_State_Machine is new Generic_State_Machine
+     (Character_Type, Text_Type, Text_Access);
+   package Compact_State_Machine is new Generic_State_Machine
+     (Character, String, Compact_Text_Access);
+
+   procedure Process_All_Tokens_With_Trivia is new Process_All_Tokens
+     (True, Character_Type, Text_Type, Text_Access, Text_State_Machine,
+      Identity);
+   procedure Process_All_Tokens_No_Trivia is new Process_All_Tokens
+     (False, Character_Type, Text_Type, Text_Access, Text_State_Machine,
+      Identity);
+   procedure Process_All_Compact_Tokens_With_Trivia is new Process_All_Tokens
+     (True, Character, String, Compact_Text_Access, Compact_State_Machine,
+      From_Latin_1);
+   procedure Process_All_Compact_Tokens_No_Trivia is new Process_All_Tokens
+     (False, Character, String, Compact_Text_Access, Compact_State_Machine,
+      From_Latin_1);
 
    ----------------------------
    -- Lex_From_Buffer_Helper --
@@ -459,15 +483,30 @@ package body ${ada_lib_name}.Lexer_Implementation is
       --  In the case we are reparsing an analysis unit, we want to get rid of
       --  the tokens from the old one.
 
-      Reset (TDH, Decoded_Buffer, Source_First, Source_Last);
+      Reset (TDH, Decoded_Buffer, Source_First, Source_Last, Tab_Stop);
 
-      if With_Trivia then
+      --  Reset may have switched TDH to the compact representation for the
+      --  source buffer, in which case it freed Decoded_Buffer: lex the source
+      --  buffer that TDH uses.
+
+      if Is_Compact (TDH) then
+         if With_Trivia then
+            Process_All_Compact_Tokens_With_Trivia
+              (TDH.Compact_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
+               Diagnostics);
+         else
+            Process_All_Compact_Tokens_No_Trivia
+              (TDH.Compact_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
+               Diagnostics);
+         end if;
+
+      elsif With_Trivia then
          Process_All_Tokens_With_Trivia
-           (Decoded_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
+           (TDH.Source_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
             Diagnostics);
       else
          Process_All_Tokens_No_Trivia
-           (Decoded_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
+           (TDH.Source_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
             Diagnostics);
       end if;
    end Extract_Tokens_From_Text_Buffer;
@@ -643,6 +682,27 @@ package body ${ada_lib_name}.Lexer_Implementation is
             then BOM_Kind_To_Charset (BOM).all
             else Charset);
       begin
+         --  Source files are very often pure ASCII or UTF-8: try to decode
+         --  them without going through iconv first. If this fails (invalid
+         --  input), use iconv anyway so that errors are reported the usual
+         --  way.
+
+         if Has_Fast_Decoder (Actual_Charset) then
+            declare
+               Decoded : Boolean;
+            begin
+               Fast_Decode
+                 (Buffer (Input_Index .. Buffer'Last),
+                  Actual_Charset,
+                  Result.all,
+                  Source_Last,
+                  Decoded);
+               if Decoded then
+                  return;
+               end if;
+            end;
+         end if;
+
          State := Iconv_Open (Text_Charset, Actual_Charset);
       exception
          when Unsupported_Conversion =>
@@ -715,8 +775,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
    begin
       if T.Symbol = null then
          declare
-            Text   : Text_Type renames
-               TDH.Source_Buffer (T.Source_First ..  T.Source_Last);
+            Text   : constant Text_Type :=
+               Source_Text (TDH, T.Source_First, T.Source_Last);
             Symbol : constant Symbolization_Result :=
                % if ctx.symbol_canonicalizer:
                   ${ctx.symbol_canonicalizer.fqn} (Text)
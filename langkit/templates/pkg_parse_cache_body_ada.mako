@@ -0,0 +1,638 @@
+## vim: filetype=makoada
+
+with Ada.Calendar;
+with Ada.Directories;
+with Ada.Exceptions;
+with Ada.Streams;            use Ada.Streams;
+with Ada.Streams.Stream_IO;
+with Ada.Strings.Unbounded;  use Ada.Strings.Unbounded;
+with System;                 use System;
+with System.Storage_Elements; use System.Storage_Elements;
+
+with GNAT.OS_Lib;
+with GNAT.SHA1;
+
+with GNATCOLL.Mmap;  use GNATCOLL.Mmap;
+with GNATCOLL.Traces;
+with GNATCOLL.VFS;   use GNATCOLL.VFS;
+
+with Langkit_Support.Images; use Langkit_Support.Images;
+with Langkit_Support.Slocs;  use Langkit_Support.Slocs;
+with Langkit_Support.Text;   use Langkit_Support.Text;
+
+with ${ada_lib_name}.Parsers; use ${ada_lib_name}.Parsers;
+
+package body ${ada_lib_name}.Parse_Cache is
+
+   Magic   : constant String := "LKPC";
+   Version : constant := 1;
+
+   No_Kind : constant := -1;
+   --  Kind for null nodes in cache entries
+
+   Temp_File_Pattern : constant String := "*.lkpc.*.tmp";
+   --  Pattern for the names of the temporary files that Save creates
+
+   Stale_Temp_File_Age : constant Duration := 3600.0;
+   --  Age after which Delete_Stale_Temp_Files considers that temporary files
+   --  were left behind by killed processes.
+
+   type Entry_Header is record
+      Magic                     : String (1 .. 4);
+      Version                   : Integer;
+      Token_Size, Node_Size     : Integer;
+      Source_First              : Integer;
+      Source_Last               : Integer;
+      Token_Count, Trivia_Count : Integer;
+      Map_Count, Node_Count     : Integer;
+   end record;
+   --  Header for cache entries. Token_Size and Node_Size are the sizes (in
+   --  bytes) of Cached_Token and Cached_Node, so that entries written with a
+   --  different memory layout are rejected.
+
+   type Cached_Token is record
+      Kind         : Raw_Token_Kind;
+      Source_First : Positive;
+      Source_Last  : Natural;
+      Sloc_Range   : Source_Location_Range;
+      Has_Next     : Boolean;
+   end record;
+   --  Cache entry data for a token or a trivia. Has_Next is always False for
+   --  tokens.
+
+   type Cached_Node is record
+      Kind                   : Integer;
+      Token_Start, Token_End : Token_Index;
+      Count                  : Natural;
+   end record;
+   --  Cache entry data for a node: the position of its kind in the node kind
+   --  type (or No_Kind for null nodes), its token bounds and its number of
+   --  children.
+
+   type Cached_Token_Array is array (Positive range <>) of Cached_Token;
+   type Cached_Node_Array is array (Positive range <>) of Cached_Node;
+
+   Header_Bytes : constant Storage_Offset :=
+      Entry_Header'Object_Size / Storage_Unit;
+   Char_Bytes   : constant Storage_Offset :=
+      Wide_Wide_Character'Object_Size / Storage_Unit;
+   Token_Bytes  : constant Storage_Offset :=
+      Cached_Token'Object_Size / Storage_Unit;
+   Map_Bytes    : constant Storage_Offset :=
+      Integer'Object_Size / Storage_Unit;
+   Node_Bytes   : constant Storage_Offset :=
+      Cached_Node'Object_Size / Storage_Unit;
+   --  Size of each item in cache entries
+
+   Invalid_Entry : exception;
+   --  Exception raised when decoding an invalid cache entry
+
+   function Entry_Size (Header : Entry_Header) return Storage_Offset
+   is (Header_Bytes
+       + Char_Bytes * Storage_Offset
+           (Integer'Max (0, Header.Source_Last - Header.Source_First + 1))
+       + Token_Bytes * Storage_Offset (Header.Token_Count)
+       + Token_Bytes * Storage_Offset (Header.Trivia_Count)
+       + Map_Bytes * Storage_Offset (Header.Map_Count)
+       + Node_Bytes * Storage_Offset (Header.Node_Count));
+   --  Return the size in bytes of a cache entry with the given header
+
+   ----------------
+   -- Entry_Name --
+   ----------------
+
+   function Entry_Name
+     (Unit : Internal_Unit; Input : Internal_Lexer_Input) return String
+   is
+      Context : constant Internal_Context := Unit.Context;
+      Digest  : GNAT.SHA1.Context := GNAT.SHA1.Initial_Context;
+
+      procedure Add (Item : String);
+      --  Add Item to the digest, with a terminator so that the digest of
+      --  consecutive items is not ambiguous.
+
+      ---------
+      -- Add --
+      ---------
+
+      procedure Add (Item : String) is
+      begin
+         GNAT.SHA1.Update (Digest, Item);
+         GNAT.SHA1.Update (Digest, (1 => ASCII.NUL));
+      end Add;
+
+   begin
+      Add (Build_Id);
+      Add (Grammar_Rule'Image (Unit.Rule));
+      Add (To_String (Input.Charset));
+      Add (Boolean'Image (Input.Read_BOM));
+      Add (Stripped_Image (Context.Tab_Stop));
+      Add (Boolean'Image (Context.With_Trivia));
+
+      if Input.Filename.Is_Directory
+         or else not Input.Filename.Is_Readable
+      then
+         return "";
+      end if;
+
+      declare
+         File   : Mapped_File := Open_Read (+Input.Filename.Full_Name.all);
+         Region : Mapped_Region := Read (File);
+         Buffer : String (1 .. Last (Region))
+            with Import, Address => Data (Region).all'Address;
+      begin
+         GNAT.SHA1.Update (Digest, Buffer);
+         Free (Region);
+         Close (File);
+      end;
+
+      return Ada.Directories.Compose
+        (To_String (Context.Parse_Cache_Directory),
+         GNAT.SHA1.Digest (Digest),
+         "lkpc");
+   exception
+      when Exc : others =>
+         GNATCOLL.Traces.Trace
+           (Main_Trace,
+            "WARNING: Cannot compute parse cache entry name for "
+            & Basename (Unit) & ": "
+            & Ada.Exceptions.Exception_Information (Exc));
+         return "";
+   end Entry_Name;
+
+   ----------
+   -- Load --
+   ----------
+
+   function Load
+     (Entry_Name : String;
+      Unit       : Internal_Unit;
+      Input      : Internal_Lexer_Input;
+      TDH        : in out Token_Data_Handler;
+      Pool       : out Bump_Ptr_Pool;
+      Root       : out ${T.root_node.name}) return Boolean
+   is
+      File   : Mapped_File := Invalid_Mapped_File;
+      Region : Mapped_Region := Invalid_Mapped_Region;
+   begin
+      Pool := No_Pool;
+      Root := null;
+
+      --  Cache misses are expected to be frequent: do not bother opening
+      --  missing entries.
+
+      if not GNAT.OS_Lib.Is_Regular_File (Entry_Name) then
+         return False;
+      end if;
+
+      File := Open_Read (Entry_Name);
+      Region := Read (File);
+
+      if Storage_Offset (Last (Region)) < Header_Bytes then
+         raise Invalid_Entry with "truncated header";
+      end if;
+
+      declare
+         Base   : constant Address := Data (Region).all'Address;
+         Header : Entry_Header with Import, Address => Base;
+      begin
+         if Header.Magic /= Magic
+            or else Header.Version /= Version
+            or else Storage_Offset (Header.Token_Size) /= Token_Bytes
+            or else Storage_Offset (Header.Node_Size) /= Node_Bytes
+            or else Header.Source_First < 1
+            or else Header.Source_Last < Header.Source_First - 1
+            or else Header.Token_Count < 0
+            or else Header.Trivia_Count < 0
+            or else Header.Map_Count /= Header.Token_Count + 1
+            or else Header.Node_Count < 1
+            or else Entry_Size (Header) /= Storage_Offset (Last (Region))
+         then
+            raise Invalid_Entry with "invalid header";
+         end if;
+
+         declare
+            Source_Address : constant Address := Base + Header_Bytes;
+            Source         : Text_Type
+              (Header.Source_First .. Header.Source_Last)
+               with Import, Address => Source_Address;
+
+            Tokens_Address : constant Address :=
+               Source_Address + Char_Bytes * Source'Length;
+            Tokens         : Cached_Token_Array (1 .. Header.Token_Count)
+               with Import, Address => Tokens_Address;
+
+            Trivias_Address : constant Address :=
+               Tokens_Address + Token_Bytes * Tokens'Length;
+            Trivias         : Cached_Token_Array (1 .. Header.Trivia_Count)
+               with Import, Address => Trivias_Address;
+
+            Map_Address : constant Address :=
+               Trivias_Address + Token_Bytes * Trivias'Length;
+            Map         : Integer_Vectors.Elements_Array
+              (1 .. Header.Map_Count)
+               with Import, Address => Map_Address;
+
+            Nodes_Address : constant Address :=
+               Map_Address + Map_Bytes * Map'Length;
+            Nodes         : Cached_Node_Array (1 .. Header.Node_Count)
+               with Import, Address => Nodes_Address;
+
+            Next_Node : Positive := Nodes'First;
+            --  Index in Nodes of the next node to load
+
+            function To_Token_Data
+              (T : Cached_Token) return Stored_Token_Data;
+            --  Check that T is valid and return the corresponding token data
+
+            function Load_Node
+              (Parent : ${T.root_node.name}) return ${T.root_node.name};
+            --  Load the subtree that starts at Nodes (Next_Node), using
+            --  Parent as the parent for its root.
+
+            -------------------
+            -- To_Token_Data --
+            -------------------
+
+            function To_Token_Data
+              (T : Cached_Token) return Stored_Token_Data is
+            begin
+               if T.Source_First > Source'Last + 1
+                  or else T.Source_Last > Source'Last
+               then
+                  raise Invalid_Entry with "invalid token";
+               end if;
+               return (Kind         => T.Kind,
+                       Source_First => T.Source_First,
+                       Source_Last  => T.Source_Last,
+                       Symbol       => null,
+                       Sloc_Range   => T.Sloc_Range);
+            end To_Token_Data;
+
+            ---------------
+            -- Load_Node --
+            ---------------
+
+            function Load_Node
+              (Parent : ${T.root_node.name}) return ${T.root_node.name}
+            is
+               N      : Cached_Node;
+               Kind   : ${T.node_kind};
+               Result : ${T.root_node.name};
+            begin
+               if Next_Node > Nodes'Last then
+                  raise Invalid_Entry with "truncated tree";
+               end if;
+               N := Nodes (Next_Node);
+               Next_Node := Next_Node + 1;
+
+               if N.Kind = No_Kind then
+                  return null;
+               elsif N.Kind not in ${T.node_kind}'Pos (${T.node_kind}'First)
+                                 .. ${T.node_kind}'Pos (${T.node_kind}'Last)
+                  or else N.Token_Start
+                          not in No_Token_Index
+                                 .. Token_Index (Header.Token_Count)
+                  or else N.Token_End
+                          not in No_Token_Index
+                                 .. Token_Index (Header.Token_Count)
+               then
+                  raise Invalid_Entry with "invalid node";
+               end if;
+
+               Kind := ${T.node_kind}'Val (N.Kind);
+               Result := ${T.root_node.name} (Allocate_Node (Pool, Kind));
+               Initialize
+                 (Self              => Result,
+                  Kind              => Kind,
+                  Unit              => Unit,
+                  Token_Start_Index => N.Token_Start,
+                  Token_End_Index   => N.Token_End,
+                  Parent            => Parent);
+
+               --  Then load children, and initialize the node fields that
+               --  reference them the same way parsers do.
+
+               if Kind_To_Node_Children_Count (Kind) = -1 then
+                  if N.Count > Nodes'Last - Next_Node + 1 then
+                     raise Invalid_Entry with "invalid list node";
+                  end if;
+
+                  Result.Count := N.Count;
+                  Result.Nodes :=
+                     Alloc_AST_List_Array.Alloc (Pool, N.Count);
+                  for I in 1 .. N.Count loop
+                     Result.Nodes (I) := Load_Node (Result);
+                  end loop;
+                  return Result;
+
+               elsif N.Count /= Kind_To_Node_Children_Count (Kind) then
+                  raise Invalid_Entry with "invalid node";
+               end if;
+
+               case Kind is
+                  % for cls in ctx.astnode_types:
+                     % if not cls.abstract and not cls.is_list_type \
+                           and cls.has_fields_initializer:
+                        <%
+                           parse_fields = [
+                              f for f in cls.fields_to_initialize(
+                                 include_inherited=True
+                              )
+                              if not f.is_user_field
+                           ]
+                        %>
+                        when ${cls.ada_kind_name} =>
+                           declare
+                              % for f in parse_fields:
+                                 ${f.name} : constant ${f.type.name} :=
+                                    Load_Node (Result);
+                              % endfor
+                           begin
+                              Initialize_Fields_For_${cls.kwless_raw_name}
+                                (Self => Result${''.join(
+                                    ', {0} => {0}'.format(f.name)
+                                    for f in parse_fields
+                                )});
+                           end;
+                     % endif
+                  % endfor
+                  when others =>
+                     null;
+               end case;
+               return Result;
+            end Load_Node;
+
+         begin
+            --  Rebuild token data: first the source buffer, then tokens and
+            --  trivia.
+
+            declare
+               Buffer : constant Text_Access :=
+                  new Text_Type'(Source);
+            begin
+               Reset (TDH, Buffer, Source'First, Source'Last,
+                      Unit.Context.Tab_Stop);
+            end;
+            TDH.Filename := Input.Filename;
+            TDH.Charset := Input.Charset;
+
+            for T of Tokens loop
+               TDH.Tokens.Append (To_Token_Data (T));
+            end loop;
+            for T of Trivias loop
+               TDH.Trivias.Append ((T        => To_Token_Data (T),
+                                    Has_Next => T.Has_Next));
+            end loop;
+            for M of Map loop
+               if M not in Integer (No_Token_Index) .. Trivias'Last then
+                  raise Invalid_Entry with "invalid trivia index";
+               end if;
+            end loop;
+            Integer_Vectors.Concat (TDH.Tokens_To_Trivias, Map);
+
+            --  Then rebuild the parse tree
+
+            Pool := Create;
+            Root := Load_Node (null);
+            if Next_Node /= Nodes'Last + 1 then
+               raise Invalid_Entry with "trailing nodes";
+            end if;
+         end;
+      end;
+
+      Free (Region);
+      Close (File);
+      return True;
+
+   exception
+      when Exc : others =>
+         GNATCOLL.Traces.Trace
+           (Main_Trace,
+            "WARNING: Cannot load parse cache entry " & Entry_Name & ": "
+            & Ada.Exceptions.Exception_Information (Exc));
+
+         Free (Region);
+         Close (File);
+         Free (Pool);
+         Root := null;
+         Reset (TDH, null, 1, 0, Unit.Context.Tab_Stop);
+         return False;
+   end Load;
+
+   ----------
+   -- Save --
+   ----------
+
+   procedure Save
+     (Entry_Name : String;
+      TDH        : Token_Data_Handler;
+      Root       : ${T.root_node.name})
+   is
+      use Ada.Streams.Stream_IO;
+
+      Temp_Name : constant String :=
+         Entry_Name & "."
+         & Stripped_Image (GNAT.OS_Lib.Pid_To_Integer
+                             (GNAT.OS_Lib.Current_Process_Id))
+         & ".tmp";
+      --  Temporary file in which to write the entry. Its name must match
+      --  Temp_File_Pattern.
+
+      File   : File_Type;
+      Header : Entry_Header :=
+        (Magic        => Magic,
+         Version      => Version,
+         Token_Size   => Integer (Token_Bytes),
+         Node_Size    => Integer (Node_Bytes),
+         Source_First => TDH.Source_First,
+         Source_Last  => TDH.Source_Last,
+         Token_Count  => TDH.Tokens.Length,
+         Trivia_Count => TDH.Trivias.Length,
+         Map_Count    => TDH.Tokens_To_Trivias.Length,
+         Node_Count   => 0);
+
+      procedure Write (Item : Address; Size : Storage_Offset);
+      --  Write the Size bytes at Item to File
+
+      procedure Write_Token (T : Stored_Token_Data; Has_Next : Boolean);
+      --  Write the given token or trivia to File
+
+      procedure Write_Node (Node : ${T.root_node.name});
+      --  Write the subtree rooted at Node to File, counting its nodes in
+      --  Header.Node_Count.
+
+      -----------
+      -- Write --
+      -----------
+
+      procedure Write (Item : Address; Size : Storage_Offset) is
+         Bytes : Stream_Element_Array (1 .. Stream_Element_Offset (Size))
+            with Import, Address => Item;
+      begin
+         Write (File, Bytes);
+      end Write;
+
+      -----------------
+      -- Write_Token --
+      -----------------
+
+      procedure Write_Token (T : Stored_Token_Data; Has_Next : Boolean) is
+         Item : constant Cached_Token :=
+           (Kind         => T.Kind,
+            Source_First => T.Source_First,
+            Source_Last  => T.Source_Last,
+            Sloc_Range   => T.Sloc_Range,
+            Has_Next     => Has_Next);
+      begin
+         Write (Item'Address, Token_Bytes);
+      end Write_Token;
+
+      ----------------
+      -- Write_Node --
+      ----------------
+
+      procedure Write_Node (Node : ${T.root_node.name}) is
+         Item : Cached_Node :=
+           (Kind        => No_Kind,
+            Token_Start => No_Token_Index,
+            Token_End   => No_Token_Index,
+            Count       => 0);
+      begin
+         Header.Node_Count := Header.Node_Count + 1;
+         if Node = null then
+            Write (Item'Address, Node_Bytes);
+            return;
+         end if;
+
+         Item :=
+           (Kind        => ${T.node_kind}'Pos (Node.Kind),
+            Token_Start => Node.Token_Start_Index,
+            Token_End   => Node.Token_End_Index,
+            Count       => Children_Count (Node));
+         Write (Item'Address, Node_Bytes);
+         for I in 1 .. Item.Count loop
+            Write_Node (Child (Node, I));
+         end loop;
+      end Write_Node;
+
+   begin
+      Ada.Directories.Create_Path
+        (Ada.Directories.Containing_Directory (Entry_Name));
+      Create (File, Out_File, Temp_Name);
+
+      --  Write a first header to reserve its space: we will know the number
+      --  of nodes only once the tree is written.
+
+      Write (Header'Address, Header_Bytes);
+      if Is_Compact (TDH) then
+
+         --  Entries always contain the UTF-32 source buffer: convert the
+         --  compact one chunk by chunk.
+
+         declare
+            Chunk_First : Positive := TDH.Source_First;
+            Chunk_Last  : Natural;
+         begin
+            while Chunk_First <= TDH.Source_Last loop
+               Chunk_Last := Natural'Min (Chunk_First + 4095, TDH.Source_Last);
+               declare
+                  Chunk : constant Text_Type :=
+                     Source_Text (TDH, Chunk_First, Chunk_Last);
+               begin
+                  Write (Chunk'Address,
+                         Char_Bytes * Storage_Offset (Chunk'Length));
+               end;
+               Chunk_First := Chunk_Last + 1;
+            end loop;
+         end;
+
+      elsif TDH.Source_Last >= TDH.Source_First then
+         Write (TDH.Source_Buffer (TDH.Source_First)'Address,
+                Char_Bytes * Storage_Offset
+                               (TDH.Source_Last - TDH.Source_First + 1));
+      end if;
+      for T of TDH.Tokens loop
+         Write_Token (T, Has_Next => False);
+      end loop;
+      for T of TDH.Trivias loop
+         Write_Token (T.T, T.Has_Next);
+      end loop;
+      for M of TDH.Tokens_To_Trivias loop
+         declare
+            Item : constant Integer := M;
+         begin
+            Write (Item'Address, Map_Bytes);
+         end;
+      end loop;
+      Write_Node (Root);
+
+      Set_Index (File, 1);
+      Write (Header'Address, Header_Bytes);
+      Close (File);
+
+      declare
+         Success : Boolean;
+      begin
+         GNAT.OS_Lib.Rename_File (Temp_Name, Entry_Name, Success);
+         if not Success then
+            GNAT.OS_Lib.Delete_File (Temp_Name, Success);
+         end if;
+      end;
+
+   exception
+      when Exc : others =>
+         GNATCOLL.Traces.Trace
+           (Main_Trace,
+            "WARNING: Cannot save parse cache entry " & Entry_Name & ": "
+            & Ada.Exceptions.Exception_Information (Exc));
+
+         if Is_Open (File) then
+            Close (File);
+         end if;
+         declare
+            Dummy : Boolean;
+         begin
+            GNAT.OS_Lib.Delete_File (Temp_Name, Dummy);
+         end;
+   end Save;
+
+   -----------------------------
+   -- Delete_Stale_Temp_Files --
+   -----------------------------
+
+   procedure Delete_Stale_Temp_Files (Directory : String) is
+      use Ada.Directories;
+      use type Ada.Calendar.Time;
+
+      Now    : constant Ada.Calendar.Time := Ada.Calendar.Clock;
+      Search : Search_Type;
+      Item   : Directory_Entry_Type;
+      Dummy  : Boolean;
+   begin
+      if not Exists (Directory) then
+         return;
+      end if;
+
+      Start_Search
+        (Search,
+         Directory => Directory,
+         Pattern   => Temp_File_Pattern,
+         Filter    => (Ordinary_File => True, others => False));
+      while More_Entries (Search) loop
+         Get_Next_Entry (Search, Item);
+         if Now - Modification_Time (Item) > Stale_Temp_File_Age then
+            GNAT.OS_Lib.Delete_File (Full_Name (Item), Dummy);
+         end if;
+      end loop;
+      End_Search (Search);
+
+   exception
+      when Exc : others =>
+         GNATCOLL.Traces.Trace
+           (Main_Trace,
+            "WARNING: Cannot delete stale parse cache files in " & Directory
+            & ": " & Ada.Exceptions.Exception_Information (Exc));
+   end Delete_Stale_Temp_Files;
+
+end ${ada_lib_name}.Parse_Cache;
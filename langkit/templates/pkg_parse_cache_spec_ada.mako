@@ -0,0 +1,85 @@
+## vim: filetype=makoada
+
+--  This package implements the on-disk parse cache (see
+--  Analysis.Set_Parse_Cache_Directory): it saves the tokens and the parse tree
+--  of units parsed from source files, so that parsing the same source file
+--  again just reloads them.
+--
+--  Cache entries are files named after a SHA-1 digest of the source file
+--  contents and of everything else that affects parsing: the identifier of
+--  the library build (Build_Id), the grammar rule, the charset, the BOM
+--  handling, the tab stop and whether trivia are kept. Each entry is only
+--  meant to be read on the host that wrote it: it uses the native memory
+--  layout of the records below, so that it can be loaded with bulk copies.
+--  Entries contain, in order:
+--
+--  * A header (Entry_Header in the body): magic bytes, format version, sizes
+--    of the records below, bounds of the source buffer and length of each
+--    table.
+--
+--  * The decoded source buffer, in UTF-32 even for units that use the compact
+--    representation (see Token_Data_Handler.Compact_Buffer).
+--
+--  * The tokens, then the trivia: kind, bounds in the source buffer, source
+--    location range and, for trivia, whether another trivia follows. Symbols
+--    are not saved: they are computed again when they are needed.
+--
+--  * The table that maps tokens to the trivia that follow them (see
+--    Token_Data_Handler.Tokens_To_Trivias).
+--
+--  * The parse tree, in preorder: for each node, its kind (-1 for null
+--    nodes), the indexes of its first and last tokens and its number of
+--    children.
+
+with Langkit_Support.Bump_Ptr; use Langkit_Support.Bump_Ptr;
+
+with ${ada_lib_name}.Common; use ${ada_lib_name}.Common;
+use ${ada_lib_name}.Common.Token_Data_Handlers;
+with ${ada_lib_name}.Implementation; use ${ada_lib_name}.Implementation;
+with ${ada_lib_name}.Lexer_Implementation;
+use ${ada_lib_name}.Lexer_Implementation;
+
+private package ${ada_lib_name}.Parse_Cache is
+
+   Build_Id : constant String := "${ctx.parse_cache_build_id}";
+   --  Identifier for the lexer, the parsers and the node types of this
+   --  library. Entries written by a library with a different identifier are
+   --  never used.
+
+   function Entry_Name
+     (Unit : Internal_Unit; Input : Internal_Lexer_Input) return String
+      with Pre => Input.Kind = File;
+   --  Return the name of the cache entry for the parsing of Input into Unit,
+   --  or an empty string if the source file cannot be read.
+
+   function Load
+     (Entry_Name : String;
+      Unit       : Internal_Unit;
+      Input      : Internal_Lexer_Input;
+      TDH        : in out Token_Data_Handler;
+      Pool       : out Bump_Ptr_Pool;
+      Root       : out ${T.root_node.name}) return Boolean;
+   --  Try to rebuild the tokens and the parse tree for Input from the
+   --  Entry_Name cache entry: tokens go to TDH (which must be freshly
+   --  initialized) and nodes go to a new pool, which is stored in Pool. Return
+   --  whether this succeeded. If it did not (missing or invalid entry), TDH is
+   --  left empty and Pool is set to No_Pool.
+
+   procedure Save
+     (Entry_Name : String;
+      TDH        : Token_Data_Handler;
+      Root       : ${T.root_node.name});
+   --  Write the Entry_Name cache entry for the given tokens and parse tree. As
+   --  the parse cache is only an optimization, errors are just traced.
+   --
+   --  The entry is first written to a temporary file next to it, which is
+   --  then renamed, so that other processes never read incomplete entries.
+
+   procedure Delete_Stale_Temp_Files (Directory : String);
+   --  Delete the temporary files that Save left behind in the Directory cache
+   --  directory, which happens when processes are killed while they write
+   --  entries. Recently modified files are kept, as they may belong to
+   --  processes that are still writing them. As for Save, errors are just
+   --  traced.
+
+end ${ada_lib_name}.Parse_Cache;
@@ -0,0 +1,352 @@
+## vim: filetype=makoada
+
+with Ada.Containers.Indefinite_Hashed_Maps;
+with Ada.Containers.Indefinite_Vectors;
+with Ada.Strings.UTF_Encoding.Wide_Wide_Strings;
+use Ada.Strings.UTF_Encoding.Wide_Wide_Strings;
+with Ada.Strings.Wide_Wide_Hash;
+with Ada.Strings.Wide_Wide_Unbounded; use Ada.Strings.Wide_Wide_Unbounded;
+
+with Interfaces; use Interfaces;
+
+with Langkit_Support.Slocs; use Langkit_Support.Slocs;
+with Langkit_Support.Text;  use Langkit_Support.Text;
+
+with ${ada_lib_name}.Common; use ${ada_lib_name}.Common;
+use ${ada_lib_name}.Common.Token_Data_Handlers;
+with ${ada_lib_name}.Introspection_Implementation;
+use ${ada_lib_name}.Introspection_Implementation;
+
+package body ${ada_lib_name}.Serialization is
+
+   Binary_Magic    : constant String := "LKTB";
+   Binary_Version  : constant := 1;
+   Binary_No_Kind  : constant := 16#FFFF#;
+   Binary_No_Token : constant := 16#FFFF_FFFF#;
+
+   List_Kind_Flag  : constant := 1;
+   Token_Kind_Flag : constant := 2;
+
+   package String_Maps is new Ada.Containers.Indefinite_Hashed_Maps
+     (Key_Type        => Text_Type,
+      Element_Type    => Natural,
+      Hash            => Ada.Strings.Wide_Wide_Hash,
+      Equivalent_Keys => "=");
+
+   package String_Vectors is new Ada.Containers.Indefinite_Vectors
+     (Index_Type   => Positive,
+      Element_Type => String);
+
+   procedure Write_Bytes
+     (Stream : not null access Root_Stream_Type'Class; Bytes : String);
+   --  Write Bytes to Stream
+
+   procedure Write_Integer
+     (Stream : not null access Root_Stream_Type'Class;
+      Value  : Unsigned_32;
+      Size   : Positive);
+   --  Write the Size least significant bytes of Value to Stream, in
+   --  little-endian order.
+
+   procedure Write_String
+     (Stream : not null access Root_Stream_Type'Class; S : String);
+   --  Write S to Stream as a binary format string
+
+   function JSON_String (Text : Text_Type) return String;
+   --  Return a JSON string literal for Text
+
+   function Has_Variable_Children (Kind : ${T.node_kind}) return Boolean
+   is (Kind_To_Node_Children_Count (Kind) = -1);
+   --  Return whether nodes of the given kind are lists
+
+   function Binary_Token_Index (Index : Token_Index) return Unsigned_32
+   is (if Index = No_Token_Index
+       then Binary_No_Token
+       else Unsigned_32 (Index - First_Token_Index));
+   --  Return the binary format encoding for a token index
+
+   procedure Serialize_JSON
+     (Unit : Internal_Unit; Stream : not null access Root_Stream_Type'Class);
+   --  Implementation of Serialize for the JSON format
+
+   procedure Serialize_Binary
+     (Unit : Internal_Unit; Stream : not null access Root_Stream_Type'Class);
+   --  Implementation of Serialize for the binary format
+
+   -----------------
+   -- Write_Bytes --
+   -----------------
+
+   procedure Write_Bytes
+     (Stream : not null access Root_Stream_Type'Class; Bytes : String) is
+   begin
+      String'Write (Stream, Bytes);
+   end Write_Bytes;
+
+   -------------------
+   -- Write_Integer --
+   -------------------
+
+   procedure Write_Integer
+     (Stream : not null access Root_Stream_Type'Class;
+      Value  : Unsigned_32;
+      Size   : Positive)
+   is
+      Buffer : Stream_Element_Array (1 .. Stream_Element_Offset (Size));
+      V      : Unsigned_32 := Value;
+   begin
+      for B of Buffer loop
+         B := Stream_Element (V and 16#FF#);
+         V := Shift_Right (V, 8);
+      end loop;
+      Write (Stream.all, Buffer);
+   end Write_Integer;
+
+   ------------------
+   -- Write_String --
+   ------------------
+
+   procedure Write_String
+     (Stream : not null access Root_Stream_Type'Class; S : String) is
+   begin
+      Write_Integer (Stream, S'Length, 4);
+      Write_Bytes (Stream, S);
+   end Write_String;
+
+   -----------------
+   -- JSON_String --
+   -----------------
+
+   function JSON_String (Text : Text_Type) return String is
+      Hex    : constant Text_Type := "0123456789abcdef";
+      Result : Unbounded_Wide_Wide_String;
+   begin
+      for C of Text loop
+         case C is
+            when '"' | '\' =>
+               Append (Result, '\');
+               Append (Result, C);
+
+            when Wide_Wide_Character'Val (0) .. Wide_Wide_Character'Val (31) =>
+               declare
+                  Code : constant Natural := Wide_Wide_Character'Pos (C);
+               begin
+                  Append (Result, "\u00");
+                  Append (Result, Hex (Hex'First + Code / 16));
+                  Append (Result, Hex (Hex'First + Code mod 16));
+               end;
+
+            when others =>
+               Append (Result, C);
+         end case;
+      end loop;
+      return '"' & Encode (To_Wide_Wide_String (Result)) & '"';
+   end JSON_String;
+
+   --------------------
+   -- Serialize_JSON --
+   --------------------
+
+   procedure Serialize_JSON
+     (Unit : Internal_Unit; Stream : not null access Root_Stream_Type'Class)
+   is
+      procedure Process (Node : ${T.root_node.name});
+      --  Write the JSON representation of Node to Stream
+
+      -------------
+      -- Process --
+      -------------
+
+      procedure Process (Node : ${T.root_node.name}) is
+      begin
+         if Node = null then
+            Write_Bytes (Stream, "null");
+            return;
+         end if;
+
+         Write_Bytes
+           (Stream, "{""kind"":""" & Kind_Name (Node)
+                    & """,""sloc_range"":""" & Image (Sloc_Range (Node))
+                    & """");
+         if Is_Token_Node (Node) then
+            Write_Bytes (Stream, ",""text"":" & JSON_String (Text (Node)));
+         end if;
+
+         if Has_Variable_Children (Node.Kind) then
+            Write_Bytes (Stream, ",""items"":[");
+            for I in 1 .. Children_Count (Node) loop
+               if I > 1 then
+                  Write_Bytes (Stream, ",");
+               end if;
+               Process (Child (Node, I));
+            end loop;
+            Write_Bytes (Stream, "]}");
+
+         else
+            Write_Bytes (Stream, ",""fields"":{");
+            if Children_Count (Node) > 0 then
+               declare
+                  Fields : constant Field_Reference_Array :=
+                     Introspection_Implementation.Fields (Node.Kind);
+               begin
+                  for I in Fields'Range loop
+                     if I > Fields'First then
+                        Write_Bytes (Stream, ",");
+                     end if;
+                     Write_Bytes
+                       (Stream, """" & Field_Name (Fields (I)) & """:");
+                     Process (Child (Node, I - Fields'First + 1));
+                  end loop;
+               end;
+            end if;
+            Write_Bytes (Stream, "}}");
+         end if;
+      end Process;
+
+   begin
+      Process (Unit.AST_Root);
+   end Serialize_JSON;
+
+   ----------------------
+   -- Serialize_Binary --
+   ----------------------
+
+   procedure Serialize_Binary
+     (Unit : Internal_Unit; Stream : not null access Root_Stream_Type'Class)
+   is
+      Strings    : String_Vectors.Vector;
+      String_Map : String_Maps.Map;
+      --  String table for the texts of token nodes, and the corresponding
+      --  mapping from texts to string indexes.
+
+      function String_Index (Text : Text_Type) return Unsigned_32;
+      --  Return the 0-based index of Text in the string table, adding it if
+      --  needed.
+
+      procedure Write_Kinds;
+      --  Write the table of node kinds to Stream
+
+      procedure Process (Node : ${T.root_node.name});
+      --  Write the binary representation of Node to Stream
+
+      ------------------
+      -- String_Index --
+      ------------------
+
+      function String_Index (Text : Text_Type) return Unsigned_32 is
+         Cur : constant String_Maps.Cursor := String_Map.Find (Text);
+      begin
+         if String_Maps.Has_Element (Cur) then
+            return Unsigned_32 (String_Maps.Element (Cur));
+         end if;
+
+         Strings.Append (Encode (Text));
+         String_Map.Insert (Text, Strings.Last_Index - 1);
+         return Unsigned_32 (Strings.Last_Index - 1);
+      end String_Index;
+
+      -----------------
+      -- Write_Kinds --
+      -----------------
+
+      procedure Write_Kinds is
+      begin
+         Write_Integer
+           (Stream, ${T.node_kind}'Pos (${T.node_kind}'Last) + 1, 4);
+         for Kind in ${T.node_kind} loop
+            declare
+               Flags : Unsigned_32 := 0;
+            begin
+               if Has_Variable_Children (Kind) then
+                  Flags := Flags or List_Kind_Flag;
+               end if;
+               if Is_Token_Node (Kind) then
+                  Flags := Flags or Token_Kind_Flag;
+               end if;
+
+               Write_String (Stream, Kind_Name (Kind));
+               Write_Integer (Stream, Flags, 1);
+
+               if Kind_To_Node_Children_Count (Kind) > 0 then
+                  declare
+                     Fields : constant Field_Reference_Array :=
+                        Introspection_Implementation.Fields (Kind);
+                  begin
+                     Write_Integer (Stream, Fields'Length, 4);
+                     for F of Fields loop
+                        Write_String (Stream, Field_Name (F));
+                     end loop;
+                  end;
+               else
+                  Write_Integer (Stream, 0, 4);
+               end if;
+            end;
+         end loop;
+      end Write_Kinds;
+
+      -------------
+      -- Process --
+      -------------
+
+      procedure Process (Node : ${T.root_node.name}) is
+      begin
+         if Node = null then
+            Write_Integer (Stream, Binary_No_Kind, 2);
+            return;
+         end if;
+
+         declare
+            R : constant Source_Location_Range := Sloc_Range (Node);
+         begin
+            Write_Integer (Stream, ${T.node_kind}'Pos (Node.Kind), 2);
+            Write_Integer
+              (Stream, Binary_Token_Index (Node.Token_Start_Index), 4);
+            Write_Integer
+              (Stream, Binary_Token_Index (Node.Token_End_Index), 4);
+            Write_Integer (Stream, Unsigned_32 (R.Start_Line), 4);
+            Write_Integer (Stream, Unsigned_32 (R.Start_Column), 2);
+            Write_Integer (Stream, Unsigned_32 (R.End_Line), 4);
+            Write_Integer (Stream, Unsigned_32 (R.End_Column), 2);
+         end;
+
+         if Is_Token_Node (Node) then
+            Write_Integer (Stream, String_Index (Text (Node)), 4);
+         end if;
+         if Has_Variable_Children (Node.Kind) then
+            Write_Integer (Stream, Unsigned_32 (Children_Count (Node)), 4);
+         end if;
+
+         for I in 1 .. Children_Count (Node) loop
+            Process (Child (Node, I));
+         end loop;
+      end Process;
+
+   begin
+      Write_Bytes (Stream, Binary_Magic);
+      Write_Integer (Stream, Binary_Version, 2);
+      Write_Kinds;
+      Process (Unit.AST_Root);
+
+      Write_Integer (Stream, Unsigned_32 (Strings.Length), 4);
+      for S of Strings loop
+         Write_String (Stream, S);
+      end loop;
+   end Serialize_Binary;
+
+   ---------------
+   -- Serialize --
+   ---------------
+
+   procedure Serialize
+     (Unit   : Internal_Unit;
+      Format : Serialization_Format;
+      Stream : not null access Root_Stream_Type'Class) is
+   begin
+      Ensure_Loaded (Unit);
+      case Format is
+         when JSON   => Serialize_JSON (Unit, Stream);
+         when Binary => Serialize_Binary (Unit, Stream);
+      end case;
+   end Serialize;
+
+end ${ada_lib_name}.Serialization;
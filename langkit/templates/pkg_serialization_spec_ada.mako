@@ -0,0 +1,52 @@
+## vim: filetype=makoada
+
+--  This package provides streaming serializers for parse trees, so that other
+--  tools can process them without going through the analysis API.
+
+with Ada.Streams; use Ada.Streams;
+
+with ${ada_lib_name}.Implementation; use ${ada_lib_name}.Implementation;
+
+private package ${ada_lib_name}.Serialization is
+
+   type Serialization_Format is (JSON, Binary);
+   --  Formats to serialize parse trees.
+   --
+   --  JSON: each node is an object with a "kind" (name of the node kind) and
+   --  a "sloc_range" (image of its source location range) entries. Token
+   --  nodes also have a "text" entry, list nodes have an "items" entry (array
+   --  of child nodes) and other nodes have a "fields" entry (object that maps
+   --  field names to child nodes). Null nodes are null.
+   --
+   --  Binary: all integers are unsigned and little-endian, and strings are a
+   --  u32 byte length followed by UTF-8 bytes. This format contains, in
+   --  order:
+   --
+   --  * The "LKTB" magic bytes and the format version (u16, currently 1).
+   --
+   --  * The table of node kinds: a u32 count then, for each kind, its name,
+   --    its flags (u8: 1 for list kinds, 2 for token kinds), a u32 number of
+   --    fields and the name of each field.
+   --
+   --  * The tree, in preorder. Each node starts with the index of its kind in
+   --    the table of node kinds (u16, 16#FFFF# for null nodes, which have no
+   --    other data), the 0-based indexes of its first and last tokens (u32,
+   --    16#FFFF_FFFF# for none) and its source location range (u32 start
+   --    line, u16 start column, u32 end line, u16 end column). Then follow,
+   --    for token nodes only, the index of its text in the string table
+   --    (u32), for list nodes only, the number of its children (u32), and
+   --    finally its children.
+   --
+   --  * The string table: a u32 count followed by the strings.
+
+   procedure Serialize
+     (Unit   : Internal_Unit;
+      Format : Serialization_Format;
+      Stream : not null access Root_Stream_Type'Class);
+   --  Write the parse tree of Unit to Stream in the given Format.
+   --
+   --  The tree is written as it is traversed, so that the memory needed to
+   --  serialize it does not depend on the size of the tree (except for the
+   --  string table of the binary format).
+
+end ${ada_lib_name}.Serialization;
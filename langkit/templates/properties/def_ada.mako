@@ -77,11 +77,6 @@ is
    % endif
 
    % if memoized:
-      <%
-         key_length = 1 + len(property.arguments)
-         if property.uses_entity_info:
-            key_length += 1
-      %>
       Mmz_Handle : Memoization_Handle;
       Mmz_Val    : Mmz_Value;
 
@@ -95,22 +90,23 @@ is
       function Create_Mmz_Key return Mmz_Key is
       begin
          return Mmz_K : Mmz_Key :=
-           (Property => ${property.memoization_enum},
-            Items    => new Mmz_Key_Array (1 ..  ${key_length}))
+           Make_Key (${property.memoization_enum},
+                     ${property.memoization_key_length})
          do
-            Mmz_K.Items (1) := (Kind => ${property.struct.memoization_kind},
-                                As_${property.struct.name} => Self);
+            Set_Item (Mmz_K, 1, (Kind => ${property.struct.memoization_kind},
+                                 As_${property.struct.name} => Self));
             % for i, arg in enumerate(property.arguments, 2):
-               Mmz_K.Items (${i}) := (Kind => ${arg.type.memoization_kind},
-                                      As_${arg.type.name} => ${arg.name});
+               Set_Item (Mmz_K, ${i}, (Kind => ${arg.type.memoization_kind},
+                                       As_${arg.type.name} => ${arg.name}));
                % if arg.type.is_refcounted:
-                  Inc_Ref (Mmz_K.Items (${i}).As_${arg.type.name});
+                  Inc_Ref (${arg.name});
                % endif
             % endfor
             % if property.uses_entity_info:
-               Mmz_K.Items (${key_length}) :=
-                 (Kind => ${T.entity_info.memoization_kind},
-                  As_${T.entity_info.name} => ${property.entity_info_name});
+               Set_Item
+                 (Mmz_K, ${property.memoization_key_length},
+                  (Kind => ${T.entity_info.memoization_kind},
+                   As_${T.entity_info.name} => ${property.entity_info_name}));
             % endif
          end return;
       end Create_Mmz_Key;
@@ -169,7 +165,10 @@ begin
       % endif
 
          if Find_Memoized_Value
-           (Self.Unit, Mmz_Handle, Mmz_Val, Create_Mmz_Key'Access)
+           (Self.Unit, Mmz_Handle, Mmz_Val, Create_Mmz_Key'Access,
+            Uses_Envs => ${'True' if property.uses_envs else 'False'},
+            Untracked => ${'True' if property.calls_user_externals
+                           else 'False'})
          then
             ${gdb_memoization_lookup()}
 
@@ -202,7 +201,9 @@ begin
                   Properties_Traces.Decrease_Indent;
                % endif
                ${gdb_memoization_return()}
-               Exit_Call (Self.Unit.Context, Call_Depth);
+               Exit_Call
+                 (Self.Unit.Context, Call_Depth, Self.Unit,
+                  ${string_repr(property.qualname)});
                return Property_Result;
             end if;
             ${gdb_end()}
@@ -277,7 +278,9 @@ begin
    % endif
 
    if Self /= null then
-      Exit_Call (Self.Unit.Context, Call_Depth);
+      Exit_Call
+        (Self.Unit.Context, Call_Depth, Self.Unit,
+         ${string_repr(property.qualname)});
    end if;
    return Property_Result;
 
@@ -319,14 +322,18 @@ exception
       % endif
 
       if Self /= null then
-         Exit_Call (Self.Unit.Context, Call_Depth);
+         Exit_Call
+           (Self.Unit.Context, Call_Depth, Self.Unit,
+            ${string_repr(property.qualname)});
       end if;
       raise;
 % endif
 
    when others =>
       if Self /= null then
-         Exit_Call (Self.Unit.Context, Call_Depth);
+         Exit_Call
+           (Self.Unit.Context, Call_Depth, Self.Unit,
+            ${string_repr(property.qualname)});
       end if;
       raise;
 
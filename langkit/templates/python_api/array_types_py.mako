@@ -40,26 +40,41 @@ class _BaseArray(object):
         self.dec_ref(self.c_value)
         self.clear()
 
+    def item_at(self, index):
+        """
+        Return the Python wrapper for the item at the given index.
+        """
+        # In ctypes, accessing an array element does not copy it, which means
+        # the the array must live at least as long as the accessed element. We
+        # cannot guarantee that, so we must copy the element so that it is
+        # independent of the array it comes from.
+        #
+        # The try/except block tries to do a copy if "item" is indeed a buffer
+        # to be copied, and will fail if it's a mere integer, which does not
+        # need the buffer copy anyway, hence the "pass".
+        item = self.items[index]
+        try:
+            item = self.c_element_type.from_buffer_copy(item)
+        except TypeError:
+            pass
+        return self.wrap_item(item)
+
     @classmethod
-    def wrap(cls, c_value, from_field_access):
+    def wrap(cls, c_value, from_field_access, context=None):
         helper = cls(c_value)
 
-        result = []
-        for i in range(helper.length):
-            # In ctypes, accessing an array element does not copy it, which
-            # means the the array must live at least as long as the accessed
-            # element. We cannot guarantee that, so we must copy the element so
-            # that it is independent of the array it comes from.
-            #
-            # The try/except block tries to do a copy if "item" is indeed a
-            # buffer to be copied, and will fail if it's a mere integer, which
-            # does not need the buffer copy anyway, hence the "pass".
-            item = helper.items[i]
-            try:
-                item = cls.c_element_type.from_buffer_copy(item)
-            except TypeError:
-                pass
-            result.append(helper.wrap_item(item))
+        # Return a view if requested for the context that owns this array (see
+        # AnalysisContext.lazy_arrays). Arrays that come from structure fields
+        # are owned by the structure, so we cannot keep them alive in a view:
+        # always wrap them eagerly.
+        if (
+            context is not None
+            and context._lazy_arrays_depth
+            and not from_field_access
+        ):
+            return ArrayView(helper, context)
+
+        result = [helper.item_at(i) for i in range(helper.length)]
 
         # If this array value comes from a structure field, we must not call
         # its dec_ref primitive, as it is up to the structure's dec_ref
@@ -71,7 +86,9 @@ class _BaseArray(object):
 
     @classmethod
     def unwrap(cls, value, context=None):
-        if not isinstance(value, list):
+        if isinstance(value, ArrayView):
+            value = list(value)
+        elif not isinstance(value, list):
             _raise_type_error('list', value)
 
         # Create a holder for the result
@@ -129,7 +146,7 @@ class ${cls.py_converter}(_BaseArray):
     ## instances.
     % if cls.is_string_type:
     @classmethod
-    def wrap(cls, c_value, from_field_access):
+    def wrap(cls, c_value, from_field_access, context=None):
         # Reinterpret this array of uint32_t values as the equivalent array of
         # characters, then decode it using the appropriate UTF-32 encoding.
         chars = ctypes.cast(ctypes.pointer(c_value.contents.items),
@@ -148,18 +165,34 @@ class ${cls.py_converter}(_BaseArray):
 
     c_element_type = ${c_element_type}
 
-    class c_struct(ctypes.Structure):
-        _fields_ = [('n', ctypes.c_int),
-                    ('ref_count', ctypes.c_int),
-                    ('items', ${c_element_type} * 1)]
-
-    c_type = ctypes.POINTER(c_struct)
-
-    create = staticmethod(_import_func(
-        '${cls.c_create(capi)}', [ctypes.c_int], c_type))
-    inc_ref = staticmethod(_import_func(
-        '${cls.c_inc_ref(capi)}', [c_type], None))
-    dec_ref = staticmethod(_import_func(
-        '${cls.c_dec_ref(capi)}', [c_type], None))
+    ## Most array types are used by few properties only: create their ctypes
+    ## types and bindings only when they are first needed.
+
+    @_lazy_class_attribute
+    def c_struct(cls):
+        class c_struct(ctypes.Structure):
+            _fields_ = [('n', ctypes.c_int),
+                        ('ref_count', ctypes.c_int),
+                        ('items', ${c_element_type} * 1)]
+        return c_struct
+
+    @_lazy_class_attribute
+    def c_type(cls):
+        return ctypes.POINTER(cls.c_struct)
+
+    @_lazy_class_attribute
+    def create(cls):
+        return staticmethod(_import_func(
+            '${cls.c_create(capi)}', [ctypes.c_int], cls.c_type))
+
+    @_lazy_class_attribute
+    def inc_ref(cls):
+        return staticmethod(_import_func(
+            '${cls.c_inc_ref(capi)}', [cls.c_type], None))
+
+    @_lazy_class_attribute
+    def dec_ref(cls):
+        return staticmethod(_import_func(
+            '${cls.c_dec_ref(capi)}', [cls.c_type], None))
 
 </%def>
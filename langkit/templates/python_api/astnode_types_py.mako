@@ -4,7 +4,11 @@
 
         <% c_accessor = '_{}'.format(field.accessor_basename.lower) %>
 
-        % if field.type.is_ast_node and not field.arguments:
+        % if not field.is_property and not field.is_user_field:
+        result = self._eval_syntax_field(${repr(field.api_name.lower)},
+                                         ${c_accessor})
+
+        % elif field.type.is_ast_node and not field.arguments:
         result = self._eval_astnode_field(${c_accessor})
 
         % else:
@@ -35,7 +39,8 @@
         ## Evaluate the C value for field evaluation, and then the Python
         ## wrapper.
         c_result = self._eval_field(${', '.join(eval_args)})
-        result = ${pyapi.wrap_value('c_result', field.public_type)}
+        result = ${pyapi.wrap_value('c_result', field.public_type,
+                                    context='self._unit.context')}
         % endif
 
 </%def>
@@ -64,7 +69,13 @@
             for a in field.arguments
         ]
     %>
-    % if not field.arguments:
+    % if field.has_bulk_accessor:
+    @_BulkProperty.create(
+        lambda: (_${field.bulk_accessor_basename.lower},
+                 ${pyapi.c_type(field.public_type)}),
+        lambda c_result: ${pyapi.wrap_value('c_result', field.public_type)}
+    )
+    % elif not field.arguments:
     @property
     % endif
     def ${field.api_name.lower}(${', '.join(arg_list)}):
@@ -114,13 +125,18 @@
             )
             for a in field.arguments
         ]
+        return_hint = pyapi.property_type_hint(field.type)
     %>
+    % if field.has_bulk_accessor:
+    ${field.api_name.lower}: _BulkProperty[${return_hint}]
+    % else:
     % if not field.arguments:
     @property
     % endif
     def ${field.api_name.lower}(
         ${', '.join(arg_list)}
-    ) -> ${field.type.mypy_type_hint}: ...
+    ) -> ${return_hint}: ...
+    % endif
     % endfor
 
     ## __iter__ and __getitem__ refinements for more precise list element types
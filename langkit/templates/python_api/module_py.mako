@@ -25,10 +25,10 @@ from __future__ import absolute_import, division, print_function
 %>
 
 
-import argparse
 import collections
+import contextlib
 import ctypes
-import json
+import itertools
 import os
 import sys
 import weakref
@@ -79,46 +79,78 @@ if _old_env_path is not None:
     os.environ['PATH'] = _old_env_path
 
 
+_lazy_funcs = {}
+"""
+Lazy wrappers that ``_import_func`` returns, indexed by their ``id``.
+
+:type: dict[int, function]
+"""
+
+
 def _import_func(name, argtypes, restype, exc_wrap=True):
     """
     Import "name" from the C library, set its arguments/return types and return
     the binding.
 
+    Binding many functions has a noticeable cost at import time, so the symbol
+    is actually resolved (and its signature set) only on the first call. This
+    first call also replaces the returned lazy wrapper with the actual binding
+    in the module global that designates it, if any, so that later calls do
+    not go through the lazy wrapper.
+
     :param str name: Name of the symbol for the function to import.
-    :param list[ctypes._CData] argtypes: Types for function argruments.
+    :param list[ctypes._CData]|() -> list[ctypes._CData] argtypes: Types for
+        function arguments, or a function that returns them. The latter makes
+        it possible to defer the creation of these types to the first call.
     :param None|ctypes._CData restype: Function return type, or None if it
         does not return anything.
     :param bool exc_wrap: If True, wrap the returned function to check for
       exceptions.
     """
-    func = getattr(_c_lib, name)
-    func.argtypes = argtypes
-    func.restype = restype
-
-    def check_argcount(args, kwargs):
-        argcount = len(args) + len(kwargs)
-        if argcount != len(argtypes):
-            raise TypeError(
-                '{} takes {} positional arguments but {} was given'
-                .format(name, len(argtypes), argcount))
-
-    # Wrapper for "func" that raises a NativeException in case of internal
-    # error.
-
-    if exc_wrap:
-        def wrapper(*args, **kwargs):
-            check_argcount(args, kwargs)
-            result = func(*args, **kwargs)
-            exc = _get_last_exception()
-            if exc:
-                raise exc.contents._wrap()
-            return result
-    else:
-        def wrapper(*args, **kwargs):
-            check_argcount(args, kwargs)
-            return func(*args, **kwargs)
+    def bind():
+        types = argtypes() if callable(argtypes) else argtypes
+        func = getattr(_c_lib, name)
+        func.argtypes = types
+        func.restype = restype
+
+        def check_argcount(args, kwargs):
+            argcount = len(args) + len(kwargs)
+            if argcount != len(types):
+                raise TypeError(
+                    '{} takes {} positional arguments but {} was given'
+                    .format(name, len(types), argcount))
+
+        # Wrapper for "func" that raises a NativeException in case of internal
+        # error.
+
+        if exc_wrap:
+            def wrapper(*args, **kwargs):
+                check_argcount(args, kwargs)
+                result = func(*args, **kwargs)
+                exc = _get_last_exception()
+                if exc:
+                    raise exc.contents._wrap()
+                return result
+        else:
+            def wrapper(*args, **kwargs):
+                check_argcount(args, kwargs)
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    # Once resolved, actual binding for the C function
+    binding = []
+
+    def lazy_wrapper(*args, **kwargs):
+        if not binding:
+            binding.append(bind())
+            global_name = getattr(lazy_wrapper, 'global_name', None)
+            if global_name is not None:
+                globals()[global_name] = binding[0]
+        return binding[0](*args, **kwargs)
 
-    return wrapper
+    _lazy_funcs[id(lazy_wrapper)] = lazy_wrapper
+    return lazy_wrapper
 
 
 class _Exception(ctypes.Structure):
@@ -197,6 +229,25 @@ def _hashable_c_pointer(pointed_type=None):
     return _c_type
 
 
+class _lazy_class_attribute(object):
+    """
+    Decorator to turn a class method into a class attribute whose value is
+    computed on first access, and then stored in the class. This is useful to
+    defer the creation of ctypes types and bindings that are rarely used.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+
+    def __get__(self, instance, owner):
+        setattr(owner, self.name, self.func(owner))
+
+        # Go through the regular attribute lookup so that descriptors (for
+        # instance staticmethod objects) are handled as usual.
+        return getattr(owner, self.name)
+
+
 class _text(ctypes.Structure):
     """
     C value for unicode strings. This object is the owner of the underlying
@@ -264,17 +315,48 @@ class _symbol_type(ctypes.Structure):
     _fields_ = [('data', ctypes.c_void_p),
                 ('bounds', ctypes.c_void_p)]
 
+    _texts = {}
+    """
+    Cache for symbol texts, indexed by symbol addresses. Symbols are interned
+    in the symbol table of their analysis context, so addresses stay valid as
+    long as this context is alive. C symbols do not reference their context,
+    so this cache is shared by all contexts, and it is flushed every time an
+    analysis context wrapper is released: at this point, the symbol table of
+    the corresponding context may be free'd.
+
+    :type: dict[int, unicode]
+    """
+
     @classmethod
     def wrap(cls, c_value):
+        address = c_value.data
+        try:
+            return cls._texts[address]
+        except KeyError:
+            pass
+
         # First extract the text associated to this symbol in "text"
         text = _text()
         _symbol_text(ctypes.byref(c_value), ctypes.byref(text))
 
         # Then wrap this text
-        return text._wrap()
+        result = text._wrap()
+        if address:
+            cls._texts[address] = result
+        return result
 
     @classmethod
     def unwrap(cls, py_value, context):
+        # Look for this symbol in the cache of the corresponding context, if
+        # there is one.
+        context_wrapper = AnalysisContext._context_cache.get(context)
+        if context_wrapper is not None:
+            context_wrapper._check_unit_cache()
+            try:
+                return context_wrapper._symbol_cache[py_value]
+            except (KeyError, TypeError):
+                pass
+
         # First turn the given symbol into a low-level text object
         text = _text._unwrap(py_value)
 
@@ -283,6 +365,11 @@ class _symbol_type(ctypes.Structure):
         if not _context_symbol(context, ctypes.byref(text),
                                ctypes.byref(result)):
             raise InvalidSymbolError(py_value)
+
+        # Do not fill the reverse cache (_texts): the symbol canonicalizer may
+        # have changed the text.
+        if context_wrapper is not None:
+            context_wrapper._symbol_cache[py_value] = result
         return result
 
 
@@ -427,7 +514,8 @@ class AnalysisContext(object):
     ${py_doc('langkit.analysis_context_type', 4)}
 
     __slots__ = ('_c_value', '_unit_provider', '_serial_number', '_unit_cache',
-                 '__weakref__')
+                 '_symbol_cache', '_no_reparse_depth', '_lazy_arrays_depth',
+                 '_unit_memory_limit', '__weakref__')
 
     _context_cache = weakref.WeakValueDictionary()
     """
@@ -453,6 +541,29 @@ class AnalysisContext(object):
         # construction, so that the destructor can run later on.
         self._c_value = None
 
+        self._no_reparse_depth = 0
+        """
+        Number of active ``no_reparse`` blocks for this context.
+
+        :type: int
+        """
+
+        self._lazy_arrays_depth = 0
+        """
+        Number of active ``lazy_arrays`` blocks for this context.
+
+        :type: int
+        """
+
+        self._unit_memory_limit = 0
+        """
+        Unit memory limit for this context (see ``set_unit_memory_limit``).
+        Evicting units makes their nodes stale, so the limit is lifted while
+        ``no_reparse`` blocks are active.
+
+        :type: int
+        """
+
         if _c_value is None:
             charset = _py2to3.text_to_bytes(charset)
             if not isinstance(tab_stop, int) or tab_stop < 1:
@@ -479,10 +590,19 @@ class AnalysisContext(object):
         :type: dict[str, AnalysisUnit]
         """
 
+        self._symbol_cache = {}
+        """
+        Cache for symbols in this context, indexed by symbol texts. Symbols are
+        interned, so they stay valid as long as the context is alive.
+
+        :type: dict[unicode, _symbol_type]
+        """
+
         self._check_unit_cache()
 
     def __del__(self):
         if self._c_value:
+            _symbol_type._texts.clear()
             _context_decref(self._c_value)
 
     def __eq__(self, other):
@@ -494,6 +614,8 @@ class AnalysisContext(object):
     def get_from_file(self, filename, charset=None, reparse=False,
                       rule=default_grammar_rule):
         ${py_doc('langkit.get_unit_from_file', 8)}
+        if reparse:
+            self._check_reparse_allowed()
         filename = _py2to3.text_to_bytes(filename)
         charset = _py2to3.text_to_bytes(charset or '')
         c_value = _get_analysis_unit_from_file(self._c_value, filename,
@@ -505,6 +627,14 @@ class AnalysisContext(object):
                         rule=default_grammar_rule):
         ${py_doc('langkit.get_unit_from_buffer', 8)}
         filename = _py2to3.text_to_bytes(filename)
+
+        # Getting a unit from a buffer reparses it only if it already exists
+        if (
+            self._no_reparse_depth
+            and _context_has_unit(self._c_value, filename)
+        ):
+            self._check_reparse_allowed()
+
         charset = _py2to3.text_to_bytes(charset or '')
         buffer, charset = _canonicalize_buffer(buffer, charset)
         c_value = _get_analysis_unit_from_buffer(self._c_value, filename,
@@ -515,6 +645,8 @@ class AnalysisContext(object):
 
     def get_from_provider(self, name, kind, charset=None, reparse=False):
         ${py_doc('langkit.get_unit_from_provider', 8)}
+        if reparse:
+            self._check_reparse_allowed()
         name = _py2to3.bytes_to_text(name)
         charset = _py2to3.text_to_bytes(charset or '')
 
@@ -534,6 +666,145 @@ class AnalysisContext(object):
         ${py_doc('langkit.context_discard_errors_in_populate_lexical_env', 8)}
         _discard_errors_in_populate_lexical_env(self._c_value, bool(discard))
 
+    @property
+    def memoization_invalidation_stats(self):
+        ${py_doc('langkit.context_memoization_invalidation_stats', 8)}
+        invalidated = ctypes.c_longlong()
+        surviving = ctypes.c_longlong()
+        _context_memoization_invalidation_stats(
+            self._c_value, ctypes.byref(invalidated), ctypes.byref(surviving)
+        )
+        return (invalidated.value, surviving.value)
+
+    @property
+    def memoization_stats(self):
+        ${py_doc('langkit.context_memoization_stats', 8)}
+        result = {}
+        for i in range(_memoized_properties_count()):
+            name = _unwrap_str(_memoized_property_name(i))
+            counters = [ctypes.c_longlong() for _ in MemoizationStats._fields]
+            _context_memoization_stats(
+                self._c_value, i, *[ctypes.byref(c) for c in counters]
+            )
+            result[name] = MemoizationStats(*[c.value for c in counters])
+        return result
+
+    _eviction_policies = ('lru', 'clock')
+
+    def set_memoization_memory_limit(self, limit, policy='lru'):
+        ${py_doc('langkit.context_set_memoization_memory_limit', 8)}
+        try:
+            c_policy = self._eviction_policies.index(policy)
+        except ValueError:
+            raise ValueError('invalid eviction policy: {}'.format(policy))
+        _context_set_memoization_memory_limit(self._c_value, limit, c_policy)
+
+    def set_unit_memory_limit(self, limit):
+        ${py_doc('langkit.context_set_unit_memory_limit', 8)}
+        if limit < 0:
+            raise PreconditionFailure('negative unit memory limit')
+        self._unit_memory_limit = limit
+
+        # Inside no_reparse blocks, the limit is applied when leaving the
+        # outermost block.
+        if not self._no_reparse_depth:
+            _context_set_unit_memory_limit(self._c_value, limit)
+
+    def set_parse_cache_directory(self, directory):
+        ${py_doc('langkit.context_set_parse_cache_directory', 8)}
+        directory = _py2to3.text_to_bytes(directory or '')
+        _context_set_parse_cache_directory(self._c_value, directory)
+
+    def set_compact_source_buffers(self, enabled):
+        ${py_doc('langkit.context_set_compact_source_buffers', 8)}
+        _context_set_compact_source_buffers(self._c_value, bool(enabled))
+
+    @property
+    def memory_usage(self):
+        ${py_doc('langkit.context_memory_usage', 8)}
+        result = _memory_usage()
+        _context_memory_usage(self._c_value, ctypes.byref(result))
+        return result._wrap()
+
+    def set_event_handler(self, handler):
+        ${py_doc('langkit.context_set_event_handler', 8)}
+        if handler is None:
+            _context_set_event_handler(self._c_value, None,
+                                       _event_handler_destroy_func(),
+                                       _event_handler_phase_timing_func())
+            return
+
+        key = next(_event_handler_keys)
+        _event_handlers[key] = handler
+        _context_set_event_handler(self._c_value, key,
+                                   _event_handler_destroy,
+                                   _event_handler_phase_timing)
+
+    def resolve(self, reference):
+        """
+        Return the analysis unit or the node that ``reference`` (a
+        ``UnitReference`` or a ``NodeReference`` instance) designates in this
+        context. Analysis units that are not loaded yet in this context are
+        parsed from their source file.
+
+        Raise a ``ValueError`` if the designated node does not exist.
+        """
+        if isinstance(reference, UnitReference):
+            return self.get_from_file(reference.filename)
+        elif isinstance(reference, NodeReference):
+            unit = self.get_from_file(reference.filename)
+            return ${root_astnode_name}._from_reference(unit, reference)
+        else:
+            _raise_type_error('UnitReference or NodeReference', reference)
+
+    @contextlib.contextmanager
+    def no_reparse(self):
+        """
+        Return a context manager that forbids the reparsing of analysis units
+        in this context for the duration of the ``with`` block.
+
+        As no node can become stale while it is active, node wrappers skip
+        stale reference checks, which makes node accessors cheaper. Trying to
+        reparse a unit inside the block (``AnalysisUnit.reparse``,
+        ``get_from_file`` or ``get_from_provider`` with ``reparse=True``, or
+        ``get_from_buffer``) raises a ``PreconditionFailure``. Such blocks can
+        be nested. Analysis units are not evicted while such a block is active
+        (see ``set_unit_memory_limit``).
+        """
+        self._check_unit_cache()
+        if self._no_reparse_depth == 0:
+            for unit in self._unit_cache.values():
+                unit._trust_current_version()
+            if self._unit_memory_limit:
+                _context_set_unit_memory_limit(self._c_value, 0)
+        self._no_reparse_depth += 1
+        try:
+            yield self
+        finally:
+            self._no_reparse_depth -= 1
+            if self._no_reparse_depth == 0:
+                for unit in self._unit_cache.values():
+                    unit._trusted_version = None
+                if self._unit_memory_limit:
+                    _context_set_unit_memory_limit(self._c_value,
+                                                   self._unit_memory_limit)
+
+    @contextlib.contextmanager
+    def lazy_arrays(self):
+        """
+        Return a context manager. Inside the ``with`` block, properties of
+        nodes in this context that return arrays return ``ArrayView`` instances
+        instead of lists. Such blocks can be nested.
+
+        This is useful when properties return big arrays and only a few items
+        are actually used.
+        """
+        self._lazy_arrays_depth += 1
+        try:
+            yield self
+        finally:
+            self._lazy_arrays_depth -= 1
+
     class _c_struct(ctypes.Structure):
         _fields_ = [('serial_number', ctypes.c_uint64)]
     _c_type = _hashable_c_pointer(_c_struct)
@@ -547,19 +818,183 @@ class AnalysisContext(object):
 
     def _check_unit_cache(self):
         """
-        If this context has been re-used, invalidate its unit cache.
+        If this context has been re-used, invalidate its unit and symbol
+        caches.
         """
         serial_number = self._c_value.contents.serial_number
         if self._serial_number != serial_number:
             self._unit_cache = {}
+            self._symbol_cache = {}
             self._serial_number = serial_number
 
+    def _check_reparse_allowed(self):
+        """
+        Raise a PreconditionFailure if we are in a ``no_reparse`` block.
+        """
+        if self._no_reparse_depth:
+            raise PreconditionFailure(
+                'cannot reparse analysis units inside a no_reparse() block'
+            )
+
+
+MemoizationStats = collections.namedtuple(
+    'MemoizationStats', 'hits misses entries bytes evictions'
+)
+"""
+Memoization statistics for a memoized property in an analysis context: see
+``AnalysisContext.memoization_stats``.
+"""
+
+
+MemoryUsage = collections.namedtuple(
+    'MemoryUsage',
+    'ast_nodes tokens source_buffer symbols memoization lexical_envs'
+    ' lookup_caches total'
+)
+"""
+Estimated memory usage, in bytes, for an analysis unit or an analysis context:
+see ``AnalysisUnit.memory_usage`` and ``AnalysisContext.memory_usage``.
+"""
+
+
+class _memory_usage(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_longlong) for name in MemoryUsage._fields]
+
+    def _wrap(self):
+        return MemoryUsage(*[getattr(self, name)
+                             for name in MemoryUsage._fields])
+
+
+class EventHandler(object):
+    ${py_doc('langkit.event_handler_type', 4)}
+
+    phases = ('lexing', 'parsing', 'lexical_env_population',
+              'property_evaluation')
+    """
+    Names for analysis phases, as passed to ``phase_timing``.
+    """
+
+    def phase_timing(self, filename, phase, name, elapsed):
+        """
+        Called each time an analysis phase completes for the unit whose
+        filename is ``filename``. ``phase`` is one of the names in
+        ``EventHandler.phases`` and ``elapsed`` is the time it took, in
+        seconds. For the ``property_evaluation`` phase, this is called only
+        for top-level property calls and ``name`` is the qualified name of the
+        property. ``name`` is an empty string for other phases.
+
+        This does nothing by default: override it in subclasses.
+        """
+        pass
+
+
+# Event handlers currently installed in analysis contexts, indexed by the key
+# that is passed as the "data" pointer to the C API.
+_event_handlers = {}
+_event_handler_keys = itertools.count(1)
+
+
+NodeCacheStats = collections.namedtuple('NodeCacheStats',
+                                        'hits misses size')
+"""
+Statistics for the node wrapper cache of an analysis unit: number of cache
+hits, number of cache misses (i.e. number of created wrappers) and number of
+wrappers currently in the cache.
+"""
+
+
+class _NodeCache(object):
+    """
+    Cache for the node wrappers of an analysis unit, indexed by couples:
+    (c_value, metadata, rebindings).
+
+    The cache contains weak references to wrappers, so that wrappers are
+    re-used as long as they are alive, but can be free'd otherwise. To avoid
+    creating wrappers over and over during traversals, it keeps alive the
+    ``size`` most recently used ones. If ``size`` is None, it keeps all of them
+    alive instead.
+    """
+
+    __slots__ = ('_wrappers', '_recent', '_size', 'hits', 'misses')
+
+    def __init__(self, size):
+        self._wrappers = {} if size is None else weakref.WeakValueDictionary()
+        self._recent = collections.OrderedDict() if size else None
+        """
+        If not None, wrappers to keep alive, indexed by key, from the least
+        recently used to the most recently used.
+
+        :type: None|collections.OrderedDict
+        """
+        self._size = size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return the wrapper for ``key``, or None if there is none.
+        """
+        try:
+            result = self._wrappers[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self._recent is not None:
+            self._use(key, result)
+        return result
+
+    def add(self, key, wrapper):
+        """
+        Add ``wrapper`` to the cache for ``key``.
+        """
+        self._wrappers[key] = wrapper
+        if self._recent is not None:
+            self._use(key, wrapper)
+
+    def _use(self, key, wrapper):
+        """
+        Make ``wrapper`` (for ``key``) the most recently used wrapper, evicting
+        the least recently used one if the cache is full.
+        """
+        # OrderedDict.move_to_end is not available in Python2: remove the
+        # entry and insert it back instead.
+        recent = self._recent
+        recent.pop(key, None)
+        recent[key] = wrapper
+        if len(recent) > self._size:
+            recent.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all wrappers from the cache. Note that this preserves hit/miss
+        counters.
+        """
+        self._wrappers.clear()
+        if self._recent is not None:
+            self._recent.clear()
+
+    def __len__(self):
+        return len(self._wrappers)
+
 
 class AnalysisUnit(object):
     ${py_doc('langkit.analysis_unit_type', 4)}
 
     __slots__ = ('_c_value', '_context_link', '_cache_version_number',
-                 '_node_cache')
+                 '_trusted_version', '_node_cache', '_source_cache',
+                 '__weakref__')
+
+    node_cache_size = 1024
+    """
+    Number of node wrappers that the node cache of each analysis unit keeps
+    alive (see the ``node_cache_stats`` property). Other wrappers are free'd
+    as soon as user code does not reference them anymore. If None, all node
+    wrappers are kept alive until their unit is reparsed. Changes apply to
+    units that are created after them.
+
+    :type: None|int
+    """
 
     class TokenIterator(object):
         """Iterator over the tokens in an analysis unit."""
@@ -603,15 +1038,34 @@ class AnalysisUnit(object):
         :type: int
         """
 
-        self._node_cache = {}
+        self._node_cache = _NodeCache(self.node_cache_size)
+        """
+        Cache for node wrappers in this unit.
+
+        :type: _NodeCache
+        """
+
+        self._trusted_version = None
         """
-        Cache for all node wrappers in this unit. Indexed by couples:
-        (c_value, metadata, rebindings).
+        Inside ``AnalysisContext.no_reparse`` blocks, version of this unit,
+        which is known not to change until the end of the block. None
+        otherwise.
 
-        :type: dict[T, ${root_astnode_name}]
+        :type: None|int
+        """
+
+        self._source_cache = None
+        """
+        Cache for the source buffer of this unit. See the _source method.
+
+        :type: None|list
         """
 
         self._check_node_cache()
+        if context._no_reparse_depth:
+            self._trust_current_version()
+
+        self._register_token_data()
 
     def __eq__(self, other):
         return self._c_value == other._c_value
@@ -626,6 +1080,7 @@ class AnalysisUnit(object):
 
     def reparse(self, buffer=None, charset=None):
         ${py_doc('langkit.unit_reparse_generic', 8)}
+        self._context_link._check_reparse_allowed()
         charset = _py2to3.text_to_bytes(charset or '')
         if buffer is None:
             _unit_reparse_from_file(self._c_value, charset)
@@ -633,6 +1088,7 @@ class AnalysisUnit(object):
             buffer, charset = _canonicalize_buffer(buffer, charset)
             _unit_reparse_from_buffer(self._c_value, charset, buffer,
                                       len(buffer))
+        self._release_source()
 
     def populate_lexical_env(self):
         ${py_doc('langkit.unit_populate_lexical_env', 8)}
@@ -665,6 +1121,11 @@ class AnalysisUnit(object):
         ${py_doc('langkit.unit_text', 8)}
         return Token.text_range(self.first_token, self.last_token)
 
+    @property
+    def source_buffer(self):
+        ${py_doc('langkit.unit_source_buffer', 8)}
+        return self._source(decode=False)[3]
+
     @property
     def token_count(self):
         ${py_doc('langkit.unit_token_count', 8)}
@@ -675,6 +1136,34 @@ class AnalysisUnit(object):
         ${py_doc('langkit.unit_trivia_count', 8)}
         return _unit_trivia_count(self._c_value)
 
+    @property
+    def memory_usage(self):
+        ${py_doc('langkit.unit_memory_usage', 8)}
+        result = _memory_usage()
+        _unit_memory_usage(self._c_value, ctypes.byref(result))
+        return result._wrap()
+
+    @property
+    def is_evicted(self):
+        ${py_doc('langkit.unit_is_evicted', 8)}
+        return bool(_unit_is_evicted(self._c_value))
+
+    def token_table(self):
+        ${py_doc('langkit.unit_export_tokens', 8)}
+        return TokenTable._create(self)
+
+    def node_at_preorder_index(self, index):
+        ${py_doc('langkit.unit_node_at_preorder_index', 8)}
+        if not _py2to3.is_int(index):
+            _raise_type_error('int', index)
+        if index < 0:
+            return None
+        result = ${c_entity}()
+        if not _unit_node_at_preorder_index(self._c_value, index,
+                                            ctypes.byref(result)):
+            return None
+        return ${root_astnode_name}._wrap(result)
+
     def lookup_token(self, sloc):
         ${py_doc('langkit.unit_lookup_token', 8)}
         unit = AnalysisUnit._unwrap(self)
@@ -683,6 +1172,89 @@ class AnalysisUnit(object):
         _unit_lookup_token(unit, ctypes.byref(_sloc), ctypes.byref(tok))
         return tok._wrap()
 
+    @property
+    def line_count(self):
+        ${py_doc('langkit.unit_line_count', 8)}
+        return _unit_line_count(self._c_value)
+
+    def offset_to_sloc(self, offset):
+        ${py_doc('langkit.unit_offset_to_sloc', 8)}
+        if not _py2to3.is_int(offset):
+            _raise_type_error('int', offset)
+        if offset < 0:
+            return None
+        result = Sloc._c_type()
+        if not _unit_offset_to_sloc(self._c_value, offset,
+                                    ctypes.byref(result)):
+            return None
+        return result._wrap()
+
+    def sloc_to_offset(self, sloc):
+        ${py_doc('langkit.unit_sloc_to_offset', 8)}
+        _sloc = Sloc._c_type._unwrap(sloc)
+        result = _unit_sloc_to_offset(self._c_value, ctypes.byref(_sloc))
+        return None if result < 0 else result
+
+    def line_tokens(self, line):
+        ${py_doc('langkit.unit_line_tokens', 8)}
+        if not _py2to3.is_int(line):
+            _raise_type_error('int', line)
+        first = Token()
+        last = Token()
+        if line <= 0 or not _unit_line_tokens(self._c_value, line,
+                                              ctypes.byref(first),
+                                              ctypes.byref(last)):
+            return []
+        return list(first._wrap().range_until(last._wrap()))
+
+    def lookup_node(self, sloc):
+        ${py_doc('langkit.unit_lookup_node', 8)}
+        unit = AnalysisUnit._unwrap(self)
+        _sloc = Sloc._c_type._unwrap(sloc)
+        result = ${c_entity}()
+        _unit_lookup_node(unit, ctypes.byref(_sloc), ctypes.byref(result))
+        return ${root_astnode_name}._wrap(result)
+
+    def covering_nodes(self, sloc):
+        ${py_doc('langkit.unit_covering_nodes', 8)}
+        unit = AnalysisUnit._unwrap(self)
+        _sloc = Sloc._c_type._unwrap(sloc)
+        c_result = ${pyapi.c_type(T.entity.array)}()
+        _unit_covering_nodes(unit, ctypes.byref(_sloc),
+                             ctypes.byref(c_result))
+        return ${pyapi.wrap_value('c_result', T.entity.array)}
+
+    _serialization_formats = {'json': 0, 'binary': 1}
+
+    def serialize(self, format='json', output=None):
+        ${py_doc('langkit.unit_serialize', 8)}
+        try:
+            c_format = self._serialization_formats[format]
+        except (KeyError, TypeError):
+            raise ValueError('invalid serialization format: {}'
+                             .format(repr(format)))
+
+        chunks = []
+        write = chunks.append if output is None else output.write
+
+        # Exceptions cannot propagate through the C API: keep the first one
+        # and stop writing, then re-raise it once serialization is over.
+        errors = []
+
+        def callback(data, buffer, length):
+            if errors:
+                return
+            try:
+                write(ctypes.string_at(buffer, length))
+            except BaseException as exc:
+                errors.append(exc)
+
+        _unit_serialize(self._c_value, c_format,
+                        _serialization_callback(callback), None)
+        if errors:
+            raise errors[0]
+        return b''.join(chunks) if output is None else None
+
     def _dump_lexical_env(self):
         ${py_doc('langkit.unit_dump_lexical_env', 8)}
         unit = AnalysisUnit._unwrap(self)
@@ -694,6 +1266,15 @@ class AnalysisUnit(object):
         """
         return self.TokenIterator(self.first_token)
 
+    @property
+    def node_cache_stats(self):
+        """
+        Return a ``NodeCacheStats`` instance for the node wrapper cache of
+        this unit. Hit/miss counters are not reset when the unit is reparsed.
+        """
+        cache = self._node_cache
+        return NodeCacheStats(cache.hits, cache.misses, len(cache))
+
     @property
     def filename(self):
         ${py_doc('langkit.unit_filename', 8)}
@@ -716,6 +1297,20 @@ class AnalysisUnit(object):
             os.path.basename(self.filename)
         ))
 
+    @property
+    def reference(self):
+        """
+        Return a ``UnitReference`` for this unit.
+        """
+        return UnitReference(self.filename)
+
+    def __reduce__(self):
+        """
+        Analysis units are pickled as ``UnitReference`` instances: see
+        ``AnalysisContext.resolve``.
+        """
+        return self.reference.__reduce__()
+
     class _c_struct(ctypes.Structure):
         _fields_ = [('unit_version', ctypes.c_uint64)]
     _c_type = _hashable_c_pointer(_c_struct)
@@ -758,9 +1353,90 @@ class AnalysisUnit(object):
         If this unit has been reparsed, invalidate its node cache.
         """
         if self._cache_version_number != self._unit_version:
-            self._node_cache = {}
+            self._node_cache.clear()
             self._cache_version_number = self._unit_version
 
+    def _register_token_data(self):
+        """
+        Register this unit in _token_data_units, so that tokens can find the
+        unit they belong to. This does nothing if this unit has no token yet.
+        """
+        token = self.first_token
+        if token is not None:
+            _token_data_units[token._token_data] = self
+
+    def _source(self, decode):
+        """
+        Return a list that contains information about this unit's source
+        buffer: unit version, buffer address, buffer length, memory view on
+        the copy of the buffer, decoded source text (None if not computed yet)
+        and copy of the buffer. If ``decode`` is true, make sure the source
+        text is decoded.
+
+        This information is computed only once per unit version.
+        """
+        version = self._unit_version
+        cache = self._source_cache
+        if cache is None or cache[0] != version:
+            c_text = _text()
+            _unit_source_buffer(self._c_value, ctypes.byref(c_text))
+            address = ctypes.cast(c_text.chars, ctypes.c_void_p).value or 0
+
+            # Work on a copy of the source buffer: the unit frees it when it
+            # is reparsed or evicted, which can happen behind the back of this
+            # wrapper (reparsing from the context, unit eviction, ...), so
+            # views on the original buffer could outlive it.
+            array = (ctypes.c_uint32 * c_text.length)()
+            if address:
+                ctypes.memmove(array, address, ctypes.sizeof(array))
+            view = _py2to3.readonly_view(array, 'I')
+
+            cache = [version, address, c_text.length, view, None, array]
+            self._source_cache = cache
+
+        if decode and cache[4] is None:
+            array = cache[5]
+            cache[4] = ctypes.string_at(
+                ctypes.addressof(array), ctypes.sizeof(array)
+            ).decode(_text.encoding)
+        return cache
+
+    def _release_source(self):
+        """
+        Discard the cached information about this unit's source buffer, so
+        that its memory is reclaimed once users stop referencing it.
+        """
+        self._source_cache = None
+
+    def _text_slice(self, c_text):
+        """
+        Return the content of ``c_text``, a _text value that designates a
+        slice of this unit's source buffer. This slices the decoded source
+        text instead of decoding ``c_text`` itself.
+        """
+        if not c_text.length:
+            return u''
+
+        _, address, length, _, text, _ = self._source(decode=True)
+        start = (ctypes.cast(c_text.chars, ctypes.c_void_p).value
+                 - address) // 4
+        end = start + c_text.length
+
+        # Fallback to regular decoding in case the text does not come from
+        # the current source buffer.
+        if start < 0 or end > length:
+            return c_text._wrap()
+
+        return text[start:end]
+
+    def _trust_current_version(self):
+        """
+        Bring the node cache up to date and consider the current version of
+        this unit as trusted (see ``AnalysisContext.no_reparse``).
+        """
+        self._check_node_cache()
+        self._trusted_version = self._cache_version_number
+
 
 class Sloc(object):
     ${py_doc('langkit.sloc_type', 4)}
@@ -968,7 +1644,11 @@ class Token(ctypes.Structure):
     @property
     def text(self):
         ${py_doc('langkit.token_text', 8)}
-        return self._text._wrap()
+        # Tokens wrapped while their unit uses the compact representation for
+        # its source buffer have no text: fetch it from the unit instead.
+        if not self._text.chars:
+            return Token.text_range(self, self)
+        return self._unit_text_slice(self._text)
 
     @classmethod
     def text_range(cls, first, last):
@@ -979,7 +1659,7 @@ class Token(ctypes.Structure):
         result = _text()
         assert _token_range_text(ctypes.byref(first), ctypes.byref(last),
                                  ctypes.byref(result))
-        return result._wrap() or u''
+        return first._unit_text_slice(result)
 
     @property
     def sloc_range(self):
@@ -1033,6 +1713,16 @@ class Token(ctypes.Structure):
         """
         return {"kind": "Token", "token_kind": self.kind, "text": self.text}
 
+    def _unit_text_slice(self, c_text):
+        """
+        Return the content of ``c_text``, a slice of the source buffer of the
+        unit that owns this token. See ``AnalysisUnit._text_slice``.
+        """
+        unit = _token_data_units.get(self._token_data)
+        return ((c_text._wrap() or u'')
+                if unit is None else
+                unit._text_slice(c_text))
+
     @property
     def _identity_tuple(self):
         """
@@ -1044,6 +1734,297 @@ class Token(ctypes.Structure):
         return (self._token_data, self._token_index, self._trivia_index)
 
 
+class TokenTable(object):
+    """
+    Columnar description of the tokens and trivia of an analysis unit, in
+    logical order. Each column is a read-only memory view with one item per
+    token/trivia, so that it can be consumed with the ``array`` module, with
+    NumPy (``numpy.frombuffer``), etc. without any per-token call:
+
+    * ``kinds``: token kind (integer, see ``kind_name``);
+    * ``start_offsets``/``end_offsets``: 0-based bounds (end is exclusive) in
+      the ``AnalysisUnit.source_buffer``;
+    * ``start_lines``/``start_columns``/``end_lines``/``end_columns``: source
+      location range;
+    * ``is_trivia``: 1 for trivia, 0 for regular tokens.
+
+    Columns are copies: they remain valid even if the unit is reparsed.
+    """
+
+    _columns = [
+        ('kinds', ctypes.c_int, 'i'),
+        ('start_offsets', ctypes.c_uint32, 'I'),
+        ('end_offsets', ctypes.c_uint32, 'I'),
+        ('start_lines', ctypes.c_uint32, 'I'),
+        ('start_columns', ctypes.c_uint16, 'H'),
+        ('end_lines', ctypes.c_uint32, 'I'),
+        ('end_columns', ctypes.c_uint16, 'H'),
+        ('is_trivia', ctypes.c_uint8, 'B'),
+    ]
+    """
+    List of (name, ctypes type, struct format) for all columns.
+    """
+
+    __slots__ = ('unit', '_length') + tuple(name for name, _, _ in _columns)
+
+    def __init__(self, unit, length, columns):
+        """
+        This constructor is an implementation detail, and is not meant to be
+        used directly.
+        """
+        self.unit = unit
+        self._length = length
+        for (name, _, fmt), array in zip(self._columns, columns):
+            setattr(self, name, _py2to3.readonly_view(array, fmt))
+
+    @classmethod
+    def _create(cls, unit):
+        length = unit.token_count + unit.trivia_count
+        columns = [(c_type * length)() for _, c_type, _ in cls._columns]
+        count = _unit_export_tokens(unit._c_value, length, *columns)
+        assert count == length
+        return cls(unit, length, columns)
+
+    def __len__(self):
+        return self._length
+
+    @staticmethod
+    def kind_name(kind):
+        """
+        Return the name of the given token kind, as ``Token.kind`` does.
+        """
+        return _unwrap_str(_token_kind_name(kind))
+
+    def __repr__(self):
+        return '<TokenTable for {}: {} tokens/trivia>'.format(
+            self.unit, self._length
+        )
+
+
+class ArrayView(_py2to3.collections_abc.Sequence):
+    """
+    Read-only sequence for array values that properties return when in an
+    ``AnalysisContext.lazy_arrays`` block.
+
+    Unlike lists, creating a view does not convert all array items to Python
+    values: items are converted on demand and then cached, and the underlying
+    array (as well as the analysis context) is kept alive as long as the view
+    is. Use ``list(view)`` to get a regular list.
+
+    Array items can reference nodes and tokens, which reparsing or evicting
+    units deallocates: once this happens for any unit in the context, items
+    that the view has not converted yet cannot be fetched anymore, and trying
+    to do so raises a ``StaleReferenceError``.
+    """
+
+    __slots__ = ('_array', '_items', '_context', '_reparse_version')
+
+    def __init__(self, array, context):
+        """
+        This constructor is an implementation detail, and is not meant to be
+        used directly.
+        """
+        self._array = array
+        self._items = {}
+        self._context = context
+        self._reparse_version = _context_reparse_version(context._c_value)
+
+    def __len__(self):
+        return self._array.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        elif not isinstance(key, int):
+            raise TypeError('array indexes must be integers (got {})'
+                            .format(type(key)))
+
+        if key < 0:
+            key += len(self)
+        if not (0 <= key < len(self)):
+            raise IndexError('array index out of range')
+
+        try:
+            return self._items[key]
+        except KeyError:
+            if (
+                _context_reparse_version(self._context._c_value)
+                != self._reparse_version
+            ):
+                raise StaleReferenceError()
+            result = self._array.item_at(key)
+            self._items[key] = result
+            return result
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return '<ArrayView {}>'.format(list(self))
+
+
+class UnitReference(object):
+    """
+    Reference to an analysis unit that can be pickled, for instance to send it
+    to another process. Use ``AnalysisContext.resolve`` to get the designated
+    unit in a given context.
+    """
+
+    __slots__ = ('filename', )
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __reduce__(self):
+        return (UnitReference, (self.filename, ))
+
+    def __eq__(self, other):
+        return (isinstance(other, UnitReference) and
+                self.filename == other.filename)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self.filename)
+
+    def __repr__(self):
+        return '<UnitReference {}>'.format(repr(
+            os.path.basename(self.filename)
+        ))
+
+
+class NodeReference(object):
+    """
+    Reference to a node that can be pickled, for instance to send it to
+    another process. Use ``AnalysisContext.resolve`` to get the designated
+    node in a given context.
+
+    Nodes are designated by the source file of their analysis unit and their
+    index in the preorder traversal of this unit, so references are valid only
+    as long as the source file is not modified. References also include the
+    kind of the node, so that resolution can detect most mismatches, and the
+    entity metadata (tuple that contains booleans and None for null entities,
+    or None if there is no metadata).
+    """
+
+    __slots__ = ('filename', 'index', 'kind_name', 'metadata')
+
+    def __init__(self, filename, index, kind_name, metadata=None):
+        self.filename = filename
+        self.index = index
+        self.kind_name = kind_name
+        self.metadata = metadata
+
+    @property
+    def _id_tuple(self):
+        return (self.filename, self.index, self.kind_name, self.metadata)
+
+    def __reduce__(self):
+        return (NodeReference, self._id_tuple)
+
+    def __eq__(self, other):
+        return (isinstance(other, NodeReference) and
+                self._id_tuple == other._id_tuple)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self._id_tuple)
+
+    def __repr__(self):
+        return '<NodeReference {}#{} ({})>'.format(
+            os.path.basename(self.filename), self.index, self.kind_name
+        )
+
+
+_no_error_value = object()
+
+
+class _BulkProperty(property):
+    """
+    Descriptor for node properties that take no argument. In addition to the
+    behavior of regular properties, it provides a ``map`` method to evaluate
+    the property on a sequence of nodes with a single call to the C API.
+    """
+
+    def __init__(self, fget, c_binding, wrap):
+        """
+        :param fget: Function to evaluate the property on a single node.
+        :param c_binding: Callable that returns the low-level bulk accessor
+            for this property and the ctypes type for its results. Low-level
+            bindings are declared after node classes, so we must resolve them
+            lazily.
+        :param wrap: Function to turn a low-level result into the
+            corresponding high-level value.
+        """
+        super(_BulkProperty, self).__init__(fget)
+        self.__doc__ = fget.__doc__
+        self._c_binding = c_binding
+        self._wrap = wrap
+
+    @classmethod
+    def create(cls, c_binding, wrap):
+        """
+        Decorator to create a ``_BulkProperty`` from the function that
+        evaluates the property on a single node.
+        """
+        return lambda fget: cls(fget, c_binding, wrap)
+
+    def map(self, nodes, error_value=_no_error_value):
+        """
+        Evaluate this property on each node in ``nodes`` and return the list
+        of results, in the same order.
+
+        If the evaluation fails for some nodes (for instance because they do
+        not have the kind that defines this property), raise the exception
+        for the first failing node, with its original message and the index
+        of this node, unless ``error_value`` is passed: in that case, use it
+        as the result for these nodes.
+        """
+        nodes = list(nodes)
+        c_nodes = [${root_astnode_name}._unwrap(n) for n in nodes]
+        count = len(c_nodes)
+
+        c_accessor, c_type = self._c_binding()
+        c_values = (c_type * count)()
+        c_errors = (ctypes.c_uint8 * count)()
+        c_accessor((${c_entity} * count)(*c_nodes), count, c_values,
+                   c_errors)
+
+        # Wrap all successful results first, even if we are going to raise
+        # an exception, so that wrappers take ownership of them.
+        c_size = ctypes.sizeof(c_type)
+        result = [
+            error_value if c_errors[i] else
+            self._wrap(c_type.from_buffer(c_values, i * c_size))
+            for i in range(count)
+        ]
+        if error_value is _no_error_value:
+            for i in range(count):
+                if c_errors[i]:
+                    self._raise_error(nodes[i], i)
+        return result
+
+    def _raise_error(self, node, index):
+        """
+        Raise the exception for the failed evaluation of this property on
+        ``node``, the ``index``-th node passed to ``map``.
+
+        The bulk accessor reports failures only through its array of error
+        flags, so evaluate the property again on this single node to get the
+        original exception, and thus its message.
+        """
+        msg = 'evaluation failed on node #{}'.format(index)
+        try:
+            self.fget(node)
+        except Exception as exc:
+            raise type(exc)('{}: {}'.format(msg, exc) if str(exc) else msg)
+        raise PropertyError(msg)
+
+
 ## TODO: if this is needed some day, also bind create_unit_provider to allow
 ## Python users to create their own unit providers.
 class UnitProvider(object):
@@ -1070,7 +2051,7 @@ class ${root_astnode_name}(object):
     is_list_type = False
     __slots__ = ('_unprotected_c_value', '_node_c_value', '_metadata',
                  '_rebindings', '_unprotected_getitem_cache', '_unit',
-                 '_unit_version')
+                 '_unit_version', '__weakref__')
 
     ${astnode_types.subclass_decls(T.root_node)}
 
@@ -1092,9 +2073,11 @@ class ${root_astnode_name}(object):
 
         self._unprotected_getitem_cache = {}
         """
-        Cache for the __getitem__ override.
+        Cache for the __getitem__ override and for syntax fields (see
+        _eval_syntax_field). Indexed by child index for the former and by
+        field name for the latter.
 
-        :type: dict[int, ${root_astnode_name}]
+        :type: dict[int|str, ${root_astnode_name}]
         """
 
         # Information to check before accessing node data that it is still
@@ -1111,12 +2094,16 @@ class ${root_astnode_name}(object):
 
     @property
     def _c_value(self):
-        self._check_stale_reference()
+        # Wrappers created for a trusted unit version cannot be stale: see
+        # AnalysisContext.no_reparse.
+        if self._unit._trusted_version != self._unit_version:
+            self._check_stale_reference()
         return self._unprotected_c_value
 
     @property
     def _getitem_cache(self):
-        self._check_stale_reference()
+        if self._unit._trusted_version != self._unit_version:
+            self._check_stale_reference()
         return self._unprotected_getitem_cache
 
     @property
@@ -1150,6 +2137,20 @@ class ${root_astnode_name}(object):
         node = self._unwrap(self)
         return bool(_node_is_synthetic(ctypes.byref(node)))
 
+    @property
+    def preorder_index(self):
+        ${py_doc('langkit.node_preorder_index', 8)}
+        node = self._unwrap(self)
+        result = _node_preorder_index(ctypes.byref(node))
+        return None if result < 0 else result
+
+    @property
+    def preorder_last(self):
+        ${py_doc('langkit.node_preorder_last', 8)}
+        node = self._unwrap(self)
+        result = _node_preorder_last(ctypes.byref(node))
+        return None if result < 0 else result
+
     @property
     def sloc_range(self):
         ${py_doc('langkit.node_sloc_range', 8)}
@@ -1163,8 +2164,8 @@ class ${root_astnode_name}(object):
         ${py_doc('langkit.node_text', 8)}
         node = self._unwrap(self)
         result = _text()
-        _node_text(ctypes.byref(node), ctypes.byref(result))
-        return result._wrap()
+        _node_text_slice(ctypes.byref(node), ctypes.byref(result))
+        return self._unit._text_slice(result)
 
     @property
     def image(self):
@@ -1380,6 +2381,79 @@ class ${root_astnode_name}(object):
     def __repr__(self):
         return self.image
 
+    @property
+    def reference(self):
+        """
+        Return a ``NodeReference`` for this node.
+
+        Raise a ``ValueError`` if this node cannot be designated by a
+        reference, i.e. if it is a synthetic node or an entity with rebindings
+        or with metadata that refers to other nodes.
+        """
+        index = self.preorder_index
+        if index is None:
+            raise ValueError('cannot create a reference to a synthetic node')
+        if self._rebindings:
+            raise ValueError('cannot create a reference to an entity with'
+                             ' rebindings')
+
+        # Boolean metadata fields are representable, but not node ones, unless
+        # they are null.
+        metadata = []
+        for value in self._metadata.as_tuple:
+            if _py2to3.is_int(value):
+                metadata.append(bool(value))
+            elif value._pointer_value:
+                raise ValueError('cannot create a reference to an entity with'
+                                 ' node metadata')
+            else:
+                metadata.append(None)
+        metadata = tuple(metadata) if any(metadata) else None
+        return NodeReference(self.unit.filename, index, self.kind_name,
+                             metadata)
+
+    def __reduce__(self):
+        """
+        Nodes are pickled as ``NodeReference`` instances: see
+        ``AnalysisContext.resolve``.
+        """
+        return self.reference.__reduce__()
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @classmethod
+    def _from_reference(cls, unit, reference):
+        """
+        Return the node in ``unit`` that ``reference`` designates.
+        """
+        node = unit.node_at_preorder_index(reference.index)
+        if node is None:
+            raise ValueError('no node #{} in {}'.format(reference.index, unit))
+
+        if node.kind_name != reference.kind_name:
+            raise ValueError('node #{} in {} is a {} (expected a {})'.format(
+                reference.index, unit, node.kind_name, reference.kind_name
+            ))
+
+        if reference.metadata is None:
+            return node
+
+        # None stands for null node fields in references: build null values
+        # from the field types rather than passing None to ctypes, which does
+        # not accept it for all field types.
+        metadata = ${c_metadata}(*[
+            field_type() if value is None else value
+            for value, (_, field_type) in zip(reference.metadata,
+                                              ${c_metadata}._fields_)
+        ])
+        return cls._wrap(${c_entity}(
+            node._node_c_value, ${c_entity_info}(metadata, None)
+        ))
+
     @property
     def entity_repr(self):
         c_value = self._unwrap(self)
@@ -1416,6 +2490,7 @@ class ${root_astnode_name}(object):
         """
         Return a JSON representation of this node.
         """
+        import json
         return json.dumps(self.to_data())
 
     def is_a(self, *types):
@@ -1454,17 +2529,17 @@ class ${root_astnode_name}(object):
         # Look for an already existing wrapper for this node
         cache_key = (node_c_value, metadata, rebindings)
         unit = cls._fetch_unit(c_value)
-        unit._check_node_cache()
-        try:
-            return unit._node_cache[cache_key]
-        except KeyError:
-            pass
+        if unit._trusted_version is None:
+            unit._check_node_cache()
+        result = unit._node_cache.get(cache_key)
+        if result is not None:
+            return result
 
         # Pick the right subclass to materialize this node in Python
         kind = _node_kind(ctypes.byref(c_value))
         result = _kind_to_astnode_cls[kind](c_value, node_c_value, metadata,
                                             rebindings)
-        unit._node_cache[cache_key] = result
+        unit._node_cache.add(cache_key, result)
         return result
 
     @classmethod
@@ -1502,7 +2577,7 @@ class ${root_astnode_name}(object):
         the result in "c_result". This raises a PropertyError if the evaluation
         failed. Return "c_result" for convenience.
         """
-        args = (self._unwrap(self), ) + c_args + (ctypes.byref(c_result), )
+        args = (self._c_value, ) + c_args + (ctypes.byref(c_result), )
         if not c_accessor(*args):
             raise PropertyError()
         return c_result
@@ -1518,6 +2593,22 @@ class ${root_astnode_name}(object):
             self._eval_field(${c_entity}(), c_accessor)
         )
 
+    def _eval_syntax_field(self, field_name, c_accessor):
+        """
+        Internal helper. Wrapper around _eval_astnode_field for syntax fields.
+
+        Syntax fields cannot change until the unit is reparsed, and reparsing
+        turns this wrapper into a stale reference, so we can cache the result
+        in this wrapper for later calls.
+        """
+        cache = self._getitem_cache
+        try:
+            return cache[field_name]
+        except KeyError:
+            result = self._eval_astnode_field(c_accessor)
+            cache[field_name] = result
+            return result
+
 
 % for astnode in ctx.astnode_types:
     % if astnode != T.root_node:
@@ -1641,6 +2732,79 @@ _discard_errors_in_populate_lexical_env = _import_func(
    '${capi.get_name("context_discard_errors_in_populate_lexical_env")}',
    [AnalysisContext._c_type, ctypes.c_int], None
 )
+_context_memoization_invalidation_stats = _import_func(
+   '${capi.get_name("context_memoization_invalidation_stats")}',
+   [AnalysisContext._c_type,
+    ctypes.POINTER(ctypes.c_longlong),
+    ctypes.POINTER(ctypes.c_longlong)], None
+)
+_memoized_properties_count = _import_func(
+   '${capi.get_name("memoized_properties_count")}', [], ctypes.c_int
+)
+_memoized_property_name = _import_func(
+   '${capi.get_name("memoized_property_name")}',
+   [ctypes.c_int], ctypes.POINTER(ctypes.c_char)
+)
+_context_memoization_stats = _import_func(
+   '${capi.get_name("context_memoization_stats")}',
+   [AnalysisContext._c_type, ctypes.c_int]
+   + [ctypes.POINTER(ctypes.c_longlong)] * 5, None
+)
+_context_set_memoization_memory_limit = _import_func(
+   '${capi.get_name("context_set_memoization_memory_limit")}',
+   [AnalysisContext._c_type, ctypes.c_longlong, ctypes.c_int], None
+)
+_context_set_unit_memory_limit = _import_func(
+   '${capi.get_name("context_set_unit_memory_limit")}',
+   [AnalysisContext._c_type, ctypes.c_longlong], None
+)
+_context_set_parse_cache_directory = _import_func(
+   '${capi.get_name("context_set_parse_cache_directory")}',
+   [AnalysisContext._c_type, ctypes.c_char_p], None
+)
+_context_set_compact_source_buffers = _import_func(
+   '${capi.get_name("context_set_compact_source_buffers")}',
+   [AnalysisContext._c_type, ctypes.c_int], None
+)
+_context_memory_usage = _import_func(
+   '${capi.get_name("context_memory_usage")}',
+   [AnalysisContext._c_type, ctypes.POINTER(_memory_usage)], None
+)
+_event_handler_destroy_func = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+_event_handler_phase_timing_func = ctypes.CFUNCTYPE(
+    None, ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p,
+    ctypes.c_double
+)
+_context_set_event_handler = _import_func(
+   '${capi.get_name("context_set_event_handler")}',
+   [AnalysisContext._c_type, ctypes.c_void_p, _event_handler_destroy_func,
+    _event_handler_phase_timing_func], None
+)
+
+
+@_event_handler_destroy_func
+def _event_handler_destroy(data):
+    _event_handlers.pop(data, None)
+
+
+@_event_handler_phase_timing_func
+def _event_handler_phase_timing(data, filename, phase, name, elapsed):
+    handler = _event_handlers.get(data)
+    if handler is not None:
+        handler.phase_timing(_py2to3.bytes_to_text(filename),
+                             EventHandler.phases[phase],
+                             _py2to3.bytes_to_text(name),
+                             elapsed)
+
+
+_context_has_unit = _import_func(
+    '${capi.get_name("context_has_unit")}',
+    [AnalysisContext._c_type, ctypes.c_char_p], ctypes.c_int
+)
+_context_reparse_version = _import_func(
+    '${capi.get_name("context_reparse_version")}',
+    [AnalysisContext._c_type], ctypes.c_int
+)
 _get_analysis_unit_from_file = _import_func(
     '${capi.get_name("get_analysis_unit_from_file")}',
     [AnalysisContext._c_type,  # context
@@ -1691,6 +2855,33 @@ _unit_trivia_count = _import_func(
     "${capi.get_name('unit_trivia_count')}",
     [AnalysisUnit._c_type], ctypes.c_int
 )
+_unit_memory_usage = _import_func(
+    "${capi.get_name('unit_memory_usage')}",
+    [AnalysisUnit._c_type, ctypes.POINTER(_memory_usage)], None
+)
+_unit_is_evicted = _import_func(
+    "${capi.get_name('unit_is_evicted')}",
+    [AnalysisUnit._c_type], ctypes.c_int
+)
+_unit_source_buffer = _import_func(
+    "${capi.get_name('unit_source_buffer')}",
+    [AnalysisUnit._c_type, ctypes.POINTER(_text)], None
+)
+_unit_export_tokens = _import_func(
+    "${capi.get_name('unit_export_tokens')}",
+    [AnalysisUnit._c_type, ctypes.c_int,
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_uint32),
+     ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_uint16),
+     ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_uint16),
+     ctypes.POINTER(ctypes.c_uint8)],
+    ctypes.c_int
+)
+_unit_node_at_preorder_index = _import_func(
+    "${capi.get_name('unit_node_at_preorder_index')}",
+    [AnalysisUnit._c_type, ctypes.c_uint, ctypes.POINTER(${c_entity})],
+    ctypes.c_int
+)
 _unit_lookup_token = _import_func(
     "${capi.get_name('unit_lookup_token')}",
     [AnalysisUnit._c_type,
@@ -1698,6 +2889,52 @@ _unit_lookup_token = _import_func(
      ctypes.POINTER(Token)],
     None
 )
+_serialization_callback = ctypes.CFUNCTYPE(
+    None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t
+)
+_unit_serialize = _import_func(
+    "${capi.get_name('unit_serialize')}",
+    [AnalysisUnit._c_type,
+     ctypes.c_int,
+     _serialization_callback,
+     ctypes.c_void_p],
+    ctypes.c_int
+)
+_unit_line_count = _import_func(
+    "${capi.get_name('unit_line_count')}",
+    [AnalysisUnit._c_type], ctypes.c_int
+)
+_unit_offset_to_sloc = _import_func(
+    "${capi.get_name('unit_offset_to_sloc')}",
+    [AnalysisUnit._c_type, ctypes.c_uint, ctypes.POINTER(Sloc._c_type)],
+    ctypes.c_int
+)
+_unit_sloc_to_offset = _import_func(
+    "${capi.get_name('unit_sloc_to_offset')}",
+    [AnalysisUnit._c_type, ctypes.POINTER(Sloc._c_type)], ctypes.c_int
+)
+_unit_line_tokens = _import_func(
+    "${capi.get_name('unit_line_tokens')}",
+    [AnalysisUnit._c_type,
+     ctypes.c_uint,
+     ctypes.POINTER(Token),
+     ctypes.POINTER(Token)],
+    ctypes.c_int
+)
+_unit_lookup_node = _import_func(
+    "${capi.get_name('unit_lookup_node')}",
+    [AnalysisUnit._c_type,
+     ctypes.POINTER(Sloc._c_type),
+     ctypes.POINTER(${c_entity})],
+    None
+)
+_unit_covering_nodes = _import_func(
+    "${capi.get_name('unit_covering_nodes')}",
+    [AnalysisUnit._c_type,
+     ctypes.POINTER(Sloc._c_type),
+     ctypes.POINTER(${pyapi.c_type(T.entity.array)})],
+    None
+)
 _unit_dump_lexical_env = _import_func(
     "${capi.get_name('unit_dump_lexical_env')}",
     [AnalysisUnit._c_type], None
@@ -1759,8 +2996,8 @@ _node_image = _import_func(
     '${capi.get_name("node_image")}',
     [ctypes.POINTER(${c_entity}), ctypes.POINTER(_text)], None
 )
-_node_text = _import_func(
-    '${capi.get_name("node_text")}',
+_node_text_slice = _import_func(
+    '${capi.get_name("node_text_slice")}',
     [ctypes.POINTER(${c_entity}), ctypes.POINTER(_text)], None
 )
 _node_sloc_range = _import_func(
@@ -1773,6 +3010,14 @@ _lookup_in_node = _import_func(
      ctypes.POINTER(Sloc._c_type),
      ctypes.POINTER(${c_entity})], None
 )
+_node_preorder_index = _import_func(
+    '${capi.get_name("node_preorder_index")}',
+    [ctypes.POINTER(${c_entity})], ctypes.c_int
+)
+_node_preorder_last = _import_func(
+    '${capi.get_name("node_preorder_last")}',
+    [ctypes.POINTER(${c_entity})], ctypes.c_int
+)
 _node_children_count = _import_func(
     '${capi.get_name("node_children_count")}',
     [ctypes.POINTER(${c_entity})], ctypes.c_uint
@@ -1787,7 +3032,7 @@ _node_child = _import_func(
     % for field in astnode.fields_with_accessors():
 _${field.accessor_basename.lower} = _import_func(
     '${capi.get_name(field.accessor_basename)}',
-    [ctypes.POINTER(${c_entity}),
+    lambda: [ctypes.POINTER(${c_entity}),
      % for arg in field.arguments:
         <%
             type_expr = pyapi.c_type(arg.public_type)
@@ -1799,6 +3044,15 @@ _${field.accessor_basename.lower} = _import_func(
      ctypes.POINTER(${pyapi.c_type(field.public_type)})],
     ctypes.c_int
 )
+        % if field.has_bulk_accessor:
+_${field.bulk_accessor_basename.lower} = _import_func(
+    '${capi.get_name(field.bulk_accessor_basename)}',
+    lambda: [ctypes.POINTER(${c_entity}), ctypes.c_size_t,
+             ctypes.POINTER(${pyapi.c_type(field.public_type)}),
+             ctypes.POINTER(ctypes.c_uint8)],
+    ctypes.c_int
+)
+        % endif
     % endfor
 % endfor
 
@@ -1843,6 +3097,14 @@ _entity_image = _import_func(
 # Layering helpers
 #
 
+_token_data_units = weakref.WeakValueDictionary()
+"""
+Mapping from token data handlers to the analysis units that own them. Token
+data handlers are identified by the ``Token._token_data`` field.
+
+:type: dict[Token._tdh_c_type, AnalysisUnit]
+"""
+
 def _unwrap_str(c_char_p_value):
     """
     Assuming c_char_p_value is a valid char*, convert it to a native Python
@@ -1911,14 +3173,27 @@ class App(object):
 
     - `description` to change the description of the app.
 
+    - `process_unit` to process a single analysis unit and return a result.
+
     Inside of `main`, the user can access app specific state:
 
     - `self.units` is a map of filenames to analysis units.
     - `self.ctx` is the analysis context.
     - `self.u` is the last parsed unit.
+    - `self.results` is a map of filenames to the results that `process_unit`
+      returned for the corresponding units.
 
     The user can then run the app by calling `App.run()`.
 
+    When the `--jobs N` command-line argument is passed with N different from
+    1 (0 meaning the number of CPUs), source files are processed in N worker
+    processes instead. Each worker process creates its own instance of the app
+    (and thus its own analysis context and unit provider), and calls
+    `process_unit` for all the source files it was assigned. `process_unit`
+    must then return picklable values, which the parent process collects in
+    `self.results` before calling `main`. Note that in this mode, no unit is
+    loaded in the parent process: `self.units` is empty and `self.u` is None.
+
     Here is a small example of an app subclassing `App`, that will simply print
     the tree of every unit passed as argument:
 
@@ -1944,8 +3219,32 @@ class App(object):
         return ""
 
     def __init__(self):
+        import argparse
+
+        def jobs_count(value):
+            """
+            Argument type for the ``--jobs`` command-line option: check that
+            ``value`` is a non-negative integer and return it.
+            """
+            try:
+                result = int(value)
+            except ValueError:
+                result = -1
+            if result < 0:
+                raise argparse.ArgumentTypeError(
+                    'expected a positive number of jobs (or 0 for the number'
+                    ' of CPUs), got {}'.format(value)
+                )
+            return result
+
         self.parser = argparse.ArgumentParser(description=self.description)
         self.parser.add_argument('files', nargs='+', help='Files')
+        self.parser.add_argument(
+            '--jobs', type=jobs_count, default=1,
+            help='Number of worker processes to process files (0 for the'
+                 ' number of CPUs). Default is 1: process files in the main'
+                 ' process.'
+        )
         self.add_arguments()
         self.args = self.parser.parse_args()
         self.ctx = AnalysisContext(
@@ -1967,6 +3266,14 @@ class App(object):
         """
         return None
 
+    def process_unit(self, unit):
+        """
+        Hook for subclasses to process a single analysis unit and return a
+        result for it (see `self.results`). Default implementation returns
+        None.
+        """
+        return None
+
     def process_files(self):
         """
         Load units for all source files on the command-line in `self.units`.
@@ -1977,13 +3284,91 @@ class App(object):
             self.u = self.ctx.get_from_file(file_name)
             self.units[file_name] = self.u
 
+    def process_files_parallel(self, jobs):
+        """
+        Process all source files on the command-line in `jobs` worker
+        processes and put the results in `self.results`.
+        """
+        self.units = {}
+        self.u = None
+        self.results = collections.OrderedDict()
+
+        import multiprocessing
+
+        files = self.args.files
+        chunksize = max(1, len(files) // (4 * jobs))
+        pool = multiprocessing.Pool(jobs, initializer=_app_worker_init,
+                                    initargs=(type(self), ))
+        try:
+            for file_name, result in zip(
+                files,
+                pool.imap(_app_worker_process, files, chunksize)
+            ):
+                self.results[file_name] = result
+        finally:
+            pool.terminate()
+            pool.join()
+
     @classmethod
     def run(cls):
         """
         Instantiate and run this application.
         """
         instance = cls()
-        instance.process_files()
+        jobs = instance.args.jobs
+        if jobs == 0:
+            import multiprocessing
+            jobs = multiprocessing.cpu_count()
+
+        if jobs == 1:
+            instance.process_files()
+            instance.results = collections.OrderedDict(
+                (file_name, instance.process_unit(instance.units[file_name]))
+                for file_name in instance.args.files
+            )
+        else:
+            instance.process_files_parallel(jobs)
+
         instance.main()
 
     ${exts.include_extension(ctx.ext('python_api/app_exts'))}
+
+
+_app_worker = None
+"""
+In worker processes for ``App.process_files_parallel``, instance of the app
+that processes source files.
+
+:type: App
+"""
+
+
+def _app_worker_init(app_cls):
+    """
+    Initializer for ``App.process_files_parallel`` worker processes: create the
+    app instance that will process source files in this process.
+    """
+    global _app_worker
+    _app_worker = app_cls()
+    _app_worker.units = {}
+    _app_worker.u = None
+
+
+def _app_worker_process(file_name):
+    """
+    Process ``file_name`` in the app of the current worker process and return
+    the result.
+    """
+    unit = _app_worker.ctx.get_from_file(file_name)
+    _app_worker.units[file_name] = unit
+    _app_worker.u = unit
+    return _app_worker.process_unit(unit)
+
+
+# Now that all module globals are defined, let the lazy wrappers that
+# _import_func returned know the name of the global that designates them, if
+# any.
+for _name, _value in list(globals().items()):
+    if _lazy_funcs.get(id(_value)) is _value:
+        _value.global_name = _name
+del _name, _value
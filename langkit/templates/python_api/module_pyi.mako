@@ -10,8 +10,9 @@
 import argparse
 import sys
 from typing import (
-    Any, AnyStr, Callable, ClassVar, Dict, IO, Iterator, List, Optional as Opt,
-    Tuple, Type, TypeVar, Union
+    Any, AnyStr, Callable, ClassVar, ContextManager, Dict, Generic, IO,
+    Iterable, Iterator, List, NamedTuple, Optional as Opt, Sequence, Tuple,
+    Type, TypeVar, Union, overload
 )
 
 
@@ -74,7 +75,68 @@ class AnalysisContext(object):
     def discard_errors_in_populate_lexical_env(self,
                                                discard: bool) -> None: ...
 
+    @property
+    def memoization_invalidation_stats(self) -> Tuple[int, int]: ...
+
+    @property
+    def memoization_stats(self) -> Dict[str, MemoizationStats]: ...
+
+    def set_memoization_memory_limit(self,
+                                     limit: int,
+                                     policy: str = 'lru') -> None: ...
+
+    def set_unit_memory_limit(self, limit: int) -> None: ...
+
+    def set_parse_cache_directory(self,
+                                  directory: Opt[str]) -> None: ...
+
+    def set_compact_source_buffers(self, enabled: bool) -> None: ...
+
+    @property
+    def memory_usage(self) -> MemoryUsage: ...
+
+    def set_event_handler(self, handler: Opt[EventHandler]) -> None: ...
+
+    def resolve(
+        self,
+        reference: Union[UnitReference, NodeReference]
+    ) -> Union[AnalysisUnit, ${root_astnode_name}]: ...
+
+    def no_reparse(self) -> ContextManager[AnalysisContext]: ...
+    def lazy_arrays(self) -> ContextManager[AnalysisContext]: ...
+
+class MemoizationStats(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+    evictions: int
+
+class MemoryUsage(NamedTuple):
+    ast_nodes: int
+    tokens: int
+    source_buffer: int
+    symbols: int
+    memoization: int
+    lexical_envs: int
+    lookup_caches: int
+    total: int
+
+class EventHandler(object):
+    phases: ClassVar[Tuple[str, ...]]
+
+    def phase_timing(self, filename: str, phase: str, name: str,
+                     elapsed: float) -> None: ...
+
+class NodeCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
 class AnalysisUnit(object):
+    node_cache_size: ClassVar[Opt[int]]
+
     class TokenIterator(object):
         def __init__(self, first: Token) -> None: ...
         def __iter__(self) -> AnalysisUnit.TokenIterator: ...
@@ -106,15 +168,41 @@ class AnalysisUnit(object):
     @property
     def text(self) -> str: ...
 
+    @property
+    def source_buffer(self) -> memoryview: ...
+
     @property
     def token_count(self) -> int: ...
 
     @property
     def trivia_count(self) -> int: ...
 
+    @property
+    def memory_usage(self) -> MemoryUsage: ...
+
+    @property
+    def is_evicted(self) -> bool: ...
+
+    def token_table(self) -> TokenTable: ...
+    def node_at_preorder_index(
+        self, index: int
+    ) -> Opt[${root_astnode_name}]: ...
     def lookup_token(self, sloc: Sloc) -> Token: ...
+    @property
+    def line_count(self) -> int: ...
+    def offset_to_sloc(self, offset: int) -> Opt[Sloc]: ...
+    def sloc_to_offset(self, sloc: Sloc) -> Opt[int]: ...
+    def line_tokens(self, line: int) -> List[Token]: ...
+    def lookup_node(self, sloc: Sloc) -> Opt[${root_astnode_name}]: ...
+    def serialize(
+        self, format: str = ..., output: Opt[IO[bytes]] = ...
+    ) -> Opt[bytes]: ...
+    def covering_nodes(self, sloc: Sloc) -> List[${root_astnode_name}]: ...
     def iter_tokens(self) -> AnalysisUnit.TokenIterator: ...
 
+    @property
+    def node_cache_stats(self) -> NodeCacheStats: ...
+
     @property
     def filename(self) -> str: ...
 
@@ -123,6 +211,11 @@ class AnalysisUnit(object):
 
     def __repr__(self) -> str: ...
 
+    @property
+    def reference(self) -> UnitReference: ...
+
+    def __reduce__(self) -> Tuple[Any, ...]: ...
+
 
 class Sloc(object):
     line: int
@@ -205,6 +298,83 @@ class Token(object):
     def to_data(self) -> dict: ...
 
 
+class TokenTable(object):
+    unit: AnalysisUnit
+    kinds: memoryview
+    start_offsets: memoryview
+    end_offsets: memoryview
+    start_lines: memoryview
+    start_columns: memoryview
+    end_lines: memoryview
+    end_columns: memoryview
+    is_trivia: memoryview
+
+    def __len__(self) -> int: ...
+    @staticmethod
+    def kind_name(kind: int) -> str: ...
+    def __repr__(self) -> str: ...
+
+
+_ArrayItem = TypeVar('_ArrayItem')
+
+
+class ArrayView(Sequence[_ArrayItem]):
+
+    def __init__(self, array: Any, context: AnalysisContext) -> None: ...
+    def __len__(self) -> int: ...
+    @overload
+    def __getitem__(self, key: int) -> _ArrayItem: ...
+    @overload
+    def __getitem__(self, key: slice) -> List[_ArrayItem]: ...
+    def __iter__(self) -> Iterator[_ArrayItem]: ...
+    def __repr__(self) -> str: ...
+
+
+class UnitReference(object):
+    filename: str
+
+    def __init__(self, filename: str) -> None: ...
+    def __reduce__(self) -> Tuple[Any, ...]: ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __ne__(self, other: Any) -> bool: ...
+    def __hash__(self) -> int: ...
+    def __repr__(self) -> str: ...
+
+
+class NodeReference(object):
+    filename: str
+    index: int
+    kind_name: str
+    metadata: Opt[Tuple[Opt[bool], ...]]
+
+    def __init__(self,
+                 filename: str,
+                 index: int,
+                 kind_name: str,
+                 metadata: Opt[Tuple[Opt[bool], ...]] = None) -> None: ...
+    def __reduce__(self) -> Tuple[Any, ...]: ...
+    def __eq__(self, other: Any) -> bool: ...
+    def __ne__(self, other: Any) -> bool: ...
+    def __hash__(self) -> int: ...
+    def __repr__(self) -> str: ...
+
+
+_BulkResult = TypeVar('_BulkResult')
+
+
+class _BulkProperty(Generic[_BulkResult]):
+    @overload
+    def __get__(self,
+                obj: None,
+                owner: Any) -> _BulkProperty[_BulkResult]: ...
+    @overload
+    def __get__(self, obj: Any, owner: Any) -> _BulkResult: ...
+
+    def map(self,
+            nodes: Iterable[${root_astnode_name}],
+            error_value: Any = ...) -> List[_BulkResult]: ...
+
+
 class UnitProvider(object):
 
     def __init__(self, c_value: Any) -> None: ...
@@ -237,6 +407,12 @@ class ${root_astnode_name}(object):
     @property
     def is_synthetic(self) -> bool: ...
 
+    @property
+    def preorder_index(self) -> Opt[int]: ...
+
+    @property
+    def preorder_last(self) -> Opt[int]: ...
+
     @property
     def sloc_range(self) -> SlocRange: ...
 
@@ -285,6 +461,13 @@ class ${root_astnode_name}(object):
 
     def __repr__(self) -> str: ...
 
+    @property
+    def reference(self) -> NodeReference: ...
+
+    def __reduce__(self) -> Tuple[Any, ...]: ...
+    def __copy__(self) -> ${root_astnode_name}: ...
+    def __deepcopy__(self, memo: Any) -> ${root_astnode_name}: ...
+
     @property
     def entity_repr(self) -> str: ...
 
@@ -323,8 +506,10 @@ ${exts.include_extension(ctx.ext('mypy_python'))}
 class App(object):
     parser: argparse.ArgumentParser
     args: argparse.Namespace
-    u: AnalysisUnit
+    u: Opt[AnalysisUnit]
     ctx: AnalysisContext
+    units: Dict[str, AnalysisUnit]
+    results: Dict[str, Any]
 
     @property
     def description(self) -> str: ...
@@ -332,7 +517,9 @@ class App(object):
     def __init__(self) -> None: ...
     def add_arguments(self) -> None: ...
     def create_unit_provider(self) -> Opt[UnitProvider]: ...
+    def process_unit(self, unit: AnalysisUnit) -> Any: ...
     def process_files(self) -> None: ...
+    def process_files_parallel(self, jobs: int) -> None: ...
 
     @classmethod
     def run(cls) -> None: ...
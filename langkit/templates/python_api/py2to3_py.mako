@@ -7,6 +7,7 @@ This module is a Libadalang implementation detail, so please do not use it
 outside of Libadalang.
 """
 
+import array
 import sys
 
 
@@ -17,11 +18,13 @@ if python2:
     text_type = unicode
     is_int = lambda value: isinstance(value, (int, long))
     from StringIO import StringIO
+    import collections as collections_abc
 else:
     bytes_type = bytes
     text_type = str
     is_int = lambda value: isinstance(value, int)
     from io import StringIO
+    import collections.abc as collections_abc
 
 
 def text_to_bytes(text):
@@ -83,3 +86,23 @@ def bytes_repr(bstr):
     else:
         assert isinstance(bstr, bytes)
         return repr(bstr)
+
+
+def readonly_view(c_array, fmt):
+    """
+    Return a read-only memory view on ``c_array`` (a ctypes array), whose items
+    are in the given native struct format (``fmt``).
+
+    Memory views on ctypes arrays have explicit byte order formats (like
+    "<I"), which memoryview iteration, memoryview.tolist and the array module
+    do not support, hence the cast to a native format. Memory views cannot be
+    made read-only before Python 3.8, so older versions get a view on a copy
+    of ``c_array``. Memory views cannot be cast in Python2, which gets an
+    ``array.array`` copy instead.
+    """
+    if python2:
+        return array.array(fmt, buffer(c_array)[:])
+    elif sys.version_info < (3, 8):
+        return memoryview(bytes(c_array)).cast(fmt)
+    else:
+        return memoryview(c_array).cast('B').cast(fmt).toreadonly()
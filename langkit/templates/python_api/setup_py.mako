@@ -9,6 +9,7 @@ setup(
     name=${repr(ctx.lib_name.camel)},
     version='0.1',
     packages=[${repr(name)}],
+    py_modules=[${repr(name + '_tree_reader')}],
     package_data={
         ${repr(ctx.python_api_settings.module_name)}:
             ['*.{}'.format(ext) for ext in ('dll', 'so', 'so.*', 'dylib')],
@@ -0,0 +1,288 @@
+## vim: filetype=makopython
+
+<% module_name = ctx.python_api_settings.module_name %>
+
+"""
+Reader for parse trees serialized with the binary format of
+``${module_name}.AnalysisUnit.serialize``.
+
+This module is self-contained: it does not need the ${module_name} shared
+library, so it can be used to process serialized trees on hosts where this
+library is not available.
+"""
+
+import struct
+
+
+__all__ = ['FormatError', 'Kind', 'Node', 'load', 'loads']
+
+
+_MAGIC = b'LKTB'
+_VERSION = 1
+_NO_KIND = 0xFFFF
+_NO_TOKEN = 0xFFFFFFFF
+
+_LIST_KIND_FLAG = 1
+_TOKEN_KIND_FLAG = 2
+
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_NODE = struct.Struct('<IIIHIH')
+
+
+class FormatError(ValueError):
+    """
+    Raised when trying to decode data that is not a valid serialized tree.
+    """
+    pass
+
+
+class Kind(object):
+    """
+    Node kind, as described in the table of node kinds of a serialized tree.
+    """
+
+    __slots__ = ('name', 'is_list', 'is_token', 'fields')
+
+    def __init__(self, name, is_list, is_token, fields):
+        self.name = name
+        """
+        Name of this kind.
+        """
+
+        self.is_list = is_list
+        """
+        Whether nodes of this kind are lists.
+        """
+
+        self.is_token = is_token
+        """
+        Whether nodes of this kind are token nodes.
+        """
+
+        self.fields = fields
+        """
+        List of field names for nodes of this kind (empty for lists).
+        """
+
+    def __repr__(self):
+        return '<Kind {}>'.format(self.name)
+
+
+class Node(object):
+    """
+    Node decoded from a serialized tree.
+    """
+
+    __slots__ = ('kind', 'token_start', 'token_end', 'sloc_range', 'text',
+                 'children')
+
+    def __init__(self, kind, token_start, token_end, sloc_range):
+        self.kind = kind
+        """
+        ``Kind`` instance for this node.
+        """
+
+        self.token_start = token_start
+        self.token_end = token_end
+        """
+        0-based indexes of the first and last tokens for this node (trivia
+        excluded), or None.
+        """
+
+        self.sloc_range = sloc_range
+        """
+        Source location range for this node, as a ``((start_line,
+        start_column), (end_line, end_column))`` tuple.
+        """
+
+        self.text = None
+        """
+        For token nodes, text for this node. None otherwise.
+        """
+
+        self.children = []
+        """
+        List of children for this node (None for null children).
+        """
+
+    @property
+    def kind_name(self):
+        """
+        Name of this node's kind.
+        """
+        return self.kind.name
+
+    @property
+    def fields(self):
+        """
+        List of (field name, child) couples for this node. This is empty for
+        list nodes.
+        """
+        return list(zip(self.kind.fields, self.children))
+
+    @property
+    def sloc_range_image(self):
+        """
+        Image for this node's source location range, in the
+        ``LINE:COL-LINE:COL`` format.
+        """
+        (sl, sc), (el, ec) = self.sloc_range
+        return '{}:{}-{}:{}'.format(sl, sc, el, ec)
+
+    def to_data(self):
+        """
+        Return a nested Python data structure that represents the subtree
+        rooted at this node. This is the same data structure as the one that
+        the JSON serialization format encodes.
+        """
+        result = {'kind': self.kind.name,
+                  'sloc_range': self.sloc_range_image}
+        if self.kind.is_token:
+            result['text'] = self.text
+        if self.kind.is_list:
+            result['items'] = [_to_data(c) for c in self.children]
+        else:
+            result['fields'] = {name: _to_data(c)
+                                for name, c in self.fields}
+        return result
+
+    def __repr__(self):
+        return '<{} {}>'.format(self.kind.name, self.sloc_range_image)
+
+
+def _to_data(node):
+    return None if node is None else node.to_data()
+
+
+class _Reader(object):
+    """
+    Helper to decode binary data.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, st):
+        """
+        Decode data with the ``st`` structure and return the resulting tuple.
+        """
+        try:
+            result = st.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise FormatError('truncated data at offset {}'
+                              .format(self.offset))
+        self.offset += st.size
+        return result
+
+    def read_int(self, st):
+        return self.read(st)[0]
+
+    def read_string(self):
+        length = self.read_int(_U32)
+        end = self.offset + length
+        if end > len(self.data):
+            raise FormatError('truncated data at offset {}'
+                              .format(self.offset))
+        result = self.data[self.offset:end]
+        self.offset = end
+        try:
+            return result.decode('utf-8')
+        except UnicodeDecodeError as exc:
+            raise FormatError('invalid string: {}'.format(exc))
+
+
+def _read_kinds(reader):
+    kinds = []
+    for _ in range(reader.read_int(_U32)):
+        name = reader.read_string()
+        flags = reader.read_int(_U8)
+        fields = [reader.read_string()
+                  for _ in range(reader.read_int(_U32))]
+        kinds.append(Kind(name,
+                          bool(flags & _LIST_KIND_FLAG),
+                          bool(flags & _TOKEN_KIND_FLAG),
+                          fields))
+    return kinds
+
+
+def _read_tree(reader, kinds):
+    # Decode the tree iteratively so that deep trees do not hit Python's
+    # recursion limit. Each stack item is a list of nodes to fill and the
+    # number of nodes that remain to be decoded for it.
+    roots = []
+    token_nodes = []
+    stack = [[roots, 1]]
+    while stack:
+        item = stack[-1]
+        if item[1] == 0:
+            stack.pop()
+            continue
+        item[1] -= 1
+
+        kind_index = reader.read_int(_U16)
+        if kind_index == _NO_KIND:
+            item[0].append(None)
+            continue
+        try:
+            kind = kinds[kind_index]
+        except IndexError:
+            raise FormatError('invalid node kind: {}'.format(kind_index))
+
+        ts, te, sl, sc, el, ec = reader.read(_NODE)
+        node = Node(kind,
+                    None if ts == _NO_TOKEN else ts,
+                    None if te == _NO_TOKEN else te,
+                    ((sl, sc), (el, ec)))
+        if kind.is_token:
+            token_nodes.append((node, reader.read_int(_U32)))
+        count = (reader.read_int(_U32)
+                 if kind.is_list else
+                 len(kind.fields))
+
+        item[0].append(node)
+        if count:
+            stack.append([node.children, count])
+
+    return roots[0], token_nodes
+
+
+def loads(data):
+    """
+    Decode the given serialized tree (bytes-like object) and return the root
+    node (``Node`` instance), or None if the tree is empty.
+
+    Raise a ``FormatError`` if ``data`` is not a valid serialized tree.
+    """
+    if not isinstance(data, bytes):
+        data = memoryview(data).tobytes()
+
+    reader = _Reader(data)
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise FormatError('invalid magic bytes')
+    reader.offset = len(_MAGIC)
+    version = reader.read_int(_U16)
+    if version != _VERSION:
+        raise FormatError('unsupported version: {}'.format(version))
+
+    kinds = _read_kinds(reader)
+    root, token_nodes = _read_tree(reader, kinds)
+
+    strings = [reader.read_string() for _ in range(reader.read_int(_U32))]
+    for node, index in token_nodes:
+        try:
+            node.text = strings[index]
+        except IndexError:
+            raise FormatError('invalid string index: {}'.format(index))
+
+    return root
+
+
+def load(fp):
+    """
+    Like ``loads``, but read the serialized tree from ``fp``, a binary
+    file-like object.
+    """
+    return loads(fp.read())
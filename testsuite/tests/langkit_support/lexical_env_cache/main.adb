@@ -0,0 +1,45 @@
+--  Test that lookup caches are invalidated when one of the environments that
+--  a cached lookup traversed (parent or referenced environment) changes, and
+--  only then.
+
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Support; use Support;
+use Support.Envs;
+use Support.Symbols;
+
+procedure Main is
+   Symbols : constant Symbol_Table := Create_Symbol_Table;
+   Key_X   : constant Symbol_Type := Find (Symbols, "X");
+
+   P : Lexical_Env := Create_Lexical_Env (No_Env_Getter, 'P', Owner => True);
+   A : Lexical_Env := Create_Lexical_Env
+     (Simple_Env_Getter (P), 'A', Owner => True);
+   R : Lexical_Env := Create_Lexical_Env (No_Env_Getter, 'R', Owner => True);
+   U : Lexical_Env := Create_Lexical_Env (No_Env_Getter, 'U', Owner => True);
+begin
+   Reference (A, R);
+   Add (P, Key_X, '1');
+   Add (A, Key_X, '2');
+   Add (R, Key_X, '3');
+
+   Put_Line ("Looking in A:");
+   Put_Line (Get (A, Key_X));
+
+   Put_Line ("After adding to an unrelated env:");
+   Add (U, Key_X, '4');
+   Put_Line (Get (A, Key_X));
+
+   Put_Line ("After adding to the referenced env:");
+   Add (R, Key_X, '5');
+   Put_Line (Get (A, Key_X));
+
+   Put_Line ("After adding to the parent env:");
+   Add (P, Key_X, '6');
+   Put_Line (Get (A, Key_X));
+
+   Destroy (A);
+   Destroy (P);
+   Destroy (R);
+   Destroy (U);
+end Main;
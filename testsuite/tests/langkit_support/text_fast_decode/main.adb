@@ -0,0 +1,157 @@
+--  Check that Langkit_Support.Text.Fast_Decode agrees with iconv on valid and
+--  invalid inputs, and that Decode works on big buffers.
+
+with Ada.Text_IO; use Ada.Text_IO;
+
+with GNAT.Strings; use GNAT.Strings;
+
+with GNATCOLL.Iconv; use GNATCOLL.Iconv;
+
+with Langkit_Support.Text; use Langkit_Support.Text;
+
+procedure Main is
+
+   function Bytes (Codes : Text_Type) return String;
+   --  Return a string whose characters have the given codes
+
+   procedure Iconv_Decode
+     (Buffer  : String;
+      Charset : String;
+      Result  : out Text_Type;
+      Last    : out Natural;
+      Success : out Boolean);
+   --  Same as Fast_Decode, but use iconv
+
+   procedure Check (Label : String; Buffer : String; Charset : String);
+   --  Decode Buffer with both Fast_Decode and Iconv_Decode, print the result
+   --  and whether both decoders agree.
+
+   procedure Check_Big;
+   --  Check that Decode works on a buffer that is too big to be decoded on
+   --  the primary stack.
+
+   -----------
+   -- Bytes --
+   -----------
+
+   function Bytes (Codes : Text_Type) return String is
+      Result : String (Codes'Range);
+   begin
+      for I in Codes'Range loop
+         Result (I) := Character'Val (Character_Type'Pos (Codes (I)));
+      end loop;
+      return Result;
+   end Bytes;
+
+   ------------------
+   -- Iconv_Decode --
+   ------------------
+
+   procedure Iconv_Decode
+     (Buffer  : String;
+      Charset : String;
+      Result  : out Text_Type;
+      Last    : out Natural;
+      Success : out Boolean)
+   is
+      State        : Iconv_T := Iconv_Open (Text_Charset, Charset);
+      Status       : Iconv_Result;
+      Input_Index  : Positive := Buffer'First;
+      Output_Index : Positive := 1;
+
+      Output : Byte_Sequence (1 .. 4 * Result'Length)
+         with Import, Address => Result'Address;
+   begin
+      Iconv (State,
+             Buffer, Input_Index,
+             Output, Output_Index,
+             Status);
+      Iconv_Close (State);
+      Last := Result'First + (Output_Index - 1) / 4 - 1;
+      Success := Status = GNATCOLL.Iconv.Success;
+   end Iconv_Decode;
+
+   -----------
+   -- Check --
+   -----------
+
+   procedure Check (Label : String; Buffer : String; Charset : String) is
+      Fast_Result, Slow_Result   : Text_Type (1 .. Buffer'Length + 1);
+      Fast_Last, Slow_Last       : Natural;
+      Fast_Success, Slow_Success : Boolean;
+   begin
+      Fast_Decode (Buffer, Charset, Fast_Result, Fast_Last, Fast_Success);
+      Iconv_Decode (Buffer, Charset, Slow_Result, Slow_Last, Slow_Success);
+
+      Put (Label & " (" & Charset & "): ");
+      if Fast_Success then
+         Put_Line (Image (Fast_Result (1 .. Fast_Last), With_Quotes => True));
+      else
+         Put_Line ("<invalid>");
+      end if;
+
+      if Fast_Success /= Slow_Success
+         or else (Fast_Success
+                  and then Fast_Result (1 .. Fast_Last)
+                           /= Slow_Result (1 .. Slow_Last))
+      then
+         Put_Line ("   ... but iconv disagrees");
+      end if;
+   end Check;
+
+   ---------------
+   -- Check_Big --
+   ---------------
+
+   procedure Check_Big is
+      Count  : constant := 16 * 1024 * 1024;
+      Buffer : String_Access := new String'(1 .. Count => 'a');
+   begin
+      Put_Line
+        ("Big (utf-8): decoded"
+         & Natural'Image (Decode (Buffer.all, "utf-8")'Length)
+         & " characters");
+      Free (Buffer);
+   end Check_Big;
+
+begin
+   Check ("Empty", "", "utf-8");
+
+   Check ("ASCII", "hello world", "ascii");
+   Check ("ASCII", "hello world", "us-ascii");
+   Check ("ASCII", "hello world", "iso-8859-1");
+   Check ("ASCII", "hello world", "UTF-8");
+
+   Check ("Latin-1", Bytes ("caf" & Character_Type'Val (16#e9#)), "ascii");
+   Check ("Latin-1", Bytes ("caf" & Character_Type'Val (16#e9#)), "latin1");
+   Check ("Latin-1", Bytes ("caf" & Character_Type'Val (16#e9#)), "utf-8");
+
+   Check ("2-bytes", Bytes ("caf" & Character_Type'Val (16#c3#)
+                            & Character_Type'Val (16#a9#)), "utf-8");
+   Check ("3-bytes", Bytes (Character_Type'Val (16#e2#)
+                            & Character_Type'Val (16#82#)
+                            & Character_Type'Val (16#ac#)), "utf-8");
+   Check ("4-bytes", Bytes (Character_Type'Val (16#f0#)
+                            & Character_Type'Val (16#9f#)
+                            & Character_Type'Val (16#98#)
+                            & Character_Type'Val (16#80#)), "utf-8");
+
+   Check ("Continuation", Bytes ("a" & Character_Type'Val (16#80#)), "utf-8");
+   Check ("Overlong", Bytes (Character_Type'Val (16#c0#)
+                             & Character_Type'Val (16#af#)), "utf-8");
+   Check ("Overlong", Bytes (Character_Type'Val (16#e0#)
+                             & Character_Type'Val (16#80#)
+                             & Character_Type'Val (16#af#)), "utf-8");
+   Check ("Surrogate", Bytes (Character_Type'Val (16#ed#)
+                              & Character_Type'Val (16#a0#)
+                              & Character_Type'Val (16#80#)), "utf-8");
+   Check ("Too big", Bytes (Character_Type'Val (16#f4#)
+                            & Character_Type'Val (16#90#)
+                            & Character_Type'Val (16#80#)
+                            & Character_Type'Val (16#80#)), "utf-8");
+   Check ("Truncated", Bytes ("a" & Character_Type'Val (16#e2#)
+                              & Character_Type'Val (16#82#)), "utf-8");
+
+   Check_Big;
+   Put_Line ("Done");
+end Main;
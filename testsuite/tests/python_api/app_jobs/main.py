@@ -0,0 +1,46 @@
+import sys
+
+import libfoolang
+from libfoolang import _py2to3
+
+
+class CountApp(libfoolang.App):
+    def process_unit(self, unit):
+        return len(unit.root.findall(libfoolang.Example))
+
+    def main(self):
+        for file_name, result in self.results.items():
+            print('  {}: {} examples'.format(file_name, result))
+        print('  {} unit(s) loaded in the main process'.format(
+            len(self.units)))
+
+
+if __name__ == '__main__':
+    for jobs in ('1', '2'):
+        print('== --jobs {} =='.format(jobs))
+
+        # Flush buffered output so that forked worker processes do not emit it
+        # a second time.
+        sys.stdout.flush()
+
+        sys.argv = ['main.py', '--jobs', jobs,
+                    'foo1.txt', 'foo2.txt', 'foo3.txt']
+        CountApp.run()
+        print('')
+
+    # Invalid job counts must be rejected
+    for jobs in ('-1', 'foo'):
+        print('== --jobs {} =='.format(jobs))
+        sys.argv = ['main.py', '--jobs', jobs, 'foo1.txt']
+        stderr = sys.stderr
+        sys.stderr = _py2to3.StringIO()
+        try:
+            CountApp.run()
+        except SystemExit as exc:
+            print('  exit code {}'.format(exc.code))
+            print('  ' + sys.stderr.getvalue().strip().splitlines()[-1])
+        finally:
+            sys.stderr = stderr
+        print('')
+
+    print('main.py: Done.')
@@ -0,0 +1,22 @@
+"""
+Test that App can process files in worker processes (--jobs) and that it
+collects the results of the per-unit hook in both sequential and parallel
+modes.
+"""
+
+from langkit.dsl import ASTNode, Field
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    examples = Field()
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py',
+              types_from_lkt=True)
+print('Done')
@@ -36,4 +36,36 @@ print('u.root.p_example_items = {}'.format(example_items))
 res_array = u.root.p_count(example_items)
 print('u.root.p_count(u.root.p_example_items) = {}'.format(res_array))
 
+# Check lazy array views
+with ctx.lazy_arrays():
+    view = u.root.p_all_items
+    print('lazy u.root.p_all_items: {}'.format(type(view).__name__))
+    print('   len(view) = {}'.format(len(view)))
+    print('   view[-1] = {}'.format(view[-1]))
+    print('   view[1:] = {}'.format(view[1:]))
+    print('   list(view) = {}'.format(list(view)))
+    assert view[0] is view[0]
+    try:
+        view[3]
+    except IndexError as exc:
+        print('   view[3] = <IndexError: {}>'.format(exc))
+    print('   u.root.p_count(u.root.p_example_items) = {}'.format(
+        u.root.p_count(u.root.p_example_items)))
+
+    # Lazy wrapping is enabled only for the context that owns the node
+    other_u = libfoolang.AnalysisContext().get_from_buffer('foo.txt',
+                                                           b'example')
+    print('   other context: {}'.format(
+        type(other_u.root.p_all_items).__name__))
+
+    # Items that were not fetched before a reparse are not available anymore
+    view = u.root.p_all_items
+    view[0]
+    u.reparse(b'example null example')
+    try:
+        view[1]
+    except libfoolang.StaleReferenceError:
+        print('   view[1] after reparse = <StaleReferenceError>')
+print('u.root.p_all_items: {}'.format(type(u.root.p_all_items).__name__))
+
 print('main.py: Done.')
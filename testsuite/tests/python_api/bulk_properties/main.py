@@ -0,0 +1,42 @@
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', b'example (example example) example')
+nodes = unit.root.findall(libfoolang.FooNode)
+examples = [n for n in nodes if isinstance(n, libfoolang.Example)]
+
+print('== Results ==')
+for prop, arg in [(libfoolang.FooNode.p_is_example, nodes),
+                  (libfoolang.Example.p_parent_node, examples)]:
+    results = prop.map(arg)
+    for n, r in zip(arg, results):
+        print('{} -> {}'.format(n, r))
+
+    # Bulk evaluation must yield the same results as one-by-one evaluation
+    assert results == [prop.__get__(n) for n in arg]
+print('')
+
+print('== Errors ==')
+results = libfoolang.Example.p_examples_count.map(examples, error_value=None)
+for n, r in zip(examples, results):
+    print('{} -> {}'.format(n, r))
+
+for arg in [examples, [unit.root], [1]]:
+    try:
+        libfoolang.Example.p_examples_count.map(arg)
+    except (libfoolang.PropertyError, TypeError) as exc:
+        print('{}: {}'.format(type(exc).__name__, exc))
+print('')
+
+print('== Misc ==')
+print('Empty sequence: {}'.format(libfoolang.FooNode.p_is_example.map([])))
+print('Generator: {}'.format(
+    libfoolang.FooNode.p_is_example.map(n for n in examples)
+))
+print('Single evaluation: {}'.format(examples[0].p_examples_count))
+print('Is a property: {}'.format(
+    isinstance(libfoolang.Example.p_examples_count, property)
+))
+
+print('main.py: Done.')
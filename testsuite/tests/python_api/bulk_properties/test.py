@@ -0,0 +1,34 @@
+"""
+Test the evaluation of properties on sequences of nodes through the bulk
+accessors of the Python API.
+"""
+
+from langkit.dsl import ASTNode, Bool, Field, Int, T
+from langkit.expressions import If, PropertyError, Self, langkit_property
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+
+    @langkit_property(public=True, return_type=Bool)
+    def is_example():
+        return Self.is_a(Example)
+
+
+class Example(FooNode):
+    examples = Field()
+
+    @langkit_property(public=True, return_type=Int)
+    def examples_count():
+        return If(Self.examples.is_null,
+                  PropertyError(Int, 'no examples'),
+                  Self.examples.length)
+
+    @langkit_property(public=True, return_type=T.FooNode.entity)
+    def parent_node():
+        return Self.parent.as_bare_entity
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py')
+print('Done')
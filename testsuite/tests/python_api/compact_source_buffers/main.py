@@ -0,0 +1,87 @@
+import libfoolang
+
+
+print('main.py: Running...')
+
+
+def describe(unit):
+    """
+    Return a description of the tokens, the tree and the diagnostics of
+    ``unit``, to compare parsing results.
+    """
+    def node(n):
+        if n is None:
+            return None
+        return (n.kind_name, str(n.sloc_range), n.text, [node(c) for c in n])
+
+    return ([(t.kind, t.text, str(t.sloc_range)) for t in unit.iter_tokens()],
+            node(unit.root),
+            [str(d) for d in unit.diagnostics],
+            unit.text)
+
+
+def describe_no_text(unit):
+    """
+    Like ``describe``, but do not fetch the text of tokens and nodes.
+    """
+    def node(n):
+        if n is None:
+            return None
+        return (n.kind_name, str(n.sloc_range), [node(c) for c in n])
+
+    return ([(t.kind, str(t.sloc_range)) for t in unit.iter_tokens()],
+            node(unit.root))
+
+
+def representation(unit, length):
+    """
+    Return the representation that ``unit`` uses for its source buffer,
+    according to its memory usage. ``length`` is the number of characters in
+    its source.
+    """
+    size = unit.memory_usage.source_buffer
+    if size == length:
+        return 'compact'
+    elif size >= 4 * length:
+        return 'UTF-32'
+    else:
+        return 'unexpected size: {}'.format(size)
+
+
+def check(label, source):
+    print('== {} =='.format(label))
+    filename = 'test.txt'
+    with open(filename, 'wb') as f:
+        f.write(source.encode('utf-8'))
+
+    ref_unit = libfoolang.AnalysisContext('utf-8').get_from_file(filename)
+
+    ctx = libfoolang.AnalysisContext('utf-8')
+    ctx.set_compact_source_buffers(True)
+    unit = ctx.get_from_file(filename)
+    print('After parsing: {}'.format(representation(unit, len(source))))
+
+    # Wrapping tokens and nodes does not require the source text, so it keeps
+    # the compact representation.
+    assert describe_no_text(unit) == describe_no_text(ref_unit)
+    print('After token wrapping: {}'.format(
+        representation(unit, len(source))))
+
+    # The text of tokens, nodes and units in the Python API references the
+    # UTF-32 source buffer, so accessing it switches the unit to the UTF-32
+    # representation.
+    assert describe(unit) == describe(ref_unit)
+    print('After text access: {}'.format(representation(unit, len(source))))
+
+    # Reparsing the unit goes back to the compact representation, if possible
+    unit.reparse()
+    print('After reparsing: {}'.format(representation(unit, len(source))))
+    assert describe(unit) == describe(ref_unit)
+    print('')
+
+
+check('ASCII', 'example (example # comment\n\texample)\nexample\n')
+check('Latin-1', 'example # caf\xe9\nexample (example\n')
+check('Other', 'example # \u20ac\nexample\n')
+
+print('main.py: Done.')
@@ -0,0 +1,54 @@
+import os.path
+
+import libfoolang
+
+
+print('main.py: Running...')
+
+
+class Handler(libfoolang.EventHandler):
+
+    def __init__(self, label):
+        self.label = label
+        self.events = []
+
+    def phase_timing(self, filename, phase, name, elapsed):
+        assert elapsed >= 0
+        self.events.append((os.path.basename(filename), phase, name))
+
+    def flush(self):
+        # Events are sorted since the order in which phases are reported
+        # (lexical environments may be populated on the first property call)
+        # is an implementation detail.
+        print('{}:'.format(self.label))
+        for event in sorted(set(self.events)):
+            print('  {}'.format(event))
+        self.events = []
+
+
+ctx = libfoolang.AnalysisContext()
+h1 = Handler('h1')
+ctx.set_event_handler(h1)
+
+u = ctx.get_from_buffer('u1.txt', b'example (example example)')
+u.populate_lexical_env()
+h1.flush()
+
+# Only top-level property calls are reported
+for n in u.root.findall(libfoolang.Example):
+    n.p_examples_count
+h1.flush()
+
+# Replacing the event handler releases the previous one
+h2 = Handler('h2')
+ctx.set_event_handler(h2)
+ctx.get_from_buffer('u2.txt', b'example')
+h1.flush()
+h2.flush()
+
+# Once removed, event handlers receive nothing
+ctx.set_event_handler(None)
+ctx.get_from_buffer('u3.txt', b'example')
+h2.flush()
+
+print('main.py: Done.')
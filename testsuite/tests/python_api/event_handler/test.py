@@ -0,0 +1,24 @@
+"""
+Test event handlers to get timings for analysis phases.
+"""
+
+from langkit.dsl import ASTNode, Field, Int
+from langkit.expressions import Self, langkit_property
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    examples = Field()
+
+    @langkit_property(public=True, return_type=Int, memoized=True)
+    def examples_count():
+        return Self.examples.then(lambda e: e.length)
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py')
+print('Done')
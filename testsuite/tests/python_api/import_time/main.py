@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+
+
+# The generated module is already imported in this interpreter, so run the
+# checks in a fresh one. It prints its results as JSON on the standard output.
+script = """
+import json
+import sys
+
+
+before = set(sys.modules)
+import libfoolang
+
+
+result = {}
+
+# Modules that are used only in rare cases (argument parsing, JSON
+# serialization, multiprocessing) must not be loaded at import time. Note that
+# this script imports json itself before measuring.
+result['loaded'] = sorted(m for m in ('argparse', 'multiprocessing')
+                          if m in sys.modules and m not in before)
+
+
+# C functions must be bound only when first called, and then the module
+# global must designate the actual binding rather than the lazy wrapper.
+def is_bound(name):
+    return name in vars(libfoolang._c_lib)
+
+
+lazy_unit_root = libfoolang._unit_root
+result['bound_before_call'] = is_bound('foo_unit_root')
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', b'example')
+unit.root
+result['bound_after_call'] = is_bound('foo_unit_root')
+result['global_rebound'] = libfoolang._unit_root is not lazy_unit_root
+
+print(json.dumps(result, sort_keys=True))
+"""
+
+p = subprocess.Popen([sys.executable, '-c', script],
+                     stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+stdout, stderr = p.communicate()
+assert p.returncode == 0, stderr
+result = json.loads(stdout.decode().strip().splitlines()[-1])
+for key, value in sorted(result.items()):
+    print('{}: {}'.format(key, value))
+
+print('main.py: Done.')
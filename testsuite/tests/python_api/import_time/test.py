@@ -0,0 +1,21 @@
+"""
+Check that the import of the generated Python module defers the binding of C
+functions and the loading of rarely used modules, which are expensive.
+"""
+
+from langkit.dsl import ASTNode, Field
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    examples = Field()
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py',
+              types_from_lkt=True)
+print('Done')
@@ -0,0 +1,69 @@
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', b'example\n\texample (\n\n  example)\n')
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+print('line_count = {}'.format(unit.line_count))
+print('')
+
+for offset in (0, 7, 8, 9, 18, 19, 22, 31, 32, -1):
+    sloc = unit.offset_to_sloc(offset)
+    print('offset_to_sloc({}) = {}'.format(offset, sloc))
+    if sloc is not None:
+        assert unit.sloc_to_offset(sloc) == offset
+print('')
+
+for line, column in ((2, 5), (1, 9), (6, 1), (0, 0)):
+    sloc = libfoolang.Sloc(line, column)
+    print('sloc_to_offset({}) = {}'.format(sloc, unit.sloc_to_offset(sloc)))
+print('')
+
+for line in (0, 1, 2, 3, 4, 6):
+    print('line_tokens({}):'.format(line))
+    for t in unit.line_tokens(line):
+        print('  {}'.format(t))
+
+for value in ('0', None):
+    try:
+        unit.line_tokens(value)
+    except TypeError as exc:
+        print('TypeError: {}'.format(exc))
+print('')
+
+# Conversions must agree with the source locations that the lexer computes,
+# including for tabulations and CRLF line endings.
+print('== Tabulations and CRLF line endings ==')
+unit = ctx.get_from_buffer('crlf.txt',
+                           b'example\r\n\texample (\r\n \texample)\r\n')
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+table = unit.token_table()
+for i in range(len(table.kinds)):
+    for offset, line, column in (
+        (table.start_offsets[i], table.start_lines[i], table.start_columns[i]),
+        (table.end_offsets[i], table.end_lines[i], table.end_columns[i]),
+    ):
+        sloc = libfoolang.Sloc(line, column)
+        assert unit.offset_to_sloc(offset) == sloc
+        assert unit.sloc_to_offset(sloc) == offset
+
+for offset in (7, 8, 9, 10, 19, 20, 22, 23, 31, 33):
+    sloc = unit.offset_to_sloc(offset)
+    print('offset_to_sloc({}) = {}'.format(offset, sloc))
+    assert unit.sloc_to_offset(sloc) == offset
+
+print('line_tokens(2):')
+for t in unit.line_tokens(2):
+    print('  {}'.format(t))
+
+print('main.py: Done.')
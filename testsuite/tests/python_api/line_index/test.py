@@ -0,0 +1,21 @@
+"""
+Test conversions between source buffer offsets and source locations, and
+the lookup of tokens by line.
+"""
+
+from langkit.dsl import ASTNode, Field
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    examples = Field()
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py',
+              types_from_lkt=True)
+print('Done')
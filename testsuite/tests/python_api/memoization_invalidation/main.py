@@ -0,0 +1,36 @@
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+units = {
+    'a.txt': ctx.get_from_buffer('a.txt', b'example (example example)'),
+    'b.txt': ctx.get_from_buffer('b.txt', b'example example'),
+}
+
+
+def evaluate():
+    for filename, unit in sorted(units.items()):
+        counts = [n.p_examples_count
+                  for n in unit.root.findall(libfoolang.Example)]
+        print('{}: {}'.format(filename, counts))
+
+
+def reparse(filename, buffer):
+    print('Reparsing {}'.format(filename))
+    units[filename].reparse(buffer)
+    print('Stats: {}'.format(ctx.memoization_invalidation_stats))
+
+
+print('Stats: {}'.format(ctx.memoization_invalidation_stats))
+evaluate()
+
+# Only the 3 results for a.txt nodes should be invalidated: the 2 results for
+# b.txt nodes survive.
+reparse('a.txt', b'example (example) example')
+evaluate()
+
+# Now there are 3 results for a.txt nodes and 2 for b.txt nodes
+reparse('b.txt', b'example')
+evaluate()
+
+print('main.py: Done.')
@@ -0,0 +1,60 @@
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('main.txt', b'example (example example)')
+nodes = dict(zip(['n1', 'n2', 'n3'], u.root.findall(libfoolang.Example)))
+
+
+def evaluate(*names):
+    print('Evaluating {}'.format(', '.join(names)))
+    for name in names:
+        nodes[name].p_examples_count
+
+
+def print_stats():
+    for name, stats in sorted(ctx.memoization_stats.items()):
+        print('  {}: hits={}, misses={}, entries={}, evictions={}'.format(
+            name, stats.hits, stats.misses, stats.entries, stats.evictions
+        ))
+        # All entries have the same size
+        assert stats.bytes == stats.entries * entry_size
+
+
+print('Initial stats:')
+entry_size = 0
+print_stats()
+
+evaluate('n1', 'n2', 'n3')
+evaluate('n1', 'n2', 'n3')
+entry_size = ctx.memoization_stats['Example.examples_count'].bytes // 3
+assert entry_size > 0
+print_stats()
+
+# Leave room for only two entries: the least recently used one is evicted
+# right away. Then, evaluating all properties in a loop evicts the entry that
+# is about to be used next, so all evaluations are misses.
+print('Setting an LRU memory limit')
+ctx.set_memoization_memory_limit(2 * entry_size)
+print_stats()
+evaluate('n1', 'n2', 'n3')
+print_stats()
+
+# With the clock policy, entries used since the last eviction get a second
+# chance: the first eviction goes over all entries once.
+print('Switching to the clock policy')
+ctx.set_memoization_memory_limit(2 * entry_size, 'clock')
+evaluate('n2', 'n3', 'n1')
+print_stats()
+
+print('Removing the memory limit')
+ctx.set_memoization_memory_limit(0)
+evaluate('n1', 'n2', 'n3')
+print_stats()
+
+try:
+    ctx.set_memoization_memory_limit(0, 'fifo')
+except ValueError as exc:
+    print('ValueError: {}'.format(exc))
+
+print('main.py: Done.')
@@ -0,0 +1,47 @@
+import libfoolang
+
+
+print('main.py: Running...')
+
+
+def check(label, usage):
+    print('{}:'.format(label))
+    assert usage.total == sum(usage[:-1])
+    assert all(value >= 0 for value in usage)
+
+    # Only print categories that do not depend on implementation details (no
+    # lexical environments in this language and no precomputed symbols).
+    for name in ('ast_nodes', 'tokens', 'source_buffer', 'memoization'):
+        print('  {}: {}'.format(name, 'yes' if getattr(usage, name) else 'no'))
+
+
+ctx = libfoolang.AnalysisContext()
+u1 = ctx.get_from_buffer('u1.txt', b'example (example example)')
+u2 = ctx.get_from_buffer('u2.txt', b'example')
+
+check('u1', u1.memory_usage)
+assert u1.memory_usage.source_buffer >= 4 * len(u1.text)
+
+# Evaluating memoized properties makes memoization memory grow, and only for
+# the unit that owns the memoized nodes.
+for n in u1.root.findall(libfoolang.Example):
+    n.p_examples_count
+mmz_bytes = ctx.memoization_stats['Example.examples_count'].bytes
+check('u1 after property calls', u1.memory_usage)
+assert u1.memory_usage.memoization == mmz_bytes
+assert u2.memory_usage.memoization == 0
+
+# The context usage covers all its units, and units share the symbol table
+usage = ctx.memory_usage
+check('context', usage)
+units = [u1.memory_usage, u2.memory_usage]
+for name in ('ast_nodes', 'tokens', 'source_buffer', 'memoization'):
+    assert getattr(usage, name) == sum(getattr(u, name) for u in units), name
+assert usage.symbols >= sum(u.symbols for u in units)
+
+# Memory limits release memoization memory right away
+ctx.set_memoization_memory_limit(1)
+print('after setting a memoization memory limit: {}'.format(
+    ctx.memory_usage.memoization
+))
+print('main.py: Done.')
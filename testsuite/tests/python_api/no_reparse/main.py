@@ -0,0 +1,71 @@
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', b'example (example)')
+
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+# Create a stale reference before entering the no_reparse block: it must still
+# be detected as such inside the block.
+stale = unit.root
+unit.reparse(b'example (example (example))')
+
+
+def try_compute(label, computation):
+    print('Trying to compute: {}...'.format(label))
+    try:
+        result = computation()
+    except libfoolang.StaleReferenceError:
+        print('   StaleReferenceError raised!')
+    except libfoolang.PreconditionFailure as exc:
+        print('   PreconditionFailure raised: {}'.format(exc))
+    else:
+        print('   Got: {}'.format(result))
+
+
+with ctx.no_reparse() as c:
+    assert c is ctx
+    root = unit.root
+
+    # Wrappers are still re-used
+    assert root[0] is root[0]
+    assert root[0].parent is root
+
+    try_compute('root[0].f_examples', lambda: root[0].f_examples)
+    try_compute('stale[0]', lambda: stale[0])
+
+    # Nested blocks are allowed
+    with ctx.no_reparse():
+        try_compute('root[0]', lambda: root[0])
+
+    # Units loaded inside the block are trusted too
+    other = ctx.get_from_file('foo.txt')
+    assert other is unit
+
+    try_compute('unit.reparse()',
+                lambda: unit.reparse(b'example'))
+    try_compute('ctx.get_from_buffer() (existing unit)',
+                lambda: ctx.get_from_buffer('foo.txt', b'example'))
+
+    # Creating new units does not reparse anything, so it is allowed
+    try_compute('ctx.get_from_buffer() (new unit)',
+                lambda: ctx.get_from_buffer('bar.txt', b'example').root)
+    try_compute('ctx.get_from_file(reparse=True)',
+                lambda: ctx.get_from_file('foo.txt', reparse=True))
+    try_compute('ctx.get_from_provider(reparse=True)',
+                lambda: ctx.get_from_provider('foo', 'unit_body',
+                                              reparse=True))
+
+# Past the block, reparsing is allowed again and stale references are detected
+print('Reparsing...')
+unit.reparse(b'example')
+try_compute('root[0]', lambda: root[0])
+try_compute('unit.root[0]', lambda: unit.root[0])
+
+print('main.py: Done.')
@@ -0,0 +1,21 @@
+"""
+Test that AnalysisContext.no_reparse forbids reparsing and keeps node wrappers
+usable.
+"""
+
+from langkit.dsl import ASTNode, Field
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    examples = Field()
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py',
+              types_from_lkt=True)
+print('Done')
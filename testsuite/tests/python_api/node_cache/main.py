@@ -0,0 +1,51 @@
+import gc
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+
+
+def check(label, size):
+    print('== {} =='.format(label))
+    libfoolang.AnalysisUnit.node_cache_size = size
+    unit = ctx.get_from_buffer('{}.txt'.format(size), b'example')
+    if unit.diagnostics:
+        for d in unit.diagnostics:
+            print(d)
+        sys.exit(1)
+    print(unit.node_cache_stats)
+
+    # Wrappers are re-used as long as they are alive
+    root = unit.root
+    assert unit.root is root
+    print(unit.node_cache_stats)
+
+    # Depending on the cache size, they may be free'd when user code does not
+    # reference them anymore.
+    del root
+    gc.collect()
+    print(unit.node_cache_stats)
+    root = unit.root
+    print(unit.node_cache_stats)
+    print('')
+
+
+check('weak references only', 0)
+check('keep recent wrappers alive', 10)
+check('keep all wrappers alive', None)
+
+# Wrappers that are used repeatedly must not evict the other recently used
+# ones.
+print('== hot wrapper ==')
+libfoolang.AnalysisUnit.node_cache_size = 2
+unit = ctx.get_from_buffer('hot.txt', b'example example')
+unit.root[0]
+for _ in range(5):
+    unit.root
+gc.collect()
+print('alive wrappers: {}'.format(unit.node_cache_stats.size))
+print('')
+
+print('main.py: Done.')
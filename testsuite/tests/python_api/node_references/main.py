@@ -0,0 +1,51 @@
+import copy
+import pickle
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_file('foo.txt')
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+nodes = [unit.root] + unit.root.findall(lambda _: True)
+
+print('== References ==')
+print('{} -> {}'.format(unit, unit.reference))
+for n in nodes:
+    print('{} -> {}'.format(n, n.reference))
+print('')
+
+# Node wrappers are immutable, so copies return the same wrapper
+assert copy.copy(nodes[1]) is nodes[1]
+assert copy.deepcopy(nodes[1]) is nodes[1]
+
+print('== Resolution in another context ==')
+data = pickle.dumps([unit] + nodes)
+other_ctx = libfoolang.AnalysisContext()
+for ref in pickle.loads(data):
+    resolved = other_ctx.resolve(ref)
+    print('{} -> {}'.format(ref, resolved))
+    assert resolved.reference == ref
+    resolved_unit = (resolved if isinstance(resolved, libfoolang.AnalysisUnit)
+                     else resolved.unit)
+    assert resolved_unit.context == other_ctx
+print('')
+
+print('== Invalid references ==')
+for ref in [
+    libfoolang.NodeReference(unit.filename, 42, 'Example'),
+    libfoolang.NodeReference(unit.filename, 0, 'Example'),
+    42,
+]:
+    try:
+        other_ctx.resolve(ref)
+    except (TypeError, ValueError) as exc:
+        print('{}: {}'.format(type(exc).__name__, exc))
+print('')
+
+print('main.py: Done.')
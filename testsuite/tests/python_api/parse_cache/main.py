@@ -0,0 +1,92 @@
+import os
+import os.path
+
+import libfoolang
+
+
+print('main.py: Running...')
+
+
+class Handler(libfoolang.EventHandler):
+
+    def __init__(self):
+        self.events = []
+
+    def phase_timing(self, filename, phase, name, elapsed):
+        self.events.append((os.path.basename(filename), phase, name))
+
+
+def describe(unit):
+    """
+    Return a description of the tokens, the tree and the diagnostics of
+    ``unit``, to compare parsing results.
+    """
+    def node(n):
+        if n is None:
+            return None
+        return (n.kind_name, str(n.sloc_range), n.text, [node(c) for c in n])
+
+    return ([(t.kind, t.text, str(t.sloc_range)) for t in unit.iter_tokens()],
+            node(unit.root),
+            [str(d) for d in unit.diagnostics])
+
+
+def write(filename, content):
+    with open(filename, 'w') as f:
+        f.write(content)
+
+
+def parse(filename, cache_dir='cache'):
+    """
+    Parse ``filename`` in a new context that uses the given parse cache
+    directory, print the parsing phases that were run and check that the
+    result is the same as without the parse cache.
+    """
+    ref_unit = libfoolang.AnalysisContext().get_from_file(filename)
+
+    ctx = libfoolang.AnalysisContext()
+    ctx.set_parse_cache_directory(cache_dir)
+    handler = Handler()
+    ctx.set_event_handler(handler)
+    unit = ctx.get_from_file(filename)
+
+    print('{}: {}'.format(filename, sorted(handler.events)))
+    assert describe(unit) == describe(ref_unit)
+
+
+write('good.txt', 'example (example # comment\n  example)\nexample\n')
+write('bad.txt', 'example (example\n')
+
+print('== First parse ==')
+parse('good.txt')
+parse('bad.txt')
+print('Cache entries: {}'.format(len(os.listdir('cache'))))
+print('')
+
+# Results for sources with diagnostics are not cached
+print('== Second parse ==')
+parse('good.txt')
+parse('bad.txt')
+print('')
+
+# Entries are keyed by source contents
+print('== Modified source ==')
+write('good.txt', 'example example\n')
+parse('good.txt')
+parse('good.txt')
+print('Cache entries: {}'.format(len(os.listdir('cache'))))
+print('')
+
+# Invalid entries are ignored and replaced
+print('== Invalid entries ==')
+for name in os.listdir('cache'):
+    write(os.path.join('cache', name), 'invalid entry')
+parse('good.txt')
+parse('good.txt')
+print('')
+
+# The parse cache is disabled with None
+print('== Disabled cache ==')
+parse('good.txt', cache_dir=None)
+
+print('main.py: Done.')
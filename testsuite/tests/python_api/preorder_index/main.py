@@ -0,0 +1,46 @@
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+
+
+def check(unit):
+    if unit.diagnostics:
+        for d in unit.diagnostics:
+            print(d)
+        sys.exit(1)
+
+    nodes = [unit.root] + unit.root.findall(lambda _: True)
+    for i, n in enumerate(nodes):
+        print('{}: #{}..#{}'.format(n, n.preorder_index, n.preorder_last))
+        assert n.preorder_index == i
+        assert unit.node_at_preorder_index(i) is n
+
+    # Ancestor checks are range containment checks
+    for n in nodes:
+        for ancestor in n.parent_chain:
+            assert (ancestor.preorder_index
+                    <= n.preorder_index
+                    <= ancestor.preorder_last)
+
+    for i in (-1, len(nodes)):
+        print('node_at_preorder_index({}) = {}'.format(
+            i, unit.node_at_preorder_index(i)))
+    print('')
+
+
+unit = ctx.get_from_buffer('foo.txt', b'example (example example) example')
+check(unit)
+
+print('Reparsing...')
+unit.reparse(b'example (example)')
+check(unit)
+
+try:
+    unit.node_at_preorder_index('0')
+except TypeError as exc:
+    print('TypeError: {}'.format(exc))
+
+print('main.py: Done.')
@@ -0,0 +1,53 @@
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+
+
+def naive_lookup(unit, sloc):
+    """
+    Return the bottom-most node that contains sloc, walking the whole tree.
+    """
+    result = None
+    for n in [unit.root] + unit.root.findall(lambda _: True):
+        sr = n.sloc_range
+        if sr.start == sloc or (sr.start < sloc and sloc < sr.end):
+            result = n
+    return result
+
+
+def check(unit, slocs):
+    if unit.diagnostics:
+        for d in unit.diagnostics:
+            print(d)
+        sys.exit(1)
+
+    for line, column in slocs:
+        sloc = libfoolang.Sloc(line, column)
+        node = unit.lookup_node(sloc)
+        print('{}: {}'.format(sloc, node))
+        covering = unit.covering_nodes(sloc)
+        print('  covering: {}'.format(covering))
+        assert covering == (node.parent_chain if node else [])
+        assert node == naive_lookup(unit, sloc)
+        assert node == unit.root.lookup(sloc)
+    print('')
+
+
+unit = ctx.get_from_buffer('foo.txt', b'example (example example) example')
+check(unit, [(1, 1), (1, 9), (1, 10), (1, 17), (1, 25), (1, 26), (1, 33),
+             (1, 34), (2, 1)])
+
+# Lookups from a node only return nodes in its subtree
+sloc = libfoolang.Sloc(1, 10)
+for n in unit.root:
+    print('{}.lookup({}) = {}'.format(n, sloc, n.lookup(sloc)))
+print('')
+
+print('Reparsing...')
+unit.reparse(b'example (example)')
+check(unit, [(1, 1), (1, 10), (1, 17), (1, 18)])
+
+print('main.py: Done.')
@@ -0,0 +1,58 @@
+import sys
+
+import libfoolang
+from libfoolang import _py2to3
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', u'example (example) # H\xe9llo',
+                           charset=None)
+
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+
+def decode(buf):
+    return _py2to3.text_repr(u''.join(_py2to3.unicode_character(c)
+                                      for c in buf))
+
+
+def show_unit(unit):
+    buf = unit.source_buffer
+    print('source_buffer: {} code points, read-only: {}'.format(
+        len(buf), buf.readonly))
+    print('  decoded: {}'.format(decode(buf)))
+    print('unit.text: {}'.format(_py2to3.text_repr(unit.text)))
+    assert unit.text is unit.text
+
+    print('Tokens:')
+    for t in unit.iter_tokens():
+        print('  {} {}'.format(t.kind, _py2to3.text_repr(t.text)))
+
+    print('Nodes:')
+    for n in [unit.root] + unit.root.findall(lambda _: True):
+        print('  {} {}'.format(n.kind_name, _py2to3.text_repr(n.text)))
+    print('')
+
+
+show_unit(unit)
+
+print('Reparsing...')
+old_buf = unit.source_buffer
+old_slice = old_buf[9:16]
+unit.reparse(b'example')
+show_unit(unit)
+
+print('Reparsing through the context...')
+ctx.get_from_buffer('foo.txt', b'example (example (example))')
+show_unit(unit)
+
+# Views on older versions of the source buffer, and slices of them, keep
+# designating the corresponding source text.
+print('Old source_buffer: {}'.format(decode(old_buf)))
+print('Old source_buffer slice: {}'.format(decode(old_slice)))
+print('')
+
+print('main.py: Done.')
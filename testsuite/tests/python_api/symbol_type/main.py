@@ -23,4 +23,12 @@ for s in (None, 42, 'my_ident', 'MY_IDENT', 'no_such_symbol',
         result = 'raised <InvalidSymbolError: {}>'.format(exc)
     print('u.root.p_sym({}) {}'.format(repr(s), result))
 
+# Symbols are cached: converting the same symbol twice must yield the same
+# string, even after the symbol canonicalizer changed the text.
+for s in ('my_ident', 'MY_IDENT'):
+    first = u.root.p_sym(s)
+    second = u.root.p_sym(s)
+    print('u.root.p_sym({}) cached: {}'.format(repr(s), first is second))
+assert u.root.p_sym('my_ident') == u.root.p_sym('MY_IDENT') == 'my_ident'
+
 print('main.py: Done.')
@@ -0,0 +1,55 @@
+import array
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', b'example\n  (example) # c')
+
+if unit.diagnostics:
+    for d in unit.diagnostics:
+        print(d)
+    sys.exit(1)
+
+table = unit.token_table()
+print(table)
+print('len: {}'.format(len(table)))
+print('kinds: {} read-only: {}'.format(table.kinds.format,
+                                       table.kinds.readonly))
+print('')
+
+source = unit.text
+tokens = list(unit.iter_tokens())
+assert len(tokens) == len(table)
+
+for i, tok in enumerate(tokens):
+    kind = table.kind_name(table.kinds[i])
+    start = table.start_offsets[i]
+    end = table.end_offsets[i]
+    sloc = '{}:{}-{}:{}'.format(
+        table.start_lines[i], table.start_columns[i],
+        table.end_lines[i], table.end_columns[i]
+    )
+    print('{:<11} {:>2}-{:<2} {:<9} trivia={}'.format(
+        kind, start, end, sloc, table.is_trivia[i]))
+
+    # Check that the table is consistent with the token API
+    assert kind == tok.kind
+    assert source[start:end] == tok.text
+    assert sloc == str(tok.sloc_range)
+    assert bool(table.is_trivia[i]) == tok.is_trivia
+print('')
+
+# Columns are usable with the array module, without any per-token call
+lines = array.array('I', table.start_lines)
+print('max line: {}'.format(max(lines)))
+print('trivia count: {}'.format(sum(table.is_trivia)))
+
+# Columns are copies: they survive reparsing
+unit.reparse(b'example')
+print('after reparse: {} (table length: {})'.format(
+    len(unit.token_table()), len(table)))
+print('first end offset: {}'.format(table.end_offsets[0]))
+
+print('main.py: Done.')
@@ -0,0 +1,73 @@
+import io
+import json
+
+import libfoolang
+import libfoolang_tree_reader as tree_reader
+
+
+ctx = libfoolang.AnalysisContext()
+unit = ctx.get_from_buffer('foo.txt', b'example (example example) example')
+
+
+def check(node, decoded):
+    """
+    Check that ``decoded`` (serialized then decoded tree) matches ``node``.
+    """
+    if node is None:
+        assert decoded is None
+        return
+    assert decoded.kind_name == node.kind_name
+    assert decoded.sloc_range_image == str(node.sloc_range)
+    assert len(decoded.children) == len(node)
+    for child, decoded_child in zip(node, decoded.children):
+        check(child, decoded_child)
+
+
+print('== JSON ==')
+json_data = unit.serialize()
+print(json_data.decode('utf-8'))
+print('')
+
+print('== Binary ==')
+binary_data = unit.serialize('binary')
+root = tree_reader.loads(binary_data)
+print('root: {}'.format(root))
+print('children: {}'.format(root.children))
+print('fields: {}'.format(root.children[0].fields))
+print('tokens: {}..{}'.format(root.token_start, root.token_end))
+check(unit.root, root)
+assert root.to_data() == json.loads(json_data.decode('utf-8'))
+print('')
+
+print('== Streaming ==')
+f = io.BytesIO()
+print('serialize returned: {}'.format(unit.serialize('binary', f)))
+assert f.getvalue() == binary_data
+f.seek(0)
+print('load: {}'.format(tree_reader.load(f)))
+print('')
+
+print('== Errors ==')
+
+
+class FailingOutput(object):
+    def write(self, data):
+        raise RuntimeError('disk full')
+
+
+for args in [('xml', None), ('json', FailingOutput())]:
+    try:
+        unit.serialize(*args)
+    except (ValueError, RuntimeError) as exc:
+        print('{}: {}'.format(type(exc).__name__, exc))
+
+for label, data in [('bad version', b'LKTB\x02\x00'),
+                    ('truncated', binary_data[:-1]),
+                    ('bad magic', b'XXXX')]:
+    try:
+        tree_reader.loads(data)
+    except tree_reader.FormatError as exc:
+        msg = str(exc).replace(str(len(binary_data) - 4), 'END')
+        print('{}: FormatError: {}'.format(label, msg))
+
+print('main.py: Done.')
@@ -0,0 +1,15 @@
+package body Libfoolang.Implementation.Extensions is
+
+   ----------------------------
+   -- Example_P_U0_Root_Impl --
+   ----------------------------
+
+   function Example_P_U0_Root_Impl (Node : Bare_Example) return Bare_Foo_Node
+   is
+      Unit : constant Internal_Unit := Get_From_File
+        (Node.Unit.Context, "u0.txt", "", False, Default_Grammar_Rule);
+   begin
+      return Unit.AST_Root;
+   end Example_P_U0_Root_Impl;
+
+end Libfoolang.Implementation.Extensions;
@@ -0,0 +1,78 @@
+import os.path
+
+import libfoolang
+
+
+print('main.py: Running...')
+
+
+for i in range(3):
+    with open('u{}.txt'.format(i), 'w') as f:
+        f.write('example ' * (i + 1))
+
+ctx = libfoolang.AnalysisContext()
+units = [ctx.get_from_file('u{}.txt'.format(i)) for i in range(3)]
+buf = ctx.get_from_buffer('buf.txt', b'example')
+
+
+def print_units(label):
+    print('{}:'.format(label))
+    for u in units + [buf]:
+        print('  {}: {}'.format(os.path.basename(u.filename),
+                                'evicted' if u.is_evicted else 'loaded'))
+
+
+print_units('Without limit')
+for n in units[0].root:
+    n.p_examples_count
+
+# With a tiny limit, all units parsed from files are evicted, along with the
+# memoized results that depend on them.
+ctx.set_unit_memory_limit(1)
+print_units('With a 1-byte limit')
+assert units[0].memory_usage.ast_nodes == 0
+print('Memoized results: {}'.format(
+    ctx.memoization_stats['Example.examples_count'].entries
+))
+
+# Using an evicted unit transparently parses it again. As it is then the most
+# recently used unit, it stays loaded.
+print('Root of u1: {}'.format(units[1].root))
+print('Text of u1: {!r}'.format(units[1].text))
+print_units('After using u1')
+
+# Evicted units cannot be parsed again while properties are evaluated, as this
+# would invalidate the results these properties rely on.
+try:
+    units[1].root[0].p_u0_root
+except libfoolang.PreconditionFailure as exc:
+    print('PreconditionFailure: {}'.format(exc))
+
+# Loading another unit evicts u1, so its nodes become stale
+root = units[1].root
+units[2] = ctx.get_from_file('u2.txt')
+print_units('After loading u2')
+try:
+    root.children
+except libfoolang.StaleReferenceError:
+    print('Nodes of evicted units are stale')
+
+# No unit is evicted inside no_reparse blocks
+with ctx.no_reparse():
+    for u in units:
+        u.root
+    print_units('Inside a no_reparse block')
+print_units('After the no_reparse block')
+
+# Lifting the limit stops evictions
+ctx.set_unit_memory_limit(0)
+for u in units:
+    u.root
+print_units('Without limit')
+
+try:
+    ctx.set_unit_memory_limit(-1)
+except libfoolang.PreconditionFailure as exc:
+    print('PreconditionFailure: {}'.format(exc))
+
+print('main.py: Done.')
@@ -0,0 +1,33 @@
+"""
+Test the eviction of analysis units under a memory limit.
+"""
+
+from langkit.dsl import ASTNode, Field, Int, T
+from langkit.expressions import Self, langkit_property
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+    examples = Field()
+
+    @langkit_property(public=True, return_type=Int, memoized=True)
+    def examples_count():
+        return Self.examples.then(lambda e: e.length)
+
+    @langkit_property(return_type=T.FooNode, external=True,
+                      uses_entity_info=False, uses_envs=False)
+    def u0_root_impl():
+        pass
+
+    @langkit_property(public=True, return_type=T.FooNode)
+    def u0_root():
+        return Self.u0_root_impl
+
+
+build_and_run(lkt_file='expected_concrete_syntax.lkt', py_script='main.py')
+print('Done')
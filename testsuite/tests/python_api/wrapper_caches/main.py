@@ -22,13 +22,18 @@ assert child.parent is root
 assert root[0] is child
 assert root.unit is unit
 
+# Syntax fields are cached in node wrappers
+examples = child.f_examples
+assert child.f_examples is examples
+
 # Make sure trying to use a stale reference raises an error
 print('Reparsing...')
 unit.reparse(b'example (example)')
 for name, computation in [
     ('.parent', lambda n: n.parent),
     ('[0]', lambda n: n[0]),
-    ('str()', lambda n: str(n))
+    ('str()', lambda n: str(n)),
+    ('[0].f_examples (cached)', lambda n: child.f_examples),
 ]:
     print('Trying to compute: {}...'.format(name))
     try: